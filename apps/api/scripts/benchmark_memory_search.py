@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+AeroLab Platform - Benchmark de busca em LongTermMemory
+
+Compara a latência da busca antiga (`content LIKE '%query%'`, full scan)
+com a busca FTS5/BM25 sobre o mesmo banco.
+
+Uso:
+    python scripts/benchmark_memory_search.py --memories 1000000 --queries 200
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.agents.memory import LongTermMemory, MemoryItem, MemoryType
+
+
+VOCABULARY = [
+    "usuario", "prefere", "linguagem", "formal", "relatorio", "financeiro", "mensal",
+    "cliente", "contrato", "licitacao", "prazo", "entrega", "sao", "paulo", "brasilia",
+    "python", "agente", "workflow", "orcamento", "aprovado", "reuniao", "semanal",
+    "dashboard", "metricas", "alerta", "incidente", "deploy", "producao", "teste",
+    "fornecedor", "pagamento", "fatura", "imposto", "auditoria", "compliance", "risco",
+] + [f"termo{i}" for i in range(20_000)]
+
+# Distribuição de Zipf: poucas palavras muito comuns, cauda longa de termos raros
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def populate(memory: LongTermMemory, total: int, batch_size: int = 10_000) -> float:
+    rng = random.Random(42)
+    start = time.perf_counter()
+
+    for offset in range(0, total, batch_size):
+        memory.add_many([
+            MemoryItem(
+                id=f"m{offset + i}",
+                content=" ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=rng.randint(6, 20))),
+                memory_type=MemoryType.LONG_TERM,
+                importance=rng.random(),
+                metadata={"category": rng.choice(["fact", "preference", "instruction"])}
+            )
+            for i in range(min(batch_size, total - offset))
+        ])
+        print(f"\r  inseridas {min(offset + batch_size, total):,}/{total:,}", end="", flush=True)
+
+    print()
+    return time.perf_counter() - start
+
+
+def bench(fn, queries: list[str]) -> list[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        fn(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        memory = LongTermMemory(db_path=str(Path(tmp) / "long_term.db"), agent_id="bench")
+
+        print(f"Populando {args.memories:,} memórias...")
+        elapsed = populate(memory, args.memories)
+        print(f"  {elapsed:.1f}s ({args.memories / elapsed:,.0f} memórias/s)")
+
+        rng = random.Random(7)
+        queries = [
+            " ".join(rng.choices(VOCABULARY[:2_000], weights=WEIGHTS[:2_000], k=2))
+            for _ in range(args.queries)
+        ]
+
+        def like_search(query: str):
+            with memory._lock:
+                return memory._conn.execute(
+                    """
+                    SELECT * FROM memories WHERE agent_id = ? AND content LIKE ?
+                    ORDER BY importance DESC, access_count DESC LIMIT ?
+                    """,
+                    (memory.agent_id, f"%{query}%", args.limit)
+                ).fetchall()
+
+        results = {
+            "LIKE (antigo)": bench(like_search, queries),
+            "FTS5 + BM25": bench(lambda q: memory.search(q, limit=args.limit), queries),
+        }
+
+        print(f"\n{'método':<16}{'p50 (ms)':>12}{'p95 (ms)':>12}{'média (ms)':>12}")
+        for name, latencies in results.items():
+            print(
+                f"{name:<16}{percentile(latencies, 0.5):>12.2f}"
+                f"{percentile(latencies, 0.95):>12.2f}{statistics.mean(latencies):>12.2f}"
+            )
+
+        memory.close()
+
+
+if __name__ == "__main__":
+    main()
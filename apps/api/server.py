@@ -31,6 +31,7 @@ load_dotenv()
 from src.observability.logging import setup_logging, get_logger, set_request_id
 from src.observability.health import get_health_checker
 from src.observability.metrics import get_metrics_text, track_request
+from src.observability.http import route_template  # noqa: E402
 
 # Setup logging (JSON in production, readable in dev)
 LOG_FORMAT_JSON = os.getenv("LOG_FORMAT", "json").lower() == "json"
@@ -1056,7 +1057,7 @@ async def metrics_middleware(request: Request, call_next):
     if not request.url.path.startswith(("/health", "/metrics")):
         track_request(
             method=request.method,
-            endpoint=request.url.path,
+            endpoint=route_template(request.scope),
             status=response.status_code,
             duration=duration
         )
@@ -29,7 +29,7 @@ import json
 import time
 import hashlib
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Callable, Tuple
+from typing import Optional, List, Dict, Any, Callable, Tuple, AsyncIterator, Pattern
 from dataclasses import dataclass, field
 from enum import Enum
 from collections import defaultdict
@@ -119,19 +119,36 @@ class GuardrailsConfig:
 class PIIDetector:
     """
     Detector de Informações Pessoais Identificáveis (PII).
+    
+    Todos os padrões são combinados em uma única regex pré-compilada com
+    grupos nomeados, então detecção e mascaramento fazem uma só passada
+    sobre o texto.
     """
     
-    # Padrões de PII
+    # Padrões de PII, em ordem de prioridade: no mesmo offset vence o
+    # primeiro padrão que casar (ex: CNPJ antes de CPF, CPF antes de telefone)
     PATTERNS = {
         "email": r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        "phone_br": r'\b(?:\+55\s?)?(?:\(?\d{2}\)?[\s.-]?)?\d{4,5}[\s.-]?\d{4}\b',
-        "cpf": r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
         "cnpj": r'\b\d{2}\.?\d{3}\.?\d{3}/?\d{4}-?\d{2}\b',
+        "cpf": r'\b\d{3}\.?\d{3}\.?\d{3}-?\d{2}\b',
         "credit_card": r'\b(?:\d{4}[\s.-]?){3}\d{4}\b',
         "ssn_us": r'\b\d{3}-\d{2}-\d{4}\b',
         "ip_address": r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
+        "phone_br": r'\b(?:\+55\s?)?(?:\(?\d{2}\)?[\s.-]?)?\d{4,5}[\s.-]?\d{4}\b',
     }
     
+    _combined: Optional[Pattern[str]] = None
+    
+    @classmethod
+    def _get_regex(cls) -> Pattern[str]:
+        """Regex combinada (compilada uma vez por classe)."""
+        if cls.__dict__.get("_combined") is None:
+            cls._combined = re.compile(
+                "|".join(f"(?P<{name}>{pattern})" for name, pattern in cls.PATTERNS.items()),
+                re.IGNORECASE
+            )
+        return cls._combined
+    
     def detect(self, text: str) -> List[Dict[str, Any]]:
         """
         Detecta PII no texto.
@@ -139,30 +156,43 @@ class PIIDetector:
         Returns:
             Lista de detecções com tipo, posição e conteúdo mascarado
         """
-        findings = []
-        
-        for pii_type, pattern in self.PATTERNS.items():
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                findings.append({
-                    "type": pii_type,
-                    "start": match.start(),
-                    "end": match.end(),
-                    "masked": self._mask(match.group(), pii_type)
-                })
-        
-        return findings
+        return self.scan(text)[0]
     
     def mask(self, text: str) -> str:
         """
         Mascara todo PII encontrado no texto.
         """
-        findings = sorted(self.detect(text), key=lambda x: x["start"], reverse=True)
-        
-        result = text
-        for finding in findings:
-            result = result[:finding["start"]] + finding["masked"] + result[finding["end"]:]
+        return self.scan(text)[1]
+    
+    def scan(self, text: str) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Detecta e mascara PII em uma única passada.
         
-        return result
+        Returns:
+            (findings, texto mascarado)
+        """
+        findings: List[Dict[str, Any]] = []
+        parts: List[str] = []
+        last = 0
+        
+        for match in self._get_regex().finditer(text):
+            pii_type = match.lastgroup
+            masked = self._mask(match.group(), pii_type)
+            findings.append({
+                "type": pii_type,
+                "start": match.start(),
+                "end": match.end(),
+                "masked": masked
+            })
+            parts.append(text[last:match.start()])
+            parts.append(masked)
+            last = match.end()
+        
+        if not findings:
+            return findings, text
+        
+        parts.append(text[last:])
+        return findings, "".join(parts)
     
     def _mask(self, value: str, pii_type: str) -> str:
         """Gera versão mascarada do valor."""
@@ -180,6 +210,125 @@ class PIIDetector:
         return "***REDACTED***"
 
 
+class StreamingPIIMasker:
+    """
+    Mascara PII em texto recebido em chunks (ex: streaming SSE de LLM).
+    
+    Mantém ao menos os últimos `holdback` caracteres entre chunks para que
+    um PII dividido entre dois chunks seja detectado inteiro. O corte é
+    sempre feito logo após um espaço em branco (fronteira de palavra): um
+    token cortado ao meio faria `\\b` casar onde o texto completo não casa.
+    Sem espaço antes do limite, todo o texto fica retido até o próximo chunk.
+    
+    Exemplo:
+        masker = StreamingPIIMasker()
+        async for chunk in llm_stream:
+            yield masker.feed(chunk)
+        yield masker.flush()
+    """
+    
+    def __init__(self, detector: Optional[PIIDetector] = None, holdback: int = 64):
+        self.detector = detector or PIIDetector()
+        self.holdback = holdback
+        self.findings: List[Dict[str, Any]] = []
+        self._buffer = ""
+        self._offset = 0  # Posição de _buffer no texto completo
+    
+    def feed(self, chunk: str) -> str:
+        """Adiciona chunk e retorna o texto já seguro para emitir (mascarado)."""
+        buffer = self._buffer + chunk
+        limit = len(buffer) - self.holdback
+        matches: Optional[List[re.Match]] = None
+        
+        while True:
+            cut = self._boundary(buffer, limit)
+            if cut <= 0:
+                self._buffer = buffer
+                return ""
+            if matches is None:
+                matches = list(self.detector._get_regex().finditer(buffer))
+            # Match atravessando o corte fica inteiro para o próximo chunk
+            crossing = next((m for m in matches if m.start() < cut < m.end()), None)
+            if crossing is None:
+                break
+            limit = crossing.start()
+        
+        emitted = self._emit(buffer, cut, [m for m in matches if m.end() <= cut])
+        self._buffer = buffer[cut:]
+        return emitted
+    
+    def flush(self) -> str:
+        """Libera (mascarado) o texto retido ao final do stream."""
+        buffer = self._buffer
+        matches = list(self.detector._get_regex().finditer(buffer))
+        emitted = self._emit(buffer, len(buffer), matches)
+        self._buffer = ""
+        return emitted
+    
+    @staticmethod
+    def _boundary(buffer: str, limit: int) -> int:
+        """Posição logo após o último espaço em branco antes de `limit` (0 se não houver)."""
+        for i in range(min(limit, len(buffer)) - 1, -1, -1):
+            if buffer[i].isspace():
+                return i + 1
+        return 0
+    
+    def _emit(self, buffer: str, cut: int, matches: List[re.Match]) -> str:
+        parts: List[str] = []
+        last = 0
+        
+        for match in matches:
+            masked = self.detector._mask(match.group(), match.lastgroup)
+            self.findings.append({
+                "type": match.lastgroup,
+                "start": self._offset + match.start(),
+                "end": self._offset + match.end(),
+                "masked": masked
+            })
+            parts.append(buffer[last:match.start()])
+            parts.append(masked)
+            last = match.end()
+        
+        parts.append(buffer[last:cut])
+        self._offset += cut
+        return "".join(parts)
+
+
+class _PatternSet:
+    """
+    Conjunto de regexes pré-compiladas com teste em uma passada.
+    
+    `search` usa a alternação combinada; a lista de padrões casados só é
+    montada (padrão a padrão) quando há algum match.
+    """
+    
+    def __init__(self, patterns: List[str]):
+        self.patterns = list(patterns)
+        self._compiled = [re.compile(p, re.IGNORECASE) for p in self.patterns]
+        
+        self._combined: Optional[Pattern[str]] = None
+        if self.patterns:
+            try:
+                self._combined = re.compile(
+                    "|".join(f"(?:{p})" for p in self.patterns), re.IGNORECASE
+                )
+            except re.error:
+                # Padrões customizados incompatíveis com alternação (ex: flags inline)
+                self._combined = None
+    
+    def search(self, text: str) -> bool:
+        """Verifica se algum padrão casa."""
+        if self._combined is not None:
+            return self._combined.search(text) is not None
+        return any(c.search(text) for c in self._compiled)
+    
+    def matching(self, text: str) -> List[str]:
+        """Retorna os padrões que casam com o texto."""
+        if not self.search(text):
+            return []
+        return [p for p, c in zip(self.patterns, self._compiled) if c.search(text)]
+
+
 class ToxicContentFilter:
     """
     Filtro de conteúdo tóxico/inapropriado.
@@ -194,6 +343,7 @@ class ToxicContentFilter:
     
     def __init__(self, custom_patterns: Optional[List[str]] = None):
         self.patterns = self.TOXIC_PATTERNS + (custom_patterns or [])
+        self._pattern_set = _PatternSet(self.patterns)
     
     def check(self, text: str) -> Tuple[bool, List[str]]:
         """
@@ -202,13 +352,7 @@ class ToxicContentFilter:
         Returns:
             (is_clean, matched_patterns)
         """
-        matches = []
-        text_lower = text.lower()
-        
-        for pattern in self.patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE):
-                matches.append(pattern)
-        
+        matches = self._pattern_set.matching(text)
         return len(matches) == 0, matches
 
 
@@ -305,6 +449,7 @@ class InputGuard:
         self.config = config
         self.pii_detector = PIIDetector()
         self.toxic_filter = ToxicContentFilter(config.blocked_patterns)
+        self.blocked_patterns = _PatternSet(config.blocked_patterns)
     
     def validate(self, input_text: str, user_id: Optional[str] = None) -> GuardResult:
         """Valida o input."""
@@ -312,23 +457,33 @@ class InputGuard:
         message = None
         modified = None
         
-        # Check length
+        # Estimativa de tokens
+        estimated_tokens = len(input_text) // 4
+        
+        # Check length: input acima do limite é bloqueado sem escanear o conteúdo
         if len(input_text) > self.config.max_input_length:
             violations.append(ViolationType.INPUT_TOO_LONG)
-            message = f"Input excede limite de {self.config.max_input_length} caracteres"
+            if estimated_tokens > self.config.max_input_tokens:
+                violations.append(ViolationType.TOKEN_BUDGET_EXCEEDED)
+            return GuardResult(
+                action=GuardAction.BLOCK,
+                passed=False,
+                violations=violations,
+                message=f"Input excede limite de {self.config.max_input_length} caracteres",
+                metadata={"estimated_tokens": estimated_tokens}
+            )
         
         # Check tokens (estimativa)
-        estimated_tokens = len(input_text) // 4
         if estimated_tokens > self.config.max_input_tokens:
             violations.append(ViolationType.TOKEN_BUDGET_EXCEEDED)
             message = f"Input excede limite de {self.config.max_input_tokens} tokens"
         
         # Check PII
         if self.config.pii_detection_enabled:
-            pii_findings = self.pii_detector.detect(input_text)
+            pii_findings, masked = self.pii_detector.scan(input_text)
             if pii_findings:
                 violations.append(ViolationType.PII_DETECTED)
-                modified = self.pii_detector.mask(input_text)
+                modified = masked
         
         # Check toxic content
         if self.config.toxic_filter_enabled:
@@ -338,10 +493,8 @@ class InputGuard:
                 message = "Conteúdo potencialmente inapropriado detectado"
         
         # Check blocked patterns
-        for pattern in self.config.blocked_patterns:
-            if re.search(pattern, input_text, re.IGNORECASE):
-                violations.append(ViolationType.BLOCKED_PATTERN)
-                break
+        if self.blocked_patterns.search(input_text):
+            violations.append(ViolationType.BLOCKED_PATTERN)
         
         # Determine action
         if ViolationType.TOXIC_CONTENT in violations:
@@ -393,10 +546,10 @@ class OutputGuard:
         
         # Check PII leakage
         if self.config.pii_detection_enabled:
-            pii_findings = self.pii_detector.detect(output_text)
+            pii_findings, masked = self.pii_detector.scan(output_text)
             if pii_findings:
                 violations.append(ViolationType.PII_DETECTED)
-                modified = self.pii_detector.mask(output_text)
+                modified = masked
         
         # Check JSON schema
         if self.config.require_json_output:
@@ -532,6 +685,29 @@ class Guardrails:
         """
         return self.output_guard.validate(output_text)
     
+    async def mask_output_stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Mascara PII em um stream de output (ex: tokens SSE do LLM).
+        
+        Exemplo:
+            async for safe_chunk in guardrails.mask_output_stream(agent.astream(msg)):
+                yield f"data: {safe_chunk}\\n\\n"
+        """
+        if not self.config.pii_detection_enabled:
+            async for chunk in chunks:
+                yield chunk
+            return
+        
+        masker = StreamingPIIMasker(self.output_guard.pii_detector)
+        async for chunk in chunks:
+            safe = masker.feed(chunk)
+            if safe:
+                yield safe
+        
+        tail = masker.flush()
+        if tail:
+            yield tail
+    
     def check_tool_call(
         self, 
         tool_name: str, 
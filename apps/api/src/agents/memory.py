@@ -28,10 +28,14 @@ Arquitetura:
 └─────────────────────────────────────────────────────────────┘
 """
 
+import asyncio
+import functools
 import json
 import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Callable
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from abc import ABC, abstractmethod
@@ -256,24 +260,149 @@ class ShortTermMemory(BaseMemory):
         }
 
 
-class LongTermMemory(BaseMemory):
+def _fts_query(query: str) -> Optional[str]:
     """
-    Memória de longo prazo (persistente).
+    Converte texto livre em query FTS5.
     
-    Armazena fatos, preferências e histórico entre sessões.
-    Persistida em SQLite.
+    Cada termo vira um prefixo entre aspas (`"termo"*`), combinados com AND
+    implícito. Retorna None se o texto não tiver termos indexáveis.
     """
+    terms = re.findall(r"\w+", query, re.UNICODE)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+# Pool compartilhado para as variantes async (queries SQLite são bloqueantes)
+_memory_executor: Optional[ThreadPoolExecutor] = None
+_memory_executor_lock = threading.Lock()
+
+
+def _get_memory_executor() -> ThreadPoolExecutor:
+    global _memory_executor
+    with _memory_executor_lock:
+        if _memory_executor is None:
+            _memory_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-memory")
+        return _memory_executor
+
+
+class _SQLiteMemoryStore:
+    """
+    Base para memórias persistidas em SQLite.
     
-    def __init__(self, db_path: str = "./data/memory/long_term.db", agent_id: str = "default"):
+    Mantém uma conexão persistente em modo WAL (statements são reaproveitados
+    pelo cache de prepared statements do sqlite3) e expõe `_run_async` para
+    executar queries no thread pool sem bloquear o event loop.
+    """
+    
+    def __init__(self, db_path: str, agent_id: str):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.agent_id = agent_id
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Necessário para que INSERT OR REPLACE dispare os triggers de DELETE do FTS
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        self.fts_enabled = False
+        self._fts_tables: List[str] = []
         self._init_db()
     
+    def _init_db(self) -> None:
+        raise NotImplementedError
+    
+    def _init_fts(self, table: str, columns: List[str]) -> None:
+        """
+        Cria tabela FTS5 (external content) sincronizada por triggers.
+        
+        Se o SQLite não tiver FTS5, a busca usa LIKE.
+        """
+        fts = f"{table}_fts"
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        
+        with self._lock, self._conn:
+            exists = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+            ).fetchone()
+            
+            try:
+                self._conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                        {cols}, content='{table}', content_rowid='rowid',
+                        tokenize='unicode61 remove_diacritics 2'
+                    )
+                """)
+            except sqlite3.OperationalError:
+                return
+            
+            self._conn.executescript(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF {cols} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old_cols});
+                    INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new_cols});
+                END;
+            """)
+            
+            # Banco criado antes do FTS: indexar linhas existentes
+            if not exists:
+                self._conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        
+        self._fts_tables.append(fts)
+        self.fts_enabled = True
+    
+    def rebuild_index(self) -> None:
+        """
+        Reconstrói os índices FTS a partir das tabelas.
+        
+        Necessário após VACUUM, que pode renumerar os rowids.
+        """
+        if not self.fts_enabled:
+            return
+        with self._lock, self._conn:
+            for fts in self._fts_tables:
+                self._conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    
+    async def _run_async(self, fn: Callable, *args, **kwargs) -> Any:
+        """Executa método bloqueante no thread pool de memória."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _get_memory_executor(), functools.partial(fn, *args, **kwargs)
+        )
+    
+    def close(self) -> None:
+        """Fecha a conexão persistente."""
+        with self._lock:
+            self._conn.close()
+
+
+class LongTermMemory(_SQLiteMemoryStore, BaseMemory):
+    """
+    Memória de longo prazo (persistente).
+    
+    Armazena fatos, preferências e histórico entre sessões.
+    Persistida em SQLite, com busca full-text (FTS5 + BM25).
+    """
+    
+    def __init__(self, db_path: str = "./data/memory/long_term.db", agent_id: str = "default"):
+        super().__init__(db_path, agent_id)
+    
     def _init_db(self):
         """Inicializa banco de dados."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock, self._conn:
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS memories (
                     id TEXT PRIMARY KEY,
                     agent_id TEXT NOT NULL,
@@ -286,34 +415,54 @@ class LongTermMemory(BaseMemory):
                     metadata TEXT DEFAULT '{}'
                 )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent ON memories(agent_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON memories(category)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_agent ON memories(agent_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON memories(category)")
+        
+        self._init_fts("memories", ["content"])
     
     def _generate_id(self, content: str) -> str:
         """Gera ID único para conteúdo."""
         hash_input = f"{self.agent_id}:{content}:{datetime.now().isoformat()}"
         return hashlib.md5(hash_input.encode()).hexdigest()[:12]
     
+    def _row_to_item(self, row: sqlite3.Row) -> MemoryItem:
+        return MemoryItem(
+            id=row["id"],
+            content=row["content"],
+            memory_type=MemoryType.LONG_TERM,
+            created_at=datetime.fromisoformat(row["created_at"]),
+            importance=row["importance"],
+            access_count=row["access_count"],
+            metadata=json.loads(row["metadata"])
+        )
+    
     def add(self, item: MemoryItem) -> str:
         """Adiciona item à memória persistente."""
-        item_id = item.id or self._generate_id(item.content)
+        return self.add_many([item])[0]
+    
+    def add_many(self, items: List[MemoryItem]) -> List[str]:
+        """Adiciona vários itens em uma única transação."""
+        ids = [item.id or self._generate_id(item.content) for item in items]
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock, self._conn:
+            self._conn.executemany("""
                 INSERT OR REPLACE INTO memories 
                 (id, agent_id, content, category, importance, created_at, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                item_id,
-                self.agent_id,
-                item.content,
-                item.metadata.get("category", "general"),
-                item.importance,
-                item.created_at.isoformat(),
-                json.dumps(item.metadata)
-            ))
+            """, [
+                (
+                    item_id,
+                    self.agent_id,
+                    item.content,
+                    item.metadata.get("category", "general"),
+                    item.importance,
+                    item.created_at.isoformat(),
+                    json.dumps(item.metadata)
+                )
+                for item_id, item in zip(ids, items)
+            ])
         
-        return item_id
+        return ids
     
     def remember(
         self, 
@@ -342,64 +491,60 @@ class LongTermMemory(BaseMemory):
     
     def get(self, item_id: str) -> Optional[MemoryItem]:
         """Recupera item por ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(
+        with self._lock, self._conn:
+            row = self._conn.execute(
                 "SELECT * FROM memories WHERE id = ? AND agent_id = ?",
                 (item_id, self.agent_id)
             ).fetchone()
             
             if row:
                 # Atualizar contador de acesso
-                conn.execute(
+                self._conn.execute(
                     "UPDATE memories SET access_count = access_count + 1 WHERE id = ?",
                     (item_id,)
                 )
                 
-                return MemoryItem(
-                    id=row["id"],
-                    content=row["content"],
-                    memory_type=MemoryType.LONG_TERM,
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    importance=row["importance"],
-                    access_count=row["access_count"],
-                    metadata=json.loads(row["metadata"])
-                )
+                return self._row_to_item(row)
         
         return None
     
     def search(self, query: str, limit: int = 10, category: Optional[str] = None) -> List[MemoryItem]:
-        """Busca memórias por texto."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
+        """
+        Busca memórias por texto.
+        
+        Com FTS5, resultados são ordenados por relevância (BM25) e depois
+        por importância. Query vazia lista por importância.
+        """
+        match = _fts_query(query) if self.fts_enabled else None
+        
+        if match is not None:
             sql = """
-                SELECT * FROM memories 
-                WHERE agent_id = ? AND content LIKE ?
+                SELECT m.* FROM memories_fts f
+                JOIN memories m ON m.rowid = f.rowid
+                WHERE memories_fts MATCH ? AND m.agent_id = ?
             """
-            params = [self.agent_id, f"%{query}%"]
-            
-            if category:
-                sql += " AND category = ?"
-                params.append(category)
-            
-            sql += " ORDER BY importance DESC, access_count DESC LIMIT ?"
-            params.append(limit)
-            
-            rows = conn.execute(sql, params).fetchall()
-            
-            return [
-                MemoryItem(
-                    id=row["id"],
-                    content=row["content"],
-                    memory_type=MemoryType.LONG_TERM,
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    importance=row["importance"],
-                    access_count=row["access_count"],
-                    metadata=json.loads(row["metadata"])
-                )
-                for row in rows
-            ]
+            params: List[Any] = [match, self.agent_id]
+        else:
+            sql = "SELECT * FROM memories m WHERE m.agent_id = ?"
+            params = [self.agent_id]
+            if query:
+                sql += " AND m.content LIKE ?"
+                params.append(f"%{query}%")
+        
+        if category:
+            sql += " AND m.category = ?"
+            params.append(category)
+        
+        if match is not None:
+            sql += " ORDER BY bm25(memories_fts), m.importance DESC LIMIT ?"
+        else:
+            sql += " ORDER BY m.importance DESC, m.access_count DESC LIMIT ?"
+        params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        
+        return [self._row_to_item(row) for row in rows]
     
     def get_by_category(self, category: str, limit: int = 20) -> List[MemoryItem]:
         """Recupera memórias por categoria."""
@@ -407,8 +552,8 @@ class LongTermMemory(BaseMemory):
     
     def forget(self, item_id: str) -> bool:
         """Remove uma memória."""
-        with sqlite3.connect(self.db_path) as conn:
-            result = conn.execute(
+        with self._lock, self._conn:
+            result = self._conn.execute(
                 "DELETE FROM memories WHERE id = ? AND agent_id = ?",
                 (item_id, self.agent_id)
             )
@@ -416,29 +561,45 @@ class LongTermMemory(BaseMemory):
     
     def clear(self) -> None:
         """Limpa todas as memórias do agente."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM memories WHERE agent_id = ?", (self.agent_id,))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM memories WHERE agent_id = ?", (self.agent_id,))
     
     def get_summary(self) -> Dict[str, Any]:
         """Retorna resumo da memória."""
-        with sqlite3.connect(self.db_path) as conn:
-            count = conn.execute(
+        with self._lock:
+            count = self._conn.execute(
                 "SELECT COUNT(*) FROM memories WHERE agent_id = ?",
                 (self.agent_id,)
             ).fetchone()[0]
             
-            categories = conn.execute(
+            categories = self._conn.execute(
                 "SELECT category, COUNT(*) FROM memories WHERE agent_id = ? GROUP BY category",
                 (self.agent_id,)
             ).fetchall()
-            
-            return {
-                "total_memories": count,
-                "categories": {c[0]: c[1] for c in categories}
-            }
+        
+        return {
+            "total_memories": count,
+            "categories": {c[0]: c[1] for c in categories}
+        }
+    
+    # ==================== Async ====================
+    
+    async def aremember(self, content: str, **kwargs) -> str:
+        """Versão async de remember (executa no thread pool)."""
+        return await self._run_async(self.remember, content, **kwargs)
+    
+    async def aget(self, item_id: str) -> Optional[MemoryItem]:
+        """Versão async de get."""
+        return await self._run_async(self.get, item_id)
+    
+    async def asearch(
+        self, query: str, limit: int = 10, category: Optional[str] = None
+    ) -> List[MemoryItem]:
+        """Versão async de search."""
+        return await self._run_async(self.search, query, limit, category)
 
 
-class EpisodicMemory(BaseMemory):
+class EpisodicMemory(_SQLiteMemoryStore, BaseMemory):
     """
     Memória episódica.
     
@@ -447,15 +608,12 @@ class EpisodicMemory(BaseMemory):
     """
     
     def __init__(self, db_path: str = "./data/memory/episodic.db", agent_id: str = "default"):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.agent_id = agent_id
-        self._init_db()
+        super().__init__(db_path, agent_id)
     
     def _init_db(self):
         """Inicializa banco de dados."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock, self._conn:
+            self._conn.execute("""
                 CREATE TABLE IF NOT EXISTS episodes (
                     id TEXT PRIMARY KEY,
                     agent_id TEXT NOT NULL,
@@ -467,19 +625,32 @@ class EpisodicMemory(BaseMemory):
                     context TEXT DEFAULT '{}'
                 )
             """)
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_agent ON episodes(agent_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_agent ON episodes(agent_id)")
+        
+        self._init_fts("episodes", ["description", "lesson"])
     
     def _generate_id(self, description: str) -> str:
         """Gera ID único."""
         hash_input = f"{self.agent_id}:{description}:{datetime.now().isoformat()}"
         return hashlib.md5(hash_input.encode()).hexdigest()[:12]
     
+    def _row_to_episode(self, row: sqlite3.Row) -> Episode:
+        return Episode(
+            id=row["id"],
+            description=row["description"],
+            outcome=row["outcome"],
+            lesson=row["lesson"],
+            importance=row["importance"],
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            context=json.loads(row["context"])
+        )
+    
     def add(self, episode: Episode) -> str:
         """Adiciona episódio."""
         episode_id = episode.id or self._generate_id(episode.description)
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._lock, self._conn:
+            self._conn.execute("""
                 INSERT INTO episodes 
                 (id, agent_id, description, outcome, lesson, importance, timestamp, context)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -526,62 +697,48 @@ class EpisodicMemory(BaseMemory):
     
     def get(self, item_id: str) -> Optional[Episode]:
         """Recupera episódio por ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            row = conn.execute(
+        with self._lock:
+            row = self._conn.execute(
                 "SELECT * FROM episodes WHERE id = ? AND agent_id = ?",
                 (item_id, self.agent_id)
             ).fetchone()
-            
-            if row:
-                return Episode(
-                    id=row["id"],
-                    description=row["description"],
-                    outcome=row["outcome"],
-                    lesson=row["lesson"],
-                    importance=row["importance"],
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                    context=json.loads(row["context"])
-                )
         
-        return None
+        return self._row_to_episode(row) if row else None
     
     def search(self, query: str, limit: int = 10) -> List[Episode]:
-        """Busca episódios relevantes."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            
-            rows = conn.execute("""
-                SELECT * FROM episodes 
-                WHERE agent_id = ? AND (description LIKE ? OR lesson LIKE ?)
-                ORDER BY importance DESC, timestamp DESC
-                LIMIT ?
-            """, (self.agent_id, f"%{query}%", f"%{query}%", limit)).fetchall()
-            
-            return [
-                Episode(
-                    id=row["id"],
-                    description=row["description"],
-                    outcome=row["outcome"],
-                    lesson=row["lesson"],
-                    importance=row["importance"],
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                    context=json.loads(row["context"])
-                )
-                for row in rows
-            ]
+        """Busca episódios relevantes (BM25 sobre descrição e lição)."""
+        match = _fts_query(query) if self.fts_enabled else None
+        
+        with self._lock:
+            if match is not None:
+                rows = self._conn.execute("""
+                    SELECT e.* FROM episodes_fts f
+                    JOIN episodes e ON e.rowid = f.rowid
+                    WHERE episodes_fts MATCH ? AND e.agent_id = ?
+                    ORDER BY bm25(episodes_fts), e.importance DESC, e.timestamp DESC
+                    LIMIT ?
+                """, (match, self.agent_id, limit)).fetchall()
+            else:
+                rows = self._conn.execute("""
+                    SELECT * FROM episodes 
+                    WHERE agent_id = ? AND (description LIKE ? OR lesson LIKE ?)
+                    ORDER BY importance DESC, timestamp DESC
+                    LIMIT ?
+                """, (self.agent_id, f"%{query}%", f"%{query}%", limit)).fetchall()
+        
+        return [self._row_to_episode(row) for row in rows]
     
     def get_lessons(self, limit: int = 10) -> List[str]:
         """Retorna lições aprendidas."""
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute("""
+        with self._lock:
+            rows = self._conn.execute("""
                 SELECT lesson FROM episodes 
                 WHERE agent_id = ? AND lesson IS NOT NULL
                 ORDER BY importance DESC
                 LIMIT ?
             """, (self.agent_id, limit)).fetchall()
-            
-            return [row[0] for row in rows]
+        
+        return [row[0] for row in rows]
     
     def get_similar_situations(self, description: str, limit: int = 5) -> List[Episode]:
         """Encontra situações similares passadas."""
@@ -589,8 +746,18 @@ class EpisodicMemory(BaseMemory):
     
     def clear(self) -> None:
         """Limpa todos os episódios."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("DELETE FROM episodes WHERE agent_id = ?", (self.agent_id,))
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM episodes WHERE agent_id = ?", (self.agent_id,))
+    
+    # ==================== Async ====================
+    
+    async def arecord(self, description: str, outcome: str, **kwargs) -> str:
+        """Versão async de record (executa no thread pool)."""
+        return await self._run_async(self.record, description, outcome, **kwargs)
+    
+    async def asearch(self, query: str, limit: int = 10) -> List[Episode]:
+        """Versão async de search."""
+        return await self._run_async(self.search, query, limit)
 
 
 class MemoryManager:
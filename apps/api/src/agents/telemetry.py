@@ -35,10 +35,14 @@ Arquitetura:
 """
 
 import json
+import math
+import os
 import time
 import threading
+from bisect import bisect_left
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Callable
+from typing import Optional, List, Dict, Any, Callable, Deque, Tuple
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 from contextlib import contextmanager
@@ -131,7 +135,7 @@ class ExecutionStats:
     total_tokens_output: int = 0
     total_cost_usd: float = 0.0
     total_latency_ms: float = 0.0
-    latencies: List[float] = field(default_factory=list)
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=10000))
     
     @property
     def success_rate(self) -> float:
@@ -183,81 +187,244 @@ class ExecutionStats:
         }
 
 
+# Limites (ms) dos buckets fixos de histogram, no estilo Prometheus
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000
+)
+
+
+class QuantileSketch:
+    """
+    Sketch de quantis com erro relativo limitado (estilo DDSketch).
+
+    Cada valor positivo cai no bucket logarítmico ceil(log_gamma(v)), com
+    gamma = (1 + a) / (1 - a). O quantil estimado fica a no máximo `a`
+    (relativo) do valor real, com memória proporcional ao log do intervalo
+    de valores, e sketches podem ser somados (merge entre shards).
+    """
+
+    __slots__ = ("relative_accuracy", "_gamma_log", "bins", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._gamma_log = math.log(gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float):
+        """Adiciona um valor ao sketch."""
+        self.count += 1
+        if value <= 0:
+            self.zero_count += 1
+            return
+        idx = math.ceil(math.log(value) / self._gamma_log)
+        self.bins[idx] = self.bins.get(idx, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        """Soma os bins de outro sketch (mesma precisão)."""
+        self.count += other.count
+        self.zero_count += other.zero_count
+        # list(): o shard de origem pode estar sendo escrito por outra thread
+        for idx, n in list(other.bins.items()):
+            self.bins[idx] = self.bins.get(idx, 0) + n
+
+    def quantile(self, q: float) -> float:
+        """Estima o quantil q (0..1)."""
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for idx in sorted(self.bins):
+            seen += self.bins[idx]
+            if seen > rank:
+                # Ponto médio do bucket (gamma^(i-1), gamma^i]
+                return 2 * math.exp(idx * self._gamma_log) / (1 + math.exp(self._gamma_log))
+        return 2 * math.exp(max(self.bins) * self._gamma_log) / (1 + math.exp(self._gamma_log))
+
+
+class _Histogram:
+    """Histogram de buckets fixos + sketch de quantis."""
+
+    __slots__ = ("bounds", "bucket_counts", "count", "total", "min", "max", "sketch")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.bucket_counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def merge(self, other: "_Histogram"):
+        for i, n in enumerate(other.bucket_counts):
+            self.bucket_counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    def copy(self) -> "_Histogram":
+        clone = _Histogram(self.bounds)
+        clone.merge(self)
+        return clone
+
+
+class _Shard:
+    """Counters e histograms escritos por uma única thread."""
+
+    __slots__ = ("thread", "counters", "histograms")
+
+    def __init__(self, thread: Optional[threading.Thread]):
+        self.thread = thread
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+
+
 class MetricsCollector:
     """
     Coletor de métricas.
     
     Coleta e agrega métricas de performance.
+    
+    O caminho de escrita não usa lock global: cada thread escreve no
+    próprio shard (counters e histograms), e as leituras somam os shards.
+    Histograms usam buckets fixos + QuantileSketch em vez de listas de
+    valores, e os eventos recentes ficam em um ring buffer.
     """
     
-    def __init__(self, max_history: int = 10000):
+    def __init__(
+        self,
+        max_history: int = 10000,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        record_events: bool = True,
+        max_label_keys: int = 10000
+    ):
         self.max_history = max_history
-        self._metrics: List[Metric] = []
-        self._counters: Dict[str, float] = {}
+        self.buckets = tuple(sorted(buckets))
+        self.record_events = record_events
+        self.max_label_keys = max_label_keys
+        
+        # Eventos recentes: (name, value, type, labels, timestamp)
+        self._events: Deque[Tuple[str, float, MetricType, Optional[Dict], float]] = deque(maxlen=max_history)
         self._gauges: Dict[str, float] = {}
-        self._histograms: Dict[str, List[float]] = {}
+        self._key_cache: Dict[Tuple, str] = {}
+        
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Shards de threads encerradas, consolidados em _retired
+        self._retired = _Shard(None)
         self._lock = threading.Lock()
     
+    def _shard(self) -> _Shard:
+        """Retorna o shard da thread atual, criando-o no primeiro uso."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(threading.current_thread())
+            self._local.shard = shard
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+    
     def increment(self, name: str, value: float = 1, labels: Optional[Dict] = None):
         """Incrementa um counter."""
         key = self._make_key(name, labels)
-        with self._lock:
-            self._counters[key] = self._counters.get(key, 0) + value
-            self._add_metric(Metric(
-                name=name,
-                value=self._counters[key],
-                metric_type=MetricType.COUNTER,
-                labels=labels or {}
-            ))
+        counters = self._shard().counters
+        counters[key] = counters.get(key, 0) + value
+        if self.record_events:
+            self._events.append((name, value, MetricType.COUNTER, labels, time.time()))
     
     def set_gauge(self, name: str, value: float, labels: Optional[Dict] = None):
         """Define um gauge."""
         key = self._make_key(name, labels)
-        with self._lock:
-            self._gauges[key] = value
-            self._add_metric(Metric(
-                name=name,
-                value=value,
-                metric_type=MetricType.GAUGE,
-                labels=labels or {}
-            ))
+        self._gauges[key] = value
+        if self.record_events:
+            self._events.append((name, value, MetricType.GAUGE, labels, time.time()))
     
     def observe(self, name: str, value: float, labels: Optional[Dict] = None):
         """Observa um valor para histogram."""
         key = self._make_key(name, labels)
-        with self._lock:
-            if key not in self._histograms:
-                self._histograms[key] = []
-            self._histograms[key].append(value)
-            
-            # Limitar tamanho
-            if len(self._histograms[key]) > 1000:
-                self._histograms[key] = self._histograms[key][-1000:]
-            
-            self._add_metric(Metric(
-                name=name,
-                value=value,
-                metric_type=MetricType.HISTOGRAM,
-                labels=labels or {}
-            ))
+        histograms = self._shard().histograms
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram(self.buckets)
+        histogram.observe(value)
+        if self.record_events:
+            self._events.append((name, value, MetricType.HISTOGRAM, labels, time.time()))
     
     def _make_key(self, name: str, labels: Optional[Dict]) -> str:
         """Cria chave única para métrica."""
         if not labels:
             return name
-        label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
-        return f"{name}{{{label_str}}}"
-    
-    def _add_metric(self, metric: Metric):
-        """Adiciona métrica ao histórico."""
-        self._metrics.append(metric)
-        if len(self._metrics) > self.max_history:
-            self._metrics = self._metrics[-self.max_history:]
+        # Cache pela ordem de inserção; ordens diferentes resultam na mesma chave
+        cache_key = (name, *labels.items())
+        key = self._key_cache.get(cache_key)
+        if key is None:
+            label_str = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+            key = f"{name}{{{label_str}}}"
+            if len(self._key_cache) >= self.max_label_keys:
+                self._key_cache.clear()
+            self._key_cache[cache_key] = key
+        return key
+    
+    def _collect_shards(self) -> List[_Shard]:
+        """Consolida shards de threads encerradas e retorna os ativos."""
+        with self._lock:
+            alive = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    alive.append(shard)
+                    continue
+                for key, value in shard.counters.items():
+                    self._retired.counters[key] = self._retired.counters.get(key, 0) + value
+                for key, histogram in shard.histograms.items():
+                    existing = self._retired.histograms.get(key)
+                    if existing is None:
+                        self._retired.histograms[key] = histogram
+                    else:
+                        existing.merge(histogram)
+            self._shards = alive
+            return [self._retired, *alive]
+    
+    def _merged_counters(self) -> Dict[str, float]:
+        merged: Dict[str, float] = {}
+        for shard in self._collect_shards():
+            for key, value in list(shard.counters.items()):
+                merged[key] = merged.get(key, 0) + value
+        return merged
+    
+    def _merged_histogram(self, key: str) -> Optional[_Histogram]:
+        merged = None
+        for shard in self._collect_shards():
+            histogram = shard.histograms.get(key)
+            if histogram is None:
+                continue
+            if merged is None:
+                merged = histogram.copy()
+            else:
+                merged.merge(histogram)
+        return merged
     
     def get_counter(self, name: str, labels: Optional[Dict] = None) -> float:
         """Obtém valor de counter."""
         key = self._make_key(name, labels)
-        return self._counters.get(key, 0)
+        return sum(shard.counters.get(key, 0) for shard in self._collect_shards())
     
     def get_gauge(self, name: str, labels: Optional[Dict] = None) -> float:
         """Obtém valor de gauge."""
@@ -265,28 +432,69 @@ class MetricsCollector:
         return self._gauges.get(key, 0)
     
     def get_histogram_stats(self, name: str, labels: Optional[Dict] = None) -> Dict[str, float]:
-        """Obtém estatísticas de histogram."""
+        """
+        Obtém estatísticas de histogram.
+        
+        Percentis vêm do QuantileSketch (erro relativo de ~1%).
+        """
         key = self._make_key(name, labels)
-        values = self._histograms.get(key, [])
+        histogram = self._merged_histogram(key)
         
-        if not values:
+        if histogram is None or histogram.count == 0:
             return {"count": 0, "mean": 0, "p50": 0, "p95": 0, "p99": 0}
         
-        sorted_values = sorted(values)
+        def clamp(value: float) -> float:
+            return min(max(value, histogram.min), histogram.max)
+        
         return {
-            "count": len(values),
-            "mean": statistics.mean(values),
-            "p50": statistics.median(values),
-            "p95": sorted_values[int(len(sorted_values) * 0.95)] if len(sorted_values) > 1 else sorted_values[-1],
-            "p99": sorted_values[int(len(sorted_values) * 0.99)] if len(sorted_values) > 1 else sorted_values[-1]
+            "count": histogram.count,
+            "mean": histogram.total / histogram.count,
+            "min": histogram.min,
+            "max": histogram.max,
+            "p50": clamp(histogram.sketch.quantile(0.50)),
+            "p95": clamp(histogram.sketch.quantile(0.95)),
+            "p99": clamp(histogram.sketch.quantile(0.99))
         }
     
+    def get_histogram_buckets(self, name: str, labels: Optional[Dict] = None) -> Dict[str, int]:
+        """Obtém contagens cumulativas por bucket (formato Prometheus `le`)."""
+        key = self._make_key(name, labels)
+        histogram = self._merged_histogram(key)
+        if histogram is None:
+            return {}
+        
+        result: Dict[str, int] = {}
+        cumulative = 0
+        for bound, count in zip((*histogram.bounds, "+Inf"), histogram.bucket_counts):
+            cumulative += count
+            result[str(bound)] = cumulative
+        return result
+    
+    def get_recent(self, limit: Optional[int] = None) -> List[Metric]:
+        """Retorna os eventos mais recentes do ring buffer (mais antigos primeiro)."""
+        events = list(self._events)
+        if limit is not None:
+            events = events[-limit:] if limit > 0 else []
+        return [
+            Metric(
+                name=name,
+                value=value,
+                metric_type=metric_type,
+                labels=dict(labels) if labels else {},
+                timestamp=datetime.fromtimestamp(ts)
+            )
+            for name, value, metric_type, labels, ts in events
+        ]
+    
     def get_all_metrics(self) -> Dict[str, Any]:
         """Retorna todas as métricas."""
+        keys = set()
+        for shard in self._collect_shards():
+            keys.update(list(shard.histograms))
         return {
-            "counters": self._counters.copy(),
+            "counters": self._merged_counters(),
             "gauges": self._gauges.copy(),
-            "histograms": {k: self.get_histogram_stats(k) for k in self._histograms}
+            "histograms": {k: self.get_histogram_stats(k) for k in sorted(keys)}
         }
 
 
@@ -299,20 +507,22 @@ class TraceCollector:
     
     def __init__(self, max_traces: int = 1000):
         self.max_traces = max_traces
-        self._traces: Dict[str, List[Span]] = {}
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
         self._active_spans: Dict[str, Span] = {}
         self._lock = threading.Lock()
     
     def _generate_id(self) -> str:
         """Gera ID único."""
-        import uuid
-        return uuid.uuid4().hex[:16]
+        return os.urandom(8).hex()
     
     def start_trace(self, name: str = "agent_run") -> str:
         """Inicia um novo trace."""
         trace_id = self._generate_id()
         with self._lock:
             self._traces[trace_id] = []
+            # Descartar traces mais antigos
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
         return trace_id
     
     def start_span(
@@ -487,10 +697,6 @@ class AgentTelemetry:
         self._stats.total_cost_usd += cost
         self._stats.latencies.append(latency_ms)
         
-        # Limitar histórico de latências
-        if len(self._stats.latencies) > 10000:
-            self._stats.latencies = self._stats.latencies[-10000:]
-        
         # Métricas
         self.metrics.increment(
             "agent_executions_success" if success else "agent_executions_failed",
@@ -548,10 +754,10 @@ class AgentTelemetry:
             parent_span_id,
             {"model_id": model_id}
         ) as span:
-            start = time.time()
+            start = time.perf_counter()
             try:
                 yield span
-                latency = (time.time() - start) * 1000
+                latency = (time.perf_counter() - start) * 1000
                 
                 # Atualizar stats do modelo
                 if model_id not in self._model_stats:
@@ -586,10 +792,10 @@ class AgentTelemetry:
             parent_span_id,
             {"tool_name": tool_name}
         ) as span:
-            start = time.time()
+            start = time.perf_counter()
             try:
                 yield span
-                latency = (time.time() - start) * 1000
+                latency = (time.perf_counter() - start) * 1000
                 
                 # Atualizar stats da ferramenta
                 if tool_name not in self._tool_stats:
@@ -45,6 +45,10 @@ class Settings:
     RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
     RATE_LIMIT_WINDOW_SECONDS: int = int(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
     RATE_LIMIT_MAX_REQUESTS: int = int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "30"))
+    # Backend do rate limit: "memory" (por worker, LRU) ou "redis" (compartilhado)
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")
+    RATE_LIMIT_REDIS_URL: Optional[str] = os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL")
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
     # Rate limit específicos por grupo de rota (opcionais)
     RATE_LIMIT_RAG_QUERY: int = int(os.getenv("RATE_LIMIT_RAG_QUERY", "60"))
     RATE_LIMIT_RAG_INGEST: int = int(os.getenv("RATE_LIMIT_RAG_INGEST", "10"))
@@ -56,11 +60,25 @@ class Settings:
     JWT_EXPIRES_MIN: int = int(os.getenv("JWT_EXPIRES_MIN", "60"))
     ADMIN_USERS: Optional[str] = os.getenv("ADMIN_USERS")  # lista separada por vírgula
     
+    # Execução de agentes/RAG fora do event loop (src/os/execution.py)
+    RUN_POOL_WORKERS: int = int(os.getenv("RUN_POOL_WORKERS", "16"))
+    RUN_POOL_PER_AGENT: int = int(os.getenv("RUN_POOL_PER_AGENT", "1"))
+    RUN_POOL_TIMEOUT: float = float(os.getenv("RUN_POOL_TIMEOUT", "120"))
+    RUN_POOL_MAX_QUEUE: int = int(os.getenv("RUN_POOL_MAX_QUEUE", "200"))
+    
+    # Log estruturado por requisição (src/observability/http.py)
+    REQUEST_LOG_ENABLED: bool = os.getenv("REQUEST_LOG_ENABLED", "true").lower() == "true"
+    REQUEST_LOG_SAMPLE_RATE: float = float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0"))
+    
     # RAG / Embeddings / Vector store
     CHROMA_DB_PATH: str = os.getenv("CHROMA_DB_PATH", "data/vectorstore")
     CHROMA_HOST: Optional[str] = os.getenv("CHROMA_HOST")  # Ex: http://chromadb:8000
     EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", "openai")
     OPENAI_EMBED_MODEL: str = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-large")
+    # Ingestão (src/rag/ingest.py): processos de parsing (0 = inline), chunks por upsert, downloads por host
+    RAG_INGEST_WORKERS: int = int(os.getenv("RAG_INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+    RAG_INGEST_BATCH_SIZE: int = int(os.getenv("RAG_INGEST_BATCH_SIZE", "256"))
+    RAG_INGEST_PER_HOST: int = int(os.getenv("RAG_INGEST_PER_HOST", "4"))
     
     # Database
     DEFAULT_DB_FILE: str = os.getenv("DEFAULT_DB_FILE", "data/databases/agents.db")
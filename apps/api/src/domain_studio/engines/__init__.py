@@ -4,6 +4,8 @@ Domain Studio Engines - Motores especializados para domínios.
 
 from .agentic_rag import AgenticRAGEngine
 from .graph_rag import GraphRAGEngine
+from .graph_store import GraphStore
+from .graph_paths import PathBudget, PathConstraints, PathFinder
 from .compliance import ComplianceEngine
 from .multimodal import MultiModalEngine
 from .workflow import WorkflowEngine
@@ -12,6 +14,10 @@ from .analytics import AnalyticsEngine
 __all__ = [
     "AgenticRAGEngine",
     "GraphRAGEngine",
+    "GraphStore",
+    "PathFinder",
+    "PathConstraints",
+    "PathBudget",
     "ComplianceEngine",
     "MultiModalEngine",
     "WorkflowEngine",
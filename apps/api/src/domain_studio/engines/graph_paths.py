@@ -0,0 +1,364 @@
+"""
+Graph Paths - Busca de caminhos com orçamento para o GraphRAGEngine.
+
+- Menor caminho por BFS bidirecional (hops) ou Dijkstra (custo por aresta)
+- K menores caminhos simples via algoritmo de Yen
+- Restrições por tipo de relacionamento, peso mínimo e profundidade
+- Orçamento explícito (tempo e expansões): a busca para cedo e devolve
+  o que já encontrou, marcando o resultado como truncado
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Set, Tuple
+
+from .graph_store import GraphStore
+
+if TYPE_CHECKING:
+    from .graph_rag import Relationship
+
+
+@dataclass
+class PathConstraints:
+    """Restrições aplicadas às arestas percorridas."""
+    relationship_types: Optional[List[str]] = None
+    min_weight: Optional[float] = None
+    max_depth: int = 3
+    direction: str = "out"  # out, both
+    # Custo de cada aresta; None = número de hops
+    cost: Optional[Callable[["Relationship"], float]] = None
+
+
+@dataclass
+class PathBudget:
+    """Limites da busca."""
+    max_paths: int = 10
+    time_budget_ms: float = 200.0
+    max_expansions: int = 100_000
+
+
+@dataclass
+class GraphPath:
+    """Caminho entre duas entidades."""
+    node_ids: List[str] = field(default_factory=list)
+    relationship_ids: List[str] = field(default_factory=list)
+    cost: float = 0.0
+
+    @property
+    def hops(self) -> int:
+        return len(self.relationship_ids)
+
+
+@dataclass
+class PathSearchResult:
+    """Resultado de uma busca de caminhos."""
+    paths: List[GraphPath] = field(default_factory=list)
+    truncated: bool = False
+    expansions: int = 0
+    elapsed_ms: float = 0.0
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class _Search:
+    """Estado de uma busca: restrições, orçamento e contadores."""
+
+    def __init__(self, store: GraphStore, constraints: PathConstraints, budget: PathBudget):
+        self.store = store
+        self.constraints = constraints
+        self.budget = budget
+        self.expansions = 0
+        self.started = time.perf_counter()
+        self.deadline = self.started + budget.time_budget_ms / 1000
+
+    def expand(self) -> None:
+        self.expansions += 1
+        if self.expansions > self.budget.max_expansions:
+            raise _BudgetExceeded()
+        # Checar o relógio a cada expansão custaria mais que a expansão
+        if self.expansions % 64 == 0 and time.perf_counter() > self.deadline:
+            raise _BudgetExceeded()
+
+    def edges(
+        self,
+        node_id: str,
+        forward: bool,
+        banned_nodes: Set[str],
+        banned_edges: Set[str]
+    ) -> List[Tuple[str, "Relationship"]]:
+        """Arestas permitidas a partir de node_id (forward) ou até node_id (backward)."""
+        c = self.constraints
+        if c.direction == "both":
+            direction = "both"
+        else:
+            direction = "out" if forward else "in"
+
+        result = []
+        for neighbor, rel in self.store.neighbors(node_id, c.relationship_types, direction):
+            if neighbor.id in banned_nodes or rel.id in banned_edges:
+                continue
+            if c.min_weight is not None and rel.weight < c.min_weight:
+                continue
+            result.append((neighbor.id, rel))
+        return result
+
+    def edge_cost(self, rel: "Relationship") -> float:
+        return 1.0 if self.constraints.cost is None else self.constraints.cost(rel)
+
+    # ============================================================
+    # SHORTEST PATH
+    # ============================================================
+
+    def shortest(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: int,
+        banned_nodes: Set[str] = frozenset(),
+        banned_edges: Set[str] = frozenset()
+    ) -> Optional[GraphPath]:
+        if source_id == target_id:
+            return GraphPath(node_ids=[source_id])
+        if max_depth <= 0:
+            return None
+        if self.constraints.cost is None:
+            return self._bidirectional_bfs(source_id, target_id, max_depth, banned_nodes, banned_edges)
+        return self._dijkstra(source_id, target_id, max_depth, banned_nodes, banned_edges)
+
+    def _bidirectional_bfs(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: int,
+        banned_nodes: Set[str],
+        banned_edges: Set[str]
+    ) -> Optional[GraphPath]:
+        # node -> (nó anterior/seguinte, relacionamento, profundidade)
+        forward: Dict[str, Tuple[Optional[str], Optional["Relationship"], int]] = {source_id: (None, None, 0)}
+        backward: Dict[str, Tuple[Optional[str], Optional["Relationship"], int]] = {target_id: (None, None, 0)}
+        forward_frontier = [source_id]
+        backward_frontier = [target_id]
+        depth = 0
+
+        while forward_frontier and backward_frontier and depth < max_depth:
+            # Expande o lado com a menor fronteira
+            expand_forward = len(forward_frontier) <= len(backward_frontier)
+            frontier = forward_frontier if expand_forward else backward_frontier
+            visited, other = (forward, backward) if expand_forward else (backward, forward)
+
+            best: Optional[Tuple[int, str]] = None
+            next_frontier = []
+            for node_id in frontier:
+                self.expand()
+                node_depth = visited[node_id][2]
+                for neighbor_id, rel in self.edges(node_id, expand_forward, banned_nodes, banned_edges):
+                    if neighbor_id in visited:
+                        continue
+                    visited[neighbor_id] = (node_id, rel, node_depth + 1)
+                    next_frontier.append(neighbor_id)
+                    if neighbor_id in other:
+                        length = node_depth + 1 + other[neighbor_id][2]
+                        if length <= max_depth and (best is None or length < best[0]):
+                            best = (length, neighbor_id)
+
+            if best is not None:
+                return self._join(best[1], forward, backward)
+            if expand_forward:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+            depth += 1
+        return None
+
+    def _join(self, meeting_id, forward, backward) -> GraphPath:
+        nodes = [meeting_id]
+        rels = []
+        node_id = meeting_id
+        while forward[node_id][0] is not None:
+            previous, rel, _ = forward[node_id]
+            nodes.append(previous)
+            rels.append(rel)
+            node_id = previous
+        nodes.reverse()
+        rels.reverse()
+
+        node_id = meeting_id
+        while backward[node_id][0] is not None:
+            following, rel, _ = backward[node_id]
+            nodes.append(following)
+            rels.append(rel)
+            node_id = following
+
+        return GraphPath(
+            node_ids=nodes,
+            relationship_ids=[r.id for r in rels],
+            cost=sum(self.edge_cost(r) for r in rels),
+        )
+
+    def _dijkstra(
+        self,
+        source_id: str,
+        target_id: str,
+        max_depth: int,
+        banned_nodes: Set[str],
+        banned_edges: Set[str]
+    ) -> Optional[GraphPath]:
+        # Estados (nó, hops) para respeitar max_depth de forma exata;
+        # chain = (nó, relacionamento, chain anterior)
+        heap: List[Tuple[float, int, int, Tuple]] = [(0.0, 0, 0, (source_id, None, None))]
+        settled: Set[Tuple[str, int]] = set()
+        counter = 0
+
+        while heap:
+            cost, hops, _, chain = heapq.heappop(heap)
+            node_id = chain[0]
+            if node_id == target_id:
+                nodes, rels = [], []
+                while chain is not None:
+                    nodes.append(chain[0])
+                    if chain[1] is not None:
+                        rels.append(chain[1].id)
+                    chain = chain[2]
+                return GraphPath(node_ids=nodes[::-1], relationship_ids=rels[::-1], cost=cost)
+            if (node_id, hops) in settled or hops >= max_depth:
+                continue
+            settled.add((node_id, hops))
+            self.expand()
+
+            on_path = set()
+            link = chain
+            while link is not None:
+                on_path.add(link[0])
+                link = link[2]
+
+            for neighbor_id, rel in self.edges(node_id, True, banned_nodes, banned_edges):
+                # Só caminhos simples
+                if neighbor_id in on_path or (neighbor_id, hops + 1) in settled:
+                    continue
+                edge_cost = self.edge_cost(rel)
+                if edge_cost < 0:
+                    raise ValueError("Path costs must be non-negative")
+                counter += 1
+                heapq.heappush(heap, (cost + edge_cost, hops + 1, counter, (neighbor_id, rel, chain)))
+        return None
+
+
+class PathFinder:
+    """
+    Busca de caminhos sobre o GraphStore.
+
+    Exemplo:
+        finder = PathFinder(engine._graph)
+        result = finder.k_shortest_paths(
+            "lei_8666", "stf",
+            constraints=PathConstraints(relationship_types=["cita"], max_depth=4),
+            budget=PathBudget(max_paths=5, time_budget_ms=50),
+        )
+        for path in result.paths:
+            print(path.node_ids, path.cost)
+    """
+
+    def __init__(self, store: GraphStore):
+        self.store = store
+
+    def shortest_path(
+        self,
+        source_id: str,
+        target_id: str,
+        constraints: Optional[PathConstraints] = None,
+        budget: Optional[PathBudget] = None
+    ) -> PathSearchResult:
+        """Shortest path (hops or cost) respecting the constraints."""
+        search = _Search(self.store, constraints or PathConstraints(), budget or PathBudget())
+        result = PathSearchResult()
+        if source_id in self.store.entities and target_id in self.store.entities:
+            try:
+                path = search.shortest(source_id, target_id, search.constraints.max_depth)
+                if path:
+                    result.paths.append(path)
+            except _BudgetExceeded:
+                result.truncated = True
+        return self._finish(search, result)
+
+    def k_shortest_paths(
+        self,
+        source_id: str,
+        target_id: str,
+        constraints: Optional[PathConstraints] = None,
+        budget: Optional[PathBudget] = None
+    ) -> PathSearchResult:
+        """
+        Up to budget.max_paths simple paths in increasing cost (Yen).
+
+        When the time or expansion budget runs out, returns the paths
+        found so far with truncated=True.
+        """
+        search = _Search(self.store, constraints or PathConstraints(), budget or PathBudget())
+        result = PathSearchResult()
+        if source_id not in self.store.entities or target_id not in self.store.entities:
+            return self._finish(search, result)
+
+        max_depth = search.constraints.max_depth
+        found = result.paths
+        candidates: List[Tuple[float, int, GraphPath]] = []
+        seen: Set[Tuple[str, ...]] = set()
+        counter = 0
+
+        try:
+            first = search.shortest(source_id, target_id, max_depth)
+            if first is None:
+                return self._finish(search, result)
+            found.append(first)
+            seen.add(tuple(first.relationship_ids))
+
+            while len(found) < search.budget.max_paths:
+                previous = found[-1]
+                for i in range(len(previous.node_ids) - 1):
+                    spur_id = previous.node_ids[i]
+                    root_nodes = previous.node_ids[:i + 1]
+                    root_rels = previous.relationship_ids[:i]
+
+                    banned_edges = {
+                        p.relationship_ids[i] for p in found
+                        if len(p.relationship_ids) > i and p.node_ids[:i + 1] == root_nodes
+                    }
+                    banned_nodes = set(root_nodes[:-1])
+
+                    spur = search.shortest(spur_id, target_id, max_depth - i, banned_nodes, banned_edges)
+                    if spur is None:
+                        continue
+
+                    rel_ids = root_rels + spur.relationship_ids
+                    key = tuple(rel_ids)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    root_cost = sum(search.edge_cost(self.store.relationships[r]) for r in root_rels)
+                    counter += 1
+                    heapq.heappush(candidates, (
+                        root_cost + spur.cost,
+                        counter,
+                        GraphPath(
+                            node_ids=root_nodes + spur.node_ids[1:],
+                            relationship_ids=rel_ids,
+                            cost=root_cost + spur.cost,
+                        ),
+                    ))
+
+                if not candidates:
+                    break
+                found.append(heapq.heappop(candidates)[2])
+        except _BudgetExceeded:
+            result.truncated = True
+
+        return self._finish(search, result)
+
+    def _finish(self, search: _Search, result: PathSearchResult) -> PathSearchResult:
+        result.expansions = search.expansions
+        result.elapsed_ms = (time.perf_counter() - search.started) * 1000
+        return result
@@ -7,12 +7,15 @@ Sprint 3: GraphRAG + Neo4j Integration
 from __future__ import annotations
 
 import logging
+import os
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 import uuid
 
 from ..core.types import DomainType, RAGSource
+from .graph_paths import PathBudget, PathConstraints, PathFinder, PathSearchResult
+from .graph_store import GraphStore
 
 logger = logging.getLogger(__name__)
 
@@ -86,44 +89,54 @@ class GraphRAGEngine:
         domain: DomainType,
         neo4j_uri: Optional[str] = None,
         neo4j_user: Optional[str] = None,
-        neo4j_password: Optional[str] = None
+        neo4j_password: Optional[str] = None,
+        snapshot_path: Optional[str] = None,
+        snapshot_log_path: Optional[str] = None
     ):
         self.domain = domain
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         
-        # In-memory graph for development
-        self._entities: Dict[str, Entity] = {}
-        self._relationships: Dict[str, Relationship] = {}
-        self._entity_index: Dict[str, Set[str]] = {}  # type -> entity_ids
+        # In-memory graph for development (indexed adjacency + name index)
+        self._graph = GraphStore()
         
         # Components
         self.entity_extractor = EntityExtractor()
         self.graph_traverser = GraphTraverser(self)
         self.hybrid_ranker = HybridRanker()
         
+        # Warm start from a mapped snapshot (+ append log)
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.load_snapshot(snapshot_path, snapshot_log_path)
+        
         logger.info("GraphRAGEngine initialized for domain: %s", domain.value)
     
     # ============================================================
     # GRAPH OPERATIONS
     # ============================================================
     
+    @property
+    def _entities(self) -> Mapping[str, Entity]:
+        return self._graph.entities
+    
+    @property
+    def _relationships(self) -> Mapping[str, Relationship]:
+        return self._graph.relationships
+    
+    @property
+    def _entity_index(self) -> Dict[str, Set[str]]:
+        return self._graph.type_index  # type -> entity_ids
+    
     def add_entity(self, entity: Entity) -> str:
         """Add entity to the graph."""
-        self._entities[entity.id] = entity
-        
-        # Index by type
-        if entity.type not in self._entity_index:
-            self._entity_index[entity.type] = set()
-        self._entity_index[entity.type].add(entity.id)
-        
+        self._graph.add_entity(entity)
         logger.debug("Added entity: %s (%s)", entity.name, entity.type)
         return entity.id
     
     def add_relationship(self, relationship: Relationship) -> str:
         """Add relationship to the graph."""
-        self._relationships[relationship.id] = relationship
+        self._graph.add_relationship(relationship)
         logger.debug("Added relationship: %s -[%s]-> %s",
                     relationship.source_id, relationship.type, relationship.target_id)
         return relationship.id
@@ -143,24 +156,8 @@ class GraphRAGEngine:
         relationship_types: Optional[List[str]] = None,
         direction: str = "both"  # in, out, both
     ) -> List[Tuple[Entity, Relationship]]:
-        """Get neighboring entities."""
-        neighbors = []
-        
-        for rel in self._relationships.values():
-            if relationship_types and rel.type not in relationship_types:
-                continue
-            
-            if direction in ("out", "both") and rel.source_id == entity_id:
-                target = self._entities.get(rel.target_id)
-                if target:
-                    neighbors.append((target, rel))
-            
-            if direction in ("in", "both") and rel.target_id == entity_id:
-                source = self._entities.get(rel.source_id)
-                if source:
-                    neighbors.append((source, rel))
-        
-        return neighbors
+        """Get neighboring entities (cost proportional to the entity's degree)."""
+        return list(self._graph.neighbors(entity_id, relationship_types, direction))
     
     def get_subgraph(
         self,
@@ -181,13 +178,16 @@ class GraphRAGEngine:
             
             new_frontier = []
             for entity_id in frontier:
-                neighbors = self.get_neighbors(entity_id)
-                for neighbor, rel in neighbors:
-                    if neighbor.id not in visited and len(entities) < max_nodes:
+                if len(entities) >= max_nodes:
+                    break
+                for neighbor, rel in self._graph.neighbors(entity_id):
+                    if neighbor.id not in visited:
                         visited.add(neighbor.id)
                         entities.append(neighbor)
                         relationships.append(rel)
                         new_frontier.append(neighbor.id)
+                        if len(entities) >= max_nodes:
+                            break
             
             frontier = new_frontier
         
@@ -198,6 +198,42 @@ class GraphRAGEngine:
             depth=depth
         )
     
+    # ============================================================
+    # SNAPSHOTS
+    # ============================================================
+    
+    def save_snapshot(self, path: str) -> str:
+        """
+        Write the graph to a binary snapshot.
+        
+        When the graph was loaded from a snapshot with an append log, the
+        log is folded into the new snapshot and truncated.
+        """
+        from .graph_snapshot import LayeredGraph, write_snapshot
+        
+        if isinstance(self._graph, LayeredGraph):
+            written = self._graph.compact(path)
+            self.load_snapshot(path, self._graph.log_path)
+        else:
+            written = write_snapshot(self._graph, path)
+        return str(written)
+    
+    def load_snapshot(self, path: str, log_path: Optional[str] = None) -> None:
+        """
+        Use a snapshot as the graph (read-only mapping shared by the process).
+        
+        New entities and relationships go to an in-memory layer and, when
+        log_path is set, to an append log replayed on the next load.
+        """
+        from .graph_snapshot import LayeredGraph, get_mapped_graph
+        
+        previous = self._graph
+        self._graph = LayeredGraph(get_mapped_graph(path), log_path=log_path)
+        self.graph_traverser.path_finder.store = self._graph
+        if isinstance(previous, LayeredGraph):
+            previous.close()
+        logger.info("Graph snapshot loaded: %s (%d entities)", path, len(self._entities))
+    
     # ============================================================
     # QUERY
     # ============================================================
@@ -271,14 +307,10 @@ class GraphRAGEngine:
         matched = []
         
         for ext in extracted:
-            name = ext.get("name", "").lower()
-            entity_type = ext.get("type", "")
-            
-            # Search by name similarity
-            for entity in self._entities.values():
-                if name in entity.name.lower() or entity.name.lower() in name:
-                    matched.append(entity)
-                    break
+            # Search by name similarity (name index, no full scan)
+            entity = self._graph.match_name(ext.get("name", ""))
+            if entity:
+                matched.append(entity)
         
         return matched
     
@@ -387,32 +419,49 @@ class GraphTraverser:
     
     def __init__(self, engine: GraphRAGEngine):
         self.engine = engine
+        self.path_finder = PathFinder(engine._graph)
     
     async def find_paths(
         self,
         source_id: str,
         target_id: str,
-        max_depth: int = 3
+        max_depth: int = 3,
+        max_paths: int = 10,
+        relationship_types: Optional[List[str]] = None,
+        min_weight: Optional[float] = None,
+        time_budget_ms: float = 200.0
     ) -> List[List[str]]:
-        """Find paths between two entities."""
-        paths = []
-        
-        def dfs(current: str, target: str, path: List[str], depth: int):
-            if depth > max_depth:
-                return
-            if current == target:
-                paths.append(path.copy())
-                return
-            
-            neighbors = self.engine.get_neighbors(current, direction="out")
-            for neighbor, rel in neighbors:
-                if neighbor.id not in path:
-                    path.append(neighbor.id)
-                    dfs(neighbor.id, target, path, depth + 1)
-                    path.pop()
-        
-        dfs(source_id, target_id, [source_id], 0)
-        return paths
+        """
+        Find paths between two entities.
+        
+        Returns up to max_paths simple paths (outgoing edges), shortest
+        first (Yen's k-shortest paths over bidirectional BFS). The search
+        stops early when the time budget runs out.
+        """
+        result = self.path_finder.k_shortest_paths(
+            source_id,
+            target_id,
+            constraints=PathConstraints(
+                relationship_types=relationship_types,
+                min_weight=min_weight,
+                max_depth=max_depth,
+            ),
+            budget=PathBudget(max_paths=max_paths, time_budget_ms=time_budget_ms),
+        )
+        if result.truncated:
+            logger.debug("Path search truncated after %d expansions (%.1fms)",
+                        result.expansions, result.elapsed_ms)
+        return [path.node_ids for path in result.paths]
+    
+    def search_paths(
+        self,
+        source_id: str,
+        target_id: str,
+        constraints: Optional[PathConstraints] = None,
+        budget: Optional[PathBudget] = None
+    ) -> PathSearchResult:
+        """K-shortest paths with full constraints (types, weight, cost, direction)."""
+        return self.path_finder.k_shortest_paths(source_id, target_id, constraints, budget)
 
 
 class HybridRanker:
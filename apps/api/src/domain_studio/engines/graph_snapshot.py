@@ -0,0 +1,641 @@
+"""
+Graph Snapshot - Persistência binária do grafo do GraphRAGEngine.
+
+Formato colunar (arrays de inteiros + tabela de strings UTF-8), lido via
+mmap sem reconstruir objetos Python:
+
+- Entidades: id, nome, tipo e extras (JSON) como índices na tabela de strings
+- Relacionamentos: id, origem, destino, tipo, peso e extras
+- Adjacência de saída/entrada em CSR e índice de nomes (nomes ordenados +
+  postings de trigramas) para consultas sem desserializar o grafo
+- Log de append (JSON lines) com as alterações desde o último snapshot
+
+O arquivo é aberto somente leitura: processos que mapeiam o mesmo
+snapshot compartilham as páginas via page cache do sistema.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Set, Tuple, Union
+import logging
+
+from .graph_rag import Entity, Relationship
+from .graph_store import GraphStore
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b"AGRS"
+VERSION = 1
+NONE = 0xFFFFFFFF
+
+# Seções na ordem em que são gravadas: (nome, typecode)
+SECTIONS: List[Tuple[str, str]] = [
+    ("str_offsets", "Q"),
+    ("str_data", "B"),
+    ("ent_id", "I"),
+    ("ent_name", "I"),
+    ("ent_lname", "I"),
+    ("ent_type", "I"),
+    ("ent_extra", "I"),
+    ("ent_by_id", "I"),
+    ("rel_id", "I"),
+    ("rel_source", "I"),
+    ("rel_target", "I"),
+    ("rel_source_ent", "i"),
+    ("rel_target_ent", "i"),
+    ("rel_type", "I"),
+    ("rel_weight", "d"),
+    ("rel_extra", "I"),
+    ("rel_by_id", "I"),
+    ("out_indptr", "Q"),
+    ("out_rels", "I"),
+    ("in_indptr", "Q"),
+    ("in_rels", "I"),
+    ("name_sorted", "I"),
+    ("name_lengths", "I"),
+    ("trigram_keys", "I"),
+    ("trigram_indptr", "Q"),
+    ("trigram_postings", "I"),
+]
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION = struct.Struct("<QQ")
+_ALIGN = 8
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _extra(properties: Dict[str, Any], embedding: Optional[List[float]] = None) -> Optional[str]:
+    if not properties and embedding is None:
+        return None
+    data: Dict[str, Any] = {"properties": properties}
+    if embedding is not None:
+        data["embedding"] = embedding
+    return json.dumps(data, ensure_ascii=False)
+
+
+# ============================================================
+# WRITER
+# ============================================================
+
+def write_snapshot(graph: Union[GraphStore, "LayeredGraph", "MappedGraph"], path: str) -> Path:
+    """
+    Write the graph to a snapshot file.
+
+    The file is written next to the destination and atomically renamed, so
+    processes that still map the previous snapshot keep a valid view.
+    """
+    if sys.byteorder != "little":
+        raise RuntimeError("Graph snapshots require a little-endian host")
+
+    strings: Dict[str, int] = {}
+    table: List[bytes] = []
+
+    def ref(value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        idx = strings.get(value)
+        if idx is None:
+            idx = strings[value] = len(table)
+            table.append(value.encode("utf-8"))
+        return idx
+
+    cols: Dict[str, array] = {name: array(tc) for name, tc in SECTIONS}
+
+    entities = list(graph.entities.values())
+    entity_index: Dict[str, int] = {}
+    lnames: List[str] = []
+    trigram_postings: Dict[str, List[int]] = {}
+    name_lengths: Set[int] = set()
+    for i, entity in enumerate(entities):
+        entity_index[entity.id] = i
+        lname = entity.name.lower()
+        lnames.append(lname)
+        name_lengths.add(len(lname))
+        for gram in _trigrams(lname):
+            trigram_postings.setdefault(gram, []).append(i)
+        cols["ent_id"].append(ref(entity.id))
+        cols["ent_name"].append(ref(entity.name))
+        cols["ent_lname"].append(ref(lname))
+        cols["ent_type"].append(ref(entity.type))
+        cols["ent_extra"].append(ref(_extra(entity.properties, entity.embedding)))
+    cols["ent_by_id"].extend(sorted(range(len(entities)), key=lambda i: entities[i].id))
+    cols["name_sorted"].extend(sorted(range(len(entities)), key=lambda i: (lnames[i], i)))
+    cols["name_lengths"].extend(sorted(name_lengths))
+
+    for gram in sorted(trigram_postings):
+        cols["trigram_keys"].append(ref(gram))
+    cols["trigram_indptr"].append(0)
+    for gram in sorted(trigram_postings):
+        cols["trigram_postings"].extend(trigram_postings[gram])
+        cols["trigram_indptr"].append(len(cols["trigram_postings"]))
+
+    relationships = list(graph.relationships.values())
+    out_lists: List[List[int]] = [[] for _ in entities]
+    in_lists: List[List[int]] = [[] for _ in entities]
+    for r, rel in enumerate(relationships):
+        source = entity_index.get(rel.source_id, -1)
+        target = entity_index.get(rel.target_id, -1)
+        if source >= 0:
+            out_lists[source].append(r)
+        if target >= 0:
+            in_lists[target].append(r)
+        cols["rel_id"].append(ref(rel.id))
+        cols["rel_source"].append(ref(rel.source_id))
+        cols["rel_target"].append(ref(rel.target_id))
+        cols["rel_source_ent"].append(source)
+        cols["rel_target_ent"].append(target)
+        cols["rel_type"].append(ref(rel.type))
+        cols["rel_weight"].append(rel.weight)
+        cols["rel_extra"].append(ref(_extra(rel.properties)))
+    cols["rel_by_id"].extend(sorted(range(len(relationships)), key=lambda r: relationships[r].id))
+
+    for prefix, lists in (("out", out_lists), ("in", in_lists)):
+        indptr, rels = cols[f"{prefix}_indptr"], cols[f"{prefix}_rels"]
+        indptr.append(0)
+        for rel_ids in lists:
+            rels.extend(rel_ids)
+            indptr.append(len(rels))
+
+    offset = 0
+    for encoded in table:
+        cols["str_offsets"].append(offset)
+        offset += len(encoded)
+    cols["str_offsets"].append(offset)
+    cols["str_data"] = array("B", b"".join(table))
+
+    # Cabeçalho + tabela de seções, depois as seções alinhadas
+    header_size = _HEADER.size + _SECTION.size * len(SECTIONS)
+    position = -(-header_size // _ALIGN) * _ALIGN
+    layout = []
+    for name, _ in SECTIONS:
+        layout.append((position, len(cols[name])))
+        position += cols[name].itemsize * len(cols[name])
+        position = -(-position // _ALIGN) * _ALIGN
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, len(SECTIONS)))
+        for section_offset, count in layout:
+            f.write(_SECTION.pack(section_offset, count))
+        for (name, _), (section_offset, _) in zip(SECTIONS, layout):
+            f.write(b"\0" * (section_offset - f.tell()))
+            cols[name].tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    logger.info("Graph snapshot written: %s (%d entities, %d relationships)",
+                path, len(entities), len(relationships))
+    return path
+
+
+# ============================================================
+# READER
+# ============================================================
+
+class _MappedView(Mapping):
+    """Mapping id -> objeto, materializado sob demanda a partir do mmap."""
+
+    def __init__(self, graph: "MappedGraph", kind: str):
+        self._graph = graph
+        self._kind = kind
+
+    def __getitem__(self, key: str):
+        idx = self._graph._lookup(self._kind, key)
+        if idx is None:
+            raise KeyError(key)
+        return self._graph._materialize(self._kind, idx)
+
+    def __contains__(self, key) -> bool:
+        return self._graph._lookup(self._kind, key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        text = self._graph._text
+        for string_idx in self._graph._cols[f"{self._kind}_id"]:
+            yield text(string_idx)
+
+    def __len__(self) -> int:
+        return len(self._graph._cols[f"{self._kind}_id"])
+
+
+class MappedGraph:
+    """
+    Grafo somente leitura sobre um snapshot mapeado em memória.
+
+    Exemplo:
+        graph = MappedGraph("./data/graphs/legal.graph")
+        graph.entities["lei_8666"]
+        for neighbor, rel in graph.neighbors("lei_8666", direction="out"):
+            ...
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+        self._cols: Dict[str, memoryview] = {}
+
+        magic, version, sections = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION or sections != len(SECTIONS):
+            self.close()
+            raise ValueError(f"Not a graph snapshot (v{VERSION}): {self.path}")
+
+        for i, (name, typecode) in enumerate(SECTIONS):
+            offset, count = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+            size = count * array(typecode).itemsize
+            self._cols[name] = view[offset:offset + size].cast(typecode)
+
+        self.entities = _MappedView(self, "ent")
+        self.relationships = _MappedView(self, "rel")
+        self._type_index: Optional[Dict[str, Set[str]]] = None
+        self._relationship_types: Dict[str, int] = {}
+        for string_idx in set(self._cols["rel_type"]):
+            self._relationship_types[self._text(string_idx)] = string_idx
+
+    def close(self) -> None:
+        """Release the mapping."""
+        for col in self._cols.values():
+            col.release()
+        self._cols.clear()
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def _text(self, idx: int) -> Optional[str]:
+        if idx == NONE:
+            return None
+        offsets = self._cols["str_offsets"]
+        return bytes(self._cols["str_data"][offsets[idx]:offsets[idx + 1]]).decode("utf-8")
+
+    def _lookup(self, kind: str, key: str) -> Optional[int]:
+        """Binary search over the id-sorted index."""
+        ids, order = self._cols[f"{kind}_id"], self._cols[f"{kind}_by_id"]
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._text(ids[order[mid]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self._text(ids[order[lo]]) == key:
+            return order[lo]
+        return None
+
+    def _materialize(self, kind: str, idx: int):
+        c, text = self._cols, self._text
+        extra = text(c[f"{kind}_extra"][idx])
+        extra = json.loads(extra) if extra else {}
+        if kind == "ent":
+            return Entity(
+                id=text(c["ent_id"][idx]),
+                name=text(c["ent_name"][idx]),
+                type=text(c["ent_type"][idx]),
+                properties=extra.get("properties", {}),
+                embedding=extra.get("embedding"),
+            )
+        return Relationship(
+            id=text(c["rel_id"][idx]),
+            source_id=text(c["rel_source"][idx]),
+            target_id=text(c["rel_target"][idx]),
+            type=text(c["rel_type"][idx]),
+            properties=extra.get("properties", {}),
+            weight=c["rel_weight"][idx],
+        )
+
+    @property
+    def type_index(self) -> Dict[str, Set[str]]:
+        """type -> entity_ids (built on first use)."""
+        if self._type_index is None:
+            index: Dict[str, Set[str]] = {}
+            types: Dict[int, str] = {}
+            for id_idx, type_idx in zip(self._cols["ent_id"], self._cols["ent_type"]):
+                entity_type = types.get(type_idx)
+                if entity_type is None:
+                    entity_type = types[type_idx] = self._text(type_idx)
+                index.setdefault(entity_type, set()).add(self._text(id_idx))
+            self._type_index = index
+        return self._type_index
+
+    def incident(
+        self,
+        entity_id: str,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "both"
+    ) -> Iterator[Tuple[int, bool]]:
+        """Relationship indices touching an entity as (index, outgoing), in insertion order."""
+        idx = self._lookup("ent", entity_id)
+        if idx is None:
+            return
+        c = self._cols
+        lists = []
+        if direction in ("out", "both"):
+            lists.append(((r, 0, True) for r in c["out_rels"][c["out_indptr"][idx]:c["out_indptr"][idx + 1]]))
+        if direction in ("in", "both"):
+            lists.append(((r, 1, False) for r in c["in_rels"][c["in_indptr"][idx]:c["in_indptr"][idx + 1]]))
+
+        allowed = None
+        if relationship_types:
+            allowed = {self._relationship_types[t] for t in relationship_types if t in self._relationship_types}
+        rel_type = c["rel_type"]
+        for r, _, outgoing in (lists[0] if len(lists) == 1 else heapq.merge(*lists)):
+            if allowed is None or rel_type[r] in allowed:
+                yield r, outgoing
+
+    def neighbors(
+        self,
+        entity_id: str,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "both"
+    ) -> Iterator[Tuple[Entity, Relationship]]:
+        """Neighboring entities with the connecting relationship."""
+        c = self._cols
+        for r, outgoing in self.incident(entity_id, relationship_types, direction):
+            other = c["rel_target_ent"][r] if outgoing else c["rel_source_ent"][r]
+            if other >= 0:
+                yield self._materialize("ent", other), self._materialize("rel", r)
+
+    def degree(self, entity_id: str, direction: str = "both") -> int:
+        """Number of relationships touching an entity."""
+        return sum(1 for _ in self.incident(entity_id, None, direction))
+
+    def match_indices(self, name: str) -> List[int]:
+        """Indices of entities whose name contains `name` or is contained in it (sorted)."""
+        c, text = self._cols, self._text
+        query = name.lower()
+        candidates: Set[int] = set()
+
+        # Nome da entidade contido na query: busca binária nos nomes ordenados
+        order, lnames = c["name_sorted"], c["ent_lname"]
+        for size in c["name_lengths"]:
+            for i in range(len(query) - size + 1):
+                part = query[i:i + size]
+                lo, hi = 0, len(order)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if text(lnames[order[mid]]) < part:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                while lo < len(order) and text(lnames[order[lo]]) == part:
+                    candidates.add(order[lo])
+                    lo += 1
+
+        # Query contida no nome: interseção das postings de trigramas
+        grams = _trigrams(query)
+        if grams:
+            keys, indptr, postings = c["trigram_keys"], c["trigram_indptr"], c["trigram_postings"]
+            found: Optional[Set[int]] = None
+            for gram in grams:
+                lo, hi = 0, len(keys)
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if text(keys[mid]) < gram:
+                        lo = mid + 1
+                    else:
+                        hi = mid
+                if lo == len(keys) or text(keys[lo]) != gram:
+                    found = set()
+                    break
+                posting = set(postings[indptr[lo]:indptr[lo + 1]])
+                found = posting if found is None else found & posting
+                if not found:
+                    break
+            candidates |= {i for i in found or () if query in text(lnames[i])}
+        else:
+            candidates |= {i for i, lname in enumerate(lnames) if query in text(lname)}
+
+        return sorted(candidates)
+
+    def match_name(self, name: str) -> Optional[Entity]:
+        """First entity (snapshot order) matching `name`, case-insensitive."""
+        matches = self.match_indices(name)
+        return self._materialize("ent", matches[0]) if matches else None
+
+
+# ============================================================
+# LAYERED (snapshot + append log)
+# ============================================================
+
+class _LayeredView(Mapping):
+    """Mapping com a camada em memória sobre a do snapshot."""
+
+    def __init__(self, base: Mapping, overlay: Mapping):
+        self._base = base
+        self._overlay = overlay
+
+    def __getitem__(self, key: str):
+        if key in self._overlay:
+            return self._overlay[key]
+        return self._base[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._overlay or key in self._base
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._base
+        for key in self._overlay:
+            if key not in self._base:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._base) + sum(1 for key in self._overlay if key not in self._base)
+
+
+class LayeredGraph:
+    """
+    Snapshot mapeado (somente leitura) + alterações em memória.
+
+    Alterações são gravadas em um log de append e reaplicadas ao abrir,
+    até o próximo snapshot (compact).
+
+    Exemplo:
+        graph = LayeredGraph(get_mapped_graph("legal.graph"), log_path="legal.graph.log")
+        graph.add_entity(Entity(id="nova", name="Lei 14.133", type="law"))
+        graph.compact("legal.graph")
+    """
+
+    def __init__(self, base: MappedGraph, log_path: Optional[str] = None):
+        self.base = base
+        self.overlay = GraphStore()
+        self.log_path = Path(log_path) if log_path else None
+        self._log = None
+        self._lock = threading.Lock()
+        # type -> entity_ids das duas camadas; montado no primeiro acesso e
+        # mantido incrementalmente pelas escritas
+        self._type_index: Optional[Dict[str, Set[str]]] = None
+
+        self.entities = _LayeredView(base.entities, self.overlay.entities)
+        self.relationships = _LayeredView(base.relationships, self.overlay.relationships)
+
+        if self.log_path and self.log_path.exists():
+            self._replay()
+
+    def _replay(self) -> None:
+        applied = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Última linha incompleta (escrita interrompida)
+                    logger.warning("Ignoring truncated graph log record in %s", self.log_path)
+                    break
+                if record["op"] == "entity":
+                    self.overlay.add_entity(Entity(**record["data"]))
+                elif record["op"] == "relationship":
+                    self.overlay.add_relationship(Relationship(**record["data"]))
+                applied += 1
+        logger.info("Replayed %d graph log records from %s", applied, self.log_path)
+
+    def _append(self, line: Optional[str]) -> None:
+        """Write an already serialized record to the log (caller holds `_lock`)."""
+        if line is None:
+            return
+        if self._log is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        self._log.write(line)
+        self._log.flush()
+
+    def _record(self, op: str, data: Dict[str, Any]) -> Optional[str]:
+        # Serializado antes de alterar a camada em memória: um valor não
+        # serializável não deixa memória e log divergentes
+        if self.log_path is None:
+            return None
+        return json.dumps({"op": op, "data": data}, ensure_ascii=False) + "\n"
+
+    def add_entity(self, entity: Entity) -> str:
+        """Add or replace an entity (logged)."""
+        line = self._record("entity", asdict(entity))
+        with self._lock:
+            if self._type_index is not None:
+                previous = self.entities.get(entity.id)
+                if previous is not None:
+                    ids = self._type_index.get(previous.type)
+                    if ids is not None:
+                        ids.discard(entity.id)
+                        if not ids:
+                            del self._type_index[previous.type]
+                self._type_index.setdefault(entity.type, set()).add(entity.id)
+            self.overlay.add_entity(entity)
+            self._append(line)
+        return entity.id
+
+    def add_relationship(self, relationship: Relationship) -> str:
+        """Add or replace a relationship (logged)."""
+        line = self._record("relationship", asdict(relationship))
+        with self._lock:
+            self.overlay.add_relationship(relationship)
+            self._append(line)
+        return relationship.id
+
+    @property
+    def type_index(self) -> Dict[str, Set[str]]:
+        """type -> entity_ids across both layers."""
+        if self._type_index is None:
+            with self._lock:
+                if self._type_index is None:
+                    index = {t: set(ids) for t, ids in self.base.type_index.items()}
+                    for entity in self.overlay.entities.values():
+                        if entity.id in self.base.entities:
+                            base_type = self.base.entities[entity.id].type
+                            index.get(base_type, set()).discard(entity.id)
+                        index.setdefault(entity.type, set()).add(entity.id)
+                    self._type_index = {t: ids for t, ids in index.items() if ids}
+        return self._type_index
+
+    def neighbors(
+        self,
+        entity_id: str,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "both"
+    ) -> Iterator[Tuple[Entity, Relationship]]:
+        """Neighbors from the snapshot, then from the in-memory layer."""
+        shadowed = self.overlay.relationships
+        for r, outgoing in self.base.incident(entity_id, relationship_types, direction):
+            rel = self.base._materialize("rel", r)
+            if rel.id in shadowed:
+                continue
+            other = self.entities.get(rel.target_id if outgoing else rel.source_id)
+            if other:
+                yield other, rel
+        for rel, outgoing in self.overlay.incident(entity_id, relationship_types, direction):
+            other = self.entities.get(rel.target_id if outgoing else rel.source_id)
+            if other:
+                yield other, rel
+
+    def degree(self, entity_id: str, direction: str = "both") -> int:
+        """Number of relationships touching an entity."""
+        return sum(1 for _ in self.neighbors(entity_id, None, direction))
+
+    def match_name(self, name: str) -> Optional[Entity]:
+        """First match in the snapshot (not replaced in memory), else in memory."""
+        shadowed = self.overlay.entities
+        for idx in self.base.match_indices(name):
+            entity = self.base._materialize("ent", idx)
+            if entity.id not in shadowed:
+                return entity
+        return self.overlay.match_name(name)
+
+    def compact(self, path: str) -> Path:
+        """Write a new snapshot with both layers and truncate the log."""
+        # Escritas aguardam o snapshot: nada gravado no log durante a
+        # escrita se perde quando ele é removido
+        with self._lock:
+            written = write_snapshot(self, path)
+            if self.log_path:
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                self.log_path.unlink(missing_ok=True)
+        return written
+
+    def close(self) -> None:
+        """Close the append log."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+# ============================================================
+# SHARED MAPPINGS
+# ============================================================
+
+_mapped_graphs: Dict[Tuple[str, int, int], MappedGraph] = {}
+_mapped_lock = threading.Lock()
+
+
+def get_mapped_graph(path: str) -> MappedGraph:
+    """
+    Shared read-only mapping of a snapshot for this process.
+
+    Keyed by file identity, so a snapshot replaced on disk is mapped anew
+    while existing readers keep the previous one.
+    """
+    stat = os.stat(path)
+    key = (str(Path(path).resolve()), stat.st_ino, stat.st_mtime_ns)
+    with _mapped_lock:
+        graph = _mapped_graphs.get(key)
+        if graph is None:
+            for old in [k for k in _mapped_graphs if k[0] == key[0]]:
+                del _mapped_graphs[old]
+            graph = _mapped_graphs[key] = MappedGraph(path)
+        return graph
@@ -0,0 +1,330 @@
+"""
+Graph Store - Grafo em memória indexado para o GraphRAGEngine.
+
+- Adjacência de saída e de entrada por entidade, particionada por tipo
+  de relacionamento: vizinhos custam O(grau), não O(E)
+- Índice de nomes (nome normalizado + trigramas) para casar entidades
+  extraídas de queries sem varrer todas as entidades
+- Exportação CSR compacta (arrays) para travessias em lote
+"""
+
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .graph_rag import Entity, Relationship
+
+
+# entity_id -> tipo de relacionamento -> ids de relacionamentos (ordem de inserção)
+Adjacency = Dict[str, Dict[str, List[str]]]
+
+
+def _normalize(name: str) -> str:
+    return name.lower()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass
+class CSRGraph:
+    """
+    Grafo em formato CSR (compressed sparse row).
+
+    Vizinhos do nó i: indices[indptr[i]:indptr[i + 1]], com o
+    relacionamento correspondente em relationship_ids na mesma posição.
+    """
+    node_ids: List[str] = field(default_factory=list)
+    node_index: Dict[str, int] = field(default_factory=dict)
+    indptr: array = field(default_factory=lambda: array("q", [0]))
+    indices: array = field(default_factory=lambda: array("q"))
+    relationship_ids: List[str] = field(default_factory=list)
+
+    def neighbors(self, node: int) -> array:
+        """Neighbor node indices of a node."""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def bfs(self, seeds: Iterable[str], depth: int) -> Dict[str, int]:
+        """Breadth-first expansion; returns node id -> hop distance."""
+        distances: Dict[int, int] = {}
+        frontier = [self.node_index[s] for s in seeds if s in self.node_index]
+        for node in frontier:
+            distances[node] = 0
+        for d in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                for neighbor in self.indices[self.indptr[node]:self.indptr[node + 1]]:
+                    if neighbor not in distances:
+                        distances[neighbor] = d
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return {self.node_ids[n]: d for n, d in distances.items()}
+
+
+class GraphStore:
+    """
+    Grafo indexado de entidades e relacionamentos.
+
+    Exemplo:
+        graph = GraphStore()
+        graph.add_entity(Entity(id="a", name="Lei 8.666", type="law"))
+        graph.add_entity(Entity(id="b", name="Licitação", type="concept"))
+        graph.add_relationship(Relationship(source_id="a", target_id="b", type="regula"))
+
+        graph.neighbors("a", direction="out")
+        graph.match_name("lei 8.666")
+    """
+
+    def __init__(self):
+        self.entities: Dict[str, "Entity"] = {}
+        self.relationships: Dict[str, "Relationship"] = {}
+        self.type_index: Dict[str, Set[str]] = {}  # type -> entity_ids
+
+        self._out: Adjacency = {}
+        self._in: Adjacency = {}
+        # Ordem de inserção (desempate e ordem estável dos vizinhos)
+        self._entity_seq: Dict[str, int] = {}
+        self._rel_seq: Dict[str, int] = {}
+        self._next_seq = 0
+
+        # Índice de nomes
+        self._names: Dict[str, str] = {}              # entity_id -> nome normalizado
+        self._by_name: Dict[str, Set[str]] = {}       # nome normalizado -> entity_ids
+        self._by_trigram: Dict[str, Set[str]] = {}    # trigrama -> entity_ids
+        self._name_lengths: Dict[int, int] = {}       # tamanho do nome -> contagem
+
+    # ============================================================
+    # ENTITIES
+    # ============================================================
+
+    def add_entity(self, entity: "Entity") -> str:
+        """Add or replace an entity."""
+        if entity.id in self.entities:
+            self._unindex_entity(self.entities[entity.id])
+        else:
+            self._entity_seq[entity.id] = self._next_seq
+            self._next_seq += 1
+
+        self.entities[entity.id] = entity
+        self.type_index.setdefault(entity.type, set()).add(entity.id)
+
+        name = _normalize(entity.name)
+        self._names[entity.id] = name
+        self._by_name.setdefault(name, set()).add(entity.id)
+        self._name_lengths[len(name)] = self._name_lengths.get(len(name), 0) + 1
+        for gram in _trigrams(name):
+            self._by_trigram.setdefault(gram, set()).add(entity.id)
+        return entity.id
+
+    def remove_entity(self, entity_id: str) -> bool:
+        """Remove an entity and its relationships."""
+        entity = self.entities.pop(entity_id, None)
+        if entity is None:
+            return False
+        self._unindex_entity(entity)
+        self._entity_seq.pop(entity_id, None)
+
+        for adjacency in (self._out, self._in):
+            for rel_ids in list(adjacency.get(entity_id, {}).values()):
+                for rel_id in list(rel_ids):
+                    self.remove_relationship(rel_id)
+        self._out.pop(entity_id, None)
+        self._in.pop(entity_id, None)
+        return True
+
+    def _unindex_entity(self, entity: "Entity") -> None:
+        ids = self.type_index.get(entity.type)
+        if ids:
+            ids.discard(entity.id)
+            if not ids:
+                del self.type_index[entity.type]
+
+        name = self._names.pop(entity.id, None)
+        if name is None:
+            return
+        ids = self._by_name.get(name)
+        if ids:
+            ids.discard(entity.id)
+            if not ids:
+                del self._by_name[name]
+        self._name_lengths[len(name)] -= 1
+        if not self._name_lengths[len(name)]:
+            del self._name_lengths[len(name)]
+        for gram in _trigrams(name):
+            ids = self._by_trigram.get(gram)
+            if ids:
+                ids.discard(entity.id)
+                if not ids:
+                    del self._by_trigram[gram]
+
+    # ============================================================
+    # RELATIONSHIPS
+    # ============================================================
+
+    def add_relationship(self, relationship: "Relationship") -> str:
+        """Add or replace a relationship."""
+        if relationship.id in self.relationships:
+            self.remove_relationship(relationship.id)
+
+        self.relationships[relationship.id] = relationship
+        self._rel_seq[relationship.id] = self._next_seq
+        self._next_seq += 1
+
+        self._out.setdefault(relationship.source_id, {}).setdefault(relationship.type, []).append(relationship.id)
+        self._in.setdefault(relationship.target_id, {}).setdefault(relationship.type, []).append(relationship.id)
+        return relationship.id
+
+    def remove_relationship(self, relationship_id: str) -> bool:
+        """Remove a relationship."""
+        rel = self.relationships.pop(relationship_id, None)
+        if rel is None:
+            return False
+        self._rel_seq.pop(relationship_id, None)
+        for adjacency, entity_id in ((self._out, rel.source_id), (self._in, rel.target_id)):
+            by_type = adjacency.get(entity_id, {})
+            rel_ids = by_type.get(rel.type)
+            if rel_ids:
+                rel_ids.remove(relationship_id)
+                if not rel_ids:
+                    del by_type[rel.type]
+        return True
+
+    def _adjacent(
+        self,
+        adjacency: Adjacency,
+        entity_id: str,
+        relationship_types: Optional[List[str]]
+    ) -> List[List[str]]:
+        by_type = adjacency.get(entity_id)
+        if not by_type:
+            return []
+        if relationship_types is None:
+            return list(by_type.values())
+        return [by_type[t] for t in relationship_types if t in by_type]
+
+    def incident(
+        self,
+        entity_id: str,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "both"
+    ) -> Iterator[Tuple["Relationship", bool]]:
+        """Relationships touching an entity as (relationship, outgoing), in insertion order."""
+        seq = self._rel_seq
+        lists = []
+        if direction in ("out", "both"):
+            lists += [
+                [(seq[r], 0, r, True) for r in rel_ids]
+                for rel_ids in self._adjacent(self._out, entity_id, relationship_types or None)
+            ]
+        if direction in ("in", "both"):
+            lists += [
+                [(seq[r], 1, r, False) for r in rel_ids]
+                for rel_ids in self._adjacent(self._in, entity_id, relationship_types or None)
+            ]
+
+        merged = lists[0] if len(lists) == 1 else heapq.merge(*lists)
+        for _, _, rel_id, outgoing in merged:
+            yield self.relationships[rel_id], outgoing
+
+    def neighbors(
+        self,
+        entity_id: str,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "both"
+    ) -> Iterator[Tuple["Entity", "Relationship"]]:
+        """
+        Neighboring entities with the connecting relationship.
+
+        Ordered by relationship insertion, as a full scan would be.
+        """
+        for rel, outgoing in self.incident(entity_id, relationship_types, direction):
+            other = self.entities.get(rel.target_id if outgoing else rel.source_id)
+            if other:
+                yield other, rel
+
+    def degree(self, entity_id: str, direction: str = "both") -> int:
+        """Number of relationships touching an entity."""
+        total = 0
+        if direction in ("out", "both"):
+            total += sum(len(r) for r in self._out.get(entity_id, {}).values())
+        if direction in ("in", "both"):
+            total += sum(len(r) for r in self._in.get(entity_id, {}).values())
+        return total
+
+    # ============================================================
+    # NAME MATCHING
+    # ============================================================
+
+    def match_name(self, name: str) -> Optional["Entity"]:
+        """
+        First entity (insertion order) whose name contains `name` or is
+        contained in it, case-insensitive.
+        """
+        query = _normalize(name)
+        candidates: Set[str] = set()
+
+        # Nome da entidade contido na query: substrings da query (só nos
+        # tamanhos de nome existentes) no índice exato
+        n = len(query)
+        by_name = self._by_name
+        for size in self._name_lengths:
+            for i in range(n - size + 1):
+                ids = by_name.get(query[i:i + size])
+                if ids:
+                    candidates |= ids
+
+        # Query contida no nome da entidade: interseção dos trigramas
+        grams = _trigrams(query)
+        if grams:
+            postings = sorted((self._by_trigram.get(g, set()) for g in grams), key=len)
+            found = set(postings[0])
+            for posting in postings[1:]:
+                if not found:
+                    break
+                found &= posting
+            candidates |= {eid for eid in found if query in self._names[eid]}
+        else:
+            # Query curta demais para trigramas
+            candidates |= {eid for eid, entity_name in self._names.items() if query in entity_name}
+
+        if not candidates:
+            return None
+        return self.entities[min(candidates, key=self._entity_seq.__getitem__)]
+
+    # ============================================================
+    # EXPORT
+    # ============================================================
+
+    def to_csr(
+        self,
+        relationship_types: Optional[List[str]] = None,
+        direction: str = "out"
+    ) -> CSRGraph:
+        """Export adjacency as CSR arrays for bulk traversals."""
+        csr = CSRGraph()
+        csr.node_ids = list(self.entities)
+        csr.node_index = {eid: i for i, eid in enumerate(csr.node_ids)}
+
+        incoming = direction == "in"
+        for eid in csr.node_ids:
+            for rel_ids in self._adjacent(self._in if incoming else self._out, eid, relationship_types):
+                for rel_id in rel_ids:
+                    rel = self.relationships[rel_id]
+                    other = csr.node_index.get(rel.source_id if incoming else rel.target_id)
+                    if other is not None:
+                        csr.indices.append(other)
+                        csr.relationship_ids.append(rel_id)
+            if direction == "both":
+                for rel_ids in self._adjacent(self._in, eid, relationship_types):
+                    for rel_id in rel_ids:
+                        other = csr.node_index.get(self.relationships[rel_id].source_id)
+                        if other is not None:
+                            csr.indices.append(other)
+                            csr.relationship_ids.append(rel_id)
+            csr.indptr.append(len(csr.indices))
+        return csr
@@ -1,6 +1,13 @@
 # Licitacoes Services
 from .dedup import dedup_strong, dedup_fuzzy, merge_items, DuplicateSuggestion
-from .diff import detect_changes, detect_changes_batch
+from .near_dedup import NearDuplicateIndex, NearDuplicateMatch
+from .diff import (
+    detect_changes,
+    detect_changes_batch,
+    iter_changes,
+    item_fingerprint,
+    FingerprintStore,
+)
 from .rag_juridico import (
     RagJuridicoService,
     RagResult,
@@ -14,8 +21,13 @@ __all__ = [
     "dedup_fuzzy",
     "merge_items",
     "DuplicateSuggestion",
+    "NearDuplicateIndex",
+    "NearDuplicateMatch",
     "detect_changes",
     "detect_changes_batch",
+    "iter_changes",
+    "item_fingerprint",
+    "FingerprintStore",
     "RagJuridicoService",
     "RagResult",
     "LegalReference",
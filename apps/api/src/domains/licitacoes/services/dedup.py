@@ -6,6 +6,7 @@ import hashlib
 import logging
 
 from ..models import LicitacaoItem
+from .near_dedup import DEFAULT_THRESHOLD, NearDuplicateIndex
 
 logger = logging.getLogger(__name__)
 
@@ -20,28 +21,12 @@ class DuplicateSuggestion:
     reason: str
 
 
-def _normalize_text(text: str) -> str:
-    """Normaliza texto para comparação."""
-    import re
-    text = text.lower()
-    text = re.sub(r"[^\w\s]", " ", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-
 def _compute_item_hash(item: LicitacaoItem) -> str:
     """Computa hash normalizado de um item para dedup forte."""
     key = f"{item.source}:{item.external_id}"
     return hashlib.sha256(key.encode()).hexdigest()
 
 
-def _compute_fuzzy_hash(item: LicitacaoItem) -> str:
-    """Computa hash fuzzy para dedup fraco."""
-    normalized = _normalize_text(item.objeto)
-    key = f"{item.orgao}:{item.uf}:{normalized[:100]}"
-    return hashlib.md5(key.encode()).hexdigest()
-
-
 def dedup_strong(items: list[LicitacaoItem]) -> list[LicitacaoItem]:
     """
     Deduplicação forte: remove duplicatas exatas por source + external_id.
@@ -52,21 +37,20 @@ def dedup_strong(items: list[LicitacaoItem]) -> list[LicitacaoItem]:
     Returns:
         Lista sem duplicatas exatas
     """
-    seen: dict[str, LicitacaoItem] = {}
+    # hash -> posição em result (substituição O(1))
+    seen: dict[str, int] = {}
     result: list[LicitacaoItem] = []
 
     for item in items:
         item_hash = _compute_item_hash(item)
 
         if item_hash not in seen:
-            seen[item_hash] = item
+            seen[item_hash] = len(result)
             result.append(item)
         else:
-            existing = seen[item_hash]
-            if item.updated_at > existing.updated_at:
-                idx = result.index(existing)
+            idx = seen[item_hash]
+            if item.updated_at > result[idx].updated_at:
                 result[idx] = item
-                seen[item_hash] = item
                 logger.debug(f"Replaced older duplicate: {item.external_id}")
 
     removed = len(items) - len(result)
@@ -76,38 +60,43 @@ def dedup_strong(items: list[LicitacaoItem]) -> list[LicitacaoItem]:
     return result
 
 
-def dedup_fuzzy(items: list[LicitacaoItem]) -> list[DuplicateSuggestion]:
+def dedup_fuzzy(
+    items: list[LicitacaoItem],
+    index: NearDuplicateIndex | None = None,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[DuplicateSuggestion]:
     """
     Deduplicação fraca: identifica possíveis duplicatas por similaridade.
 
+    Compara o objeto (MinHash + LSH) apenas entre itens do mesmo órgão/UF.
+    Com um índice persistente, os itens também são comparados com os de
+    execuções anteriores, e ficam indexados para as próximas.
+
     NUNCA descarta automaticamente. Apenas sugere para revisão humana.
 
     Args:
         items: Lista de LicitacaoItem
+        index: Índice de quase-duplicatas (padrão: índice em memória do lote)
+        threshold: Similaridade mínima (Jaccard estimado) para sugerir
 
     Returns:
         Lista de DuplicateSuggestion para revisão
     """
     suggestions: list[DuplicateSuggestion] = []
-    fuzzy_hashes: dict[str, list[LicitacaoItem]] = {}
+    if index is None:
+        index = NearDuplicateIndex(threshold=threshold)
 
     for item in items:
-        fuzzy_hash = _compute_fuzzy_hash(item)
-
-        if fuzzy_hash in fuzzy_hashes:
-            for existing in fuzzy_hashes[fuzzy_hash]:
-                if existing.external_id != item.external_id:
-                    suggestions.append(
-                        DuplicateSuggestion(
-                            original_id=existing.external_id,
-                            duplicate_id=item.external_id,
-                            similarity_score=0.9,
-                            reason="Mesmo órgão, UF e objeto similar",
-                        )
+        for match in index.add(item):
+            if match.external_id != item.external_id:
+                suggestions.append(
+                    DuplicateSuggestion(
+                        original_id=match.external_id,
+                        duplicate_id=item.external_id,
+                        similarity_score=match.similarity,
+                        reason=f"Mesmo órgão e UF, objeto {match.similarity:.0%} similar",
                     )
-            fuzzy_hashes[fuzzy_hash].append(item)
-        else:
-            fuzzy_hashes[fuzzy_hash] = [item]
+                )
 
     if suggestions:
         logger.info(f"Dedup fuzzy: found {len(suggestions)} potential duplicates")
@@ -129,7 +118,8 @@ def merge_items(
     Returns:
         Tupla: (todos_itens, apenas_novos, atualizados)
     """
-    existing_map = {_compute_item_hash(item): item for item in existing}
+    # hash -> posição em all_items (substituição O(1))
+    existing_map = {_compute_item_hash(item): idx for idx, item in enumerate(existing)}
     all_items: list[LicitacaoItem] = list(existing)
     only_new: list[LicitacaoItem] = []
     updated: list[LicitacaoItem] = []
@@ -141,9 +131,8 @@ def merge_items(
             all_items.append(item)
             only_new.append(item)
         else:
-            existing_item = existing_map[item_hash]
-            if item.updated_at > existing_item.updated_at:
-                idx = all_items.index(existing_item)
+            idx = existing_map[item_hash]
+            if item.updated_at > all_items[idx].updated_at:
                 all_items[idx] = item
                 updated.append(item)
 
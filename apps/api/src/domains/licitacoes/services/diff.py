@@ -1,112 +1,169 @@
-"""Serviço de detecção de mudanças em licitações."""
+"""Serviço de detecção de mudanças em licitações.
 
+Cada item tem um fingerprint dos campos rastreados (prazos, situação,
+valor e anexos). Em re-sincronizações completas, itens inalterados são
+descartados com uma comparação de hash; só os pares que mudaram são
+comparados campo a campo. Os fingerprints (e o estado rastreado) ficam
+em um `FingerprintStore`, de modo que a sincronização seguinte não
+precisa carregar as versões anteriores dos itens.
+"""
+
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+import hashlib
+import json
 import logging
+import sqlite3
+import threading
 
 from ..models import LicitacaoItem, ChangeEvent, TipoMudanca, SourceRef
+from .near_dedup import item_key
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 1000
 
-def detect_changes(
-    old_item: LicitacaoItem,
-    new_item: LicitacaoItem,
-) -> list[ChangeEvent]:
-    """
-    Detecta mudanças entre duas versões de uma licitação.
+# Estado rastreado: [data_abertura, data_encerramento, situacao, valor_estimado, anexos]
+TrackedState = list
 
-    Args:
-        old_item: Versão anterior
-        new_item: Versão atual
 
-    Returns:
-        Lista de ChangeEvent detectados
-    """
-    changes: list[ChangeEvent] = []
-    now = datetime.now(timezone.utc)
+def tracked_state(item: LicitacaoItem) -> TrackedState:
+    """Campos rastreados do item, em forma serializável (JSON)."""
+    return [
+        item.data_abertura.isoformat() if item.data_abertura else None,
+        item.data_encerramento.isoformat() if item.data_encerramento else None,
+        item.situacao.value,
+        item.valor_estimado,
+        sorted({a.filename for a in item.anexos}),
+    ]
+
+
+def _instant(value: str | None) -> str | None:
+    """Normaliza datas com fuso para UTC (instantes iguais, fingerprint igual)."""
+    if value is None:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed.astimezone(timezone.utc).isoformat() if parsed.tzinfo else value
+
 
-    source = new_item.sources[0] if new_item.sources else SourceRef(
-        source=new_item.source,
-        url=new_item.url_edital or "",
+def state_fingerprint(state: TrackedState) -> bytes:
+    """Fingerprint (16 bytes) de um estado rastreado."""
+    abertura, encerramento, situacao, valor, anexos = state
+    normalized = [_instant(abertura), _instant(encerramento), situacao, valor, anexos]
+    payload = json.dumps(normalized, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(payload.encode(), digest_size=16).digest()
+
+
+def item_fingerprint(item: LicitacaoItem) -> bytes:
+    """Fingerprint dos campos rastreados de um item."""
+    return state_fingerprint(tracked_state(item))
+
+
+def _source(item: LicitacaoItem) -> SourceRef:
+    return item.sources[0] if item.sources else SourceRef(
+        source=item.source,
+        url=item.url_edital or "",
     )
 
-    if old_item.data_abertura != new_item.data_abertura:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.PRAZO_ALTERADO,
-            campo="data_abertura",
-            valor_anterior=str(old_item.data_abertura) if old_item.data_abertura else None,
-            valor_novo=str(new_item.data_abertura) if new_item.data_abertura else None,
-            detectado_em=now,
-            fonte=source,
-            descricao="Data de abertura alterada",
-        ))
 
-    if old_item.data_encerramento != new_item.data_encerramento:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.PRAZO_ALTERADO,
-            campo="data_encerramento",
-            valor_anterior=str(old_item.data_encerramento) if old_item.data_encerramento else None,
-            valor_novo=str(new_item.data_encerramento) if new_item.data_encerramento else None,
-            detectado_em=now,
-            fonte=source,
-            descricao="Data de encerramento alterada",
-        ))
+def _display(value: str | float | None) -> str | None:
+    """Valor como exibido no ChangeEvent (datas no formato de str(datetime))."""
+    if not value:
+        return None
+    if isinstance(value, str):
+        return str(datetime.fromisoformat(value))
+    return str(value)
 
-    if old_item.situacao != new_item.situacao:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.STATUS_ALTERADO,
-            campo="situacao",
-            valor_anterior=old_item.situacao.value,
-            valor_novo=new_item.situacao.value,
-            detectado_em=now,
-            fonte=source,
-            descricao=f"Status alterado de {old_item.situacao.value} para {new_item.situacao.value}",
-        ))
 
-    if old_item.valor_estimado != new_item.valor_estimado:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.VALOR_ALTERADO,
-            campo="valor_estimado",
-            valor_anterior=str(old_item.valor_estimado) if old_item.valor_estimado else None,
-            valor_novo=str(new_item.valor_estimado) if new_item.valor_estimado else None,
+def _diff_states(
+    licitacao_id: str,
+    old: TrackedState,
+    new: TrackedState,
+    now: datetime,
+    source: SourceRef,
+) -> list[ChangeEvent]:
+    """Compara dois estados rastreados campo a campo."""
+    changes: list[ChangeEvent] = []
+
+    def event(tipo: TipoMudanca, campo: str, anterior: str | None, novo: str | None, descricao: str) -> None:
+        # Valores já validados: evita o custo de validação do pydantic por evento
+        changes.append(ChangeEvent.model_construct(
+            licitacao_id=licitacao_id,
+            tipo=tipo,
+            campo=campo,
+            valor_anterior=anterior,
+            valor_novo=novo,
             detectado_em=now,
             fonte=source,
-            descricao="Valor estimado alterado",
+            descricao=descricao,
         ))
 
-    old_anexos = {a.filename for a in old_item.anexos}
-    new_anexos = {a.filename for a in new_item.anexos}
+    old_abertura, old_encerramento, old_situacao, old_valor, old_anexos = old
+    new_abertura, new_encerramento, new_situacao, new_valor, new_anexos = new
 
-    added_anexos = new_anexos - old_anexos
-    removed_anexos = old_anexos - new_anexos
+    if _instant(old_abertura) != _instant(new_abertura):
+        event(
+            TipoMudanca.PRAZO_ALTERADO, "data_abertura",
+            _display(old_abertura), _display(new_abertura),
+            "Data de abertura alterada",
+        )
 
-    for filename in added_anexos:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.ANEXO_ADICIONADO,
-            campo="anexos",
-            valor_anterior=None,
-            valor_novo=filename,
-            detectado_em=now,
-            fonte=source,
-            descricao=f"Anexo adicionado: {filename}",
-        ))
+    if _instant(old_encerramento) != _instant(new_encerramento):
+        event(
+            TipoMudanca.PRAZO_ALTERADO, "data_encerramento",
+            _display(old_encerramento), _display(new_encerramento),
+            "Data de encerramento alterada",
+        )
 
-    for filename in removed_anexos:
-        changes.append(ChangeEvent(
-            licitacao_id=new_item.external_id,
-            tipo=TipoMudanca.ANEXO_REMOVIDO,
-            campo="anexos",
-            valor_anterior=filename,
-            valor_novo=None,
-            detectado_em=now,
-            fonte=source,
-            descricao=f"Anexo removido: {filename}",
-        ))
+    if old_situacao != new_situacao:
+        event(
+            TipoMudanca.STATUS_ALTERADO, "situacao",
+            old_situacao, new_situacao,
+            f"Status alterado de {old_situacao} para {new_situacao}",
+        )
+
+    if old_valor != new_valor:
+        event(
+            TipoMudanca.VALOR_ALTERADO, "valor_estimado",
+            _display(old_valor), _display(new_valor),
+            "Valor estimado alterado",
+        )
+
+    old_set = set(old_anexos)
+    new_set = set(new_anexos)
+
+    for filename in sorted(new_set - old_set):
+        event(TipoMudanca.ANEXO_ADICIONADO, "anexos", None, filename, f"Anexo adicionado: {filename}")
+
+    for filename in sorted(old_set - new_set):
+        event(TipoMudanca.ANEXO_REMOVIDO, "anexos", filename, None, f"Anexo removido: {filename}")
+
+    return changes
+
+
+def detect_changes(
+    old_item: LicitacaoItem,
+    new_item: LicitacaoItem,
+) -> list[ChangeEvent]:
+    """
+    Detecta mudanças entre duas versões de uma licitação.
+
+    Args:
+        old_item: Versão anterior
+        new_item: Versão atual
+
+    Returns:
+        Lista de ChangeEvent detectados
+    """
+    changes = _diff_states(
+        new_item.external_id,
+        tracked_state(old_item),
+        tracked_state(new_item),
+        datetime.now(timezone.utc),
+        _source(new_item),
+    )
 
     if changes:
         logger.info(f"Detected {len(changes)} changes for {new_item.external_id}")
@@ -121,6 +178,8 @@ def detect_changes_batch(
     """
     Detecta mudanças em lote comparando listas de itens.
 
+    Pares com o mesmo fingerprint são descartados sem comparação campo a campo.
+
     Args:
         old_items: Lista de versões anteriores
         new_items: Lista de versões atuais
@@ -128,13 +187,134 @@ def detect_changes_batch(
     Returns:
         Lista de todos os ChangeEvent detectados
     """
-    old_map = {item.external_id: item for item in old_items}
+    old_states = {item.external_id: tracked_state(item) for item in old_items}
+    now = datetime.now(timezone.utc)
     all_changes: list[ChangeEvent] = []
 
     for new_item in new_items:
-        if new_item.external_id in old_map:
-            old_item = old_map[new_item.external_id]
-            changes = detect_changes(old_item, new_item)
-            all_changes.extend(changes)
+        old_state = old_states.get(new_item.external_id)
+        if old_state is None:
+            continue
+        new_state = tracked_state(new_item)
+        if state_fingerprint(old_state) == state_fingerprint(new_state):
+            continue
+        all_changes.extend(_diff_states(new_item.external_id, old_state, new_state, now, _source(new_item)))
+
+    if all_changes:
+        logger.info(f"Detected {len(all_changes)} changes in batch of {len(new_items)} items")
 
     return all_changes
+
+
+class FingerprintStore:
+    """
+    Fingerprints e estado rastreado por item, em SQLite.
+
+    Exemplo:
+        store = FingerprintStore("./data/licitacoes/fingerprints.db")
+        for change in iter_changes(items, store):
+            notify(change)
+    """
+
+    def __init__(self, db_path: str | None = None):
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                key TEXT PRIMARY KEY,
+                external_id TEXT NOT NULL,
+                fingerprint BLOB NOT NULL,
+                state TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def get_many(self, keys: list[str]) -> dict[str, tuple[bytes, TrackedState]]:
+        """Fingerprint e estado rastreado das chaves presentes no store."""
+        found: dict[str, tuple[bytes, TrackedState]] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            # Limite de variáveis por consulta do SQLite
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, fingerprint, state FROM fingerprints WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, fingerprint, state in rows:
+                    found[key] = (bytes(fingerprint), json.loads(state))
+        return found
+
+    def put_many(self, rows: list[tuple[str, str, bytes, TrackedState]], now: datetime | None = None) -> None:
+        """Grava (key, external_id, fingerprint, estado) substituindo versões anteriores."""
+        if not rows:
+            return
+        updated_at = (now or datetime.now(timezone.utc)).isoformat()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fingerprints (key, external_id, fingerprint, state, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (key, external_id, fingerprint, json.dumps(state, ensure_ascii=False), updated_at)
+                    for key, external_id, fingerprint, state in rows
+                ],
+            )
+
+    def close(self) -> None:
+        """Fecha a conexão."""
+        with self._lock:
+            self._conn.close()
+
+
+def iter_changes(
+    items: Iterable[LicitacaoItem],
+    store: FingerprintStore,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[ChangeEvent]:
+    """
+    Sincronização em massa: compara cada item com o fingerprint armazenado.
+
+    Itens inalterados custam uma comparação de hash; itens alterados são
+    comparados com o estado armazenado e têm o store atualizado. Itens
+    novos são apenas registrados (não geram mudança).
+
+    Args:
+        items: Versões atuais (qualquer iterável, consumido em lotes)
+        store: Fingerprints da sincronização anterior
+        batch_size: Itens por consulta/gravação no store
+
+    Yields:
+        ChangeEvent à medida que cada lote é processado
+    """
+    now = datetime.now(timezone.utc)
+    iterator = iter(items)
+    total = changed = 0
+
+    while batch := list(islice(iterator, batch_size)):
+        keys = [item_key(item) for item in batch]
+        stored = store.get_many(keys)
+        updates: list[tuple[str, str, bytes, TrackedState]] = []
+
+        for item, key in zip(batch, keys):
+            state = tracked_state(item)
+            fingerprint = state_fingerprint(state)
+            previous = stored.get(key)
+            if previous is not None and previous[0] == fingerprint:
+                continue
+            if previous is not None:
+                changed += 1
+                yield from _diff_states(item.external_id, previous[1], state, now, _source(item))
+            updates.append((key, item.external_id, fingerprint, state))
+
+        store.put_many(updates, now)
+        total += len(batch)
+
+    logger.info(f"Fingerprint sync: {total} items, {changed} changed")
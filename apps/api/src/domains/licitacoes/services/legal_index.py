@@ -0,0 +1,151 @@
+"""Índices pré-computados sobre o corpus jurídico fixo.
+
+- `KeywordAutomaton`: autômato Aho-Corasick que encontra, em uma passada,
+  todas as palavras-chave contidas em um texto
+- `SubstringIndex`: responde "alguma palavra da consulta ocorre neste
+  documento?" com um lookup por palavra, em vez de varrer as tabelas
+- `DenseIndex`: embeddings do corpus fixo em uma matriz NumPy normalizada,
+  para busca exata por similaridade sem ida ao banco vetorial
+
+Os índices são construídos uma vez e só leem; podem ser compartilhados
+entre threads.
+"""
+
+from collections import deque
+from typing import Any
+
+
+class KeywordAutomaton:
+    """
+    Autômato Aho-Corasick sobre um conjunto fixo de palavras-chave.
+
+    Exemplo:
+        automaton = KeywordAutomaton(["pregão", "edital"])
+        automaton.find("edital do pregão eletrônico")  # {0, 1}
+    """
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = list(keywords)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[set[int]] = [set()]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].add(index)
+
+        # Links de falha em largura: cada estado herda as saídas do seu sufixo
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+
+    def find(self, text: str) -> set[int]:
+        """Índices das palavras-chave que ocorrem em text."""
+        found: set[int] = set()
+        state = 0
+        goto, fail, output = self._goto, self._fail, self._output
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+
+class SubstringIndex:
+    """
+    Índice de substrings dos tokens de documentos fixos.
+
+    Equivale a `word in doc.lower()` para palavras sem espaço (como as de
+    `query.split()`): uma palavra sem espaço só ocorre dentro de um token.
+    """
+
+    def __init__(self, documents: list[str]):
+        self.size = len(documents)
+        self._postings: dict[str, set[int]] = {}
+        for doc_id, document in enumerate(documents):
+            for token in set(document.lower().split()):
+                for start in range(len(token)):
+                    for end in range(start + 1, len(token) + 1):
+                        self._postings.setdefault(token[start:end], set()).add(doc_id)
+
+    def match_any(self, words: list[str]) -> set[int]:
+        """Documentos que contêm ao menos uma das palavras."""
+        matched: set[int] = set()
+        for word in words:
+            matched |= self._postings.get(word, set())
+        return matched
+
+
+class DenseIndex:
+    """
+    Embeddings de um corpus fixo em matriz NumPy (linhas normalizadas).
+
+    A busca é exata (produto interno com todas as linhas); para o tamanho
+    do corpus jurídico fixo isso é mais rápido que uma ida ao Chroma.
+    """
+
+    def __init__(
+        self,
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+        embeddings: list[list[float]],
+    ):
+        import numpy as np
+
+        self._np = np
+        self.documents = documents
+        self.metadatas = metadatas
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, vector: list[float], top_k: int = 5) -> list[tuple[int, float]]:
+        """
+        Busca exata por similaridade de cosseno.
+
+        Returns:
+            Lista de (índice do documento, similaridade), mais similar primeiro
+        """
+        np = self._np
+        if not len(self.documents) or top_k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self.matrix @ (query / norm)
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(i), float(scores[i])) for i in top]
+
+    @classmethod
+    def from_collection(cls, collection: Any) -> "DenseIndex":
+        """Carrega documentos e embeddings já calculados de uma coleção Chroma."""
+        data = collection.get(include=["documents", "metadatas", "embeddings"])
+        documents = list(data.get("documents") or [])
+        metadatas = [m or {} for m in (data.get("metadatas") or [{}] * len(documents))]
+        embeddings = data.get("embeddings")
+        if embeddings is None:
+            embeddings = []
+        return cls(documents, metadatas, [list(e) for e in embeddings])
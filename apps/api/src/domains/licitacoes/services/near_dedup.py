@@ -0,0 +1,227 @@
+"""Detecção de quase-duplicatas de licitações (MinHash + LSH).
+
+O `objeto` normalizado é quebrado em shingles de caracteres; cada item vira
+uma assinatura MinHash, dividida em bandas (LSH). Itens só são comparados
+quando compartilham ao menos uma banda dentro do mesmo bloco órgão/UF, de
+modo que a consulta não depende do tamanho do índice.
+
+O índice fica em SQLite e persiste entre execuções diárias.
+"""
+
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import logging
+import re
+import sqlite3
+import struct
+import threading
+import unicodedata
+
+from ..models import LicitacaoItem
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.7
+
+# Um digest SHAKE-128 de NUM_PERM * 4 bytes rende NUM_PERM hashes de 32 bits
+_UNPACK = struct.Struct(f"<{NUM_PERM}I").unpack
+
+
+@dataclass
+class NearDuplicateMatch:
+    """Item indexado similar ao item consultado."""
+
+    key: str
+    external_id: str
+    similarity: float
+
+
+def normalize_objeto(text: str) -> str:
+    """Normaliza texto: minúsculas, sem acentos e pontuação."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Shingles de caracteres do texto normalizado."""
+    normalized = normalize_objeto(text)
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash_signature(shingle_set: set[str]) -> tuple[int, ...]:
+    """Assinatura MinHash com NUM_PERM funções de hash independentes."""
+    if not shingle_set:
+        return (0xFFFFFFFF,) * NUM_PERM
+    rows = [_UNPACK(hashlib.shake_128(s.encode()).digest(NUM_PERM * 4)) for s in shingle_set]
+    return tuple(map(min, zip(*rows)))
+
+
+def estimate_similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+    """Similaridade de Jaccard estimada pelas assinaturas."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+
+def item_key(item: LicitacaoItem) -> str:
+    """Chave estável do item (mesma identidade do dedup forte)."""
+    return f"{item.source}:{item.external_id}"
+
+
+def item_block(item: LicitacaoItem) -> str:
+    """Bloco de comparação: órgão + UF."""
+    return f"{normalize_objeto(item.orgao)}:{item.uf.upper()}"
+
+
+def _band_keys(signature: tuple[int, ...]) -> list[int]:
+    """Hash determinístico (int64) de cada banda, incluindo o índice da banda."""
+    keys = []
+    for band in range(BANDS):
+        chunk = array("I", signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+class NearDuplicateIndex:
+    """
+    Índice incremental de quase-duplicatas.
+
+    Exemplo:
+        index = NearDuplicateIndex("./data/licitacoes/near_dedup.db")
+        for match in index.query(item):
+            print(match.external_id, match.similarity)
+        index.add(item)
+    """
+
+    def __init__(self, db_path: str | None = None, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                key TEXT PRIMARY KEY,
+                external_id TEXT NOT NULL,
+                block TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS bands (
+                block TEXT NOT NULL,
+                band_key INTEGER NOT NULL,
+                key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bands_lookup ON bands(block, band_key);
+            CREATE INDEX IF NOT EXISTS idx_bands_key ON bands(key);
+        """)
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def _candidates(
+        self,
+        block: str,
+        signature: tuple[int, ...],
+        exclude_key: str,
+    ) -> list[NearDuplicateMatch]:
+        band_keys = _band_keys(signature)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT s.key, s.external_id, s.signature FROM signatures s
+                WHERE s.key IN (
+                    SELECT key FROM bands
+                    WHERE block = ? AND band_key IN ({','.join('?' * len(band_keys))})
+                )
+                """,
+                (block, *band_keys),
+            ).fetchall()
+
+        matches = []
+        for key, external_id, blob in rows:
+            if key == exclude_key:
+                continue
+            similarity = estimate_similarity(signature, tuple(array("I", blob)))
+            if similarity >= self.threshold:
+                matches.append(NearDuplicateMatch(key=key, external_id=external_id, similarity=similarity))
+        matches.sort(key=lambda m: (-m.similarity, m.key))
+        return matches
+
+    def query(self, item: LicitacaoItem) -> list[NearDuplicateMatch]:
+        """
+        Busca itens indexados similares ao item.
+
+        Args:
+            item: LicitacaoItem a comparar
+
+        Returns:
+            Matches acima do threshold, mais similares primeiro
+        """
+        signature = minhash_signature(shingles(item.objeto))
+        return self._candidates(item_block(item), signature, item_key(item))
+
+    def add(self, item: LicitacaoItem) -> list[NearDuplicateMatch]:
+        """
+        Consulta e indexa o item (substituindo a versão anterior, se houver).
+
+        Args:
+            item: LicitacaoItem a indexar
+
+        Returns:
+            Matches encontrados antes da inserção; vazio se o item já estava
+            indexado com a mesma assinatura (já sugerido em execução anterior)
+        """
+        key = item_key(item)
+        block = item_block(item)
+        signature = minhash_signature(shingles(item.objeto))
+        blob = array("I", signature).tobytes()
+
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT block, signature FROM signatures WHERE key = ?", (key,)
+            ).fetchone()
+        if existing == (block, blob):
+            return []
+
+        matches = self._candidates(block, signature, key)
+        with self._lock, self._conn:
+            existing = self._conn.execute(
+                "SELECT block, signature FROM signatures WHERE key = ?", (key,)
+            ).fetchone()
+            if existing != (block, blob):
+                self._conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO signatures (key, external_id, block, signature) VALUES (?, ?, ?, ?)",
+                    (key, item.external_id, block, blob),
+                )
+                self._conn.executemany(
+                    "INSERT INTO bands (block, band_key, key) VALUES (?, ?, ?)",
+                    [(block, band_key, key) for band_key in _band_keys(signature)],
+                )
+        return matches
+
+    def remove(self, item: LicitacaoItem) -> None:
+        """Remove um item do índice."""
+        key = item_key(item)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM signatures WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        """Fecha a conexão."""
+        with self._lock:
+            self._conn.close()
@@ -6,17 +6,24 @@ Permite consultas à base de conhecimento jurídico:
 - Padrões internos
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 import logging
 import re
+import threading
+
+from .legal_index import DenseIndex, KeywordAutomaton, SubstringIndex
+from .near_dedup import normalize_objeto
 
 logger = logging.getLogger(__name__)
 
 COLLECTION_LEI_14133 = "licitacoes_lei_14133"
 COLLECTION_CHECKLISTS = "licitacoes_checklists"
 
+RESULT_CACHE_SIZE = 1024
+
 LEI_14133_CAPITULOS = {
     "cap1": {
         "titulo": "Disposições Preliminares",
@@ -100,6 +107,23 @@ CHECKLIST_HABILITACAO = [
 ]
 
 
+# Palavra-chave -> (capítulo, artigo, relevância)
+ARTIGOS_KEYWORDS = {
+    "pregão": ("cap2", "Art. 28-29", 0.9),
+    "concorrência": ("cap2", "Art. 28-29", 0.9),
+    "habilitação": ("cap5", "Art. 62-70", 0.85),
+    "técnica": ("cap5", "Art. 67", 0.8),
+    "fiscal": ("cap5", "Art. 68", 0.8),
+    "contrato": ("cap6", "Art. 89-114", 0.75),
+    "sanção": ("cap7", "Art. 155-163", 0.7),
+    "penalidade": ("cap7", "Art. 155-163", 0.7),
+    "procedimento": ("cap4", "Art. 17-27", 0.7),
+    "edital": ("cap4", "Art. 25", 0.8),
+    "proposta": ("cap4", "Art. 17-27", 0.75),
+    "julgamento": ("cap4", "Art. 17-27", 0.75),
+}
+
+
 @dataclass
 class RagResult:
     """Resultado de uma consulta RAG."""
@@ -121,6 +145,31 @@ class LegalReference:
     relevancia: float
 
 
+class _StaticIndex:
+    """Índices das tabelas fixas (capítulos, checklist e palavras-chave), construídos uma vez."""
+
+    def __init__(self):
+        capitulos = list(LEI_14133_CAPITULOS.values())
+        self.capitulos_titulo = SubstringIndex([c["titulo"] for c in capitulos])
+        self.capitulos_resumo = SubstringIndex([c["resumo"] for c in capitulos])
+        self.checklist = SubstringIndex([
+            f"{item['item']} {' '.join(item['requisitos'])}" for item in CHECKLIST_HABILITACAO
+        ])
+        self.keywords = KeywordAutomaton(list(ARTIGOS_KEYWORDS))
+        self.keyword_refs: list[LegalReference] = []
+        for cap_id, artigo, relevancia in ARTIGOS_KEYWORDS.values():
+            cap_info = LEI_14133_CAPITULOS.get(cap_id, {})
+            self.keyword_refs.append(LegalReference(
+                artigo=artigo,
+                texto=cap_info.get("resumo", ""),
+                capitulo=cap_info.get("titulo", ""),
+                relevancia=relevancia,
+            ))
+
+
+_STATIC_INDEX = _StaticIndex()
+
+
 class RagJuridicoService:
     """
     Serviço de RAG para consultas jurídicas em licitações.
@@ -129,14 +178,25 @@ class RagJuridicoService:
     - Busca semântica na Lei 14.133/2021
     - Consulta a checklists de conformidade
     - Identificação de artigos relevantes
+
+    Tabelas fixas são consultadas por índices pré-computados; os embeddings
+    da coleção da Lei 14.133 são carregados uma vez para uma matriz em
+    memória (busca exata, sem ida ao Chroma por consulta). Resultados de
+    consultas repetidas vêm de um cache LRU e são compartilhados: não
+    modifique os objetos retornados.
     """
 
-    def __init__(self, rag_service: Any = None):
+    def __init__(self, rag_service: Any = None, cache_size: int = RESULT_CACHE_SIZE):
         self.rag_service = rag_service
         self._initialized = False
+        self._dense: DenseIndex | None = None
+        self._dense_loaded = False
+        self._cache: OrderedDict[tuple, Any] = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
 
     async def initialize(self) -> bool:
-        """Inicializa o serviço RAG (carrega coleções)."""
+        """Inicializa o serviço RAG (carrega coleções e o índice denso)."""
         if self._initialized:
             return True
 
@@ -144,6 +204,7 @@ class RagJuridicoService:
             if self.rag_service:
                 self.rag_service.get_collection(COLLECTION_LEI_14133)
                 self.rag_service.get_collection(COLLECTION_CHECKLISTS)
+                self._load_dense()
 
             self._initialized = True
             logger.info("RAG Jurídico initialized")
@@ -153,6 +214,76 @@ class RagJuridicoService:
             logger.error(f"Failed to initialize RAG Jurídico: {e}")
             return False
 
+    def _load_dense(self) -> DenseIndex | None:
+        """Carrega (uma vez) os embeddings da Lei 14.133 para memória."""
+        with self._lock:
+            if not self._dense_loaded:
+                self._dense_loaded = True
+                try:
+                    collection = self.rag_service.get_collection(COLLECTION_LEI_14133)
+                    self._dense = DenseIndex.from_collection(collection)
+                    logger.info(f"Loaded {len(self._dense)} Lei 14.133 embeddings into memory")
+                except Exception as e:
+                    logger.warning(f"Dense index unavailable, using collection queries: {e}")
+                    self._dense = None
+            return self._dense
+
+    def _peek(self, key: tuple) -> Any:
+        """Resultado do cache LRU, sem calcular (None se ausente)."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+        return None
+
+    def _cached(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Resultado do cache LRU ou calculado (e guardado)."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        value = compute()
+
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def _semantic_results(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        """Trechos da Lei 14.133 por similaridade (matriz em memória ou coleção)."""
+        dense = self._load_dense()
+        embed = getattr(self.rag_service, "embed", None)
+        if dense is not None and len(dense) and embed is not None:
+            try:
+                vector = embed([query])[0]
+            except Exception as e:
+                logger.warning(f"Query embedding failed, using collection query: {e}")
+            else:
+                return [
+                    {
+                        "texto": dense.documents[index],
+                        "metadata": dense.metadatas[index],
+                        "relevancia": round(score, 4),
+                    }
+                    for index, score in dense.search(vector, top_k)
+                ]
+
+        return [
+            {
+                "texto": r.get("text", ""),
+                "metadata": r.get("metadata", {}),
+                "relevancia": 0.8,
+            }
+            for r in self.rag_service.query(
+                collection=COLLECTION_LEI_14133,
+                query_text=query,
+                top_k=top_k,
+            )
+        ]
+
     def query_lei_14133(self, query: str, top_k: int = 5) -> RagResult:
         """
         Consulta a base de conhecimento da Lei 14.133/2021.
@@ -164,18 +295,20 @@ class RagJuridicoService:
         Returns:
             RagResult com trechos relevantes
         """
+        return self._cached(("lei_14133", query, top_k), lambda: self._query_lei_14133(query, top_k))
+
+    def _query_lei_14133(self, query: str, top_k: int) -> RagResult:
         results: list[dict[str, Any]] = []
         sources: list[str] = []
 
-        query_lower = query.lower()
-        for cap_id, cap_info in LEI_14133_CAPITULOS.items():
-            titulo_lower = cap_info["titulo"].lower()
-            resumo_lower = cap_info["resumo"].lower()
-
+        words = query.lower().split()
+        titulo_matches = _STATIC_INDEX.capitulos_titulo.match_any(words)
+        resumo_matches = _STATIC_INDEX.capitulos_resumo.match_any(words)
+        for position, cap_info in enumerate(LEI_14133_CAPITULOS.values()):
             relevance = 0.0
-            if any(word in titulo_lower for word in query_lower.split()):
+            if position in titulo_matches:
                 relevance += 0.5
-            if any(word in resumo_lower for word in query_lower.split()):
+            if position in resumo_matches:
                 relevance += 0.3
 
             if relevance > 0:
@@ -192,18 +325,9 @@ class RagJuridicoService:
 
         if self.rag_service:
             try:
-                rag_results = self.rag_service.query(
-                    collection=COLLECTION_LEI_14133,
-                    query_text=query,
-                    top_k=top_k,
-                )
-                for r in rag_results:
-                    results.append({
-                        "texto": r.get("text", ""),
-                        "metadata": r.get("metadata", {}),
-                        "relevancia": 0.8,
-                    })
-                    if r.get("metadata", {}).get("source"):
+                for r in self._semantic_results(query, top_k):
+                    results.append(r)
+                    if r["metadata"].get("source"):
                         sources.append(r["metadata"]["source"])
             except Exception as e:
                 logger.warning(f"RAG query failed, using fallback: {e}")
@@ -231,15 +355,8 @@ class RagJuridicoService:
         Returns:
             Lista de itens de checklist relevantes
         """
-        results: list[dict[str, Any]] = []
-        query_lower = query.lower()
-
-        for item in CHECKLIST_HABILITACAO:
-            item_text = f"{item['item']} {' '.join(item['requisitos'])}".lower()
-            if any(word in item_text for word in query_lower.split()):
-                results.append(item)
-
-        return results
+        matches = _STATIC_INDEX.checklist.match_any(query.lower().split())
+        return [item for position, item in enumerate(CHECKLIST_HABILITACAO) if position in matches]
 
     def identify_artigos_relevantes(self, texto: str) -> list[LegalReference]:
         """
@@ -251,40 +368,15 @@ class RagJuridicoService:
         Returns:
             Lista de referências legais relevantes
         """
-        references: list[LegalReference] = []
-        texto_lower = texto.lower()
-
-        keywords_map = {
-            "pregão": ("cap2", "Art. 28-29", 0.9),
-            "concorrência": ("cap2", "Art. 28-29", 0.9),
-            "habilitação": ("cap5", "Art. 62-70", 0.85),
-            "técnica": ("cap5", "Art. 67", 0.8),
-            "fiscal": ("cap5", "Art. 68", 0.8),
-            "contrato": ("cap6", "Art. 89-114", 0.75),
-            "sanção": ("cap7", "Art. 155-163", 0.7),
-            "penalidade": ("cap7", "Art. 155-163", 0.7),
-            "procedimento": ("cap4", "Art. 17-27", 0.7),
-            "edital": ("cap4", "Art. 25", 0.8),
-            "proposta": ("cap4", "Art. 17-27", 0.75),
-            "julgamento": ("cap4", "Art. 17-27", 0.75),
-        }
-
-        for keyword, (cap_id, artigo, relevancia) in keywords_map.items():
-            if keyword in texto_lower:
-                cap_info = LEI_14133_CAPITULOS.get(cap_id, {})
-                references.append(LegalReference(
-                    artigo=artigo,
-                    texto=cap_info.get("resumo", ""),
-                    capitulo=cap_info.get("titulo", ""),
-                    relevancia=relevancia,
-                ))
+        # Uma passada do autômato; a ordem de ARTIGOS_KEYWORDS decide empates
+        found = _STATIC_INDEX.keywords.find(texto.lower())
 
         seen = set()
         unique_refs = []
-        for ref in references:
-            key = ref.artigo
-            if key not in seen:
-                seen.add(key)
+        for position in sorted(found):
+            ref = _STATIC_INDEX.keyword_refs[position]
+            if ref.artigo not in seen:
+                seen.add(ref.artigo)
                 unique_refs.append(ref)
 
         unique_refs.sort(key=lambda x: x.relevancia, reverse=True)
@@ -298,8 +390,19 @@ class RagJuridicoService:
             licitacao_objeto: Objeto da licitação
 
         Returns:
-            Contexto com artigos e checklists relevantes
+            Contexto com artigos e checklists relevantes (memoizado pelo
+            objeto normalizado)
         """
+        return self._cached(
+            ("contexto", normalize_objeto(licitacao_objeto)),
+            lambda: self._contexto_juridico(licitacao_objeto),
+        )
+
+    def peek_contexto_juridico(self, licitacao_objeto: str) -> dict[str, Any] | None:
+        """Contexto jurídico já em cache para o objeto, sem calcular."""
+        return self._peek(("contexto", normalize_objeto(licitacao_objeto)))
+
+    def _contexto_juridico(self, licitacao_objeto: str) -> dict[str, Any]:
         artigos = self.identify_artigos_relevantes(licitacao_objeto)
         checklist = self.get_checklist_habilitacao()
         query_result = self.query_lei_14133(licitacao_objeto, top_k=3)
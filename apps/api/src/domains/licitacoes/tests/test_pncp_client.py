@@ -0,0 +1,250 @@
+"""Testes da coleta paginada, concorrente e incremental do PNCP."""
+
+import asyncio
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from ..tools.pncp_client import (
+    PNCPClient,
+    PNCPClientError,
+    SEARCH_ENDPOINT,
+    UPDATES_ENDPOINT,
+    _retry_after_seconds,
+)
+from ..tools.pncp_harvest import PNCPHarvester, query_key
+
+
+def make_raw(seq: int, uf: str = "SP", atualizado: str = "2026-01-10T08:00:00") -> dict:
+    return {
+        "orgaoEntidade": {"cnpj": "12345678000199", "razaoSocial": "Prefeitura", "uf": uf},
+        "anoCompra": 2026,
+        "sequencialCompra": seq,
+        "objetoCompra": f"Aquisição de item {seq}",
+        "modalidadeId": 6,
+        "situacaoCompraId": 1,
+        "dataPublicacaoPncp": "2026-01-09T10:00:00",
+        "dataAtualizacao": atualizado,
+    }
+
+
+class FakePNCP:
+    """API PNCP simulada: paginação, ETag e contagem de requisições."""
+
+    def __init__(self, records: list[dict], delay: float = 0.01):
+        self.records = records
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/api")
+        params = request.url.params
+        if path in (SEARCH_ENDPOINT, UPDATES_ENDPOINT):
+            records = [r for r in self.records if not params.get("uf") or r["orgaoEntidade"]["uf"] in params["uf"].split(",")]
+            if path == UPDATES_ENDPOINT and params.get("dataInicial"):
+                records = [r for r in records if r["dataAtualizacao"][:10] >= params["dataInicial"]]
+            size = int(params["tamanhoPagina"])
+            page = int(params["pagina"])
+            body = {
+                "data": records[(page - 1) * size:page * size],
+                "totalRegistros": len(records),
+                "totalPaginas": max(1, math.ceil(len(records) / size)),
+            }
+            etag = f'"{hash(str(body))}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers={"ETag": etag})
+            return httpx.Response(200, json=body, headers={"ETag": etag})
+
+        seq = path.rstrip("/").split("/")[-1]
+        for raw in self.records:
+            if str(raw["sequencialCompra"]) == seq:
+                return httpx.Response(200, json=raw)
+        return httpx.Response(404)
+
+
+def make_client(fake: FakePNCP, **kwargs) -> PNCPClient:
+    client = PNCPClient(base_url="https://pncp.test/api", **kwargs)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(fake))
+    return client
+
+
+async def collect(agen) -> list:
+    return [item async for item in agen]
+
+
+class TestIterSearch:
+    """Testes da paginação."""
+
+    def test_streams_all_pages_in_order(self):
+        fake = FakePNCP([make_raw(i) for i in range(1, 24)])
+        client = make_client(fake, rate_limit=None)
+
+        items = asyncio.run(collect(client.iter_search(tam_pagina=5)))
+
+        assert [item.external_id.split("-")[2] for item in items] == [str(i) for i in range(1, 24)]
+        assert len(fake.requests) == 5
+
+    def test_pages_fetched_concurrently_within_limit(self):
+        fake = FakePNCP([make_raw(i) for i in range(1, 41)], delay=0.02)
+        client = make_client(fake, rate_limit=None, max_concurrency=3)
+
+        items = asyncio.run(collect(client.iter_search(tam_pagina=2)))
+
+        assert len(items) == 40
+        assert fake.max_in_flight == 3
+
+    def test_rate_limit_spaces_requests(self):
+        fake = FakePNCP([make_raw(i) for i in range(1, 11)], delay=0)
+        client = make_client(fake, rate_limit=50.0, max_concurrency=1)
+
+        start = time.perf_counter()
+        asyncio.run(collect(client.iter_search(tam_pagina=1)))
+        elapsed = time.perf_counter() - start
+
+        # 10 requisições a 50 req/s com burst de 1: ao menos 9 intervalos de 20ms
+        assert len(fake.requests) == 10
+        assert elapsed >= 0.17
+
+
+
+class TestRetryAfter:
+    """Testes do tratamento de 429."""
+
+    def test_parses_seconds_and_http_date(self):
+        soon = datetime.now(timezone.utc) + timedelta(seconds=10)
+
+        assert _retry_after_seconds("3", 0) == 3.0
+        assert 8 <= _retry_after_seconds(format_datetime(soon, usegmt=True), 0) <= 10
+        assert _retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT", 0) == 0.0
+        assert _retry_after_seconds(None, 2) == 4.0
+        assert _retry_after_seconds("amanhã", 3) == 8.0
+
+    def test_retries_after_http_date(self):
+        fake = FakePNCP([make_raw(1)], delay=0)
+        past = format_datetime(datetime.now(timezone.utc) - timedelta(seconds=5), usegmt=True)
+        responses = [httpx.Response(429, headers={"Retry-After": past})]
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            if responses:
+                fake.requests.append(request)
+                return responses.pop()
+            return await fake(request)
+
+        client = PNCPClient(base_url="https://pncp.test/api", rate_limit=None)
+        client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+
+        items = asyncio.run(client.search())
+
+        assert len(items) == 1
+        assert len(fake.requests) == 2
+
+class TestResponseCache:
+    """Testes do cache condicional."""
+
+    def test_revalidates_with_etag(self, tmp_path):
+        fake = FakePNCP([make_raw(i) for i in range(1, 4)])
+        client = make_client(fake, rate_limit=None, cache_dir=tmp_path)
+
+        first = asyncio.run(client.search())
+        second = asyncio.run(client.search())
+
+        assert [i.external_id for i in first] == [i.external_id for i in second]
+        assert "If-None-Match" not in fake.requests[0].headers
+        assert fake.requests[1].headers["If-None-Match"]
+
+    def test_ttl_skips_request(self, tmp_path):
+        fake = FakePNCP([make_raw(1)])
+        client = make_client(fake, rate_limit=None, cache_dir=tmp_path, cache_ttl=60)
+
+        asyncio.run(client.search())
+        asyncio.run(client.search())
+
+        assert len(fake.requests) == 1
+
+
+class TestDetails:
+    """Testes de detalhes em lote."""
+
+    def test_get_details_concurrent(self):
+        fake = FakePNCP([make_raw(i) for i in range(1, 9)], delay=0.02)
+        client = make_client(fake, rate_limit=None, max_concurrency=4)
+        ids = [f"12345678000199-2026-{i}" for i in range(1, 9)] + ["12345678000199-2026-99"]
+
+        details = asyncio.run(client.get_details(ids))
+
+        assert details["12345678000199-2026-3"].objeto == "Aquisição de item 3"
+        assert details["12345678000199-2026-99"] is None
+        assert fake.max_in_flight == 4
+
+
+class TestHarvester:
+    """Testes da coleta incremental."""
+
+    def test_second_run_only_yields_changes(self, tmp_path):
+        records = [make_raw(i, uf="SP" if i % 2 else "RJ") for i in range(1, 11)]
+        fake = FakePNCP(records)
+        client = make_client(fake, rate_limit=None)
+        harvester = PNCPHarvester(client, tmp_path / "watermarks.json")
+        now = datetime(2026, 1, 10, 12, 0)
+
+        first = asyncio.run(collect(harvester.harvest(ufs=["SP", "RJ"], now=now)))
+        assert len(first) == 10
+        assert all(r.url.path.endswith(UPDATES_ENDPOINT) for r in fake.requests)
+        assert harvester.watermarks.get(query_key("SP")) == datetime(2026, 1, 10, 8, 0)
+
+        records[2]["dataAtualizacao"] = "2026-01-10T09:30:00"
+        records.append(make_raw(11, uf="SP", atualizado="2026-01-10T10:00:00"))
+
+        # Novo harvester relendo o estado do disco
+        harvester = PNCPHarvester(client, tmp_path / "watermarks.json")
+        second = asyncio.run(collect(harvester.harvest(ufs=["SP", "RJ"], now=now)))
+
+        assert sorted(item.external_id.split("-")[2] for item in second) == ["11", "3"]
+        assert harvester.watermarks.get(query_key("SP")) == datetime(2026, 1, 10, 10, 0)
+        assert harvester.watermarks.get(query_key("RJ")) == datetime(2026, 1, 10, 8, 0)
+
+    def test_failed_query_keeps_watermark(self, tmp_path):
+        fake = FakePNCP([make_raw(1)])
+        client = make_client(fake, rate_limit=None, retries=0)
+        client._client = httpx.AsyncClient(
+            base_url=client.base_url,
+            transport=httpx.MockTransport(lambda request: httpx.Response(400)),
+        )
+        harvester = PNCPHarvester(client, tmp_path / "watermarks.json")
+
+        with pytest.raises(PNCPClientError):
+            asyncio.run(collect(harvester.harvest(ufs=["SP"], now=datetime(2026, 1, 10, 12, 0))))
+        assert harvester.watermarks.all() == {}
+
+    def test_interrupted_harvest_keeps_watermark(self, tmp_path):
+        fake = FakePNCP([make_raw(i) for i in range(1, 6)])
+        client = make_client(fake, rate_limit=None)
+        harvester = PNCPHarvester(client, tmp_path / "watermarks.json")
+        now = datetime(2026, 1, 10, 12, 0)
+
+        async def first_item():
+            async for item in harvester.harvest(ufs=["SP"], now=now):
+                return item
+
+        asyncio.run(first_item())
+        assert harvester.watermarks.all() == {}
+
+        items = asyncio.run(collect(harvester.harvest(ufs=["SP"], now=now)))
+        assert len(items) == 5
+        assert harvester.watermarks.get(query_key("SP")) == datetime(2026, 1, 10, 8, 0)
@@ -1,9 +1,11 @@
 """Testes do RAG Jurídico para o Núcleo Licitações."""
 
 import pytest
+from ..services.legal_index import DenseIndex, KeywordAutomaton, SubstringIndex
 from ..services.rag_juridico import (
     RagJuridicoService,
     get_rag_juridico,
+    ARTIGOS_KEYWORDS,
     CHECKLIST_HABILITACAO,
     LEI_14133_CAPITULOS,
 )
@@ -195,3 +197,159 @@ class TestGetRagJuridico:
         service1 = get_rag_juridico()
         service2 = get_rag_juridico()
         assert service1 is service2
+
+
+class FakeCollection:
+    def __init__(self, documents, embeddings):
+        self.documents = documents
+        self.embeddings = embeddings
+
+    def get(self, include=None):
+        return {
+            "documents": self.documents,
+            "metadatas": [{"source": f"lei14133#{i}"} for i in range(len(self.documents))],
+            "embeddings": self.embeddings,
+        }
+
+
+class FakeRagService:
+    """Coleção fixa com embeddings 'bag of words' sobre um vocabulário pequeno."""
+
+    VOCAB = ["pregão", "habilitação", "contrato", "sanção", "drone"]
+
+    def __init__(self):
+        self.documents = [
+            "Art. 28. São modalidades de licitação: pregão, concorrência...",
+            "Art. 62. A habilitação é a fase da licitação...",
+            "Art. 89. Os contratos de que trata esta Lei...",
+            "Art. 155. O licitante ou contratado será responsabilizado (sanção)...",
+        ]
+        self.embed_calls = 0
+        self.query_calls = 0
+
+    def _vector(self, text):
+        text = text.lower()
+        return [1.0 if word[:5] in text else 0.0 for word in self.VOCAB]
+
+    def get_collection(self, name):
+        return FakeCollection(self.documents, [self._vector(d) for d in self.documents])
+
+    def embed(self, texts):
+        self.embed_calls += 1
+        return [self._vector(t) for t in texts]
+
+    def query(self, *, collection, query_text, top_k=5):
+        self.query_calls += 1
+        return [{"text": self.documents[0], "metadata": {"source": "lei14133#0"}}]
+
+
+class TestLegalIndex:
+    """Testes dos índices pré-computados."""
+
+    QUERIES = [
+        "modalidades de licitação pregão",
+        "habilitação técnica fiscal",
+        "contrato execução",
+        "xyz123abc",
+        "ç",
+        "de a o",
+        "CNPJ certidão, atestados",
+        "Pregão eletrônico para aquisição de drones com habilitação técnica e edital",
+    ]
+
+    def test_automaton_matches_substring_scan(self):
+        keywords = list(ARTIGOS_KEYWORDS) + ["ão", "pregão eletrônico", "a"]
+        automaton = KeywordAutomaton(keywords)
+
+        for text in self.QUERIES:
+            expected = {i for i, k in enumerate(keywords) if k in text.lower()}
+            assert automaton.find(text.lower()) == expected
+
+    def test_automaton_overlapping_patterns(self):
+        automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+
+        assert automaton.find("ushers") == {0, 1, 3}
+        assert automaton.find("xyz") == set()
+
+    def test_substring_index_matches_scan(self):
+        docs = [c["titulo"] for c in LEI_14133_CAPITULOS.values()]
+        index = SubstringIndex(docs)
+
+        for query in self.QUERIES:
+            words = query.lower().split()
+            expected = {i for i, d in enumerate(docs) if any(w in d.lower() for w in words)}
+            assert index.match_any(words) == expected
+
+    def test_query_checklist_matches_scan(self):
+        service = RagJuridicoService(rag_service=None)
+
+        for query in self.QUERIES:
+            expected = [
+                item for item in CHECKLIST_HABILITACAO
+                if any(
+                    w in f"{item['item']} {' '.join(item['requisitos'])}".lower()
+                    for w in query.lower().split()
+                )
+            ]
+            assert service.query_checklist(query) == expected
+
+    def test_dense_index_exact_search(self):
+        pytest.importorskip("numpy")
+        index = DenseIndex(["a", "b", "c"], [{}, {}, {}], [[1, 0], [0, 1], [1, 1]])
+
+        results = index.search([1, 0.1], top_k=2)
+
+        assert [i for i, _ in results] == [0, 2]
+        assert results[0][1] == pytest.approx(0.995, abs=1e-3)
+
+
+class TestRagJuridicoCache:
+    """Testes do cache de resultados e da busca em memória."""
+
+    def test_repeated_query_hits_cache(self):
+        rag = FakeRagService()
+        service = RagJuridicoService(rag_service=rag)
+
+        first = service.get_contexto_juridico("Pregão eletrônico para drones")
+        second = service.get_contexto_juridico("Pregão eletrônico para drones")
+
+        assert first is second
+        assert rag.embed_calls + rag.query_calls == 1
+
+    def test_cache_is_bounded(self):
+        service = RagJuridicoService(rag_service=None, cache_size=2)
+
+        for query in ["pregão", "contrato", "sanção"]:
+            service.query_lei_14133(query)
+
+        assert len(service._cache) == 2
+
+    def test_dense_results_without_collection_query(self):
+        pytest.importorskip("numpy")
+        rag = FakeRagService()
+        service = RagJuridicoService(rag_service=rag)
+
+        result = service.query_lei_14133("sanção ao contrato", top_k=2)
+
+        semantic = [r for r in result.results if "texto" in r]
+        assert [r["metadata"]["source"] for r in semantic] == ["lei14133#3", "lei14133#2"]
+        assert rag.query_calls == 0
+        assert rag.embed_calls == 1
+
+    @pytest.mark.parametrize("embed", ["raises", "missing"])
+    def test_embed_failure_falls_back_to_collection_query(self, embed):
+        pytest.importorskip("numpy")
+        rag = FakeRagService()
+        if embed == "raises":
+            def failing_embed(texts):
+                raise RuntimeError("embedding indisponível")
+            rag.embed = failing_embed
+        else:
+            rag.embed = None
+        service = RagJuridicoService(rag_service=rag)
+
+        result = service.query_lei_14133("sanção ao contrato", top_k=2)
+
+        semantic = [r for r in result.results if "texto" in r]
+        assert [r["metadata"]["source"] for r in semantic] == ["lei14133#0"]
+        assert rag.query_calls == 1
@@ -2,6 +2,7 @@
 
 import pytest
 from datetime import datetime, timezone
+from operator import attrgetter
 
 from ..models import (
     LicitacaoItem,
@@ -16,6 +17,9 @@ from ..services import (
     merge_items,
     detect_changes,
     detect_changes_batch,
+    iter_changes,
+    item_fingerprint,
+    FingerprintStore,
 )
 
 
@@ -76,6 +80,22 @@ class TestDedupStrong:
         result = dedup_strong([])
         assert result == []
 
+    def test_keeps_newer_version_in_original_position(self):
+        old_time = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        new_time = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+        items = [
+            make_item("001", objeto="Versão antiga", updated_at=old_time),
+            make_item("002"),
+            make_item("001", objeto="Versão nova", updated_at=new_time),
+            make_item("001", objeto="Mais antiga", updated_at=old_time),
+        ]
+        result = dedup_strong(items)
+        assert [(item.external_id, item.objeto) for item in result] == [
+            ("001", "Versão nova"),
+            ("002", "Aquisição de drones"),
+        ]
+
 
 class TestDedupFuzzy:
     """Testes para dedup_fuzzy."""
@@ -98,6 +118,54 @@ class TestDedupFuzzy:
         assert suggestions[0].original_id == "001"
         assert suggestions[0].duplicate_id == "002"
 
+    def test_suggests_reworded_items(self):
+        items = [
+            make_item("001", objeto="Aquisição de drones para combate a incêndios florestais"),
+            make_item("002", objeto="AQUISICAO de drones p/ combate a incendios florestais."),
+            make_item("003", objeto="Contratação de serviços de limpeza urbana"),
+        ]
+        suggestions = dedup_fuzzy(items)
+        assert [(s.original_id, s.duplicate_id) for s in suggestions] == [("001", "002")]
+        assert 0.7 <= suggestions[0].similarity_score < 1.0
+
+    def test_blocks_by_orgao_and_uf(self):
+        items = [
+            make_item("001", objeto="Aquisição de drones para combate", orgao="Prefeitura", uf="SP"),
+            make_item("002", objeto="Aquisição de drones para combate", orgao="Prefeitura", uf="RJ"),
+            make_item("003", objeto="Aquisição de drones para combate", orgao="Câmara", uf="SP"),
+        ]
+        assert dedup_fuzzy(items) == []
+
+    def test_persistent_index_across_runs(self, tmp_path):
+        from ..services import NearDuplicateIndex
+
+        path = str(tmp_path / "near_dedup.db")
+        index = NearDuplicateIndex(path)
+        assert dedup_fuzzy([make_item("001", objeto="Reforma da escola municipal Monteiro Lobato")], index) == []
+        index.close()
+
+        index = NearDuplicateIndex(path)
+        suggestions = dedup_fuzzy(
+            [make_item("002", objeto="Reforma da Escola Municipal Monteiro Lobato - bloco B")], index
+        )
+        assert [(s.original_id, s.duplicate_id) for s in suggestions] == [("001", "002")]
+        assert len(index) == 2
+
+        # Reprocessar itens já indexados não repete sugestões nem reindexa
+        again = dedup_fuzzy(
+            [
+                make_item("001", objeto="Reforma da escola municipal Monteiro Lobato"),
+                make_item("002", objeto="Reforma da Escola Municipal Monteiro Lobato - bloco B"),
+            ],
+            index,
+        )
+        assert again == []
+        assert len(index) == 2
+
+        # Item alterado volta a ser comparado
+        changed = dedup_fuzzy([make_item("001", objeto="Reforma da escola municipal Monteiro Lobato - bloco B")], index)
+        assert [(s.original_id, s.duplicate_id) for s in changed] == [("002", "001")]
+
 
 class TestMergeItems:
     """Testes para merge_items."""
@@ -233,3 +301,91 @@ class TestDetectChangesBatch:
         items = [make_item("001"), make_item("002")]
         changes = detect_changes_batch(items, items)
         assert len(changes) == 0
+
+
+class TestFingerprintSync:
+    """Testes para o diff em massa por fingerprint."""
+
+    def test_fingerprint_tracks_only_tracked_fields(self):
+        item = make_item("001", valor_estimado=100.0)
+
+        assert item_fingerprint(item) == item_fingerprint(make_item("001", valor_estimado=100.0, objeto="Outro"))
+        assert item_fingerprint(item) != item_fingerprint(make_item("001", valor_estimado=101.0))
+
+    def test_fingerprint_same_instant_other_offset(self):
+        from datetime import timedelta
+
+        utc = make_item("001", data_abertura=datetime(2025, 1, 15, 12, tzinfo=timezone.utc))
+        brt = make_item(
+            "001",
+            data_abertura=datetime(2025, 1, 15, 9, tzinfo=timezone(timedelta(hours=-3))),
+        )
+
+        assert item_fingerprint(utc) == item_fingerprint(brt)
+        assert detect_changes(utc, brt) == []
+
+    def test_sync_streams_only_changed_items(self):
+        store = FingerprintStore()
+        old = [make_item(f"{i:03d}", valor_estimado=1000.0 * (i + 1)) for i in range(50)]
+
+        assert list(iter_changes(old, store, batch_size=7)) == []
+        assert len(store) == 50
+
+        new = [item.model_copy() for item in old]
+        new[3] = make_item("003", valor_estimado=1.0)
+        new[10] = make_item(
+            "010",
+            valor_estimado=11000.0,
+            situacao=Situacao.SUSPENSA,
+            anexos=[AttachmentRef(filename="errata.pdf", url="https://example.com/errata.pdf")],
+        )
+        new.append(make_item("999"))
+
+        changes = list(iter_changes(iter(new), store, batch_size=7))
+
+        assert [(c.licitacao_id, c.tipo) for c in changes] == [
+            ("003", TipoMudanca.VALOR_ALTERADO),
+            ("010", TipoMudanca.STATUS_ALTERADO),
+            ("010", TipoMudanca.ANEXO_ADICIONADO),
+        ]
+        assert changes[0].valor_anterior == "4000.0"
+        assert changes[0].valor_novo == "1.0"
+        assert len(store) == 51
+
+        # Store atualizado: nova sincronização idêntica não gera eventos
+        assert list(iter_changes(new, store)) == []
+
+    def test_sync_matches_detect_changes(self):
+        old = make_item(
+            "001",
+            situacao=Situacao.ABERTA,
+            data_abertura=datetime(2025, 1, 15, tzinfo=timezone.utc),
+            anexos=[AttachmentRef(filename="edital.pdf", url="https://example.com/edital.pdf")],
+        )
+        new = make_item(
+            "001",
+            situacao=Situacao.ENCERRADA,
+            data_abertura=datetime(2025, 1, 20, tzinfo=timezone.utc),
+            data_encerramento=datetime(2025, 2, 1, tzinfo=timezone.utc),
+        )
+        store = FingerprintStore()
+        list(iter_changes([old], store))
+
+        streamed = list(iter_changes([new], store))
+        direct = detect_changes(old, new)
+
+        fields = attrgetter("tipo", "campo", "valor_anterior", "valor_novo", "descricao")
+        assert [fields(c) for c in streamed] == [fields(c) for c in direct]
+        assert direct[0].valor_anterior == "2025-01-15 00:00:00+00:00"
+
+    def test_store_persists(self, tmp_path):
+        db_path = str(tmp_path / "fingerprints.db")
+        store = FingerprintStore(db_path)
+        list(iter_changes([make_item("001", valor_estimado=10.0)], store))
+        store.close()
+
+        store = FingerprintStore(db_path)
+        changes = list(iter_changes([make_item("001", valor_estimado=20.0)], store))
+
+        assert len(changes) == 1
+        assert changes[0].valor_anterior == "10.0"
@@ -1,11 +1,15 @@
 # Licitacoes Tools
-from .pncp_client import PNCPClient, PNCPClientError, create_pncp_client
+from .pncp_client import PNCPClient, PNCPClientError, ResponseCache, create_pncp_client
+from .pncp_harvest import PNCPHarvester, WatermarkStore
 from .fetcher import Fetcher, FetcherError, RawDocumentRef, create_fetcher
 
 __all__ = [
     "PNCPClient",
     "PNCPClientError",
     "create_pncp_client",
+    "ResponseCache",
+    "PNCPHarvester",
+    "WatermarkStore",
     "Fetcher",
     "FetcherError",
     "RawDocumentRef",
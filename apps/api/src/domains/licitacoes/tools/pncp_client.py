@@ -1,8 +1,18 @@
 """Cliente para API do Portal Nacional de Contratações Públicas (PNCP)."""
 
+import asyncio
+import hashlib
 import httpx
+import json
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
 from datetime import datetime, timezone, timedelta
+from email.utils import parsedate_to_datetime
+from pathlib import Path
 from typing import Any
+from urllib.parse import urlencode
 import logging
 
 from ..models import (
@@ -18,6 +28,34 @@ logger = logging.getLogger(__name__)
 PNCP_BASE_URL = "https://pncp.gov.br/api/consulta/v1"
 DEFAULT_TIMEOUT = 15.0
 DEFAULT_RETRIES = 2
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_RATE_LIMIT = 5.0  # requisições por segundo
+MAX_PAGE_SIZE = 500
+
+SEARCH_ENDPOINT = "/contratacoes/publicacao"
+UPDATES_ENDPOINT = "/contratacoes/atualizacao"
+
+
+def _retry_after_seconds(value: str | None, attempt: int) -> float:
+    """
+    Interpreta o header Retry-After (segundos ou data HTTP).
+
+    Valores ausentes ou inválidos caem no backoff exponencial.
+    """
+    backoff = float(2 ** attempt)
+    if not value:
+        return backoff
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return backoff
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
 
 class PNCPClientError(Exception):
@@ -25,6 +63,75 @@ class PNCPClientError(Exception):
     pass
 
 
+class RateLimiter:
+    """Limitador assíncrono (token bucket) de requisições por segundo."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResponseCache:
+    """
+    Cache em disco de respostas JSON, com validadores HTTP.
+
+    Cada resposta fica em um arquivo próprio (chave = hash de endpoint +
+    parâmetros) com ETag/Last-Modified para requisições condicionais.
+    """
+
+    def __init__(self, cache_dir: Path | str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def key(self, endpoint: str, params: dict[str, Any] | None = None) -> str:
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{endpoint}?{query}".encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        try:
+            return json.loads((self.cache_dir / f"{key}.json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(
+        self,
+        key: str,
+        body: Any,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        entry = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+            "body": body,
+        }
+        path = self.cache_dir / f"{key}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def touch(self, key: str) -> None:
+        """Marca uma entrada como revalidada (304)."""
+        entry = self.get(key)
+        if entry is not None:
+            self.put(key, entry["body"], entry.get("etag"), entry.get("last_modified"))
+
+
 class PNCPClient:
     """Cliente para consulta à API do PNCP."""
 
@@ -33,10 +140,30 @@ class PNCPClient:
         base_url: str = PNCP_BASE_URL,
         timeout: float = DEFAULT_TIMEOUT,
         retries: int = DEFAULT_RETRIES,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate_limit: float | None = DEFAULT_RATE_LIMIT,
+        cache_dir: Path | str | None = None,
+        cache_ttl: float = 0.0,
     ):
+        """
+        Args:
+            base_url: URL base da API
+            timeout: Timeout por requisição (s)
+            retries: Tentativas extras em timeout/5xx/429
+            max_concurrency: Requisições simultâneas
+            rate_limit: Requisições por segundo (None = sem limite)
+            cache_dir: Diretório do cache de respostas (None = sem cache)
+            cache_ttl: Segundos em que uma resposta em cache é usada sem
+                revalidar; depois disso vira requisição condicional
+        """
         self.base_url = base_url
         self.timeout = timeout
         self.retries = retries
+        self.max_concurrency = max(1, max_concurrency)
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.cache_ttl = cache_ttl
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._limiter = RateLimiter(rate_limit, burst=self.max_concurrency) if rate_limit else None
         self._client: httpx.AsyncClient | None = None
 
     async def __aenter__(self):
@@ -58,14 +185,52 @@ class PNCPClient:
         return self._client
 
     async def _request(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
-        """Faz requisição com retry."""
+        """Faz requisição com retry, limite de taxa e cache condicional."""
         last_error: Exception | None = None
 
+        cache_key: str | None = None
+        cached: dict[str, Any] | None = None
+        headers = dict(kwargs.pop("headers", None) or {})
+        if self.cache is not None and method == "GET":
+            cache_key = self.cache.key(endpoint, kwargs.get("params"))
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                if time.time() - cached["stored_at"] < self.cache_ttl:
+                    return cached["body"]
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
         for attempt in range(self.retries + 1):
             try:
-                response = await self.client.request(method, endpoint, **kwargs)
+                async with self._semaphore:
+                    if self._limiter:
+                        await self._limiter.acquire()
+                    response = await self.client.request(method, endpoint, headers=headers, **kwargs)
+
+                if response.status_code == 304 and cached is not None:
+                    await asyncio.to_thread(self.cache.touch, cache_key)
+                    return cached["body"]
+                if response.status_code == 429:
+                    last_error = httpx.HTTPStatusError("Too Many Requests", request=response.request, response=response)
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"), attempt)
+                    logger.warning(f"PNCP rate limited (attempt {attempt + 1}), retrying in {retry_after}s")
+                    await asyncio.sleep(min(retry_after, 30.0))
+                    continue
                 response.raise_for_status()
-                return response.json()
+
+                # PNCP responde 204 quando a consulta não tem resultados
+                data = response.json() if response.status_code != 204 and response.content else {}
+                if cache_key is not None:
+                    await asyncio.to_thread(
+                        self.cache.put,
+                        cache_key,
+                        data,
+                        response.headers.get("ETag"),
+                        response.headers.get("Last-Modified"),
+                    )
+                return data
             except httpx.TimeoutException as e:
                 last_error = e
                 logger.warning(f"PNCP timeout (attempt {attempt + 1}/{self.retries + 1}): {e}")
@@ -81,34 +246,18 @@ class PNCPClient:
 
         raise PNCPClientError(f"PNCP request failed after {self.retries + 1} attempts") from last_error
 
-    async def search(
+    def _search_params(
         self,
         keywords: list[str] | None = None,
         ufs: list[str] | None = None,
         modalidades: list[Modalidade] | None = None,
         data_inicio: datetime | None = None,
         data_fim: datetime | None = None,
-        pagina: int = 1,
         tam_pagina: int = 50,
-    ) -> list[LicitacaoItem]:
-        """
-        Busca licitações no PNCP.
-
-        Args:
-            keywords: Palavras-chave para busca no objeto
-            ufs: UFs para filtrar
-            modalidades: Modalidades de licitação
-            data_inicio: Data inicial de publicação
-            data_fim: Data final de publicação
-            pagina: Número da página
-            tam_pagina: Tamanho da página (max 500)
-
-        Returns:
-            Lista de LicitacaoItem normalizados
-        """
+    ) -> dict[str, Any]:
+        """Monta os parâmetros de consulta (sem a página)."""
         params: dict[str, Any] = {
-            "pagina": pagina,
-            "tamanhoPagina": min(tam_pagina, 500),
+            "tamanhoPagina": min(tam_pagina, MAX_PAGE_SIZE),
         }
 
         if keywords:
@@ -134,12 +283,10 @@ class PNCPClient:
             if codes:
                 params["modalidade"] = ",".join(filter(None, codes))
 
-        try:
-            data = await self._request("GET", "/contratacoes/publicacao", params=params)
-        except PNCPClientError:
-            logger.error("Failed to search PNCP")
-            return []
+        return params
 
+    def _normalize_page(self, data: dict[str, Any]) -> list[LicitacaoItem]:
+        """Normaliza os itens de uma página de resultados."""
         items = []
         for raw in data.get("data", []):
             try:
@@ -147,9 +294,126 @@ class PNCPClient:
                 items.append(item)
             except Exception as e:
                 logger.warning(f"Failed to normalize PNCP item: {e}")
-
         return items
 
+    async def search(
+        self,
+        keywords: list[str] | None = None,
+        ufs: list[str] | None = None,
+        modalidades: list[Modalidade] | None = None,
+        data_inicio: datetime | None = None,
+        data_fim: datetime | None = None,
+        pagina: int = 1,
+        tam_pagina: int = 50,
+    ) -> list[LicitacaoItem]:
+        """
+        Busca licitações no PNCP (uma página).
+
+        Args:
+            keywords: Palavras-chave para busca no objeto
+            ufs: UFs para filtrar
+            modalidades: Modalidades de licitação
+            data_inicio: Data inicial de publicação
+            data_fim: Data final de publicação
+            pagina: Número da página
+            tam_pagina: Tamanho da página (max 500)
+
+        Returns:
+            Lista de LicitacaoItem normalizados
+        """
+        params = self._search_params(keywords, ufs, modalidades, data_inicio, data_fim, tam_pagina)
+        params["pagina"] = pagina
+
+        try:
+            data = await self._request("GET", SEARCH_ENDPOINT, params=params)
+        except PNCPClientError:
+            logger.error("Failed to search PNCP")
+            return []
+
+        return self._normalize_page(data)
+
+    async def iter_search(
+        self,
+        keywords: list[str] | None = None,
+        ufs: list[str] | None = None,
+        modalidades: list[Modalidade] | None = None,
+        data_inicio: datetime | None = None,
+        data_fim: datetime | None = None,
+        tam_pagina: int = MAX_PAGE_SIZE,
+        endpoint: str = SEARCH_ENDPOINT,
+    ) -> AsyncIterator[LicitacaoItem]:
+        """
+        Percorre todas as páginas de uma consulta.
+
+        A primeira página informa o total; as demais são buscadas em
+        paralelo (até max_concurrency em voo) e entregues em ordem.
+
+        Args:
+            keywords: Palavras-chave para busca no objeto
+            ufs: UFs para filtrar
+            modalidades: Modalidades de licitação
+            data_inicio: Data inicial
+            data_fim: Data final
+            tam_pagina: Tamanho da página (max 500)
+            endpoint: SEARCH_ENDPOINT (publicação) ou UPDATES_ENDPOINT (atualização)
+
+        Yields:
+            LicitacaoItem normalizados
+
+        Raises:
+            PNCPClientError: Se uma página falhar após os retries
+        """
+        params = self._search_params(keywords, ufs, modalidades, data_inicio, data_fim, tam_pagina)
+
+        first = await self._request("GET", endpoint, params={**params, "pagina": 1})
+        for item in self._normalize_page(first):
+            yield item
+
+        total_pages = int(first.get("totalPaginas") or 1)
+        pending: deque[asyncio.Task] = deque()
+        next_page = 2
+        try:
+            while next_page <= total_pages or pending:
+                while next_page <= total_pages and len(pending) < self.max_concurrency:
+                    pending.append(asyncio.create_task(
+                        self._request("GET", endpoint, params={**params, "pagina": next_page})
+                    ))
+                    next_page += 1
+                data = await pending.popleft()
+                for item in self._normalize_page(data):
+                    yield item
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def get_details(self, external_ids: Iterable[str]) -> dict[str, LicitacaoItem | None]:
+        """
+        Obtém detalhes de várias licitações em paralelo.
+
+        Args:
+            external_ids: IDs no formato "cnpj-ano-sequencial"
+
+        Returns:
+            Dict external_id -> LicitacaoItem (None se não encontrado)
+        """
+        ids = list(dict.fromkeys(external_ids))
+        results = await asyncio.gather(*(self.get_detail(external_id) for external_id in ids))
+        return dict(zip(ids, results))
+
+    async def list_attachments_many(self, external_ids: Iterable[str]) -> dict[str, list[AttachmentRef]]:
+        """
+        Lista anexos de várias licitações em paralelo.
+
+        Args:
+            external_ids: IDs no formato "cnpj-ano-sequencial"
+
+        Returns:
+            Dict external_id -> lista de AttachmentRef
+        """
+        ids = list(dict.fromkeys(external_ids))
+        results = await asyncio.gather(*(self.list_attachments(external_id) for external_id in ids))
+        return dict(zip(ids, results))
+
     async def get_detail(self, external_id: str) -> LicitacaoItem | None:
         """
         Obtém detalhes de uma licitação pelo ID externo.
@@ -0,0 +1,189 @@
+"""Coleta incremental do PNCP com high-watermark por consulta."""
+
+import asyncio
+import json
+import os
+import threading
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from pathlib import Path
+import logging
+
+from ..models import LicitacaoItem, Modalidade
+from .pncp_client import UPDATES_ENDPOINT, PNCPClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_WINDOW = timedelta(days=1)
+
+_DONE = object()
+
+
+class WatermarkStore:
+    """
+    High-watermarks por consulta, persistidos em JSON.
+
+    A marca de uma consulta é o maior instante de atualização já coletado;
+    só avança depois que a consulta inteira termina sem erro e todos os
+    seus itens foram consumidos pelo chamador.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self._marks: dict[str, str] = json.loads(self.path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._marks = {}
+
+    def get(self, key: str) -> datetime | None:
+        value = self._marks.get(key)
+        return datetime.fromisoformat(value) if value else None
+
+    def set(self, key: str, value: datetime) -> None:
+        with self._lock:
+            self._marks[key] = value.isoformat()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._marks, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def all(self) -> dict[str, datetime]:
+        return {key: datetime.fromisoformat(value) for key, value in self._marks.items()}
+
+
+def query_key(
+    uf: str | None,
+    keywords: list[str] | None = None,
+    modalidades: list[Modalidade] | None = None,
+) -> str:
+    """Chave estável de uma consulta (UF + filtros)."""
+    kw = ",".join(sorted(k.lower() for k in keywords or []))
+    mod = ",".join(sorted(m.value for m in modalidades or []))
+    return f"uf={uf or '*'}|q={kw}|mod={mod}"
+
+
+class PNCPHarvester:
+    """
+    Coleta incremental: cada consulta (UF + filtros) puxa apenas registros
+    novos ou alterados desde o último high-watermark.
+
+    Exemplo:
+        async with PNCPClient(cache_dir="./data/licitacoes/pncp_cache") as client:
+            harvester = PNCPHarvester(client, "./data/licitacoes/watermarks.json")
+            async for item in harvester.harvest(ufs=["SP", "RJ"], keywords=["drones"]):
+                ...
+    """
+
+    def __init__(
+        self,
+        client: PNCPClient,
+        state_path: Path | str,
+        initial_window: timedelta = DEFAULT_INITIAL_WINDOW,
+    ):
+        self.client = client
+        self.watermarks = WatermarkStore(state_path)
+        self.initial_window = initial_window
+
+    def _changed_at(self, item: LicitacaoItem) -> datetime | None:
+        raw = item.raw_data or {}
+        for field in ("dataAtualizacaoGlobal", "dataAtualizacao"):
+            parsed = self.client._parse_date(raw.get(field))
+            if parsed:
+                return parsed
+        return item.data_publicacao
+
+    async def _harvest_query(
+        self,
+        uf: str | None,
+        keywords: list[str] | None,
+        modalidades: list[Modalidade] | None,
+        now: datetime,
+        queue: asyncio.Queue,
+    ) -> tuple[str, datetime | None]:
+        """Enfileira os itens da consulta; retorna (chave, nova marca)."""
+        key = query_key(uf, keywords, modalidades)
+        watermark = self.watermarks.get(key)
+        since = watermark or now - self.initial_window
+        newest = watermark
+        count = 0
+
+        async for item in self.client.iter_search(
+            keywords=keywords,
+            ufs=[uf] if uf else None,
+            modalidades=modalidades,
+            data_inicio=since,
+            data_fim=now,
+            endpoint=UPDATES_ENDPOINT,
+        ):
+            changed_at = self._changed_at(item)
+            # A API filtra por dia: descarta o que já foi coletado até a marca
+            if watermark and changed_at and changed_at <= watermark:
+                continue
+            if changed_at and (newest is None or changed_at > newest):
+                newest = changed_at
+            count += 1
+            await queue.put(item)
+
+        logger.info(f"PNCP harvest {key}: {count} new/changed items (watermark {newest})")
+        return key, newest
+
+    async def harvest(
+        self,
+        ufs: list[str] | None = None,
+        keywords: list[str] | None = None,
+        modalidades: list[Modalidade] | None = None,
+        now: datetime | None = None,
+    ) -> AsyncIterator[LicitacaoItem]:
+        """
+        Coleta registros novos ou alterados, uma consulta por UF em paralelo.
+
+        Args:
+            ufs: UFs a coletar (None = consulta única sem filtro de UF)
+            keywords: Palavras-chave
+            modalidades: Modalidades
+            now: Instante de referência (padrão: agora)
+
+        Yields:
+            LicitacaoItem novos ou alterados desde o último watermark
+
+        Os watermarks só são gravados depois que todos os itens foram
+        consumidos: se o chamador interromper a iteração, a próxima coleta
+        repete os itens ainda não entregues.
+
+        Raises:
+            PNCPClientError: Se alguma consulta falhar (as demais ainda
+                avançam seus watermarks)
+        """
+        now = now or datetime.now()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.client.max_concurrency * 100)
+        errors: list[BaseException] = []
+        marks: list[tuple[str, datetime | None]] = []
+
+        async def run(uf: str | None) -> None:
+            try:
+                marks.append(await self._harvest_query(uf, keywords, modalidades, now, queue))
+            except Exception as e:
+                logger.error(f"PNCP harvest failed for uf={uf}: {e}")
+                errors.append(e)
+            await queue.put(_DONE)
+
+        targets = ufs or [None]
+        tasks = [asyncio.create_task(run(uf)) for uf in targets]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        for key, newest in marks:
+            if newest is not None:
+                self.watermarks.set(key, newest)
+        if errors:
+            raise errors[0]
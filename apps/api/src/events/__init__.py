@@ -11,6 +11,7 @@ from .webhooks import (
     emit_event,
     emit_event_sync,
 )
+from .queue import DeliveryQueue, QueuedDelivery
 
 __all__ = [
     "WebhookManager",
@@ -20,4 +21,6 @@ __all__ = [
     "get_webhook_manager",
     "emit_event",
     "emit_event_sync",
+    "DeliveryQueue",
+    "QueuedDelivery",
 ]
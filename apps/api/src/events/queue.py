@@ -0,0 +1,260 @@
+"""
+Fila persistente de entregas de webhooks.
+
+Entregas ficam em SQLite até serem confirmadas, então sobrevivem a
+reinícios do processo. Retries são agendados gravando `next_attempt_at`
+na própria linha, sem manter corrotinas dormindo.
+
+Estados:
+- pending: aguardando entrega (ou retry agendado)
+- in_flight: reservada por um worker
+- dead: esgotou as tentativas (dead letter)
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+@dataclass
+class QueuedDelivery:
+    """Entrega reservada da fila."""
+    id: str
+    webhook_id: str
+    event_type: str
+    body: str
+    attempts: int = 0
+    created_at: float = 0.0
+    last_error: Optional[str] = None
+
+
+class DeliveryQueue:
+    """
+    Fila de entregas em SQLite (WAL).
+
+    Exemplo:
+        queue = DeliveryQueue("./data/webhooks/queue.db")
+        queue.enqueue([("d1", "wh1", "agent.created", '{"event": ...}')])
+        for delivery in queue.claim(limit=10):
+            ...
+            queue.complete([delivery.id])
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id TEXT PRIMARY KEY,
+                webhook_id TEXT NOT NULL,
+                event_type TEXT NOT NULL,
+                body TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_deliveries_due
+                ON deliveries(status, next_attempt_at);
+        """)
+        self._conn.commit()
+
+    def enqueue(self, items: Iterable[Tuple[str, str, str, str]], at: Optional[float] = None) -> int:
+        """
+        Enfileira entregas (id, webhook_id, event_type, body).
+
+        Returns:
+            Número de entregas enfileiradas
+        """
+        now = time.time()
+        rows = [(i, w, e, b, at or now, now, now) for i, w, e, b in items]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO deliveries
+                (id, webhook_id, event_type, body, next_attempt_at, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+        return len(rows)
+
+    def _blocked_clause(self, blocked: Iterable[str]) -> Tuple[str, List[str]]:
+        blocked = list(blocked)
+        if not blocked:
+            return "", []
+        return f" AND webhook_id NOT IN ({','.join('?' * len(blocked))})", blocked
+
+    def claim(
+        self,
+        limit: int,
+        capacity: Optional[Dict[str, int]] = None,
+        default_capacity: Optional[int] = None,
+        blocked: Iterable[str] = (),
+        now: Optional[float] = None
+    ) -> List[QueuedDelivery]:
+        """
+        Reserva entregas vencidas (status in_flight), mais antigas primeiro.
+
+        Args:
+            limit: Máximo de entregas reservadas
+            capacity: Máximo de entregas por webhook nesta reserva
+            default_capacity: Máximo para webhooks fora de `capacity`
+            blocked: Webhooks que não devem ser reservados (circuito aberto, saturados)
+            now: Momento de referência (default: time.time())
+        """
+        if limit <= 0:
+            return []
+        now = now or time.time()
+        clause, params = self._blocked_clause(blocked)
+
+        # Capacidade aplicada no SQL (ROW_NUMBER por webhook): um endpoint
+        # com muitas entregas vencidas não ocupa o lote dos demais
+        caps = list((capacity or {}).items())
+        if caps:
+            caps_sql = "VALUES " + ",".join("(?, ?)" for _ in caps)
+            caps_params = [value for pair in caps for value in pair]
+        else:
+            caps_sql = "SELECT NULL, NULL WHERE 0"
+            caps_params = []
+
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"""
+                WITH caps(webhook_id, cap) AS ({caps_sql}),
+                due AS (
+                    SELECT id, webhook_id, event_type, body, attempts, created_at, last_error,
+                           next_attempt_at,
+                           ROW_NUMBER() OVER (PARTITION BY webhook_id ORDER BY next_attempt_at) AS rn
+                    FROM deliveries
+                    WHERE status = 'pending' AND next_attempt_at <= ?{clause}
+                )
+                SELECT due.id, due.webhook_id, event_type, body, attempts, created_at, last_error
+                FROM due LEFT JOIN caps ON caps.webhook_id = due.webhook_id
+                WHERE rn <= COALESCE(caps.cap, ?, rn)
+                ORDER BY next_attempt_at
+                LIMIT ?
+                """,
+                (*caps_params, now, *params, default_capacity, limit)
+            ).fetchall()
+
+            chosen = [QueuedDelivery(*row) for row in rows]
+            if chosen:
+                self._conn.executemany(
+                    "UPDATE deliveries SET status = 'in_flight', updated_at = ? WHERE id = ?",
+                    [(now, d.id) for d in chosen]
+                )
+        return chosen
+
+    def complete(self, ids: List[str]) -> None:
+        """Remove entregas confirmadas."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM deliveries WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, ids: List[str], attempts: int, next_attempt_at: float, error: Optional[str]) -> None:
+        """Agenda nova tentativa."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE deliveries
+                SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                [(attempts, next_attempt_at, error, now, i) for i in ids]
+            )
+
+    def release(self, ids: List[str]) -> None:
+        """Devolve entregas reservadas sem consumir tentativa."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE deliveries SET status = 'pending', updated_at = ? WHERE id = ?",
+                [(now, i) for i in ids]
+            )
+
+    def dead(self, ids: List[str], attempts: int, error: Optional[str]) -> None:
+        """Move entregas para dead letter."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                UPDATE deliveries
+                SET status = 'dead', attempts = ?, last_error = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                [(attempts, error, now, i) for i in ids]
+            )
+
+    def recover(self) -> int:
+        """
+        Devolve à fila entregas que estavam em voo (processo interrompido).
+
+        Returns:
+            Número de entregas recuperadas
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE deliveries SET status = 'pending' WHERE status = 'in_flight'"
+            )
+        return cursor.rowcount
+
+    def next_due(self, blocked: Iterable[str] = ()) -> Optional[float]:
+        """Momento da próxima entrega pendente (ignorando `blocked`)."""
+        clause, params = self._blocked_clause(blocked)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT MIN(next_attempt_at) FROM deliveries WHERE status = 'pending'{clause}",
+                params
+            ).fetchone()
+        return row[0]
+
+    def requeue_dead(self, webhook_id: Optional[str] = None) -> int:
+        """Devolve dead letters à fila (todas ou de um webhook)."""
+        now = time.time()
+        query = "UPDATE deliveries SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'dead'"
+        params: list = [now]
+        if webhook_id:
+            query += " AND webhook_id = ?"
+            params.append(webhook_id)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(query, params)
+        return cursor.rowcount
+
+    def dead_letters(self, limit: int = 100) -> List[QueuedDelivery]:
+        """Lista entregas que esgotaram as tentativas."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, webhook_id, event_type, body, attempts, created_at, last_error
+                FROM deliveries WHERE status = 'dead'
+                ORDER BY updated_at DESC LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        return [QueuedDelivery(*row) for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Contagem de entregas por status."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM deliveries GROUP BY status"
+            ).fetchall()
+        counts = {"pending": 0, "in_flight": 0, "dead": 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        """Fecha a conexão."""
+        with self._lock:
+            self._conn.close()
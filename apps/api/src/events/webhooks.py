@@ -2,6 +2,8 @@
 Sistema de Webhooks para eventos.
 
 Permite enviar notificações para URLs externas quando eventos ocorrem.
+Entregas passam por uma fila persistente (ver `queue.py`) e são feitas
+por workers em background.
 """
 
 import os
@@ -9,13 +11,21 @@ import json
 import hmac
 import hashlib
 import asyncio
-from typing import Optional, List, Dict, Any, Callable
+import logging
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
 import httpx
 
+from .queue import DeliveryQueue, QueuedDelivery
+
+
+logger = logging.getLogger(__name__)
+
 
 class EventType(Enum):
     """Tipos de eventos suportados."""
@@ -60,6 +70,12 @@ class WebhookConfig:
     last_triggered: Optional[datetime] = None
     failure_count: int = 0
     
+    # Requisições simultâneas permitidas para este endpoint
+    max_concurrency: int = 4
+    
+    # > 1 habilita entrega em lote (body é uma lista JSON de eventos)
+    batch_size: int = 1
+    
     def matches_event(self, event_type: EventType) -> bool:
         """Verifica se webhook deve receber este evento."""
         return self.enabled and event_type in self.events
@@ -78,6 +94,44 @@ class WebhookDelivery:
     duration_ms: float = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
     error: Optional[str] = None
+    
+    # pending (na fila), delivered ou failed (dead letter)
+    status: str = "pending"
+    attempts: int = 0
+
+
+@dataclass
+class _EndpointState:
+    """Concorrência e circuit breaker de um endpoint."""
+    max_concurrency: int
+    in_flight: int = 0
+    failures: int = 0
+    opened_at: Optional[float] = None
+    
+    def available(self, now: float, recovery_timeout: float) -> int:
+        """Requisições que ainda podem ser abertas agora."""
+        if self.opened_at is None:
+            return self.max_concurrency - self.in_flight
+        if now - self.opened_at < recovery_timeout:
+            return 0
+        # Half-open: uma requisição de teste por vez
+        return 1 - self.in_flight
+    
+    def reopens_in(self, now: float, recovery_timeout: float) -> Optional[float]:
+        """Segundos até o circuito aceitar tentativa (None se fechado)."""
+        if self.opened_at is None:
+            return None
+        return max(0.0, self.opened_at + recovery_timeout - now)
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+    
+    def record_failure(self, now: float, threshold: int):
+        self.failures += 1
+        # Falha em half-open reabre o circuito imediatamente
+        if self.opened_at is not None or self.failures >= threshold:
+            self.opened_at = now
 
 
 class WebhookManager:
@@ -87,33 +141,74 @@ class WebhookManager:
     Features:
     - Registro de webhooks por evento
     - Assinatura HMAC para segurança
-    - Retry automático com backoff
+    - Fila persistente (SQLite): entregas sobrevivem a reinícios
+    - Workers compartilhando um cliente HTTP com keep-alive
+    - Concorrência máxima e circuit breaker por endpoint
+    - Retry com backoff agendado na fila (sem corrotinas dormindo)
+    - Entrega em lote opt-in (batch_size > 1)
     - Log de deliveries
-    - Rate limiting
+    
+    `trigger` apenas enfileira e retorna; o dispatcher é iniciado
+    automaticamente no event loop corrente (ou via `start()`).
+    Entregas são at-least-once: receptores podem deduplicar pelo
+    header X-Webhook-Delivery.
     
     Configuração:
         WEBHOOK_STORAGE_PATH: Diretório para persistência
         WEBHOOK_RETRY_COUNT: Número de retries (default: 3)
         WEBHOOK_TIMEOUT: Timeout em segundos (default: 30)
+        WEBHOOK_WORKERS: Requisições simultâneas no total (default: 16)
     """
     
     def __init__(
         self,
         storage_path: Optional[str] = None,
         retry_count: int = 3,
-        timeout: float = 30.0
+        timeout: float = 30.0,
+        workers: int = 16,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        max_backoff: float = 300.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
     ):
         self.storage_path = Path(storage_path or os.getenv("WEBHOOK_STORAGE_PATH", "./data/webhooks"))
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
         self.retry_count = int(os.getenv("WEBHOOK_RETRY_COUNT", str(retry_count)))
         self.timeout = float(os.getenv("WEBHOOK_TIMEOUT", str(timeout)))
+        self.workers = int(os.getenv("WEBHOOK_WORKERS", str(workers)))
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_backoff = max_backoff
         
         self._webhooks: Dict[str, WebhookConfig] = {}
-        self._deliveries: List[WebhookDelivery] = []
+        self._deliveries: deque = deque(maxlen=1000)
         self._event_handlers: Dict[EventType, List[Callable]] = {}
         
+        self._queue = DeliveryQueue(str(self.storage_path / "queue.db"))
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._endpoints: Dict[str, _EndpointState] = {}
+        self._active: Set[asyncio.Task] = set()
+        self._waiters: Dict[str, asyncio.Future] = {}
+        # Entregas reservadas por este manager e ainda não resolvidas
+        self._claimed: Set[str] = set()
+        self._dispatch_lock: Optional[asyncio.Lock] = None
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        
+        # last_triggered muda a cada entrega; gravado no máximo 1x/s
+        self._dirty = False
+        self._last_save = 0.0
+        
         self._load_webhooks()
+        
+        # Entregas em voo de um processo anterior voltam para a fila
+        recovered = self._queue.recover()
+        if recovered:
+            logger.info("%d entregas de webhook recuperadas da fila", recovered)
     
     def _load_webhooks(self):
         """Carrega webhooks salvos."""
@@ -130,7 +225,9 @@ class WebhookManager:
                     headers=wh.get("headers", {}),
                     created_at=datetime.fromisoformat(wh["created_at"]),
                     last_triggered=datetime.fromisoformat(wh["last_triggered"]) if wh.get("last_triggered") else None,
-                    failure_count=wh.get("failure_count", 0)
+                    failure_count=wh.get("failure_count", 0),
+                    max_concurrency=wh.get("max_concurrency", 4),
+                    batch_size=wh.get("batch_size", 1)
                 )
                 self._webhooks[config.id] = config
     
@@ -147,19 +244,30 @@ class WebhookManager:
                     "headers": wh.headers,
                     "created_at": wh.created_at.isoformat(),
                     "last_triggered": wh.last_triggered.isoformat() if wh.last_triggered else None,
-                    "failure_count": wh.failure_count
+                    "failure_count": wh.failure_count,
+                    "max_concurrency": wh.max_concurrency,
+                    "batch_size": wh.batch_size
                 }
                 for wh in self._webhooks.values()
             ]
         }
         (self.storage_path / "webhooks.json").write_text(json.dumps(data, indent=2))
+        self._dirty = False
+        self._last_save = time.monotonic()
+    
+    def _flush_webhooks(self, force: bool = False):
+        """Grava webhooks se houve mudança (limitado a 1x/s)."""
+        if self._dirty and (force or time.monotonic() - self._last_save >= 1.0):
+            self._save_webhooks()
     
     def register_webhook(
         self,
         url: str,
         events: List[EventType],
         secret: Optional[str] = None,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        max_concurrency: int = 4,
+        batch_size: int = 1
     ) -> WebhookConfig:
         """
         Registra um novo webhook.
@@ -169,6 +277,8 @@ class WebhookManager:
             events: Lista de eventos a escutar
             secret: Secret para assinatura HMAC
             headers: Headers customizados
+            max_concurrency: Requisições simultâneas para este endpoint
+            batch_size: Eventos por requisição (> 1 envia lista JSON)
         """
         import uuid
         
@@ -177,7 +287,9 @@ class WebhookManager:
             url=url,
             events=events,
             secret=secret,
-            headers=headers or {}
+            headers=headers or {},
+            max_concurrency=max(1, max_concurrency),
+            batch_size=max(1, batch_size)
         )
         
         self._webhooks[webhook.id] = webhook
@@ -189,6 +301,7 @@ class WebhookManager:
         """Remove um webhook."""
         if webhook_id in self._webhooks:
             del self._webhooks[webhook_id]
+            self._endpoints.pop(webhook_id, None)
             self._save_webhooks()
             return True
         return False
@@ -202,15 +315,16 @@ class WebhookManager:
         return self._webhooks.get(webhook_id)
     
     def enable_webhook(self, webhook_id: str) -> bool:
-        """Habilita um webhook."""
+        """Habilita um webhook (entregas retidas voltam a sair)."""
         if webhook_id in self._webhooks:
             self._webhooks[webhook_id].enabled = True
             self._save_webhooks()
+            self._notify()
             return True
         return False
     
     def disable_webhook(self, webhook_id: str) -> bool:
-        """Desabilita um webhook."""
+        """Desabilita um webhook (entregas pendentes ficam retidas na fila)."""
         if webhook_id in self._webhooks:
             self._webhooks[webhook_id].enabled = False
             self._save_webhooks()
@@ -221,19 +335,26 @@ class WebhookManager:
         self,
         event_type: EventType,
         payload: Dict[str, Any],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        wait: bool = False
     ) -> List[WebhookDelivery]:
         """
-        Dispara evento para todos os webhooks inscritos.
+        Enfileira evento para todos os webhooks inscritos.
+        
+        Retorna assim que as entregas estão persistidas; o envio é
+        feito pelos workers em background.
         
         Args:
             event_type: Tipo do evento
             payload: Dados do evento
             metadata: Metadados adicionais
+            wait: Aguardar o resultado final (entregue ou dead letter)
         
         Returns:
-            Lista de deliveries
+            Lista de deliveries (status "pending", ou finais com wait=True)
         """
+        import uuid
+        
         event_data = {
             "event": event_type.value,
             "timestamp": datetime.utcnow().isoformat(),
@@ -242,18 +363,31 @@ class WebhookManager:
         }
         
         # Encontrar webhooks inscritos
-        matching = [
-            wh for wh in self._webhooks.values()
+        deliveries = [
+            WebhookDelivery(
+                id=str(uuid.uuid4()),
+                webhook_id=wh.id,
+                event_type=event_type.value,
+                payload=event_data
+            )
+            for wh in self._webhooks.values()
             if wh.matches_event(event_type)
         ]
         
-        # Disparar em paralelo
-        tasks = [
-            self._deliver(webhook, event_data)
-            for webhook in matching
-        ]
-        
-        deliveries = await asyncio.gather(*tasks)
+        if deliveries:
+            body = json.dumps(event_data)
+            await asyncio.to_thread(
+                self._queue.enqueue,
+                [(d.id, d.webhook_id, d.event_type, body) for d in deliveries]
+            )
+            self._ensure_started()
+            
+            if wait:
+                loop = asyncio.get_running_loop()
+                for d in deliveries:
+                    self._waiters[d.id] = loop.create_future()
+            
+            self._notify()
         
         # Chamar handlers locais
         for handler in self._event_handlers.get(event_type, []):
@@ -264,31 +398,256 @@ class WebhookManager:
             except Exception:
                 pass
         
+        if wait and deliveries:
+            return list(await asyncio.gather(*(self._waiters[d.id] for d in deliveries)))
+        
         return deliveries
     
-    async def _deliver(
-        self,
-        webhook: WebhookConfig,
-        event_data: Dict[str, Any]
-    ) -> WebhookDelivery:
-        """Entrega evento para um webhook."""
-        import uuid
-        import time
+    # ------------------------------------------------------------------
+    # Dispatcher
+    # ------------------------------------------------------------------
+    
+    async def start(self):
+        """Inicia o dispatcher de entregas no event loop corrente."""
+        self._ensure_started()
+        self._notify()
+    
+    async def stop(self):
+        """Para o dispatcher, aguardando entregas em voo até `timeout`."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
         
-        delivery = WebhookDelivery(
-            id=str(uuid.uuid4()),
-            webhook_id=webhook.id,
-            event_type=event_data["event"],
-            payload=event_data
-        )
+        if self._active:
+            _, pending = await asyncio.wait(list(self._active), timeout=self.timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                # Cada task cancelada devolve à fila apenas as suas entregas
+                # (ver `_process`); as que terminaram não são reenviadas
+                await asyncio.wait(pending)
         
-        body = json.dumps(event_data)
-        headers = {
-            "Content-Type": "application/json",
-            "X-Webhook-Event": event_data["event"],
-            "X-Webhook-Timestamp": event_data["timestamp"],
-            **webhook.headers
-        }
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        
+        self._flush_webhooks(force=True)
+    
+    def close(self):
+        """Fecha a fila persistente."""
+        self._flush_webhooks(force=True)
+        self._queue.close()
+    
+    def _ensure_started(self):
+        """Inicia (ou reinicia, se o loop mudou) o dispatcher."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            old_loop, old_task = self._loop, self._task
+            if old_loop is not None and not old_loop.is_closed():
+                # O loop anterior segue vivo (outra thread): seu dispatcher
+                # para, e as requisições em voo terminam nele
+                if old_task is not None:
+                    old_loop.call_soon_threadsafe(old_task.cancel)
+            elif self._claimed:
+                # Loop fechado: as reservas feitas nele não vão terminar
+                self._queue.release(list(self._claimed))
+                self._claimed.clear()
+            
+            # Recursos asyncio ficam presos ao loop em que foram criados
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._dispatch_lock = asyncio.Lock()
+            self._client = None
+            self._active = set()
+            self._waiters = {}
+            self._task = None
+            for state in self._endpoints.values():
+                state.in_flight = 0
+        
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run_loop())
+    
+    def _notify(self):
+        if self._wakeup is not None and self._loop is not None and not self._loop.is_closed():
+            self._wakeup.set()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartilhado (keep-alive) entre todos os workers."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.workers,
+                    max_keepalive_connections=self.workers
+                ),
+                transport=self._transport
+            )
+        return self._client
+    
+    def _endpoint(self, webhook: WebhookConfig) -> _EndpointState:
+        state = self._endpoints.get(webhook.id)
+        if state is None:
+            state = self._endpoints[webhook.id] = _EndpointState(webhook.max_concurrency)
+        state.max_concurrency = webhook.max_concurrency
+        return state
+    
+    def _capacity(self, now: float) -> Tuple[Dict[str, int], List[str]]:
+        """Linhas reserváveis por webhook e webhooks bloqueados."""
+        capacity: Dict[str, int] = {}
+        blocked: List[str] = []
+        for webhook in self._webhooks.values():
+            slots = self._endpoint(webhook).available(now, self.recovery_timeout)
+            if not webhook.enabled or slots <= 0:
+                blocked.append(webhook.id)
+            else:
+                capacity[webhook.id] = slots * webhook.batch_size
+        return capacity, blocked
+    
+    async def _run_loop(self):
+        """Loop do dispatcher: dorme até a próxima entrega vencida."""
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._dispatch()
+                self._flush_webhooks()
+                delay = await self._next_delay()
+            except Exception:
+                logger.exception("Erro no dispatcher de webhooks")
+                delay = 1.0
+            
+            # call_later em vez de wait_for: no 3.11 wait_for pode engolir
+            # o cancelamento quando o evento dispara ao mesmo tempo
+            timer = self._loop.call_later(delay, self._wakeup.set) if delay is not None else None
+            try:
+                await self._wakeup.wait()
+            finally:
+                if timer is not None:
+                    timer.cancel()
+    
+    async def _next_delay(self) -> Optional[float]:
+        """Segundos até haver trabalho (None: aguardar notificação)."""
+        if len(self._active) >= self.workers:
+            return None
+        
+        now = time.monotonic()
+        _, blocked = self._capacity(now)
+        delays = []
+        
+        due = await asyncio.to_thread(self._queue.next_due, blocked)
+        if due is not None:
+            delays.append(due - time.time())
+        
+        for state in self._endpoints.values():
+            # Circuito aberto: acordar quando aceitar a tentativa de teste
+            reopens = state.reopens_in(now, self.recovery_timeout)
+            if reopens and state.in_flight == 0:
+                delays.append(reopens)
+        
+        return max(0.0, min(delays)) if delays else None
+    
+    async def _dispatch(self) -> int:
+        """Reserva entregas vencidas e abre uma task por requisição."""
+        # Serializa reservas (loop e deliver_pending): a capacidade
+        # calculada vale até as tasks da reserva serem abertas
+        async with self._dispatch_lock:
+            free = self.workers - len(self._active)
+            if free <= 0:
+                return 0
+            
+            capacity, blocked = self._capacity(time.monotonic())
+            max_batch = max((wh.batch_size for wh in self._webhooks.values()), default=1)
+            rows = await asyncio.to_thread(
+                self._queue.claim,
+                limit=free * max_batch,
+                capacity=capacity,
+                default_capacity=1,
+                blocked=blocked
+            )
+            self._claimed.update(row.id for row in rows)
+            
+            # Agrupar por webhook respeitando batch_size
+            requests: List[Tuple[Optional[WebhookConfig], List[QueuedDelivery]]] = []
+            grouped: Dict[str, List[QueuedDelivery]] = {}
+            for row in rows:
+                grouped.setdefault(row.webhook_id, []).append(row)
+            for webhook_id, items in grouped.items():
+                webhook = self._webhooks.get(webhook_id)
+                size = webhook.batch_size if webhook else 1
+                for i in range(0, len(items), size):
+                    requests.append((webhook, items[i:i + size]))
+            
+            # Excedente (mais requisições que workers livres) volta para a fila
+            if len(requests) > free:
+                excess = [row.id for _, items in requests[free:] for row in items]
+                await asyncio.to_thread(self._queue.release, excess)
+                self._claimed.difference_update(excess)
+                requests = requests[:free]
+            
+            for webhook, items in requests:
+                if webhook is None:
+                    # Webhook removido com entregas pendentes
+                    ids = [row.id for row in items]
+                    await asyncio.to_thread(self._queue.dead, ids, items[0].attempts, "webhook removido")
+                    self._claimed.difference_update(ids)
+                    continue
+                
+                self._endpoint(webhook).in_flight += 1
+                task = asyncio.ensure_future(self._process(webhook, items))
+                self._active.add(task)
+                task.add_done_callback(self._on_done)
+            
+            return len(requests)
+    
+    def _on_done(self, task: asyncio.Task):
+        self._active.discard(task)
+        self._notify()
+    
+    async def deliver_pending(self) -> int:
+        """
+        Entrega tudo que está vencido agora e aguarda as requisições.
+        
+        Retries agendados para o futuro permanecem na fila.
+        
+        Returns:
+            Número de requisições feitas
+        """
+        self._ensure_started()
+        sent = 0
+        while True:
+            sent += await self._dispatch()
+            if not self._active:
+                return sent
+            await asyncio.wait(list(self._active), return_when=asyncio.FIRST_COMPLETED)
+    
+    # ------------------------------------------------------------------
+    # Entrega
+    # ------------------------------------------------------------------
+    
+    def _build_request(self, webhook: WebhookConfig, rows: List[QueuedDelivery]) -> Tuple[str, Dict[str, str]]:
+        if webhook.batch_size > 1:
+            body = "[" + ",".join(row.body for row in rows) + "]"
+            headers = {
+                "Content-Type": "application/json",
+                "X-Webhook-Event": ",".join(sorted({row.event_type for row in rows})),
+                "X-Webhook-Timestamp": datetime.utcnow().isoformat(),
+                "X-Webhook-Delivery": ",".join(row.id for row in rows),
+                "X-Webhook-Batch-Size": str(len(rows)),
+                **webhook.headers
+            }
+        else:
+            row = rows[0]
+            body = row.body
+            headers = {
+                "Content-Type": "application/json",
+                "X-Webhook-Event": row.event_type,
+                "X-Webhook-Timestamp": json.loads(body)["timestamp"],
+                "X-Webhook-Delivery": row.id,
+                **webhook.headers
+            }
         
         # Adicionar assinatura se secret configurado
         if webhook.secret:
@@ -299,46 +658,102 @@ class WebhookManager:
             ).hexdigest()
             headers["X-Webhook-Signature"] = f"sha256={signature}"
         
-        start = time.time()
+        return body, headers
+    
+    async def _process(self, webhook: WebhookConfig, rows: List[QueuedDelivery]):
+        """Faz uma requisição (um evento ou um lote) e registra o resultado."""
+        state = self._endpoint(webhook)
+        ids = [row.id for row in rows]
+        status_code = None
+        response_text = None
+        error = None
+        start = time.perf_counter()
         
-        for attempt in range(self.retry_count + 1):
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.post(
-                        webhook.url,
-                        content=body,
-                        headers=headers,
-                        timeout=self.timeout
-                    )
-                    
-                    delivery.status_code = response.status_code
-                    delivery.response = response.text[:500]  # Limitar resposta
-                    delivery.success = 200 <= response.status_code < 300
-                    delivery.duration_ms = (time.time() - start) * 1000
-                    
-                    if delivery.success:
-                        webhook.last_triggered = datetime.utcnow()
-                        webhook.failure_count = 0
-                        break
-                    
-            except Exception as e:
-                delivery.error = str(e)
-                
-                if attempt < self.retry_count:
-                    # Backoff exponencial
-                    await asyncio.sleep(2 ** attempt)
+        try:
+            body, headers = self._build_request(webhook, rows)
+            response = await self._get_client().post(webhook.url, content=body, headers=headers)
+            status_code = response.status_code
+            response_text = response.text[:500]  # Limitar resposta
+            success = 200 <= status_code < 300
+            if not success:
+                error = f"HTTP {status_code}"
+        except asyncio.CancelledError:
+            # Interrompida (stop): volta à fila sem consumir tentativa.
+            # Síncrono para não depender do loop que está encerrando
+            self._queue.release(ids)
+            self._claimed.difference_update(ids)
+            raise
+        except Exception as e:
+            success = False
+            error = str(e) or type(e).__name__
+        finally:
+            state.in_flight -= 1
+        
+        duration_ms = (time.perf_counter() - start) * 1000
+        self._claimed.difference_update(ids)
+        
+        if success:
+            state.record_success()
+            await asyncio.to_thread(self._queue.complete, ids)
+            webhook.last_triggered = datetime.utcnow()
+            webhook.failure_count = 0
+            self._dirty = True
+            for row in rows:
+                self._finish(row, webhook, "delivered", status_code, response_text, None, duration_ms, row.attempts + 1)
+            return
+        
+        state.record_failure(time.monotonic(), self.failure_threshold)
         
-        if not delivery.success:
+        for row in rows:
+            attempts = row.attempts + 1
+            if attempts <= self.retry_count:
+                # Backoff exponencial agendado na fila
+                delay = min(self.max_backoff, 2 ** row.attempts)
+                await asyncio.to_thread(self._queue.retry, [row.id], attempts, time.time() + delay, error)
+                continue
+            
+            await asyncio.to_thread(self._queue.dead, [row.id], attempts, error)
             webhook.failure_count += 1
+            self._dirty = True
             
             # Desabilitar após muitas falhas
-            if webhook.failure_count >= 10:
+            if webhook.failure_count >= 10 and webhook.enabled:
                 webhook.enabled = False
-        
+                logger.warning("Webhook %s desabilitado após %d falhas", webhook.id, webhook.failure_count)
+                self._save_webhooks()
+            
+            self._finish(row, webhook, "failed", status_code, response_text, error, duration_ms, attempts)
+    
+    def _finish(
+        self,
+        row: QueuedDelivery,
+        webhook: WebhookConfig,
+        status: str,
+        status_code: Optional[int],
+        response_text: Optional[str],
+        error: Optional[str],
+        duration_ms: float,
+        attempts: int
+    ):
+        """Registra o resultado final e acorda quem aguarda."""
+        delivery = WebhookDelivery(
+            id=row.id,
+            webhook_id=webhook.id,
+            event_type=row.event_type,
+            payload=json.loads(row.body),
+            status_code=status_code,
+            response=response_text,
+            success=status == "delivered",
+            duration_ms=duration_ms,
+            error=error,
+            status=status,
+            attempts=attempts
+        )
         self._deliveries.append(delivery)
-        self._save_webhooks()
         
-        return delivery
+        waiter = self._waiters.pop(row.id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(delivery)
     
     def on_event(self, event_type: EventType):
         """Decorator para registrar handler local."""
@@ -354,13 +769,43 @@ class WebhookManager:
         webhook_id: Optional[str] = None,
         limit: int = 100
     ) -> List[WebhookDelivery]:
-        """Lista deliveries recentes."""
-        deliveries = self._deliveries
+        """Lista deliveries recentes (resultados finais)."""
+        deliveries = list(self._deliveries)
         
         if webhook_id:
             deliveries = [d for d in deliveries if d.webhook_id == webhook_id]
         
         return sorted(deliveries, key=lambda d: d.created_at, reverse=True)[:limit]
+    
+    def get_dead_letters(self, limit: int = 100) -> List[QueuedDelivery]:
+        """Lista entregas que esgotaram as tentativas."""
+        return self._queue.dead_letters(limit)
+    
+    def retry_dead_letters(self, webhook_id: Optional[str] = None) -> int:
+        """Devolve dead letters à fila."""
+        count = self._queue.requeue_dead(webhook_id)
+        self._notify()
+        return count
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas da fila e dos circuitos por endpoint."""
+        now = time.monotonic()
+        return {
+            "queue": self._queue.stats(),
+            "active_requests": len(self._active),
+            "endpoints": {
+                webhook_id: {
+                    "in_flight": state.in_flight,
+                    "consecutive_failures": state.failures,
+                    "circuit": (
+                        "closed" if state.opened_at is None
+                        else "open" if state.reopens_in(now, self.recovery_timeout) > 0
+                        else "half_open"
+                    )
+                }
+                for webhook_id, state in self._endpoints.items()
+            }
+        }
 
 
 # Singleton
@@ -391,10 +836,26 @@ def emit_event_sync(
     payload: Dict[str, Any],
     **metadata
 ):
-    """Emite evento de forma síncrona."""
+    """
+    Emite evento de forma síncrona.
+    
+    Faz a primeira tentativa de entrega antes de retornar; retries
+    ficam na fila até o próximo uso do manager em um event loop.
+    Roda em um event loop próprio, encerrado (com o dispatcher) ao final.
+    """
     import asyncio
+    
+    async def _emit():
+        manager = get_webhook_manager()
+        try:
+            deliveries = await emit_event(event_type, payload, **metadata)
+            await manager.deliver_pending()
+            return deliveries
+        finally:
+            await manager.stop()
+    
+    loop = asyncio.new_event_loop()
     try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-    return loop.run_until_complete(emit_event(event_type, payload, **metadata))
+        return loop.run_until_complete(_emit())
+    finally:
+        loop.close()
@@ -57,6 +57,7 @@ from .types import (
 from .marketplace import Marketplace, get_marketplace
 from .publisher import Publisher, get_publisher
 from .search import MarketplaceSearch
+from .index import ListingIndex
 
 __all__ = [
     # Types
@@ -72,7 +73,8 @@ __all__ = [
     "get_marketplace",
     "Publisher",
     "get_publisher",
-    "MarketplaceSearch"
+    "MarketplaceSearch",
+    "ListingIndex"
 ]
 
 __version__ = "2.0.0"
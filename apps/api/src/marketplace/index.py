@@ -0,0 +1,562 @@
+"""
+Marketplace Index - Índice Incremental de Busca
+
+Estruturas mantidas a cada publicação, edição ou remoção de um listing,
+para que a busca não precise varrer o catálogo:
+- Índice invertido com estatísticas BM25 (nome, descrições e tags)
+- Posting lists por tipo, categoria, preço e tag
+- Arrays ordenados por downloads, rating, data e preço
+- Trie de prefixos para autocomplete
+
+Apenas listings publicados entram no índice.
+"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Set, Tuple, Iterable, Iterator, Callable, Any
+
+from .types import Listing, ListingType, ListingCategory, ListingStatus
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Peso de cada campo na frequência de termos (BM25F simplificado)
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "tags": 2.5,
+    "short_description": 1.5,
+    "description": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Critérios com array ordenado mantido pelo índice
+SORT_KEYS = ("downloads", "rating", "newest", "price")
+
+
+def tokenize(text: str) -> List[str]:
+    """Quebra texto em tokens minúsculos (letras, dígitos e _)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def name_slug(listing: Listing) -> str:
+    """Nome no formato de slug (match exato de nome na busca)."""
+    return listing.name.lower().replace(" ", "-")
+
+
+def _sort_key(listing: Listing, key: str) -> Any:
+    if key == "downloads":
+        return listing.downloads
+    if key == "rating":
+        return (listing.rating, listing.review_count)
+    if key == "newest":
+        return listing.created_at
+    return listing.price
+
+
+@dataclass
+class _IndexedDoc:
+    """Snapshot do que foi indexado (o Listing é mutável)."""
+    field_terms: Dict[str, Set[str]]
+    term_freqs: Dict[str, float]
+    length: float
+    type: ListingType
+    category: ListingCategory
+    is_free: bool
+    tags: List[str]
+    slug: str
+    suggestions: List[Tuple[str, str]]
+    sort_keys: Dict[str, Any] = field(default_factory=dict)
+
+
+class _TrieNode:
+    __slots__ = ("children", "suggestions", "cache")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # Sugestões que terminam neste nó -> número de listings
+        self.suggestions: Dict[str, int] = {}
+        # (limit, resultado) da última consulta com este prefixo
+        self.cache: Optional[Tuple[int, List[str]]] = None
+
+
+class PrefixTrie:
+    """
+    Trie de prefixos para autocomplete.
+    
+    Cada chave (token ou texto completo) aponta para uma sugestão; a
+    sugestão é contada uma vez por listing que a contém. O resultado de
+    cada prefixo fica em cache no nó até que uma chave abaixo dele mude.
+    """
+    
+    def __init__(self):
+        self._root = _TrieNode()
+    
+    def _path(self, key: str, create: bool) -> List[_TrieNode]:
+        node = self._root
+        path = [node]
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return []
+                child = node.children[char] = _TrieNode()
+            node = child
+            path.append(node)
+        return path
+    
+    def add(self, key: str, suggestion: str) -> None:
+        path = self._path(key, create=True)
+        terminal = path[-1]
+        terminal.suggestions[suggestion] = terminal.suggestions.get(suggestion, 0) + 1
+        for node in path:
+            node.cache = None
+    
+    def remove(self, key: str, suggestion: str) -> None:
+        path = self._path(key, create=False)
+        if not path:
+            return
+        terminal = path[-1]
+        count = terminal.suggestions.get(suggestion, 0) - 1
+        if count > 0:
+            terminal.suggestions[suggestion] = count
+        else:
+            terminal.suggestions.pop(suggestion, None)
+        for node in path:
+            node.cache = None
+        
+        # Poda nós que ficaram vazios
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.children or node.suggestions:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+    
+    def complete(self, prefix: str, limit: int) -> List[str]:
+        """
+        Sugestões cujas chaves começam com prefix.
+        
+        Args:
+            prefix: Prefixo (minúsculo)
+            limit: Número máximo de sugestões
+        
+        Returns:
+            Sugestões, mais frequentes primeiro (empate: ordem alfabética)
+        """
+        path = self._path(prefix, create=False)
+        if not path:
+            return []
+        node = path[-1]
+        if node.cache and node.cache[0] >= limit:
+            return node.cache[1][:limit]
+        
+        counts: Dict[str, int] = {}
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for suggestion, count in current.suggestions.items():
+                counts[suggestion] = counts.get(suggestion, 0) + count
+            stack.extend(current.children.values())
+        
+        result = [
+            s for s, _ in heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
+        ]
+        node.cache = (limit, result)
+        return result
+
+
+class ListingIndex:
+    """
+    Índice incremental dos listings publicados.
+    
+    Cada listing recebe um número de documento estável (ordem de inserção),
+    usado nas posting lists e como desempate nas ordenações.
+    
+    Exemplo:
+        index = ListingIndex()
+        index.upsert(listing)          # após publicar/editar
+        index.refresh_metrics(listing) # após install/review
+        top, total = index.match_top(["support"], k=10)
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._doc_of: Dict[str, int] = {}
+        self._listings: List[Listing] = []
+        self._docs: Dict[int, _IndexedDoc] = {}
+        
+        # Texto (BM25)
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._total_length = 0.0
+        self._slugs: Dict[str, Set[int]] = {}
+        
+        # Filtros categóricos
+        self._by_type: Dict[ListingType, Set[int]] = {}
+        self._by_category: Dict[ListingCategory, Set[int]] = {}
+        self._by_price: Dict[bool, Set[int]] = {True: set(), False: set()}
+        self._by_tag: Dict[str, Set[int]] = {}
+        
+        # Ordenações: listas de (chave, -doc) em ordem crescente
+        self._sorted: Dict[str, List[Tuple[Any, int]]] = {key: [] for key in SORT_KEYS}
+        
+        self._trie = PrefixTrie()
+    
+    def __len__(self) -> int:
+        return len(self._docs)
+    
+    def __contains__(self, listing_id: str) -> bool:
+        doc = self._doc_of.get(listing_id)
+        return doc is not None and doc in self._docs
+    
+    # === Manutenção ===
+    
+    def sync(self, listings: Dict[str, Listing]) -> None:
+        """Indexa listings ainda desconhecidos (inseridos sem passar pelo índice)."""
+        if len(listings) == len(self._doc_of):
+            return
+        with self.lock:
+            for listing_id, listing in list(listings.items()):
+                if listing_id not in self._doc_of:
+                    self.upsert(listing)
+    
+    def upsert(self, listing: Listing) -> None:
+        """(Re)indexa um listing; listings não publicados saem do índice."""
+        with self.lock:
+            doc = self._doc_of.get(listing.id)
+            if doc is None:
+                doc = self._doc_of[listing.id] = len(self._listings)
+                self._listings.append(listing)
+            else:
+                self._listings[doc] = listing
+            
+            if doc in self._docs:
+                self._remove(doc)
+            if listing.status == ListingStatus.PUBLISHED:
+                self._add(doc, listing)
+    
+    def remove(self, listing_id: str) -> None:
+        """Remove um listing do índice."""
+        with self.lock:
+            doc = self._doc_of.get(listing_id)
+            if doc is not None and doc in self._docs:
+                self._remove(doc)
+    
+    def refresh_metrics(self, listing: Listing) -> None:
+        """Atualiza apenas as ordenações (downloads, rating) de um listing."""
+        with self.lock:
+            doc = self._doc_of.get(listing.id)
+            entry = self._docs.get(doc) if doc is not None else None
+            if entry is None:
+                return
+            for key in ("downloads", "rating"):
+                value = _sort_key(listing, key)
+                if value != entry.sort_keys[key]:
+                    self._unsort(key, entry.sort_keys[key], doc)
+                    bisect.insort(self._sorted[key], (value, -doc))
+                    entry.sort_keys[key] = value
+    
+    def _add(self, doc: int, listing: Listing) -> None:
+        texts = {
+            "name": listing.name,
+            "tags": " ".join(listing.tags),
+            "short_description": listing.short_description,
+            "description": listing.description,
+        }
+        field_terms: Dict[str, Set[str]] = {}
+        term_freqs: Dict[str, float] = {}
+        length = 0.0
+        for name, text in texts.items():
+            weight = FIELD_WEIGHTS[name]
+            tokens = tokenize(text)
+            field_terms[name] = set(tokens)
+            length += weight * len(tokens)
+            for token in tokens:
+                term_freqs[token] = term_freqs.get(token, 0.0) + weight
+        
+        suggestions = []
+        for text in [listing.name, *listing.tags]:
+            lowered = text.lower()
+            for key in {lowered, *tokenize(lowered)}:
+                suggestions.append((key, text))
+        
+        entry = _IndexedDoc(
+            field_terms=field_terms,
+            term_freqs=term_freqs,
+            length=length,
+            type=listing.type,
+            category=listing.category,
+            is_free=listing.is_free,
+            tags=list(dict.fromkeys(listing.tags)),
+            slug=name_slug(listing),
+            suggestions=suggestions,
+            sort_keys={key: _sort_key(listing, key) for key in SORT_KEYS},
+        )
+        self._docs[doc] = entry
+        
+        for term, tf in term_freqs.items():
+            self._postings.setdefault(term, {})[doc] = tf
+        self._total_length += length
+        self._slugs.setdefault(entry.slug, set()).add(doc)
+        
+        self._by_type.setdefault(entry.type, set()).add(doc)
+        self._by_category.setdefault(entry.category, set()).add(doc)
+        self._by_price[entry.is_free].add(doc)
+        for tag in entry.tags:
+            self._by_tag.setdefault(tag, set()).add(doc)
+        
+        for key, value in entry.sort_keys.items():
+            bisect.insort(self._sorted[key], (value, -doc))
+        
+        for key, suggestion in suggestions:
+            self._trie.add(key, suggestion)
+    
+    def _remove(self, doc: int) -> None:
+        entry = self._docs.pop(doc)
+        
+        for term in entry.term_freqs:
+            postings = self._postings[term]
+            del postings[doc]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= entry.length
+        self._discard(self._slugs, entry.slug, doc)
+        
+        self._discard(self._by_type, entry.type, doc)
+        self._discard(self._by_category, entry.category, doc)
+        self._by_price[entry.is_free].discard(doc)
+        for tag in entry.tags:
+            self._discard(self._by_tag, tag, doc)
+        
+        for key, value in entry.sort_keys.items():
+            self._unsort(key, value, doc)
+        
+        for key, suggestion in entry.suggestions:
+            self._trie.remove(key, suggestion)
+    
+    @staticmethod
+    def _discard(postings: Dict[Any, Set[int]], key: Any, doc: int) -> None:
+        docs = postings.get(key)
+        if docs is not None:
+            docs.discard(doc)
+            if not docs:
+                del postings[key]
+    
+    def _unsort(self, key: str, value: Any, doc: int) -> None:
+        array = self._sorted[key]
+        position = bisect.bisect_left(array, (value, -doc))
+        if position < len(array) and array[position] == (value, -doc):
+            del array[position]
+    
+    # === Consulta ===
+    
+    def listing(self, doc: int) -> Listing:
+        """Listing de um documento."""
+        return self._listings[doc]
+    
+    def doc_id(self, listing_id: str) -> Optional[int]:
+        """Documento de um listing indexado."""
+        doc = self._doc_of.get(listing_id)
+        return doc if doc is not None and doc in self._docs else None
+    
+    def documents(self) -> Set[int]:
+        """Documentos publicados."""
+        return set(self._docs)
+    
+    def field_terms(self, doc: int) -> Dict[str, Set[str]]:
+        """Tokens indexados por campo (para highlights)."""
+        return self._docs[doc].field_terms
+    
+    def _term_lists(self, terms: List[str]) -> List[Tuple[Dict[int, float], float]]:
+        """(postings, idf) dos termos presentes no índice, do mais raro ao mais comum."""
+        total = len(self._docs)
+        lists = []
+        for term in dict.fromkeys(terms):
+            postings = self._postings.get(term)
+            if postings:
+                df = len(postings)
+                lists.append((postings, math.log(1 + (total - df + 0.5) / (df + 0.5))))
+        lists.sort(key=lambda item: len(item[0]))
+        return lists
+    
+    def _bm25(self, doc: int, tf: float, idf: float, avg_length: float) -> float:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._docs[doc].length / avg_length)
+        return idf * tf * (BM25_K1 + 1) / (tf + norm)
+    
+    def _avg_length(self) -> float:
+        return (self._total_length / len(self._docs) if self._docs else 0.0) or 1.0
+    
+    def match_docs(self, terms: List[str]) -> Set[int]:
+        """Documentos que contêm ao menos um dos termos."""
+        return set().union(*(postings.keys() for postings, _ in self._term_lists(terms)))
+    
+    def text_scores(self, terms: List[str], docs: Iterable[int]) -> Dict[int, float]:
+        """Score BM25 de documentos específicos (ex.: os da página)."""
+        lists = self._term_lists(terms)
+        avg_length = self._avg_length()
+        scores = {}
+        for doc in docs:
+            score = 0.0
+            for postings, idf in lists:
+                tf = postings.get(doc)
+                if tf:
+                    score += self._bm25(doc, tf, idf, avg_length)
+            scores[doc] = score
+        return scores
+    
+    def match_top(
+        self,
+        terms: List[str],
+        k: int,
+        weight: float = 1.0,
+        seed: Optional[Dict[int, float]] = None,
+        bonus: Optional[Callable[[int], float]] = None,
+        bonus_bound: float = 0.0,
+        allowed: Optional[Set[int]] = None
+    ) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Top-k por score textual + bônus, com poda MaxScore.
+        
+        Os termos são percorridos do mais raro ao mais comum. Quando o k-ésimo
+        melhor score já supera o máximo que um documento ainda não visto
+        poderia alcançar (soma dos limites dos termos restantes + bonus_bound),
+        as posting lists restantes só completam os scores dos documentos já
+        vistos; a contagem de matches usa operações de conjunto.
+        
+        Args:
+            terms: Termos já tokenizados
+            k: Número de documentos
+            weight: Peso do BM25 no score textual
+            seed: Score textual inicial por documento (ex.: match exato de nome)
+            bonus: Bônus por documento somado ao score textual no ranking
+            bonus_bound: Limite superior de bonus
+            allowed: Documentos elegíveis (None = todos)
+        
+        Returns:
+            ([(documento, score textual)] no ranking, total de documentos que casam)
+        """
+        bonus = bonus or (lambda doc: 0.0)
+        lists = self._term_lists(terms)
+        avg_length = self._avg_length()
+        
+        # Limite do que os termos i.. ainda podem somar a um documento
+        bounds = [weight * idf * (BM25_K1 + 1) for _, idf in lists]
+        remaining = [sum(bounds[i:]) for i in range(len(lists))]
+        
+        scores = {
+            doc: value for doc, value in (seed or {}).items()
+            if allowed is None or doc in allowed
+        }
+        skipped: List[Tuple[Dict[int, float], float]] = []
+        
+        for i, (postings, idf) in enumerate(lists):
+            if len(scores) >= k > 0:
+                threshold = heapq.nlargest(k, (s + bonus(doc) for doc, s in scores.items()))[-1]
+                if threshold > remaining[i] + bonus_bound:
+                    skipped = lists[i:]
+                    break
+            for doc, tf in postings.items():
+                if allowed is not None and doc not in allowed:
+                    continue
+                scores[doc] = scores.get(doc, 0.0) + weight * self._bm25(doc, tf, idf, avg_length)
+        
+        total = len(scores)
+        if skipped:
+            for postings, idf in skipped:
+                for doc in scores:
+                    tf = postings.get(doc)
+                    if tf:
+                        scores[doc] += weight * self._bm25(doc, tf, idf, avg_length)
+            if allowed is None and len(skipped) == 1:
+                postings = skipped[0][0]
+                total += len(postings) - sum(1 for doc in scores if doc in postings)
+            else:
+                unseen = set().union(*(postings.keys() for postings, _ in skipped))
+                unseen.difference_update(scores)
+                if allowed is not None:
+                    unseen &= allowed
+                total += len(unseen)
+        
+        top = heapq.nlargest(k, scores.items(), key=lambda item: (item[1] + bonus(item[0]), -item[0]))
+        return top, total
+    
+    def slug_matches(self, term: str) -> Set[int]:
+        """Documentos cujo nome, em formato de slug, é igual a term."""
+        return self._slugs.get(term, set())
+    
+    def filter(
+        self,
+        type: Optional[ListingType] = None,
+        category: Optional[ListingCategory] = None,
+        is_free: Optional[bool] = None,
+        min_rating: Optional[float] = None,
+        tags: Optional[List[str]] = None
+    ) -> Optional[Set[int]]:
+        """
+        Interseção das posting lists dos filtros.
+        
+        Returns:
+            Documentos que passam nos filtros, ou None se não há filtro
+        """
+        sets: List[Set[int]] = []
+        if type:
+            sets.append(self._by_type.get(type, set()))
+        if category:
+            sets.append(self._by_category.get(category, set()))
+        if is_free is not None:
+            sets.append(self._by_price[bool(is_free)])
+        if tags:
+            tagged: Set[int] = set()
+            for tag in tags:
+                tagged |= self._by_tag.get(tag, set())
+            sets.append(tagged)
+        if min_rating:
+            ratings = self._sorted["rating"]
+            start = bisect.bisect_left(ratings, ((min_rating,),))
+            sets.append({-doc for _, doc in ratings[start:]})
+        
+        if not sets:
+            return None
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return result
+    
+    def iter_sorted(self, key: str, descending: bool = True) -> Iterator[int]:
+        """Documentos na ordem de um critério mantido (downloads, rating, newest, price)."""
+        array = self._sorted[key]
+        entries = reversed(array) if descending else iter(array)
+        for _, negative_doc in entries:
+            yield -negative_doc
+    
+    def max_value(self, key: str) -> Any:
+        """Maior valor indexado de um critério (None se o índice está vazio)."""
+        array = self._sorted[key]
+        return array[-1][0] if array else None
+    
+    def sort_value(self, doc: int, key: str) -> Any:
+        """Valor indexado de um critério de ordenação."""
+        return self._docs[doc].sort_keys[key]
+    
+    def facets(self) -> Dict[str, Any]:
+        """Contagens por tipo, categoria, tag e faixa de preço."""
+        return {
+            "types": {t.value: len(docs) for t, docs in self._by_type.items()},
+            "categories": {c.value: len(docs) for c, docs in self._by_category.items()},
+            "tags": {tag: len(docs) for tag, docs in self._by_tag.items()},
+            "price_ranges": {
+                "free": len(self._by_price[True]),
+                "paid": len(self._by_price[False]),
+            },
+        }
+    
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Autocomplete por prefixo de nomes e tags."""
+        return self._trie.complete(prefix.lower(), limit)
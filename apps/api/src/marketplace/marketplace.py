@@ -13,6 +13,7 @@ from .types import (
     Listing, ListingType, ListingStatus, ListingCategory,
     ListingVersion, Review, Installation
 )
+from .index import ListingIndex
 
 
 class Marketplace:
@@ -33,8 +34,12 @@ class Marketplace:
         self._installations: Dict[str, List[Installation]] = defaultdict(list)
         self._user_installations: Dict[str, List[str]] = defaultdict(list)
         
+        # Índice de busca (apenas publicados)
+        self._index = ListingIndex()
+        
         # Carregar itens de exemplo
         self._load_sample_listings()
+        self._index.sync(self._listings)
     
     def _load_sample_listings(self) -> None:
         """Carrega listings de exemplo."""
@@ -163,6 +168,14 @@ class Marketplace:
         """Obtém listing pelo ID."""
         return self._listings.get(listing_id)
     
+    def reindex(self, listing_id: str) -> None:
+        """Atualiza o índice de busca após mudanças em um listing."""
+        listing = self._listings.get(listing_id)
+        if listing:
+            self._index.upsert(listing)
+        else:
+            self._index.remove(listing_id)
+    
     def get_listing_by_slug(self, slug: str) -> Optional[Listing]:
         """Obtém listing pelo slug."""
         for listing in self._listings.values():
@@ -283,6 +296,7 @@ class Marketplace:
         # Atualizar contadores
         listing.installs += 1
         listing.downloads += 1
+        self._index.refresh_metrics(listing)
         
         return installation
     
@@ -367,6 +381,7 @@ class Marketplace:
         all_ratings = [r.rating for r in self._reviews[listing_id]]
         listing.rating = sum(all_ratings) / len(all_ratings)
         listing.review_count = len(all_ratings)
+        self._index.refresh_metrics(listing)
         
         return review
     
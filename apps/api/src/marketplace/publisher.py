@@ -90,6 +90,7 @@ class Publisher:
         
         # Salvar no marketplace
         self._marketplace._listings[listing.id] = listing
+        self._marketplace.reindex(listing.id)
         
         return listing
     
@@ -130,6 +131,7 @@ class Publisher:
                 setattr(listing, field, value)
         
         listing.updated_at = datetime.now()
+        self._marketplace.reindex(listing_id)
         
         return listing
     
@@ -201,6 +203,7 @@ class Publisher:
         
         listing.status = ListingStatus.PENDING_REVIEW
         self._pending_reviews[listing_id] = listing
+        self._marketplace.reindex(listing_id)
         
         return True
     
@@ -274,6 +277,7 @@ class Publisher:
         
         if listing_id in self._pending_reviews:
             del self._pending_reviews[listing_id]
+        self._marketplace.reindex(listing_id)
         
         return True
     
@@ -301,6 +305,7 @@ class Publisher:
         listing.status = ListingStatus.DRAFT
         listing.metadata["unpublish_reason"] = reason
         listing.metadata["unpublished_at"] = datetime.now().isoformat()
+        self._marketplace.reindex(listing_id)
         
         return True
     
@@ -332,6 +337,7 @@ class Publisher:
         listing.metadata["deprecation_message"] = message
         if replacement_id:
             listing.metadata["replacement_id"] = replacement_id
+        self._marketplace.reindex(listing_id)
         
         return True
     
@@ -2,14 +2,31 @@
 Marketplace Search - Busca no Marketplace
 
 Sistema de busca com ranking e filtros.
+
+A busca consulta o `ListingIndex` mantido pelo Marketplace (índice
+invertido BM25, posting lists dos filtros e arrays ordenados), de modo
+que o custo depende dos itens que casam com a consulta e do tamanho da
+página, não do tamanho do catálogo.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set
 from collections import defaultdict
-import re
+import heapq
+
+from .types import Listing, ListingType, ListingCategory
+from .index import ListingIndex, tokenize
+
+
+# Peso do BM25 em relação aos bônus de popularidade/qualidade
+TEXT_SCORE_WEIGHT = 5.0
+
+# Bônus para query igual ao nome do listing (em formato de slug)
+EXACT_NAME_BONUS = 20
 
-from .types import Listing, ListingType, ListingCategory, ListingStatus
+# Abaixo desta fração do catálogo, os filtros são ordenados diretamente
+# (top-k sobre o conjunto filtrado) em vez de percorrer o array ordenado
+SELECTIVE_FILTER_RATIO = 0.05
 
 
 @dataclass
@@ -39,6 +56,13 @@ class MarketplaceSearch:
         from .marketplace import get_marketplace
         self._marketplace = marketplace or get_marketplace()
     
+    @property
+    def _index(self) -> ListingIndex:
+        """Índice do marketplace (indexa listings inseridos diretamente)."""
+        index = self._marketplace._index
+        index.sync(self._marketplace._listings)
+        return index
+    
     def search(
         self,
         query: str,
@@ -64,49 +88,73 @@ class MarketplaceSearch:
             sort_by: Ordenação
             limit: Número máximo
             offset: Offset para paginação
-            
+        
         Returns:
             Resultados da busca
         """
-        results: List[SearchResult] = []
-        
-        # Normalizar query
-        query_lower = query.lower().strip()
-        query_terms = query_lower.split()
-        
-        for listing in self._marketplace._listings.values():
-            # Apenas publicados
-            if listing.status != ListingStatus.PUBLISHED:
-                continue
-            
-            # Aplicar filtros
-            if type and listing.type != type:
-                continue
-            if category and listing.category != category:
-                continue
-            if is_free is not None and listing.is_free != is_free:
-                continue
-            if min_rating and listing.rating < min_rating:
-                continue
-            if tags and not any(t in listing.tags for t in tags):
-                continue
+        index = self._index
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        has_query = bool(query.strip())
+        k = max(offset + limit, 0)
+        
+        with index.lock:
+            # Filtros: interseção das posting lists (None = sem filtro)
+            allowed = index.filter(
+                type=type,
+                category=category,
+                is_free=is_free,
+                min_rating=min_rating,
+                tags=tags
+            )
+            order = self._order(sort_by, has_query)
             
-            # Calcular score
-            score, highlights = self._calculate_score(listing, query_terms)
+            if not has_query:
+                total = len(allowed) if allowed is not None else len(index)
+                page = self._rank(index, allowed, order, k)[offset:]
+                # Sem query, usar popularidade como score
+                scores = {doc: index.listing(doc).downloads / 1000 for doc in page}
+            else:
+                exact = self._exact_name_matches(index, query.lower().split())
+                
+                if order is None:
+                    ranked, total = index.match_top(
+                        query_terms,
+                        k,
+                        weight=TEXT_SCORE_WEIGHT,
+                        seed=exact,
+                        bonus=self._ranking_bonus(index, sort_by),
+                        bonus_bound=self._ranking_bonus_bound(index, sort_by),
+                        allowed=allowed
+                    )
+                    text_scores = dict(ranked)
+                    page = [doc for doc, _ in ranked[offset:]]
+                else:
+                    candidates = index.match_docs(query_terms)
+                    candidates.update(exact)
+                    if allowed is not None:
+                        candidates &= allowed
+                    total = len(candidates)
+                    page = self._rank(index, candidates, order, k)[offset:]
+                    text_scores = {
+                        doc: score * TEXT_SCORE_WEIGHT
+                        for doc, score in index.text_scores(query_terms, page).items()
+                    }
+                    for doc in page:
+                        text_scores[doc] += exact.get(doc, 0.0)
+                
+                scores = {
+                    doc: text_scores[doc] + self._quality_bonus(index.listing(doc))
+                    for doc in page
+                }
             
-            if score > 0 or not query:
-                results.append(SearchResult(
-                    listing=listing,
-                    score=score,
-                    highlights=highlights
-                ))
-        
-        # Ordenar resultados
-        results = self._sort_results(results, sort_by, bool(query))
-        
-        # Paginar
-        total = len(results)
-        results = results[offset:offset + limit]
+            results = [
+                SearchResult(
+                    listing=index.listing(doc),
+                    score=scores[doc],
+                    highlights=self._highlights(index, doc, query_terms)
+                )
+                for doc in page
+            ]
         
         return {
             "query": query,
@@ -130,118 +178,147 @@ class MarketplaceSearch:
             }
         }
     
-    def _calculate_score(
+    def _exact_name_matches(
         self,
-        listing: Listing,
-        query_terms: List[str]
-    ) -> tuple:
+        index: ListingIndex,
+        raw_terms: List[str]
+    ) -> Dict[int, float]:
         """
-        Calcula score de relevância.
+        Bônus de match exato no nome.
         
         Args:
-            listing: Listing a avaliar
-            query_terms: Termos da busca
-            
+            index: Índice de listings
+            raw_terms: Termos separados por espaço
+        
         Returns:
-            (score, highlights)
+            Dict documento -> bônus
         """
-        score = 0
-        highlights = defaultdict(list)
-        
-        if not query_terms:
-            # Sem query, usar popularidade como score
-            return listing.downloads / 1000, {}
-        
-        name_lower = listing.name.lower()
-        desc_lower = listing.description.lower()
-        short_desc_lower = listing.short_description.lower()
-        tags_lower = [t.lower() for t in listing.tags]
+        matches: Dict[int, float] = defaultdict(float)
+        for term in raw_terms:
+            for doc in index.slug_matches(term):
+                matches[doc] += EXACT_NAME_BONUS
+        return dict(matches)
+    
+    def _quality_bonus(self, listing: Listing) -> float:
+        """Bônus de popularidade, rating, verificação e destaque."""
+        bonus = min(listing.downloads / 1000, 5) + listing.rating
         
-        for term in query_terms:
-            # Match no nome (peso alto)
-            if term in name_lower:
-                score += 10
-                highlights["name"].append(term)
-            
-            # Match exato no nome
-            if term == name_lower.replace(" ", "-"):
-                score += 20
-            
-            # Match na descrição curta
-            if term in short_desc_lower:
-                score += 5
-                highlights["short_description"].append(term)
-            
-            # Match na descrição
-            if term in desc_lower:
-                score += 2
-                highlights["description"].append(term)
-            
-            # Match em tags
-            for tag in tags_lower:
-                if term in tag:
-                    score += 8
-                    highlights["tags"].append(term)
+        if listing.is_verified:
+            bonus += 2
         
-        # Bonus por popularidade
-        score += min(listing.downloads / 1000, 5)
+        if listing.is_featured:
+            bonus += 3
         
-        # Bonus por rating
-        score += listing.rating
+        return bonus
+    
+    def _ranking_bonus(self, index: ListingIndex, sort_by: str):
+        """Parte do score de ranking que não depende do texto."""
+        if sort_by == "relevance":
+            return lambda doc: self._quality_bonus(index.listing(doc))
         
-        # Bonus por verificado
-        if listing.is_verified:
-            score += 2
+        # Default: combinar score e downloads
+        def bonus(doc: int) -> float:
+            listing = index.listing(doc)
+            return self._quality_bonus(listing) + listing.downloads / 100
         
-        # Bonus por featured
-        if listing.is_featured:
-            score += 3
+        return bonus
+    
+    def _ranking_bonus_bound(self, index: ListingIndex, sort_by: str) -> float:
+        """Limite superior de `_ranking_bonus` no catálogo atual."""
+        max_downloads = index.max_value("downloads") or 0
+        max_rating = (index.max_value("rating") or (0.0, 0))[0]
+        bound = min(max_downloads / 1000, 5) + max_rating + 2 + 3
+        if sort_by != "relevance":
+            bound += max_downloads / 100
+        return bound
+    
+    def _order(self, sort_by: str, has_query: bool) -> Optional[tuple]:
+        """
+        Critério mantido pelo índice para sort_by.
         
-        return score, dict(highlights)
+        Returns:
+            (critério, decrescente), ou None para ordenação por score
+        """
+        orders = {
+            "downloads": ("downloads", True),
+            "rating": ("rating", True),
+            "newest": ("newest", True),
+            "price_low": ("price", False),
+            "price_high": ("price", True),
+        }
+        order = orders.get(sort_by)
+        if order is None and not has_query:
+            # Sem query, relevância equivale a popularidade
+            order = ("downloads", True)
+        return order
     
-    def _sort_results(
+    def _rank(
         self,
-        results: List[SearchResult],
-        sort_by: str,
-        has_query: bool
-    ) -> List[SearchResult]:
+        index: ListingIndex,
+        candidates: Optional[Set[int]],
+        order: tuple,
+        k: int
+    ) -> List[int]:
         """
-        Ordena resultados.
+        Top-k documentos por um critério mantido pelo índice.
+        
+        Percorre o array ordenado até preencher a página; para filtros muito
+        seletivos, usa um heap de tamanho k sobre os candidatos.
         
         Args:
-            results: Lista de resultados
-            sort_by: Critério de ordenação
-            has_query: Se tem query de busca
-            
+            index: Índice de listings
+            candidates: Documentos elegíveis (None = todos os publicados)
+            order: (critério, decrescente)
+            k: Número de documentos (offset + limit)
+        
         Returns:
-            Lista ordenada
+            Documentos ordenados
         """
-        if sort_by == "relevance" and has_query:
-            results.sort(key=lambda r: r.score, reverse=True)
-        elif sort_by == "downloads":
-            results.sort(key=lambda r: r.listing.downloads, reverse=True)
-        elif sort_by == "rating":
-            results.sort(key=lambda r: (r.listing.rating, r.listing.review_count), reverse=True)
-        elif sort_by == "newest":
-            results.sort(key=lambda r: r.listing.created_at, reverse=True)
-        elif sort_by == "price_low":
-            results.sort(key=lambda r: r.listing.price)
-        elif sort_by == "price_high":
-            results.sort(key=lambda r: r.listing.price, reverse=True)
-        else:
-            # Default: combinar score e downloads
-            results.sort(key=lambda r: r.score + r.listing.downloads/100, reverse=True)
+        if k <= 0:
+            return []
         
-        return results
+        sort_key, descending = order
+        if candidates is not None and len(candidates) < max(k, SELECTIVE_FILTER_RATIO * len(index)):
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return select(k, candidates, key=lambda doc: (index.sort_value(doc, sort_key), -doc))
+        
+        page = []
+        for doc in index.iter_sorted(sort_key, descending):
+            if candidates is None or doc in candidates:
+                page.append(doc)
+                if len(page) == k:
+                    break
+        return page
+    
+    def _highlights(
+        self,
+        index: ListingIndex,
+        doc: int,
+        query_terms: List[str]
+    ) -> Dict[str, List[str]]:
+        """Termos da query encontrados em cada campo do listing."""
+        if not query_terms:
+            return {}
+        
+        field_terms = index.field_terms(doc)
+        highlights = {}
+        for name in ("name", "short_description", "description", "tags"):
+            matched = [term for term in query_terms if term in field_terms[name]]
+            if matched:
+                highlights[name] = matched
+        return highlights
     
     def suggest(self, query: str, limit: int = 5) -> List[str]:
         """
         Sugere termos de busca.
         
+        Usa a trie de prefixos do índice: casa o início do nome, de uma
+        palavra do nome ou de uma tag.
+        
         Args:
             query: Query parcial
             limit: Número máximo de sugestões
-            
+        
         Returns:
             Lista de sugestões
         """
@@ -249,22 +326,9 @@ class MarketplaceSearch:
         if len(query_lower) < 2:
             return []
         
-        suggestions = set()
-        
-        for listing in self._marketplace._listings.values():
-            if listing.status != ListingStatus.PUBLISHED:
-                continue
-            
-            # Sugerir nomes
-            if query_lower in listing.name.lower():
-                suggestions.add(listing.name)
-            
-            # Sugerir tags
-            for tag in listing.tags:
-                if query_lower in tag.lower():
-                    suggestions.add(tag)
-        
-        return list(suggestions)[:limit]
+        index = self._index
+        with index.lock:
+            return index.suggest(query_lower, limit)
     
     def get_trending(self, days: int = 7, limit: int = 10) -> List[Listing]:
         """
@@ -273,18 +337,17 @@ class MarketplaceSearch:
         Args:
             days: Período em dias
             limit: Número máximo
-            
+        
         Returns:
             Lista de listings trending
         """
         # Simplificado: usar downloads como proxy
-        listings = [
-            l for l in self._marketplace._listings.values()
-            if l.status == ListingStatus.PUBLISHED
-        ]
-        
-        listings.sort(key=lambda l: l.downloads, reverse=True)
-        return listings[:limit]
+        index = self._index
+        with index.lock:
+            return [
+                index.listing(doc)
+                for doc in self._rank(index, None, ("downloads", True), limit)
+            ]
     
     def get_related(
         self,
@@ -297,7 +360,7 @@ class MarketplaceSearch:
         Args:
             listing_id: ID do listing base
             limit: Número máximo
-            
+        
         Returns:
             Lista de listings relacionados
         """
@@ -305,36 +368,25 @@ class MarketplaceSearch:
         if not base:
             return []
         
-        related = []
-        
-        for listing in self._marketplace._listings.values():
-            if listing.id == listing_id:
-                continue
-            if listing.status != ListingStatus.PUBLISHED:
-                continue
-            
-            # Calcular similaridade
-            similarity = 0
-            
-            # Mesmo tipo
-            if listing.type == base.type:
-                similarity += 5
+        index = self._index
+        with index.lock:
+            same_type = index.filter(type=base.type) or set()
+            same_category = index.filter(category=base.category) or set()
+            tag_sets = [index.filter(tags=[tag]) or set() for tag in set(base.tags)]
             
-            # Mesma categoria
-            if listing.category == base.category:
-                similarity += 3
+            # Similaridade: mesmo tipo (5), mesma categoria (3), 2 por tag em comum
+            similarity: Dict[int, int] = defaultdict(int)
+            for doc in same_type:
+                similarity[doc] += 5
+            for doc in same_category:
+                similarity[doc] += 3
+            for docs in tag_sets:
+                for doc in docs:
+                    similarity[doc] += 2
             
-            # Tags em comum
-            common_tags = set(listing.tags) & set(base.tags)
-            similarity += len(common_tags) * 2
-            
-            if similarity > 0:
-                related.append((listing, similarity))
-        
-        # Ordenar por similaridade
-        related.sort(key=lambda x: x[1], reverse=True)
-        
-        return [r[0] for r in related[:limit]]
+            similarity.pop(index.doc_id(listing_id), None)
+            top = heapq.nlargest(limit, similarity, key=lambda doc: (similarity[doc], -doc))
+            return [index.listing(doc) for doc in top]
     
     def get_filters(self) -> Dict[str, Any]:
         """
@@ -343,32 +395,16 @@ class MarketplaceSearch:
         Returns:
             Opções de filtros
         """
-        types = defaultdict(int)
-        categories = defaultdict(int)
-        tags = defaultdict(int)
-        price_ranges = {"free": 0, "paid": 0}
-        
-        for listing in self._marketplace._listings.values():
-            if listing.status != ListingStatus.PUBLISHED:
-                continue
-            
-            types[listing.type.value] += 1
-            categories[listing.category.value] += 1
-            
-            for tag in listing.tags:
-                tags[tag] += 1
-            
-            if listing.is_free:
-                price_ranges["free"] += 1
-            else:
-                price_ranges["paid"] += 1
+        index = self._index
+        with index.lock:
+            facets = index.facets()
         
         # Top tags
-        top_tags = sorted(tags.items(), key=lambda x: x[1], reverse=True)[:20]
+        top_tags = heapq.nlargest(20, facets["tags"].items(), key=lambda x: x[1])
         
         return {
-            "types": dict(types),
-            "categories": dict(categories),
+            "types": facets["types"],
+            "categories": facets["categories"],
             "tags": [{"name": t[0], "count": t[1]} for t in top_tags],
-            "price_ranges": price_ranges
+            "price_ranges": facets["price_ranges"]
         }
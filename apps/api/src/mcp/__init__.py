@@ -53,6 +53,7 @@ from .types import (
     ServerStatus
 )
 from .client import MCPClient, get_mcp_client
+from .cache import CacheConfig, CachePolicy, MCPResultCache
 from .server import MCPServerBase, AgnoMCPServer
 from .registry import MCPRegistry, get_mcp_registry
 from .transports import StdioTransport, HTTPTransport, SSETransport
@@ -73,6 +74,10 @@ __all__ = [
     # Client
     "MCPClient",
     "get_mcp_client",
+    # Cache
+    "CacheConfig",
+    "CachePolicy",
+    "MCPResultCache",
     # Server
     "MCPServerBase",
     "AgnoMCPServer",
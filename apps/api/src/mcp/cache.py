@@ -0,0 +1,289 @@
+"""
+MCP Cache - Cache opt-in de resultados de tools e resources
+
+Tools puras (lookups, buscas) e leituras de resources são repetidas muitas
+vezes por workflow. Este módulo fornece:
+- Políticas de cache por tool/resource (TTL e limite de entradas)
+- Chaves com argumentos canonicalizados (ordem de chaves irrelevante)
+- Deduplicação de chamadas idênticas em voo
+- Invalidação por URI (notificações de resources/updated)
+- Estatísticas de hit/miss por tool
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+
+@dataclass
+class CachePolicy:
+    """
+    Política de cache para uma tool ou resource.
+
+    Configurada por server no MCPRegistry:
+    ```json
+    {"cache": {"tools": {"search": {"ttl_seconds": 60, "max_entries": 256,
+                                  "invalidated_by": ["repo://index"]}},
+               "resources": {"ttl_seconds": 300}}}
+    ```
+    """
+    ttl_seconds: float = 60.0
+    max_entries: int = 256
+
+    # URIs cujas notificações de update invalidam todo o cache da tool
+    invalidated_by: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário."""
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "invalidated_by": self.invalidated_by
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CachePolicy":
+        """Cria CachePolicy a partir de dicionário."""
+        return cls(
+            ttl_seconds=float(data.get("ttl_seconds", 60.0)),
+            max_entries=int(data.get("max_entries", 256)),
+            invalidated_by=list(data.get("invalidated_by", []))
+        )
+
+
+@dataclass
+class CacheConfig:
+    """Configuração de cache de um server: políticas por tool e para resources."""
+    tools: dict[str, CachePolicy] = field(default_factory=dict)
+    resources: Optional[CachePolicy] = None
+
+    def is_empty(self) -> bool:
+        """Verifica se nenhuma política está configurada."""
+        return not self.tools and self.resources is None
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário."""
+        data: dict = {"tools": {name: p.to_dict() for name, p in self.tools.items()}}
+        if self.resources is not None:
+            data["resources"] = self.resources.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict]) -> "CacheConfig":
+        """Cria CacheConfig a partir de dicionário."""
+        data = data or {}
+        resources = data.get("resources")
+        return cls(
+            tools={
+                name: CachePolicy.from_dict(p or {})
+                for name, p in data.get("tools", {}).items()
+            },
+            resources=CachePolicy.from_dict(resources) if resources is not None else None
+        )
+
+
+@dataclass
+class CacheStats:
+    """Estatísticas de cache de uma tool (ou de resources)."""
+    hits: int = 0
+    misses: int = 0
+    deduplicated: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fração de chamadas servidas sem ir ao server."""
+        served = self.hits + self.deduplicated
+        return served / max(served + self.misses, 1)
+
+    def to_dict(self) -> dict:
+        """Converte para dicionário."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hit_rate
+        }
+
+
+def canonical_key(name: str, arguments: Optional[dict] = None) -> str:
+    """
+    Gera chave de cache estável para nome + argumentos.
+
+    Argumentos equivalentes (mesmas chaves em outra ordem) geram a mesma chave.
+    """
+    args = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{name}:{args}"
+
+
+class _Bucket:
+    """Entradas LRU com TTL de uma única tool/resource."""
+
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self.entries: OrderedDict[str, tuple[float, Any, Optional[str]]] = OrderedDict()
+        self.stats = CacheStats()
+
+
+class MCPResultCache:
+    """
+    Cache de resultados MCP com TTL, LRU e deduplicação em voo.
+
+    Cada tool com política configurada tem seu próprio bucket, limitado
+    por `max_entries`. Resources compartilham o bucket `resources`.
+    """
+
+    RESOURCES = "__resources__"
+
+    def __init__(self, config: Optional[CacheConfig] = None, clock: Callable[[], float] = time.monotonic):
+        self.config = config or CacheConfig()
+        self._clock = clock
+        self._buckets: dict[str, _Bucket] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+
+        # Incrementado a cada invalidação; resultados carregados durante
+        # uma invalidação podem estar desatualizados e não são armazenados
+        self._generation = 0
+
+        for name, policy in self.config.tools.items():
+            self._buckets[name] = _Bucket(policy)
+        if self.config.resources is not None:
+            self._buckets[self.RESOURCES] = _Bucket(self.config.resources)
+
+    def is_cacheable(self, name: str) -> bool:
+        """Verifica se a tool (ou RESOURCES) tem política de cache."""
+        return name in self._buckets
+
+    def _get(self, bucket: _Bucket, key: str) -> tuple[bool, Any]:
+        entry = bucket.entries.get(key)
+        if entry is None:
+            return False, None
+
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            del bucket.entries[key]
+            return False, None
+
+        bucket.entries.move_to_end(key)
+        return True, value
+
+    def _put(self, bucket: _Bucket, key: str, value: Any, uri: Optional[str]) -> None:
+        bucket.entries[key] = (self._clock() + bucket.policy.ttl_seconds, value, uri)
+        bucket.entries.move_to_end(key)
+
+        while len(bucket.entries) > bucket.policy.max_entries:
+            bucket.entries.popitem(last=False)
+            bucket.stats.evictions += 1
+
+    async def get_or_load(
+        self,
+        name: str,
+        arguments: Optional[dict],
+        loader: Callable[[], Awaitable[Any]],
+        uri: Optional[str] = None,
+        should_cache: Optional[Callable[[Any], bool]] = None
+    ) -> Any:
+        """
+        Retorna valor em cache ou executa `loader`.
+
+        Chamadas concorrentes com a mesma chave aguardam o mesmo loader.
+
+        Args:
+            name: Nome da tool (ou RESOURCES)
+            arguments: Argumentos da chamada
+            loader: Corrotina que busca o valor no server
+            uri: URI associada (usada na invalidação)
+            should_cache: Predicado para decidir se o resultado é armazenado
+
+        Returns:
+            Valor em cache ou retornado pelo loader
+        """
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            return await loader()
+
+        key = canonical_key(name, arguments)
+
+        found, value = self._get(bucket, key)
+        if found:
+            bucket.stats.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            bucket.stats.deduplicated += 1
+        else:
+            bucket.stats.misses += 1
+            task = asyncio.ensure_future(
+                self._load(bucket, key, loader, uri, should_cache, self._generation)
+            )
+            self._inflight[key] = task
+            # Evita "exception was never retrieved" se todos forem cancelados
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+        # Todos os chamadores (inclusive o primeiro) aguardam a task
+        # compartilhada: o cancelamento de um não cancela os demais
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        bucket: _Bucket,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        uri: Optional[str],
+        should_cache: Optional[Callable[[Any], bool]],
+        generation: int
+    ) -> Any:
+        try:
+            value = await loader()
+            if generation == self._generation and (should_cache is None or should_cache(value)):
+                self._put(bucket, key, value, uri)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate_uri(self, uri: str) -> int:
+        """
+        Remove entradas associadas a uma URI.
+
+        Returns:
+            Número de entradas removidas
+        """
+        self._generation += 1
+        removed = 0
+        for bucket in self._buckets.values():
+            if uri in bucket.policy.invalidated_by:
+                stale = list(bucket.entries)
+            else:
+                stale = [k for k, (_, _, u) in bucket.entries.items() if u == uri]
+            for key in stale:
+                del bucket.entries[key]
+            bucket.stats.invalidations += len(stale)
+            removed += len(stale)
+        return removed
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Limpa o cache de uma tool, ou todo o cache se `name` for None."""
+        self._generation += 1
+        buckets = [self._buckets[name]] if name in self._buckets else (
+            self._buckets.values() if name is None else []
+        )
+        for bucket in buckets:
+            bucket.stats.invalidations += len(bucket.entries)
+            bucket.entries.clear()
+
+    def get_stats(self) -> dict[str, dict]:
+        """Retorna estatísticas por tool (resources sob a chave `resources`)."""
+        return {
+            ("resources" if name == self.RESOURCES else name): {
+                **bucket.stats.to_dict(),
+                "size": len(bucket.entries)
+            }
+            for name, bucket in self._buckets.items()
+        }
@@ -7,6 +7,7 @@ permitindo:
 - Descoberta de tools, resources e prompts
 - Invocação de ferramentas
 - Leitura de recursos
+- Cache opt-in de tools/resources idempotentes
 """
 
 import asyncio
@@ -22,6 +23,7 @@ from .types import (
     ServerStatus, TransportType, ClientInfo, ServerInfo
 )
 from .transports import Transport, StdioTransport, HTTPTransport, SSETransport, TransportFactory
+from .cache import CacheConfig, MCPResultCache
 
 
 logger = logging.getLogger(__name__)
@@ -67,6 +69,12 @@ class MCPClient:
         self._pending: dict[str, asyncio.Future] = {}
         self._request_id = 0
         
+        # Cache de resultados (políticas em server.cache)
+        self._cache = MCPResultCache(server.cache)
+        self._subscribed: set[str] = set()
+        # Recursos sem inscrição: sem invalidação possível, não são cacheados
+        self._unsubscribable: set[str] = set()
+        
         # Métricas
         self.total_calls = 0
         self.failed_calls = 0
@@ -96,6 +104,10 @@ class MCPClient:
             # Criar transporte
             self._transport = self._create_transport()
             
+            # Notificações do server (ex: resources/updated) invalidam o cache
+            if hasattr(self._transport, "set_message_handler"):
+                self._transport.set_message_handler(self._on_message)
+            
             # Conectar
             await self._transport.connect()
             
@@ -192,10 +204,13 @@ class MCPClient:
         self._initialized = False
         self.server.status = ServerStatus.DISCONNECTED
         
-        # Limpar cache
+        # Limpar cache (sem conexão, notificações de update são perdidas)
         self._tools.clear()
         self._resources.clear()
         self._prompts.clear()
+        self._cache.invalidate()
+        self._subscribed.clear()
+        self._unsubscribable.clear()
         
         logger.info(f"Desconectado do server: {self.server.name}")
     
@@ -268,6 +283,22 @@ class MCPClient:
             self.server.error_count += 1
             raise
     
+    def _on_message(self, message: MCPMessage) -> None:
+        """Processa notificações recebidas do server."""
+        if not message.is_notification():
+            return
+        
+        params = message.params or {}
+        
+        if message.method == "notifications/resources/updated":
+            uri = params.get("uri")
+            if uri:
+                removed = self._cache.invalidate_uri(uri)
+                logger.debug(f"Resource atualizado: {uri} ({removed} entradas invalidadas)")
+        
+        elif message.method == "notifications/tools/list_changed":
+            self._cache.invalidate()
+    
     async def _notify(self, method: str, params: Optional[dict] = None) -> None:
         """Envia notificação (sem esperar resposta)."""
         if not self._transport:
@@ -324,6 +355,10 @@ class MCPClient:
         """
         Invoca uma ferramenta no server.
         
+        Se a tool tiver política de cache em `server.cache`, resultados
+        sem erro são reaproveitados e chamadas idênticas concorrentes
+        compartilham uma única request.
+        
         Args:
             name: Nome da ferramenta
             arguments: Argumentos da ferramenta
@@ -331,6 +366,19 @@ class MCPClient:
         Returns:
             ToolResult com conteúdo ou erro
         """
+        return await self._cache.get_or_load(
+            name,
+            arguments,
+            lambda: self._call_tool(name, arguments),
+            should_cache=lambda r: not r.is_error
+        )
+    
+    async def _call_tool(
+        self,
+        name: str,
+        arguments: Optional[dict] = None
+    ) -> ToolResult:
+        """Invoca a ferramenta no server, sem cache."""
         start = datetime.now()
         
         call = ToolCall(
@@ -412,12 +460,34 @@ class MCPClient:
         """
         Lê conteúdo de um recurso.
         
+        Com cache de resources habilitado, o client se inscreve no recurso
+        para que notificações de update invalidem a entrada. Recursos em
+        que a inscrição falha são sempre lidos do server.
+        
         Args:
             uri: URI do recurso
             
         Returns:
             ResourceContent com dados
         """
+        if not self._cache.is_cacheable(MCPResultCache.RESOURCES) or uri in self._unsubscribable:
+            return await self._read_resource(uri)
+        
+        if uri not in self._subscribed:
+            if not await self.subscribe_resource(uri):
+                self._unsubscribable.add(uri)
+                return await self._read_resource(uri)
+            self._subscribed.add(uri)
+        
+        return await self._cache.get_or_load(
+            MCPResultCache.RESOURCES,
+            {"uri": uri},
+            lambda: self._read_resource(uri),
+            uri=uri
+        )
+    
+    async def _read_resource(self, uri: str) -> ResourceContent:
+        """Lê o recurso no server, sem cache."""
         response = await self._request("resources/read", {
             "uri": uri
         })
@@ -566,8 +636,18 @@ class MCPClient:
             "avg_latency_ms": avg_latency,
             "tools_count": len(self._tools),
             "resources_count": len(self._resources),
-            "prompts_count": len(self._prompts)
+            "prompts_count": len(self._prompts),
+            "cache": self.get_cache_stats()
         }
+    
+    def configure_cache(self, config: CacheConfig) -> None:
+        """Substitui as políticas de cache (entradas atuais são descartadas)."""
+        self.server.cache = config
+        self._cache = MCPResultCache(config)
+    
+    def get_cache_stats(self) -> dict[str, dict]:
+        """Retorna estatísticas de cache por tool."""
+        return self._cache.get_stats()
 
 
 # Singleton registry para clients
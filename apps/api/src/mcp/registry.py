@@ -6,6 +6,7 @@ Centraliza:
 - Gerenciamento de conexões
 - Health checks
 - Métricas agregadas
+- Políticas de cache por tool
 """
 
 import asyncio
@@ -20,6 +21,7 @@ from .types import (
     ServerStatus, TransportType
 )
 from .client import MCPClient, get_mcp_client
+from .cache import CacheConfig, CachePolicy
 
 
 logger = logging.getLogger(__name__)
@@ -156,7 +158,8 @@ class MCPRegistry:
                     command=server_config.get("command"),
                     args=server_config.get("args", []),
                     env=server_config.get("env", {}),
-                    url=server_config.get("url")
+                    url=server_config.get("url"),
+                    cache=CacheConfig.from_dict(server_config.get("cache"))
                 )
                 
                 self._servers[server.id] = server
@@ -180,7 +183,8 @@ class MCPRegistry:
                     "command": server.command,
                     "args": server.args,
                     "env": server.env,
-                    "url": server.url
+                    "url": server.url,
+                    "cache": server.cache.to_dict()
                 }
                 for server in self._servers.values()
             ]
@@ -256,6 +260,43 @@ class MCPRegistry:
         
         return False
     
+    def set_cache_policy(
+        self,
+        server_id: str,
+        tool_name: str,
+        policy: Optional[CachePolicy]
+    ) -> bool:
+        """
+        Define (ou remove, com policy=None) a política de cache de uma tool.
+        
+        Args:
+            server_id: ID do server
+            tool_name: Nome da tool
+            policy: Política de cache
+            
+        Returns:
+            True se o server existe
+        """
+        server = self._servers.get(server_id)
+        if not server:
+            return False
+        
+        tools = dict(server.cache.tools)
+        if policy is None:
+            tools.pop(tool_name, None)
+        else:
+            tools[tool_name] = policy
+        
+        config = CacheConfig(tools=tools, resources=server.cache.resources)
+        
+        client = self._clients.get(server_id)
+        if client:
+            client.configure_cache(config)
+        else:
+            server.cache = config
+        
+        return True
+    
     def get_server(self, server_id: str) -> Optional[MCPServer]:
         """Retorna server por ID."""
         return self._servers.get(server_id)
@@ -550,9 +591,33 @@ class MCPRegistry:
             "prompts_total": len(self._all_prompts),
             "total_calls": total_calls,
             "failed_calls": failed_calls,
-            "success_rate": (total_calls - failed_calls) / max(total_calls, 1)
+            "success_rate": (total_calls - failed_calls) / max(total_calls, 1),
+            "cache": self.get_cache_metrics()
         }
     
+    def get_cache_metrics(self) -> dict[str, dict]:
+        """
+        Retorna métricas de cache agregadas por tool.
+        
+        Tools com o mesmo nome em servers diferentes são somadas.
+        """
+        totals: dict[str, dict] = {}
+        
+        for client in self._clients.values():
+            for tool_name, stats in client.get_cache_stats().items():
+                agg = totals.setdefault(tool_name, {
+                    "hits": 0, "misses": 0, "deduplicated": 0,
+                    "evictions": 0, "invalidations": 0, "size": 0
+                })
+                for key in agg:
+                    agg[key] += stats.get(key, 0)
+        
+        for agg in totals.values():
+            served = agg["hits"] + agg["deduplicated"]
+            agg["hit_rate"] = served / max(served + agg["misses"], 1)
+        
+        return totals
+    
     def get_server_metrics(self) -> list[dict]:
         """Retorna métricas por server."""
         metrics = []
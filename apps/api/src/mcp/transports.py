@@ -349,6 +349,11 @@ class SSETransport(Transport):
         self._sse_task: Optional[asyncio.Task] = None
         self._message_queue: asyncio.Queue[MCPMessage] = asyncio.Queue()
         self._pending_requests: dict[str, asyncio.Future] = {}
+        self._on_message: Optional[Callable[[MCPMessage], None]] = None
+    
+    def set_message_handler(self, handler: Callable[[MCPMessage], None]) -> None:
+        """Define handler para mensagens recebidas fora de requests pendentes."""
+        self._on_message = handler
     
     async def connect(self) -> None:
         """Estabelece conexão SSE."""
@@ -497,6 +502,9 @@ class SSETransport(Transport):
                                 # Colocar na fila geral
                                 await self._message_queue.put(message)
                                 
+                                if self._on_message:
+                                    self._on_message(message)
+                                
                         except json.JSONDecodeError:
                             logger.warning(f"Invalid SSE data: {data_str}")
                             
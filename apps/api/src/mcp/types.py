@@ -11,6 +11,8 @@ from typing import Optional, Any, Union, Literal
 from enum import Enum
 import uuid
 
+from .cache import CacheConfig
+
 
 class ServerStatus(str, Enum):
     """Status de conexão do server."""
@@ -139,6 +141,9 @@ class MCPServer:
     env: dict[str, str] = field(default_factory=dict)
     url: Optional[str] = None  # Para HTTP/SSE
     
+    # Cache opt-in de tools/resources idempotentes
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    
     # Estado
     status: ServerStatus = ServerStatus.DISCONNECTED
     capabilities: MCPCapabilities = field(default_factory=MCPCapabilities)
@@ -168,6 +173,7 @@ class MCPServer:
             "args": self.args,
             "env": self.env,
             "url": self.url,
+            "cache": self.cache.to_dict(),
             "status": self.status.value,
             "capabilities": self.capabilities.to_dict(),
             "icon": self.icon,
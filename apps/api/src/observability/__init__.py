@@ -19,6 +19,12 @@ from .metrics import (
     ERRORS,
 )
 
+from .http import (
+    HTTPMetrics,
+    RequestLog,
+    route_template,
+)
+
 from .logging import (
     get_logger,
     setup_logging,
@@ -42,6 +48,10 @@ __all__ = [
     "CACHE_HITS",
     "CACHE_MISSES",
     "ERRORS",
+    # HTTP
+    "HTTPMetrics",
+    "RequestLog",
+    "route_template",
     # Logging
     "get_logger",
     "setup_logging",
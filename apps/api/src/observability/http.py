@@ -0,0 +1,229 @@
+"""
+Métricas e log de requisições HTTP.
+
+Fornece:
+- Chave de métricas pelo template da rota ("/agents/{name}/run"), não
+  pelo path bruto: cardinalidade limitada ao número de rotas
+- Histogramas de latência com buckets fixos por rota
+- Exportação para o registry Prometheus (`metrics.track_request`)
+- Log estruturado por requisição opcional, amostrado e não bloqueante
+  (QueueHandler + QueueListener em thread própria)
+"""
+
+import json
+import logging
+import queue
+import random
+import threading
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from .metrics import track_request
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+OTHER_ROUTE = "<other>"
+
+DEFAULT_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Template da rota que atendeu a requisição (após o roteamento).
+
+    Requisições sem rota (404, interceptadas por middleware) são agrupadas
+    em UNMATCHED_ROUTE.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if not template:
+        # Rotas Starlette puras não registram "route", só o endpoint
+        endpoint = scope.get("endpoint")
+        name = getattr(endpoint, "__qualname__", None)
+        return f"<{name}>" if name else UNMATCHED_ROUTE
+    return scope.get("root_path", "") + template
+
+
+class _RouteStats:
+    __slots__ = ("count", "total_ms", "buckets", "statuses")
+
+    def __init__(self, n_buckets: int):
+        self.count = 0
+        self.total_ms = 0.0
+        self.buckets = [0] * (n_buckets + 1)  # último = +Inf
+        self.statuses: Dict[int, int] = {}
+
+
+class HTTPMetrics:
+    """
+    Agregados de requisições HTTP por template de rota.
+
+    A memória é limitada: no máximo `max_routes` chaves, incluindo
+    OTHER_ROUTE (que recebe o excedente), cada uma com um número fixo de
+    buckets.
+    """
+
+    def __init__(
+        self,
+        buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS,
+        max_routes: int = 256,
+        export_prometheus: bool = True
+    ):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self.max_routes = max_routes
+        self.export_prometheus = export_prometheus
+
+        self.requests = 0
+        self._per_status: Dict[int, int] = {}
+        self._routes: Dict[str, _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, status: int, duration_ms: float):
+        """Registra uma requisição."""
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                if len(self._routes) >= self.max_routes - 1:
+                    route = OTHER_ROUTE
+                    stats = self._routes.get(route)
+                if stats is None:
+                    stats = self._routes[route] = _RouteStats(len(self.buckets_ms))
+
+            self.requests += 1
+            self._per_status[status] = self._per_status.get(status, 0) + 1
+            stats.count += 1
+            stats.total_ms += duration_ms
+            stats.buckets[bisect_left(self.buckets_ms, duration_ms)] += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+        if self.export_prometheus:
+            track_request(method, route, status, duration_ms / 1000.0)
+
+    def _quantile(self, stats: _RouteStats, q: float) -> Optional[float]:
+        """Limite superior do bucket que contém o quantil q."""
+        if not stats.count:
+            return None
+        target = q * stats.count
+        seen = 0
+        for i, count in enumerate(stats.buckets):
+            seen += count
+            if seen >= target:
+                return float(self.buckets_ms[i]) if i < len(self.buckets_ms) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Agregados em formato JSON (compatível com o /metrics anterior)."""
+        with self._lock:
+            per_route = {}
+            for route, stats in self._routes.items():
+                cumulative = 0
+                buckets = {}
+                for le, count in zip(self.buckets_ms, stats.buckets):
+                    cumulative += count
+                    buckets[str(le)] = cumulative
+                buckets["+Inf"] = stats.count
+
+                per_route[route] = {
+                    "count": stats.count,
+                    "avg_ms": round(stats.total_ms / stats.count, 2) if stats.count else 0.0,
+                    "p50_ms": self._quantile(stats, 0.5),
+                    "p95_ms": self._quantile(stats, 0.95),
+                    "buckets_ms": buckets,
+                }
+
+            return {
+                "requests": self.requests,
+                "per_route": per_route,
+                "per_status": dict(self._per_status),
+                "per_route_status": {
+                    route: dict(stats.statuses) for route, stats in self._routes.items()
+                },
+            }
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """QueueHandler que descarta registros quando a fila está cheia."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestLog:
+    """
+    Log estruturado por requisição.
+
+    O registro é enfileirado e escrito pelos handlers do logger original
+    em uma thread (QueueListener), sem I/O no event loop. Com
+    `sample_rate` < 1 apenas uma fração das requisições é registrada;
+    erros (5xx) e rate limit (429) são sempre registrados.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rate: float = 1.0,
+        enabled: bool = True,
+        max_queue: int = 10000
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+
+        handlers = list(logger.handlers) or list(logging.getLogger().handlers)
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._handler = _DroppingQueueHandler(self._queue)
+
+        self._logger = logging.getLogger(f"{logger.name}.requests")
+        self._logger.setLevel(logger.getEffectiveLevel())
+        self._logger.propagate = False
+        self._logger.handlers = [self._handler]
+
+        self._listener = QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+    @property
+    def dropped(self) -> int:
+        """Registros descartados por fila cheia."""
+        return self._handler.dropped
+
+    def log(self, fields: Dict[str, Any]):
+        """Registra uma requisição (respeitando habilitação e amostragem)."""
+        if not self.enabled:
+            return
+        status = fields.get("status", 0)
+        forced = status >= 500 or status == 429
+        if not forced and self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._logger.info(json.dumps(fields, default=str))
+
+    def close(self):
+        """Esvazia a fila e para a thread de escrita (idempotente)."""
+        if self._listener._thread is not None:
+            self._listener.stop()
+
+    def close_on_shutdown(self, app: Any):
+        """
+        Para a thread de escrita no encerramento da app (lifespan).
+
+        Envolve o lifespan existente, de modo que os hooks de startup e
+        shutdown já registrados continuam valendo.
+        """
+        lifespan_context = app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app_: Any):
+            try:
+                async with lifespan_context(app_) as state:
+                    yield state
+            finally:
+                self.close()
+
+        app.router.lifespan_context = lifespan
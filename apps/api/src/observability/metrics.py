@@ -9,6 +9,7 @@ Fornece:
 """
 
 import time
+from bisect import bisect_left
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
 from collections import defaultdict
@@ -104,8 +105,9 @@ class Histogram:
         self.name = name
         self.description = description
         self.label_names = labels or []
-        self.buckets = buckets or self.DEFAULT_BUCKETS
-        self._counts: Dict[tuple, Dict[float, int]] = defaultdict(lambda: defaultdict(int))
+        self.buckets = tuple(sorted(buckets or self.DEFAULT_BUCKETS))
+        # Contagem por bucket (não cumulativa; acumulada no collect)
+        self._counts: Dict[tuple, list] = {}
         self._sums: Dict[tuple, float] = defaultdict(float)
         self._totals: Dict[tuple, int] = defaultdict(int)
         self._lock = threading.Lock()
@@ -113,12 +115,14 @@ class Histogram:
     def observe(self, value: float, **labels):
         """Registra uma observação."""
         key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
         with self._lock:
             self._sums[key] += value
             self._totals[key] += 1
-            for bucket in self.buckets:
-                if value <= bucket:
-                    self._counts[key][bucket] += 1
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
     
     def collect(self) -> Dict[str, Any]:
         """Coleta estatísticas."""
@@ -132,8 +136,10 @@ class Histogram:
                 result[f"{prefix}_count"] = self._totals[key]
                 result[f"{prefix}_sum"] = self._sums[key]
                 
-                for bucket in self.buckets:
-                    result[f"{prefix}_bucket{{le=\"{bucket}\"}}"] = self._counts[key].get(bucket, 0)
+                cumulative = 0
+                for bucket, count in zip(self.buckets, self._counts[key]):
+                    cumulative += count
+                    result[f"{prefix}_bucket{{le=\"{bucket}\"}}"] = cumulative
                 result[f"{prefix}_bucket{{le=\"+Inf\"}}"] = self._totals[key]
         
         return result
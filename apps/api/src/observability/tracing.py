@@ -16,8 +16,15 @@ Arquitetura:
 │  │ - Span ID   │  │ - Process   │  │ - OpenTel   │         │
 │  │ - Baggage   │  │ - Export    │  │ - Custom    │         │
 │  └─────────────┘  └─────────────┘  └─────────────┘         │
+│         ↑                ↑                                   │
+│   contextvars      Simple / Batch / TailSampling             │
 └─────────────────────────────────────────────────────────────┘
 
+O span atual é propagado via `contextvars`, então tasks asyncio
+concorrentes mantêm cadeias de parent independentes. Spans finalizados
+passam por SpanProcessors: `BatchSpanProcessor` exporta em background
+com fila limitada, e samplers (head e tail) reduzem o volume exportado.
+
 Uso:
 ```python
 from observability.tracing import Tracer, span
@@ -34,15 +41,25 @@ with tracer.start_span("agent_execution") as span:
 @span("tool_call")
 async def execute_tool(name: str, args: dict):
     ...
+
+# Export em background + sampling
+tracer = Tracer(
+    processors=[BatchSpanProcessor(JsonlSpanExporter("traces.jsonl"))],
+    sampler=TraceIdRatioSampler(0.1)
+)
 ```
 """
 
 import asyncio
+from collections import OrderedDict, deque
 from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Any, Dict, List, Callable
+from typing import Optional, Any, Dict, List, Callable, Deque, IO
 from enum import Enum
+import os
+import random
 import uuid
 import json
 import logging
@@ -77,12 +94,16 @@ class SpanContext:
     parent_span_id: Optional[str] = None
     baggage: Dict[str, str] = field(default_factory=dict)
     
+    # Decisão de head sampling, herdada pelos spans filhos
+    sampled: bool = True
+    
     def to_dict(self) -> dict:
         return {
             "trace_id": self.trace_id,
             "span_id": self.span_id,
             "parent_span_id": self.parent_span_id,
-            "baggage": self.baggage
+            "baggage": self.baggage,
+            "sampled": self.sampled
         }
     
     @classmethod
@@ -91,7 +112,8 @@ class SpanContext:
             trace_id=data.get("trace_id", ""),
             span_id=data.get("span_id", ""),
             parent_span_id=data.get("parent_span_id"),
-            baggage=data.get("baggage", {})
+            baggage=data.get("baggage", {}),
+            sampled=data.get("sampled", True)
         )
 
 
@@ -295,16 +317,44 @@ class ConsoleSpanExporter(SpanExporter):
                     print(f"    {key}: {value}")
 
 
-class FileSpanExporter(SpanExporter):
-    """Exporta spans para arquivo JSON."""
+class JsonlSpanExporter(SpanExporter):
+    """
+    Exporta spans para arquivo JSONL.
     
-    def __init__(self, file_path: str = "traces.jsonl"):
+    Mantém um único handle bufferizado aberto (em vez de reabrir o
+    arquivo a cada span) e faz flush ao final de cada lote.
+    """
+    
+    def __init__(self, file_path: str = "traces.jsonl", buffer_size: int = 64 * 1024):
         self.file_path = file_path
+        self.buffer_size = buffer_size
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+    
+    def _get_file(self) -> IO[str]:
+        if self._file is None or self._file.closed:
+            directory = os.path.dirname(self.file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.file_path, "a", buffering=self.buffer_size, encoding="utf-8")
+        return self._file
     
     def export(self, spans: List[Span]) -> None:
-        with open(self.file_path, "a") as f:
-            for span in spans:
-                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            f = self._get_file()
+            f.write(lines)
+            f.flush()
+    
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+            self._file = None
+
+
+# Compatibilidade: FileSpanExporter sempre gravou JSON Lines
+FileSpanExporter = JsonlSpanExporter
 
 
 class InMemorySpanExporter(SpanExporter):
@@ -359,8 +409,243 @@ class InMemorySpanExporter(SpanExporter):
             self.spans.clear()
 
 
-# Thread-local para contexto atual
-_current_context = threading.local()
+# ==================== Processors ====================
+
+
+class SpanProcessor:
+    """
+    Base class para processadores de spans.
+    
+    Recebe spans no início e no fim e decide quando exportá-los.
+    """
+    
+    def on_start(self, span: Span) -> None:
+        """Chamado quando um span é iniciado."""
+        pass
+    
+    def on_end(self, span: Span) -> None:
+        """Chamado quando um span é finalizado."""
+        raise NotImplementedError
+    
+    def force_flush(self, timeout: float = 30.0) -> bool:
+        """Exporta spans pendentes."""
+        return True
+    
+    def shutdown(self) -> None:
+        """Finaliza processador."""
+        pass
+
+
+class SimpleSpanProcessor(SpanProcessor):
+    """Exporta cada span de forma síncrona ao finalizar."""
+    
+    def __init__(self, exporter: SpanExporter):
+        self.exporter = exporter
+    
+    def on_end(self, span: Span) -> None:
+        try:
+            self.exporter.export([span])
+        except Exception as e:
+            logger.error(f"Failed to export span: {e}")
+    
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor(SpanProcessor):
+    """
+    Exporta spans em lotes a partir de uma thread em background.
+    
+    `on_end` apenas enfileira o span (O(1), sem I/O). A fila é limitada:
+    quando cheia, novos spans são descartados e contabilizados em
+    `dropped_spans`, para que o tracing nunca bloqueie o hot path.
+    """
+    
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_ms: float = 1000
+    ):
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_export_batch_size = max_export_batch_size
+        self.schedule_delay = schedule_delay_ms / 1000
+        
+        self._queue: Deque[Span] = deque()
+        self._condition = threading.Condition(threading.Lock())
+        self._export_lock = threading.Lock()
+        self._shutdown = False
+        
+        # Métricas
+        self.dropped_spans = 0
+        self.exported_spans = 0
+        
+        self._worker = threading.Thread(
+            target=self._run, name="BatchSpanProcessor", daemon=True
+        )
+        self._worker.start()
+    
+    def on_end(self, span: Span) -> None:
+        if self._shutdown:
+            return
+        
+        # deque.append é thread-safe; o lock só é tomado para acordar o worker
+        if len(self._queue) >= self.max_queue_size:
+            self.dropped_spans += 1
+            return
+        
+        self._queue.append(span)
+        
+        if len(self._queue) >= self.max_export_batch_size:
+            with self._condition:
+                self._condition.notify()
+    
+    def _run(self) -> None:
+        while not self._shutdown:
+            with self._condition:
+                if len(self._queue) < self.max_export_batch_size:
+                    self._condition.wait(self.schedule_delay)
+            self._export_pending()
+    
+    def _export_pending(self) -> None:
+        with self._export_lock:
+            while self._queue:
+                batch: List[Span] = []
+                while self._queue and len(batch) < self.max_export_batch_size:
+                    batch.append(self._queue.popleft())
+                
+                try:
+                    self.exporter.export(batch)
+                    self.exported_spans += len(batch)
+                except Exception as e:
+                    logger.error(f"Failed to export span batch: {e}")
+    
+    def force_flush(self, timeout: float = 30.0) -> bool:
+        self._export_pending()
+        return not self._queue
+    
+    def shutdown(self) -> None:
+        if self._shutdown:
+            return
+        self._shutdown = True
+        with self._condition:
+            self._condition.notify()
+        self._worker.join(timeout=5)
+        self._export_pending()
+        self.exporter.shutdown()
+
+
+class TailSamplingProcessor(SpanProcessor):
+    """
+    Tail-based sampling por trace.
+    
+    Mantém os spans de cada trace em buffer até o span raiz terminar e
+    então decide se o trace inteiro é repassado ao processador delegado:
+    traces com erro ou mais lentos que `latency_threshold_ms` são sempre
+    mantidos; os demais, com probabilidade `sample_ratio`.
+    """
+    
+    def __init__(
+        self,
+        delegate: SpanProcessor,
+        sample_ratio: float = 0.1,
+        latency_threshold_ms: Optional[float] = 1000,
+        keep_errors: bool = True,
+        max_traces: int = 10000
+    ):
+        self.delegate = delegate
+        self.sample_ratio = sample_ratio
+        self.latency_threshold_ms = latency_threshold_ms
+        self.keep_errors = keep_errors
+        self.max_traces = max_traces
+        
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+        
+        # Métricas
+        self.kept_traces = 0
+        self.dropped_traces = 0
+    
+    def _should_keep(self, spans: List[Span], root: Span) -> bool:
+        if self.keep_errors and any(s.status == SpanStatus.ERROR for s in spans):
+            return True
+        if self.latency_threshold_ms is not None and root.duration_ms >= self.latency_threshold_ms:
+            return True
+        return random.random() < self.sample_ratio
+    
+    def on_end(self, span: Span) -> None:
+        trace_id = span.context.trace_id
+        
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            if spans is None:
+                spans = self._traces[trace_id] = []
+                # Traces que nunca terminam são descartados (memória limitada)
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+                    self.dropped_traces += 1
+            spans.append(span)
+            
+            if span.context.parent_span_id is not None:
+                return
+            
+            del self._traces[trace_id]
+        
+        if self._should_keep(spans, span):
+            self.kept_traces += 1
+            for s in spans:
+                self.delegate.on_end(s)
+        else:
+            self.dropped_traces += 1
+    
+    def force_flush(self, timeout: float = 30.0) -> bool:
+        return self.delegate.force_flush(timeout)
+    
+    def shutdown(self) -> None:
+        self.delegate.shutdown()
+
+
+# ==================== Samplers ====================
+
+
+class Sampler:
+    """Base class para head samplers (decisão na criação do trace)."""
+    
+    def should_sample(self, trace_id: str, name: str) -> bool:
+        raise NotImplementedError
+
+
+class AlwaysOnSampler(Sampler):
+    """Grava todos os traces."""
+    
+    def should_sample(self, trace_id: str, name: str) -> bool:
+        return True
+
+
+class TraceIdRatioSampler(Sampler):
+    """
+    Grava uma fração determinística dos traces com base no trace_id.
+    
+    Serviços diferentes com a mesma razão tomam a mesma decisão para o
+    mesmo trace.
+    """
+    
+    def __init__(self, ratio: float):
+        self.ratio = max(0.0, min(1.0, ratio))
+        self._bound = int(self.ratio * (1 << 64))
+    
+    def should_sample(self, trace_id: str, name: str) -> bool:
+        try:
+            value = int(trace_id[:16], 16)
+        except ValueError:
+            value = hash(trace_id) & ((1 << 64) - 1)
+        return value < self._bound
+
+
+# Span atual do contexto (contextvars: isolado por task asyncio e por thread)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
 
 
 class Tracer:
@@ -384,21 +669,53 @@ class Tracer:
     def __init__(
         self,
         service_name: str = "agno",
-        exporters: Optional[List[SpanExporter]] = None
+        exporters: Optional[List[SpanExporter]] = None,
+        processors: Optional[List[SpanProcessor]] = None,
+        sampler: Optional[Sampler] = None
     ):
         self.service_name = service_name
-        self.exporters = exporters or [InMemorySpanExporter()]
+        
+        # Exporters avulsos são exportados de forma síncrona (SimpleSpanProcessor)
+        if not exporters and not processors:
+            exporters = [InMemorySpanExporter()]
+        self.exporters: List[SpanExporter] = list(exporters or [])
+        self.processors: List[SpanProcessor] = [
+            SimpleSpanProcessor(e) for e in self.exporters
+        ] + list(processors or [])
+        self.sampler: Sampler = sampler or AlwaysOnSampler()
         
         # Traces ativos
         self._active_traces: Dict[str, Trace] = {}
+        
+        # Overhead acumulado de tracing (criação + processamento de spans)
+        self.spans_started = 0
+        self.overhead_ns = 0
     
     def _generate_id(self) -> str:
         """Gera ID único."""
-        return str(uuid.uuid4()).replace("-", "")[:16]
+        return os.urandom(8).hex()
+    
+    def _new_context(self, parent_context: Optional[SpanContext], name: str) -> SpanContext:
+        """Cria contexto filho de `parent_context`, ou raiz com decisão de sampling."""
+        if parent_context:
+            return SpanContext(
+                trace_id=parent_context.trace_id,
+                span_id=self._generate_id(),
+                parent_span_id=parent_context.span_id,
+                baggage=parent_context.baggage.copy(),
+                sampled=parent_context.sampled
+            )
+        
+        trace_id = self._generate_id()
+        return SpanContext(
+            trace_id=trace_id,
+            span_id=self._generate_id(),
+            sampled=self.sampler.should_sample(trace_id, name)
+        )
     
     def get_current_span(self) -> Optional[Span]:
         """Obtém span atual do contexto."""
-        return getattr(_current_context, "span", None)
+        return _current_span.get()
     
     def get_current_context(self) -> Optional[SpanContext]:
         """Obtém contexto atual."""
@@ -425,35 +742,25 @@ class Tracer:
         Yields:
             Span ativo
         """
-        # Contexto pai
-        parent_context = self.get_current_context()
+        started = time.perf_counter_ns()
         
-        # Criar contexto do span
-        if parent_context:
-            context = SpanContext(
-                trace_id=parent_context.trace_id,
-                span_id=self._generate_id(),
-                parent_span_id=parent_context.span_id,
-                baggage=parent_context.baggage.copy()
-            )
-        else:
-            context = SpanContext(
-                trace_id=self._generate_id(),
-                span_id=self._generate_id()
-            )
-        
-        # Criar span
+        # Criar span como filho do span atual
         span = Span(
             name=name,
-            context=context,
+            context=self._new_context(self.get_current_context(), name),
             kind=kind,
             attributes=attributes or {},
             links=links or []
         )
         
+        if span.context.sampled:
+            for processor in self.processors:
+                processor.on_start(span)
+        
         # Definir como span atual
-        previous_span = getattr(_current_context, "span", None)
-        _current_context.span = span
+        token = _current_span.set(span)
+        self.spans_started += 1
+        self.overhead_ns += time.perf_counter_ns() - started
         
         try:
             yield span
@@ -463,15 +770,27 @@ class Tracer:
             span.record_exception(e)
             raise
         finally:
+            finished = time.perf_counter_ns()
             span.end()
-            _current_context.span = previous_span
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Span encerrado em outro contexto (ex: outra task)
+                _current_span.set(None)
             
-            # Exportar
-            for exporter in self.exporters:
-                try:
-                    exporter.export([span])
-                except Exception as e:
-                    logger.error(f"Failed to export span: {e}")
+            self._on_end(span)
+            self.overhead_ns += time.perf_counter_ns() - finished
+    
+    def _on_end(self, span: Span) -> None:
+        """Repassa span finalizado aos processors (se amostrado)."""
+        if not span.context.sampled:
+            return
+        
+        for processor in self.processors:
+            try:
+                processor.on_end(span)
+            except Exception as e:
+                logger.error(f"Failed to process span: {e}")
     
     @asynccontextmanager
     async def start_async_span(
@@ -489,23 +808,32 @@ class Tracer:
         name: str,
         kind: SpanKind = SpanKind.INTERNAL
     ) -> Span:
-        """Cria span sem context manager."""
-        parent_context = self.get_current_context()
-        
-        if parent_context:
-            context = SpanContext(
-                trace_id=parent_context.trace_id,
-                span_id=self._generate_id(),
-                parent_span_id=parent_context.span_id
-            )
-        else:
-            context = SpanContext(
-                trace_id=self._generate_id(),
-                span_id=self._generate_id()
-            )
-        
+        """Cria span sem context manager (use `end_span` para exportá-lo)."""
+        context = self._new_context(self.get_current_context(), name)
         return Span(name=name, context=context, kind=kind)
     
+    def end_span(self, span: Span) -> None:
+        """Finaliza span criado com `create_span` e o repassa aos processors."""
+        span.end()
+        self._on_end(span)
+    
+    def force_flush(self, timeout: float = 30.0) -> bool:
+        """Exporta spans pendentes em todos os processors."""
+        return all(p.force_flush(timeout) for p in self.processors)
+    
+    def shutdown(self) -> None:
+        """Finaliza processors e exporters."""
+        for processor in self.processors:
+            processor.shutdown()
+    
+    def get_overhead_stats(self) -> Dict[str, float]:
+        """Retorna o overhead médio de tracing por span."""
+        return {
+            "spans_started": self.spans_started,
+            "overhead_ms_total": self.overhead_ns / 1e6,
+            "overhead_us_per_span": self.overhead_ns / 1e3 / max(self.spans_started, 1)
+        }
+    
     def get_memory_exporter(self) -> Optional[InMemorySpanExporter]:
         """Obtém exportador em memória se existir."""
         for exp in self.exporters:
@@ -561,19 +889,26 @@ def get_tracer() -> Tracer:
     global _tracer
     if _tracer is None:
         _tracer = Tracer(
-            exporters=[
-                InMemorySpanExporter(max_spans=10000),
-                ConsoleSpanExporter(verbose=False)
-            ]
+            exporters=[InMemorySpanExporter(max_spans=10000)],
+            processors=[BatchSpanProcessor(ConsoleSpanExporter(verbose=False))]
         )
     return _tracer
 
 
 def configure_tracer(
     service_name: str = "agno",
-    exporters: Optional[List[SpanExporter]] = None
+    exporters: Optional[List[SpanExporter]] = None,
+    processors: Optional[List[SpanProcessor]] = None,
+    sampler: Optional[Sampler] = None
 ) -> Tracer:
     """Configura o tracer global."""
     global _tracer
-    _tracer = Tracer(service_name=service_name, exporters=exporters)
+    if _tracer is not None:
+        _tracer.shutdown()
+    _tracer = Tracer(
+        service_name=service_name,
+        exporters=exporters,
+        processors=processors,
+        sampler=sampler
+    )
     return _tracer
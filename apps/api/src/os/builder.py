@@ -1,10 +1,9 @@
 from typing import List, Optional, Dict
 import time
-from collections import deque
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 from agno.os import AgentOS
@@ -14,6 +13,10 @@ from agno.team import Team
 from src.agents import BaseAgent
 from src.config import get_settings
 from src.hitl.repo import get_repo
+from src.os.execution import offload, get_run_pool
+from src.os.middleware.rate_limit import create_rate_limit_dependency, get_rate_limiter
+from src.observability.http import HTTPMetrics, RequestLog, route_template
+from src.observability.metrics import get_metrics_text
 from src.auth.deps import is_auth_enabled, get_current_user, create_access_token
 from src.storage.service import get_storage
 from src.utils.logger import get_logger
@@ -125,55 +128,8 @@ def _setup_security_and_rate_limit(router: APIRouter):
         router.dependencies.append(Depends(_basic_auth))
 
     if settings.RATE_LIMIT_ENABLED:
-        window = getattr(settings, "RATE_LIMIT_WINDOW_SECONDS", 60)
-        buckets: Dict[str, deque] = {}
-
-        def _route_group(path: str) -> str:
-            if path.startswith("/rag/query"):
-                return "rag_query"
-            if path.startswith("/rag/ingest"):
-                return "rag_ingest"
-            if path.startswith("/auth/"):
-                return "auth"
-            if path.startswith("/teams/"):
-                return "teams"
-            if path.startswith("/workflows/"):
-                return "workflows"
-            return "default"
-
-        def _limit_for(group: str) -> int:
-            if group == "rag_query":
-                return getattr(settings, "RATE_LIMIT_RAG_QUERY", 60)
-            if group == "rag_ingest":
-                return getattr(settings, "RATE_LIMIT_RAG_INGEST", 10)
-            if group == "auth":
-                return getattr(settings, "RATE_LIMIT_AUTH", 30)
-            if group in ("teams", "workflows"):
-                return getattr(settings, "RATE_LIMIT_AGENTICS", 30)
-            return getattr(settings, "RATE_LIMIT_DEFAULT", 120)
-
-        def _rate_limit(request: Request):
-            now = time.time()
-            path = request.url.path
-            group = _route_group(path)
-            limit = _limit_for(group)
-            auth = request.headers.get("authorization", "")
-            key = None
-            if auth.lower().startswith("bearer "):
-                key = auth.split(" ", 1)[1].strip()
-            if not key:
-                key = request.client.host if request.client else "unknown"
-            bucket_key = f"{group}:{key}"
-            dq = buckets.setdefault(bucket_key, deque())
-            while dq and (now - dq[0]) > window:
-                dq.popleft()
-            if len(dq) >= limit:
-                retry_after = max(1, int(window - (now - dq[0]))) if dq else window
-                raise HTTPException(status_code=429, detail="Rate limit exceeded", headers={"Retry-After": str(retry_after)})
-            dq.append(now)
-            return True
-
-        router.dependencies.append(Depends(_rate_limit))
+        # Limiter compartilhado (memória com LRU ou Redis entre workers)
+        router.dependencies.append(Depends(create_rate_limit_dependency(get_rate_limiter())))
 
 
 def get_app():
@@ -959,7 +915,11 @@ def get_app():
         except Exception:
             raise HTTPException(status_code=503, detail="RAG não habilitado. Instale o extra: pip install -e .[rag]")
         rag = get_rag_service()
-        res = rag.add_texts(collection=req.collection, texts=req.texts, metadatas=req.metadatas)
+        # Embeddings + Chroma são síncronos: executar fora do event loop
+        res = await offload(
+            "rag:ingest", rag.add_texts,
+            collection=req.collection, texts=req.texts, metadatas=req.metadatas
+        )
         return res
 
     @rag_router.post("/query")
@@ -969,7 +929,11 @@ def get_app():
         except Exception:
             raise HTTPException(status_code=503, detail="RAG não habilitado. Instale o extra: pip install -e .[rag]")
         rag = get_rag_service()
-        res = rag.query(collection=req.collection, query_text=req.query_text, top_k=req.top_k or 5)
+        res = await offload(
+            "rag:query", rag.query,
+            collection=req.collection, query_text=req.query_text, top_k=req.top_k or 5,
+            limit=get_run_pool().max_workers
+        )
         return {"results": res}
 
     class IngestUrlsRequest(BaseModel):
@@ -1013,7 +977,7 @@ def get_app():
             payload.append((f.filename, data))
         if not payload:
             return {"added": 0}
-        res = rag.ingest_files(collection=collection, files=payload)
+        res = await offload("rag:ingest", rag.ingest_files, collection=collection, files=payload)
         return res
 
     # RAG: gestão de coleções e documentos (se suportado pelo backend RAG)
@@ -1178,13 +1142,18 @@ def get_app():
         ag = agents_map.get(name)
         if not ag:
             raise HTTPException(status_code=404, detail="Agent not found")
-        ag.run(req.prompt)
-        _out = None
-        try:
-            _out = ag.get_last_run_output()
-        except Exception:
+
+        def _run() -> str:
+            # run + leitura da saída na mesma thread (o Agent guarda o último run)
+            ag.run(req.prompt)
             _out = None
-        out_text = (_out.get("content") if isinstance(_out, dict) else getattr(_out, "content", None)) or ""
+            try:
+                _out = ag.get_last_run_output()
+            except Exception:
+                _out = None
+            return (_out.get("content") if isinstance(_out, dict) else getattr(_out, "content", None)) or ""
+
+        out_text = await offload(f"agent:{name}", _run)
         return {"agent": name, "output": out_text}
 
     @agents_router.delete("/{name}")
@@ -1203,23 +1172,27 @@ def get_app():
     app.include_router(agents_router)
 
     # Métricas middleware e endpoint
+    # Chaveadas pelo template da rota (cardinalidade limitada), com
+    # histogramas de latência e exportação Prometheus
     if not hasattr(app.state, "metrics"):
-        app.state.metrics = {
-            "requests": 0,
-            "per_route": {},           # {route: {count, total_ms}}
-            "per_status": {},          # {status: count}
-            "per_route_status": {},    # {route: {status: count}}
-        }
+        app.state.metrics = HTTPMetrics()
+
+    # Log estruturado por requisição: opcional, amostrado e escrito em
+    # thread própria (QueueHandler) para não bloquear o event loop
+    if getattr(app.state, "logger", None) and not hasattr(app.state, "request_log"):
+        settings = get_settings()
+        app.state.request_log = RequestLog(
+            app.state.logger,
+            sample_rate=getattr(settings, "REQUEST_LOG_SAMPLE_RATE", 1.0),
+            enabled=getattr(settings, "REQUEST_LOG_ENABLED", True),
+        )
+        app.state.request_log.close_on_shutdown(app)
 
     @app.middleware("http")
     async def metrics_middleware(request: Request, call_next):
-        start = time.time()
+        start = time.perf_counter()
         req_id = request.headers.get("x-request-id") or uuid.uuid4().hex
         method = request.method
-        path = request.url.path
-        ip = request.client.host if request.client else "unknown"
-        ua = request.headers.get("user-agent", "-")
-        auth_present = bool(request.headers.get("authorization"))
 
         response = None
         try:
@@ -1233,7 +1206,7 @@ def get_app():
             response = await call_next(request)
             return response
         finally:
-            dur = (time.time() - start) * 1000.0
+            dur = (time.perf_counter() - start) * 1000.0
             status_code = getattr(response, "status_code", 500) if response else 500
             try:
                 if response is not None:
@@ -1241,55 +1214,46 @@ def get_app():
             except Exception:
                 pass
 
-            # Atualizar métricas
-            m = app.state.metrics
-            m["requests"] += 1
-            pr = m["per_route"].setdefault(path, {"count": 0, "total_ms": 0.0})
-            pr["count"] += 1
-            pr["total_ms"] += dur
-            m["per_status"][status_code] = m["per_status"].get(status_code, 0) + 1
-            prs = m["per_route_status"].setdefault(path, {})
-            prs[status_code] = prs.get(status_code, 0) + 1
+            # Atualizar métricas (template disponível após o roteamento)
+            route = route_template(request.scope)
+            app.state.metrics.record(method, route, status_code, dur)
 
             # Log estruturado por requisição
-            logger = getattr(app.state, "logger", None)
-            if logger:
+            request_log = getattr(app.state, "request_log", None)
+            if request_log and request_log.enabled:
                 try:
-                    logger.info(
+                    request_log.log(
                         {
                             "event": "request",
                             "id": req_id,
                             "method": method,
-                            "path": path,
+                            "path": request.url.path,
+                            "route": route,
                             "status": status_code,
                             "duration_ms": round(dur, 2),
-                            "ip": ip,
-                            "user_agent": ua,
-                            "authenticated": auth_present,
+                            "ip": request.client.host if request.client else "unknown",
+                            "user_agent": request.headers.get("user-agent", "-"),
+                            "authenticated": bool(request.headers.get("authorization")),
                             "rate_limited": bool(status_code == 429),
                         }
                     )
                 except Exception:
-                    # Se o logger não suportar objetos, serialize como string
-                    try:
-                        logger.info(f"event=request id={req_id} method={method} path={path} status={status_code} duration_ms={round(dur,2)} ip={ip} auth={auth_present}")
-                    except Exception:
-                        pass
+                    pass
 
     metrics_router = APIRouter(prefix="/metrics", tags=["metrics"]) 
 
     @metrics_router.get("")
     async def metrics_get():
-        per_route = {}
-        for k, v in app.state.metrics["per_route"].items():
-            avg = (v["total_ms"] / v["count"]) if v["count"] else 0.0
-            per_route[k] = {"count": v["count"], "avg_ms": round(avg, 2)}
-        return {
-            "requests": app.state.metrics["requests"],
-            "per_route": per_route,
-            "per_status": app.state.metrics.get("per_status", {}),
-            "per_route_status": app.state.metrics.get("per_route_status", {}),
-        }
+        snapshot = app.state.metrics.snapshot()
+        snapshot["run_pool"] = get_run_pool().stats()
+        return snapshot
+
+    @metrics_router.get("/prometheus")
+    async def metrics_prometheus():
+        return PlainTextResponse(
+            content=get_metrics_text(),
+            media_type="text/plain; version=0.0.4; charset=utf-8"
+        )
 
     app.include_router(metrics_router)
 
@@ -0,0 +1,253 @@
+"""
+Execução de chamadas bloqueantes (agentes, RAG) fora do event loop.
+
+`Agent.run` e o RagService (Chroma + embeddings) são síncronos; chamados
+direto em rotas `async def` congelam o loop do uvicorn para todos os
+clientes. Este módulo fornece um pool de threads limitado com:
+- Limite de concorrência por chave (ex: um agente)
+- Limite de fila (excedente recebe 503)
+- Timeout por requisição (504)
+- Métricas de fila e execução
+
+Exemplo:
+    pool = get_run_pool()
+    text = await pool.run("agent:Researcher", agent.run, prompt, limit=1)
+
+    # Em rotas, `offload` converte saturação/timeout em HTTPException
+    text = await offload("agent:Researcher", agent.run, prompt, limit=1)
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+
+class PoolSaturatedError(Exception):
+    """Fila de execução cheia."""
+    pass
+
+
+@dataclass
+class _KeyStats:
+    running: int = 0
+    waiting: int = 0
+    completed: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+
+
+class BlockingRunPool:
+    """
+    Pool limitado para chamadas síncronas longas.
+
+    O timeout libera a requisição, mas a thread só é liberada quando a
+    chamada termina (threads não podem ser interrompidas); por isso o
+    slot da chave continua ocupado até lá, mantendo o limite real.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_key_limit: int = 1,
+        timeout: Optional[float] = 120.0,
+        max_queue: int = 200
+    ):
+        self.max_workers = max_workers
+        self.per_key_limit = per_key_limit
+        self.timeout = timeout
+        self.max_queue = max_queue
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="run-pool")
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _KeyStats] = {}
+        self._waiting = 0
+        self._running = 0
+        self._rejected = 0
+
+        # Semáforos são de um event loop; recriados se o loop mudar
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _semaphore(self, key: str, limit: int) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphores = {}
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _key_stats(self, key: str) -> _KeyStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _KeyStats()
+        return stats
+
+    async def run(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args,
+        limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> Any:
+        """
+        Executa `fn(*args, **kwargs)` em thread do pool.
+
+        Args:
+            key: Chave de concorrência (ex: "agent:Researcher", "rag:query")
+            fn: Função síncrona
+            limit: Execuções simultâneas para a chave (default: per_key_limit)
+            timeout: Segundos até desistir, contando a espera (default: self.timeout)
+
+        Raises:
+            PoolSaturatedError: fila cheia
+            TimeoutError: timeout excedido
+        """
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise PoolSaturatedError(f"Fila de execução cheia ({self._waiting} aguardando)")
+            self._waiting += 1
+            stats = self._key_stats(key)
+            stats.waiting += 1
+
+        semaphore = self._semaphore(key, limit or self.per_key_limit)
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        state = {"started": False, "abandoned": False}
+
+        def call():
+            with self._lock:
+                if state["abandoned"]:
+                    # Requisição desistiu antes da thread começar
+                    return None
+                state["started"] = True
+                self._waiting -= 1
+                self._running += 1
+                stats.waiting -= 1
+                stats.running += 1
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    stats.running -= 1
+                    stats.total_ms += (time.perf_counter() - start) * 1000
+
+        future = None
+        try:
+            async with asyncio.timeout(timeout):
+                await semaphore.acquire()
+                try:
+                    future = self._executor.submit(call)
+                except BaseException:
+                    semaphore.release()
+                    raise
+                # O slot é liberado quando a thread termina, não no timeout
+                future.add_done_callback(lambda _: self._release(loop, semaphore))
+                result = await asyncio.shield(asyncio.wrap_future(future))
+        except BaseException as e:
+            with self._lock:
+                if not state["started"]:
+                    state["abandoned"] = True
+                    self._waiting -= 1
+                    stats.waiting -= 1
+                if isinstance(e, TimeoutError):
+                    stats.timeouts += 1
+                elif state["started"]:
+                    stats.failed += 1
+            if future is not None:
+                future.cancel()
+            raise
+
+        with self._lock:
+            stats.completed += 1
+        return result
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+        try:
+            loop.call_soon_threadsafe(semaphore.release)
+        except RuntimeError:
+            # Loop já encerrado
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Métricas do pool: fila, execuções e contadores por chave."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queued": self._waiting,
+                "rejected": self._rejected,
+                "per_key": {
+                    key: {
+                        "running": s.running,
+                        "queued": s.waiting,
+                        "completed": s.completed,
+                        "failed": s.failed,
+                        "timeouts": s.timeouts,
+                        "avg_ms": round(s.total_ms / max(s.completed + s.failed, 1), 2)
+                    }
+                    for key, s in self._stats.items()
+                }
+            }
+
+    def shutdown(self, wait: bool = False):
+        """Encerra o pool."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Singleton
+_run_pool: Optional[BlockingRunPool] = None
+
+
+def get_run_pool() -> BlockingRunPool:
+    """Obtém o pool global (configurado por RUN_POOL_* nas settings)."""
+    global _run_pool
+    if _run_pool is None:
+        from src.config import get_settings
+
+        settings = get_settings()
+        _run_pool = BlockingRunPool(
+            max_workers=getattr(settings, "RUN_POOL_WORKERS", 16),
+            per_key_limit=getattr(settings, "RUN_POOL_PER_AGENT", 1),
+            timeout=getattr(settings, "RUN_POOL_TIMEOUT", 120.0),
+            max_queue=getattr(settings, "RUN_POOL_MAX_QUEUE", 200)
+        )
+    return _run_pool
+
+
+async def offload(
+    key: str,
+    fn: Callable[..., Any],
+    *args,
+    limit: Optional[int] = None,
+    timeout: Optional[float] = None,
+    pool: Optional[BlockingRunPool] = None,
+    **kwargs
+) -> Any:
+    """
+    Executa chamada bloqueante no pool, para uso em rotas.
+
+    Raises:
+        HTTPException: 503 se a fila estiver cheia, 504 no timeout
+    """
+    pool = pool or get_run_pool()
+    try:
+        return await pool.run(key, functools.partial(fn, *args, **kwargs), limit=limit, timeout=timeout)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail=f"Execução excedeu o timeout ({key})")
@@ -1,17 +1,38 @@
 """
 Rate limiting middleware e utilitários.
+
+Janela deslizante aproximada (contador da janela fixa atual + contador da
+anterior ponderado pelo tempo restante): memória O(1) por chave, em vez
+de um timestamp por requisição.
+
+Backends:
+- MemoryBackend: estado local com despejo LRU (limite por worker)
+- RedisBackend: script Lua atômico; o limite vale para todos os workers
 """
 
 from __future__ import annotations
 
+import hashlib
+import logging
+import math
+import threading
 import time
-from collections import deque
-from typing import Callable, Dict, Optional
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from src.config import get_settings
 
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+
+logger = logging.getLogger(__name__)
+
 
 def _route_group(path: str) -> str:
     """Determina o grupo de rate limit baseado no path."""
@@ -41,42 +62,188 @@ def _limit_for(group: str) -> int:
     return limits.get(group, getattr(settings, "RATE_LIMIT_DEFAULT", 120))
 
 
+def _retry_after(current: int, previous: int, limit: int, window: float, elapsed: float) -> int:
+    """Segundos até a estimativa da janela liberar uma requisição."""
+    if current < limit and previous:
+        # Espera o peso da janela anterior cair o suficiente
+        wait = window * (1 - (limit - 1 - current) / previous) - elapsed
+    else:
+        # Janela atual cheia: na próxima ela vira a "anterior"
+        wait = (window - elapsed) + window * (1 - (limit - 1) / max(current, 1))
+    return max(1, math.ceil(wait))
+
+
+class MemoryBackend:
+    """
+    Contadores locais com despejo LRU.
+
+    Cada chave guarda [índice da janela, contador atual, contador anterior];
+    acima de `max_keys` as chaves menos recentes são descartadas.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._state: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Tuple[bool, int]:
+        """Consome uma requisição se houver espaço. Retorna (permitido, retry_after)."""
+        index = int(now // window)
+        elapsed = now - index * window
+
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = [index, 0, 0]
+                self._state[key] = state
+                if len(self._state) > self.max_keys:
+                    self._state.popitem(last=False)
+            else:
+                self._state.move_to_end(key)
+                if state[0] != index:
+                    previous = state[1] if state[0] == index - 1 else 0
+                    state[0], state[1], state[2] = index, 0, previous
+
+            current, previous = state[1], state[2]
+            if previous * (1 - elapsed / window) + current + 1 > limit:
+                return False, _retry_after(current, previous, limit, window, elapsed)
+            state[1] = current + 1
+            return True, 0
+
+    def retry_after(self, key: str, limit: int, window: float, now: float) -> int:
+        """Segundos até haver espaço para `key`, sem consumir (0 se há espaço)."""
+        index = int(now // window)
+        elapsed = now - index * window
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                return 0
+            if state[0] == index:
+                current, previous = state[1], state[2]
+            else:
+                current, previous = 0, state[1] if state[0] == index - 1 else 0
+        if previous * (1 - elapsed / window) + current + 1 <= limit:
+            return 0
+        return _retry_after(current, previous, limit, window, elapsed)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+
+# KEYS: contador da janela atual, contador da anterior
+# ARGV: limite, peso da anterior, TTL
+_REDIS_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {1, current, previous}
+"""
+
+
+class RedisBackend:
+    """
+    Contadores compartilhados no Redis.
+
+    Se o Redis falhar, a requisição é avaliada no MemoryBackend local
+    (limite por worker) em vez de ser bloqueada.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None, prefix: str = "ratelimit:", max_keys: int = 100_000):
+        if client is None:
+            if not HAS_REDIS:
+                raise ImportError("redis não instalado. Instale com: pip install redis")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_REDIS_SCRIPT)
+        self._fallback = MemoryBackend(max_keys=max_keys)
+
+    def _base(self, key: str) -> str:
+        # Tokens não vão em claro para o Redis
+        return f"{self.prefix}{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}:"
+
+    def hit(self, key: str, limit: int, window: float, now: float) -> Tuple[bool, int]:
+        """Consome uma requisição se houver espaço. Retorna (permitido, retry_after)."""
+        index = int(now // window)
+        elapsed = now - index * window
+        base = self._base(key)
+
+        try:
+            allowed, current, previous = self._script(
+                keys=[f"{base}{index}", f"{base}{index - 1}"],
+                args=[limit, 1 - elapsed / window, int(window * 2)],
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit no Redis indisponível, usando memória local: {e}")
+            return self._fallback.hit(key, limit, window, now)
+
+        if allowed:
+            return True, 0
+        return False, _retry_after(int(current), int(previous), limit, window, elapsed)
+
+    def retry_after(self, key: str, limit: int, window: float, now: float) -> int:
+        """Segundos até haver espaço para `key`, sem consumir (0 se há espaço)."""
+        index = int(now // window)
+        elapsed = now - index * window
+        base = self._base(key)
+        try:
+            current, previous = (int(v or 0) for v in self.client.mget(f"{base}{index}", f"{base}{index - 1}"))
+        except Exception:
+            return self._fallback.retry_after(key, limit, window, now)
+        if previous * (1 - elapsed / window) + current + 1 <= limit:
+            return 0
+        return _retry_after(current, previous, limit, window, elapsed)
+
+
 class RateLimiter:
-    """Rate limiter baseado em sliding window."""
+    """Rate limiter por janela deslizante aproximada."""
 
-    def __init__(self, window_seconds: int = 60):
+    def __init__(self, window_seconds: int = 60, backend=None, max_keys: int = 100_000):
         self.window = window_seconds
-        self.buckets: Dict[str, deque] = {}
+        self.backend = backend or MemoryBackend(max_keys=max_keys)
+        self._limits: Dict[str, int] = {}
+
+    def _limit(self, group: str) -> int:
+        limit = self._limits.get(group)
+        if limit is None:
+            limit = self._limits[group] = _limit_for(group)
+        return limit
+
+    def acquire(self, key: str, group: str) -> Tuple[bool, int]:
+        """
+        Consome uma requisição de `group:key`.
+
+        Returns:
+            (permitido, segundos para Retry-After)
+        """
+        return self.backend.hit(f"{group}:{key}", self._limit(group), self.window, time.time())
 
     def check(self, key: str, group: str) -> bool:
         """
         Verifica se a requisição deve ser permitida.
         Retorna True se permitida, False se bloqueada.
         """
-        now = time.time()
-        limit = _limit_for(group)
-        bucket_key = f"{group}:{key}"
-
-        dq = self.buckets.setdefault(bucket_key, deque())
+        allowed, _ = self.acquire(key, group)
+        return allowed
 
-        # Remove entradas fora da janela
-        while dq and (now - dq[0]) > self.window:
-            dq.popleft()
-
-        if len(dq) >= limit:
-            return False
+    def get_retry_after(self, key: str, group: str) -> int:
+        """Retorna segundos até poder tentar novamente (0 se há espaço)."""
+        return self.backend.retry_after(f"{group}:{key}", self._limit(group), self.window, time.time())
 
-        dq.append(now)
-        return True
 
-    def get_retry_after(self, key: str, group: str) -> int:
-        """Retorna segundos até poder tentar novamente."""
-        bucket_key = f"{group}:{key}"
-        dq = self.buckets.get(bucket_key)
-        if not dq:
-            return 0
-        now = time.time()
-        return max(1, int(self.window - (now - dq[0])))
+def _create_backend(settings):
+    """Backend configurado por RATE_LIMIT_BACKEND (memory | redis)."""
+    max_keys = getattr(settings, "RATE_LIMIT_MAX_KEYS", 100_000)
+    if getattr(settings, "RATE_LIMIT_BACKEND", "memory") == "redis":
+        try:
+            return RedisBackend(url=getattr(settings, "RATE_LIMIT_REDIS_URL", None), max_keys=max_keys)
+        except Exception as e:
+            logger.warning(f"Rate limit no Redis indisponível, usando memória local: {e}")
+    return MemoryBackend(max_keys=max_keys)
 
 
 # Instância global do rate limiter
@@ -87,9 +254,7 @@ def get_rate_limiter() -> RateLimiter:
     """Retorna a instância global do rate limiter."""
     global _rate_limiter
     if _rate_limiter is None:
-        settings = get_settings()
-        window = getattr(settings, "RATE_LIMIT_WINDOW_SECONDS", 60)
-        _rate_limiter = RateLimiter(window_seconds=window)
+        _rate_limiter = create_rate_limiter()
     return _rate_limiter
 
 
@@ -97,10 +262,10 @@ def create_rate_limiter() -> RateLimiter:
     """Cria uma nova instância do rate limiter."""
     settings = get_settings()
     window = getattr(settings, "RATE_LIMIT_WINDOW_SECONDS", 60)
-    return RateLimiter(window_seconds=window)
+    return RateLimiter(window_seconds=window, backend=_create_backend(settings))
 
 
-def create_rate_limit_dependency() -> Callable:
+def create_rate_limit_dependency(limiter: Optional[RateLimiter] = None) -> Callable:
     """Cria uma dependência de rate limiting para FastAPI."""
 
     def _rate_limit(request: Request):
@@ -108,9 +273,7 @@ def create_rate_limit_dependency() -> Callable:
         if not settings.RATE_LIMIT_ENABLED:
             return True
 
-        limiter = get_rate_limiter()
-        path = request.url.path
-        group = _route_group(path)
+        group = _route_group(request.scope.get("path", ""))
 
         # Extrair chave do usuário (token ou IP)
         auth = request.headers.get("authorization", "")
@@ -120,8 +283,8 @@ def create_rate_limit_dependency() -> Callable:
         if not key:
             key = request.client.host if request.client else "unknown"
 
-        if not limiter.check(key, group):
-            retry_after = limiter.get_retry_after(key, group)
+        allowed, retry_after = (limiter or get_rate_limiter()).acquire(key, group)
+        if not allowed:
             raise HTTPException(
                 status_code=429,
                 detail="Rate limit exceeded",
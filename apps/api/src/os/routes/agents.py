@@ -16,6 +16,7 @@ from agno.agent import Agent
 from src.agents import BaseAgent
 from src.config import get_settings
 from src.auth.deps import get_current_user, is_auth_enabled
+from src.os.execution import offload
 from src.os.middleware import setup_rate_limit, setup_security
 
 
@@ -64,6 +65,12 @@ def _get_agent_output(agent: Agent) -> str:
     return getattr(out, "content", "") or ""
 
 
+def _run_agent(agent: Agent, prompt: str) -> str:
+    """Executa o agente e lê a saída na mesma thread (o Agent guarda o último run)."""
+    agent.run(prompt)
+    return _get_agent_output(agent)
+
+
 def create_router(app: Any) -> APIRouter:
     """
     Cria o router de agents.
@@ -190,8 +197,7 @@ def create_router(app: Any) -> APIRouter:
         if not agent:
             raise HTTPException(status_code=404, detail="Agent not found")
 
-        agent.run(req.prompt)
-        output = _get_agent_output(agent)
+        output = await offload(f"agent:{name}", _run_agent, agent, req.prompt)
 
         return {"agent": name, "output": output}
 
@@ -209,9 +215,8 @@ def create_router(app: Any) -> APIRouter:
 
         async def generate():
             try:
-                # Executar agente
-                agent.run(req.prompt)
-                output = _get_agent_output(agent)
+                # Executar agente (fora do event loop)
+                output = await offload(f"agent:{name}", _run_agent, agent, req.prompt)
                 
                 # Simular streaming dividindo a resposta em chunks
                 # Em produção, usar run_stream do Agno se disponível
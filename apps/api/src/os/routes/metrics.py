@@ -11,7 +11,9 @@ from typing import Any
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse, PlainTextResponse
 
-from src.observability.metrics import get_metrics_text, track_request
+from src.config import get_settings
+from src.observability.http import HTTPMetrics, RequestLog, route_template
+from src.observability.metrics import get_metrics_text
 
 
 def create_router(app: Any) -> APIRouter:
@@ -28,20 +30,11 @@ def create_router(app: Any) -> APIRouter:
 
     @router.get("")
     async def metrics_get():
-        """Retorna métricas da aplicação em JSON."""
-        metrics = getattr(app.state, "metrics", {})
-
-        per_route = {}
-        for path, data in metrics.get("per_route", {}).items():
-            avg = (data["total_ms"] / data["count"]) if data["count"] else 0.0
-            per_route[path] = {"count": data["count"], "avg_ms": round(avg, 2)}
-
-        return {
-            "requests": metrics.get("requests", 0),
-            "per_route": per_route,
-            "per_status": metrics.get("per_status", {}),
-            "per_route_status": metrics.get("per_route_status", {}),
-        }
+        """Retorna métricas da aplicação em JSON (por template de rota)."""
+        metrics = getattr(app.state, "metrics", None)
+        if metrics is None:
+            return HTTPMetrics().snapshot()
+        return metrics.snapshot()
 
     @router.get("/prometheus")
     async def metrics_prometheus():
@@ -65,23 +58,26 @@ def setup_metrics_middleware(app: Any) -> None:
     Args:
         app: Instância do FastAPI app.
     """
-    # Inicializar métricas
+    # Inicializar métricas (chaveadas pelo template da rota)
     if not hasattr(app.state, "metrics"):
-        app.state.metrics = {
-            "requests": 0,
-            "per_route": {},
-            "per_status": {},
-            "per_route_status": {},
-        }
+        app.state.metrics = HTTPMetrics()
+
+    # Log por requisição opcional, amostrado e não bloqueante
+    logger = getattr(app.state, "logger", None)
+    if logger and not hasattr(app.state, "request_log"):
+        settings = get_settings()
+        app.state.request_log = RequestLog(
+            logger,
+            sample_rate=getattr(settings, "REQUEST_LOG_SAMPLE_RATE", 1.0),
+            enabled=getattr(settings, "REQUEST_LOG_ENABLED", True),
+        )
+        app.state.request_log.close_on_shutdown(app)
 
     @app.middleware("http")
     async def metrics_middleware(request: Request, call_next):
-        start = time.time()
+        start = time.perf_counter()
         req_id = request.headers.get("x-request-id") or uuid.uuid4().hex
         method = request.method
-        path = request.url.path
-        ip = request.client.host if request.client else "unknown"
-        auth_present = bool(request.headers.get("authorization"))
 
         response = None
         try:
@@ -95,7 +91,7 @@ def setup_metrics_middleware(app: Any) -> None:
             response = await call_next(request)
             return response
         finally:
-            duration_ms = (time.time() - start) * 1000.0
+            duration_ms = (time.perf_counter() - start) * 1000.0
             status_code = getattr(response, "status_code", 500) if response else 500
 
             try:
@@ -104,27 +100,24 @@ def setup_metrics_middleware(app: Any) -> None:
             except Exception:
                 pass
 
-            # Atualizar métricas
-            metrics = app.state.metrics
-            metrics["requests"] += 1
-
-            pr = metrics["per_route"].setdefault(path, {"count": 0, "total_ms": 0.0})
-            pr["count"] += 1
-            pr["total_ms"] += duration_ms
-
-            metrics["per_status"][status_code] = metrics["per_status"].get(status_code, 0) + 1
-
-            prs = metrics["per_route_status"].setdefault(path, {})
-            prs[status_code] = prs.get(status_code, 0) + 1
+            # Atualizar métricas (template disponível após o roteamento)
+            route = route_template(request.scope)
+            app.state.metrics.record(method, route, status_code, duration_ms)
 
             # Log estruturado
-            logger = getattr(app.state, "logger", None)
-            if logger:
+            request_log = getattr(app.state, "request_log", None)
+            if request_log and request_log.enabled:
                 try:
-                    logger.info(
-                        f"event=request id={req_id} method={method} path={path} "
-                        f"status={status_code} duration_ms={round(duration_ms, 2)} "
-                        f"ip={ip} auth={auth_present}"
-                    )
+                    request_log.log({
+                        "event": "request",
+                        "id": req_id,
+                        "method": method,
+                        "path": request.url.path,
+                        "route": route,
+                        "status": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        "ip": request.client.host if request.client else "unknown",
+                        "authenticated": bool(request.headers.get("authorization")),
+                    })
                 except Exception:
                     pass
@@ -10,6 +10,7 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
 
 from src.auth.deps import get_current_user, is_auth_enabled
+from src.os.execution import get_run_pool, offload
 from src.os.middleware import setup_rate_limit, setup_security
 
 
@@ -76,7 +77,9 @@ def create_router(app: Any) -> APIRouter:
                 raise HTTPException(status_code=403, detail="Forbidden")
 
         rag = _get_rag_service()
-        result = rag.add_texts(
+        # Embeddings + Chroma são síncronos: executar fora do event loop
+        result = await offload(
+            "rag:ingest", rag.add_texts,
             collection=req.collection, texts=req.texts, metadatas=req.metadatas
         )
         return result
@@ -85,8 +88,10 @@ def create_router(app: Any) -> APIRouter:
     async def rag_query(req: QueryRequest):
         """Consulta conhecimento em uma coleção."""
         rag = _get_rag_service()
-        results = rag.query(
-            collection=req.collection, query_text=req.query_text, top_k=req.top_k or 5
+        results = await offload(
+            "rag:query", rag.query,
+            collection=req.collection, query_text=req.query_text, top_k=req.top_k or 5,
+            limit=get_run_pool().max_workers
         )
         return {"results": results}
 
@@ -124,7 +129,7 @@ def create_router(app: Any) -> APIRouter:
         if not payload:
             return {"added": 0}
 
-        result = rag.ingest_files(collection=collection, files=payload)
+        result = await offload("rag:ingest", rag.ingest_files, collection=collection, files=payload)
         return result
 
     @router.get("/collections")
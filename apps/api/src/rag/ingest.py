@@ -0,0 +1,397 @@
+"""
+Pipeline de ingestão do RagService.
+
+- Download concorrente de URLs com um cliente HTTP compartilhado e
+  limite de conexões por host
+- Parsing de PDF/Markdown/HTML em pool de processos (CPU-bound)
+- Upsert incremental no Chroma em lotes grandes (um embedding por lote)
+- Documentos sem mudança (mesmo hash de conteúdo) são pulados
+- Progresso reportado por callback
+
+Exemplo:
+    pipeline = IngestPipeline(collection, progress=print)
+    stats = pipeline.ingest_files([("manual.pdf", data)])
+    stats = await pipeline.ingest_urls(["https://exemplo.com/doc"])
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+
+Chunk = Tuple[str, Dict[str, Any]]
+
+_TABLE_SEP_RE = re.compile(r"^\s*\|?[-+:| ]+\|?\s*$")
+_HEADING_RE = re.compile(r"^\s{0,3}#{1,6}\s+(.*)$")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Abaixo disso o custo de enviar ao pool supera o do parsing
+INLINE_PARSE_BYTES = 256 * 1024
+
+
+# ============================================================
+# Parsing (funções de módulo: executadas no pool de processos)
+# ============================================================
+
+def content_hash(data: bytes) -> str:
+    """Hash do conteúdo bruto de um documento."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 200) -> List[str]:
+    chunks: List[str] = []
+    start = 0
+    n = len(text)
+    if chunk_size <= 0:
+        return [text]
+    while start < n:
+        end = min(start + chunk_size, n)
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= n:
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza texto removendo boilerplate simples e tabelas markdown/separadores."""
+    cleaned_lines: List[str] = []
+    for ln in text.splitlines():
+        s = ln.strip("\u200b\ufeff ")
+        if not s:
+            cleaned_lines.append("")
+            continue
+        if _TABLE_SEP_RE.match(s):
+            continue
+        cleaned_lines.append(s)
+    # Colapsa múltiplas linhas em branco
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(cleaned_lines)).strip()
+
+
+def extract_pdf_pages(data: bytes) -> List[str]:
+    from pypdf import PdfReader
+
+    try:
+        reader = PdfReader(io.BytesIO(data))
+        pages: List[str] = []
+        for p in reader.pages:
+            try:
+                t = p.extract_text() or ""
+            except Exception:
+                t = ""
+            if t:
+                pages.append(t)
+        return pages
+    except Exception:
+        return []
+
+
+def split_markdown_by_headings(text: str) -> List[Tuple[str, str]]:
+    """Divide markdown por headings (#, ##, ### ...) retornando pares (heading, conteudo)."""
+    sections: List[Tuple[str, List[str]]] = []
+    current_title = "root"
+    current: List[str] = []
+    for ln in text.splitlines():
+        m = _HEADING_RE.match(ln)
+        if m:
+            # inicia nova seção
+            if current:
+                sections.append((current_title, current))
+            current_title = m.group(1).strip() or "section"
+            current = []
+        else:
+            current.append(ln)
+    if current:
+        sections.append((current_title, current))
+    return [(title, "\n".join(body).strip()) for title, body in sections if "\n".join(body).strip()]
+
+
+def parse_file(name: str, data: bytes) -> List[Chunk]:
+    """Extrai chunks (texto, metadados) de um arquivo .pdf, .md/.markdown ou .txt."""
+    lower = name.lower()
+    chunks: List[Chunk] = []
+    if lower.endswith(".pdf"):
+        for pidx, page_text in enumerate(extract_pdf_pages(data)):
+            for cidx, ch in enumerate(chunk_text(normalize_text(page_text))):
+                chunks.append((ch, {"source": name, "page": pidx + 1, "chunk": cidx + 1}))
+    elif lower.endswith(".md") or lower.endswith(".markdown"):
+        md = data.decode("utf-8", errors="ignore")
+        for title, body in split_markdown_by_headings(md):
+            for cidx, ch in enumerate(chunk_text(normalize_text(body))):
+                chunks.append((ch, {"source": name, "section": title, "chunk": cidx + 1}))
+    elif lower.endswith(".txt"):
+        txt = normalize_text(data.decode("utf-8", errors="ignore"))
+        for cidx, ch in enumerate(chunk_text(txt)):
+            chunks.append((ch, {"source": name, "chunk": cidx + 1}))
+    # Formatos não suportados não geram chunks
+    return chunks
+
+
+def parse_html(url: str, html: str) -> List[Chunk]:
+    """Extrai o texto de uma página HTML como um único chunk."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.title.string.strip() if soup.title and soup.title.string else url
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    text = "\n".join(t.strip() for t in soup.get_text("\n").splitlines() if t.strip())
+    text = normalize_text(text)
+    return [(text, {"source": url, "title": title})] if text else []
+
+
+# ============================================================
+# Pool de processos
+# ============================================================
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Pool de processos para parsing (RAG_INGEST_WORKERS; 0 desativa).
+
+    Usa "spawn": o processo da API tem threads (uvicorn, run pool) e
+    fork com threads ativas não é seguro.
+    """
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            from src.config import get_settings
+
+            workers = getattr(get_settings(), "RAG_INGEST_WORKERS", min(4, os.cpu_count() or 1))
+            if workers <= 0:
+                return None
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _parse_pool
+
+
+class _InlineFuture(Future):
+    """Future já resolvido (parsing feito na própria thread)."""
+
+    def __init__(self, fn: Callable, *args):
+        super().__init__()
+        try:
+            self.set_result(fn(*args))
+        except BaseException as e:
+            self.set_exception(e)
+
+
+# ============================================================
+# Pipeline
+# ============================================================
+
+class IngestPipeline:
+    """
+    Ingestão incremental em uma coleção Chroma.
+
+    Cada chunk recebe id determinístico (`<hash>-<n>`) e metadado
+    `content_hash`; um documento cujo hash já está na coleção é pulado e
+    um documento alterado tem seus chunks antigos removidos.
+
+    Args:
+        collection: Coleção Chroma (get/upsert/delete)
+        batch_size: Chunks por upsert (cada upsert é um lote de embeddings)
+        progress: Callback chamado com as estatísticas a cada documento
+        pool: Executor para parsing (default: get_parse_pool())
+    """
+
+    def __init__(
+        self,
+        collection: Any,
+        batch_size: int = 256,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        pool: Optional[Executor] = None
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.progress = progress
+        self.pool = pool
+
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {
+            "documents": 0,
+            "processed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "added": 0,
+        }
+
+    # ---------- coleção ----------
+
+    def existing_hashes(self, sources: Iterable[str]) -> Dict[str, str]:
+        """
+        Hash de conteúdo já indexado para cada source.
+
+        Sources indexados sem `content_hash` (ingestão anterior ao hash)
+        recebem "", que nunca coincide: são tratados como alterados e seus
+        chunks antigos são substituídos.
+        """
+        sources = list(dict.fromkeys(sources))
+        if not sources:
+            return {}
+        try:
+            result = self.collection.get(where={"source": {"$in": sources}}, include=["metadatas"])
+        except Exception:
+            return {}
+        hashes: Dict[str, str] = {}
+        for meta in result.get("metadatas") or []:
+            if not meta or not meta.get("source"):
+                continue
+            digest = meta.get("content_hash") or ""
+            hashes[meta["source"]] = digest if hashes.get(meta["source"], digest) == digest else ""
+        return hashes
+
+    def _flush(self):
+        if not self._ids:
+            return
+        self.collection.upsert(ids=self._ids, documents=self._documents, metadatas=self._metadatas)
+        self.stats["added"] += len(self._ids)
+        self._ids, self._documents, self._metadatas = [], [], []
+
+    def _add_document(self, source: str, digest: str, chunks: List[Chunk], replace: bool):
+        if replace:
+            # Versão anterior do documento: remove chunks órfãos
+            self._flush()
+            self.collection.delete(where={"source": source})
+        prefix = f"{content_hash(source.encode())[:16]}-{digest[:16]}"
+        for i, (text, meta) in enumerate(chunks):
+            self._ids.append(f"{prefix}-{i}")
+            self._documents.append(text)
+            self._metadatas.append({**meta, "content_hash": digest})
+            if len(self._ids) >= self.batch_size:
+                self._flush()
+        self._document_done()
+
+    def _document_done(self, key: str = "processed"):
+        self.stats[key] += 1
+        if self.progress:
+            try:
+                self.progress(dict(self.stats))
+            except Exception:
+                pass
+
+    def _pool_for(self, size: int) -> Optional[Executor]:
+        if size < INLINE_PARSE_BYTES:
+            return None
+        return self.pool if self.pool is not None else get_parse_pool()
+
+    def _submit(self, size: int, fn: Callable, *args) -> Future:
+        pool = self._pool_for(size)
+        if pool is None:
+            return _InlineFuture(fn, *args)
+        return pool.submit(fn, *args)
+
+    # ---------- arquivos ----------
+
+    def ingest_files(self, files: List[Tuple[str, bytes]]) -> Dict[str, Any]:
+        """
+        Ingere arquivos (nome, bytes), fazendo upsert à medida que o
+        parsing de cada um termina. Nomes repetidos: vale o último arquivo.
+        """
+        files = list(dict(files).items())
+        self.stats["documents"] += len(files)
+        digests = {name: content_hash(data) for name, data in files}
+        existing = self.existing_hashes(digests)
+
+        futures: Dict[Future, Tuple[str, str]] = {}
+        for name, data in files:
+            digest = digests[name]
+            if existing.get(name) == digest:
+                self._document_done("skipped")
+                continue
+            futures[self._submit(len(data), parse_file, name, data)] = (name, digest)
+
+        for future in as_completed(futures):
+            name, digest = futures[future]
+            try:
+                chunks = future.result()
+            except Exception:
+                self._document_done("failed")
+                continue
+            self._add_document(name, digest, chunks, replace=name in existing)
+
+        self._flush()
+        return dict(self.stats)
+
+    # ---------- URLs ----------
+
+    async def ingest_urls(
+        self,
+        urls: List[str],
+        max_concurrency: int = 16,
+        per_host: int = 4,
+        timeout: float = 20.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> Dict[str, Any]:
+        """
+        Baixa e ingere URLs concorrentemente.
+
+        Um único AsyncClient (pool de conexões) atende todas as URLs; cada
+        host tem no máximo `per_host` downloads simultâneos. Operações na
+        coleção rodam em thread para não bloquear o event loop.
+        """
+        urls = list(dict.fromkeys(urls))
+        self.stats["documents"] += len(urls)
+        loop = asyncio.get_running_loop()
+        existing = await asyncio.to_thread(self.existing_hashes, urls)
+
+        hosts: Dict[str, asyncio.Semaphore] = {}
+        collection_lock = asyncio.Lock()
+        limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+
+        async with httpx.AsyncClient(timeout=timeout, limits=limits, transport=transport, follow_redirects=True) as client:
+
+            async def fetch(url: str):
+                host = urlsplit(url).netloc
+                semaphore = hosts.get(host)
+                if semaphore is None:
+                    semaphore = hosts[host] = asyncio.Semaphore(per_host)
+                async with semaphore:
+                    r = await client.get(url)
+                    r.raise_for_status()
+                    return r.content, r.text
+
+            async def process(url: str):
+                try:
+                    body, text = await fetch(url)
+                    digest = content_hash(body)
+                    if existing.get(url) == digest:
+                        self._document_done("skipped")
+                        return
+                    pool = self._pool_for(len(body))
+                    if pool is None:
+                        chunks = await asyncio.to_thread(parse_html, url, text)
+                    else:
+                        chunks = await loop.run_in_executor(pool, parse_html, url, text)
+                except Exception:
+                    # pula URL com erro
+                    self._document_done("failed")
+                    return
+                async with collection_lock:
+                    await asyncio.to_thread(self._add_document, url, digest, chunks, url in existing)
+
+            await asyncio.gather(*(process(url) for url in urls))
+
+        async with collection_lock:
+            await asyncio.to_thread(self._flush)
+        return dict(self.stats)
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import chromadb
 from chromadb.utils import embedding_functions
-import httpx
-from bs4 import BeautifulSoup
-import io
-from pypdf import PdfReader
-import re
 
 from src.config import get_settings
+from src.rag.ingest import (
+    IngestPipeline,
+    chunk_text,
+    extract_pdf_pages,
+    normalize_text,
+    split_markdown_by_headings,
+)
 
 
 class RagService:
@@ -49,6 +52,10 @@ class RagService:
         col.add(ids=ids, documents=texts, metadatas=metadatas)
         return {"added": len(texts)}
 
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings com a mesma função usada pelas coleções."""
+        return [list(e) for e in self._get_embed_fn()(texts)]
+
     def query(self, *, collection: str, query_text: str, top_k: int = 5):
         col = self.get_collection(collection)
         res = col.query(query_texts=[query_text], n_results=top_k)
@@ -56,61 +63,31 @@ class RagService:
         metas = res.get("metadatas", [[]])[0]
         return [{"text": d, "metadata": m} for d, m in zip(docs, metas)]
 
-    async def ingest_urls(self, *, collection: str, urls: List[str]) -> Dict[str, Any]:
-        texts: List[str] = []
-        metas: List[Dict[str, Any]] = []
-        async with httpx.AsyncClient(timeout=20) as client:
-            for url in urls:
-                try:
-                    r = await client.get(url)
-                    r.raise_for_status()
-                    soup = BeautifulSoup(r.text, "html.parser")
-                    title = (soup.title.string.strip() if soup.title and soup.title.string else url)
-                    for tag in soup(["script", "style", "noscript"]):
-                        tag.decompose()
-                    text = "\n".join(t.strip() for t in soup.get_text("\n").splitlines() if t.strip())
-                    text = self._normalize_text(text)
-                    if text:
-                        texts.append(text)
-                        metas.append({"source": url, "title": title})
-                except Exception:
-                    # pula URL com erro
-                    continue
-        if not texts:
-            return {"added": 0}
-        return self.add_texts(collection=collection, texts=texts, metadatas=metas)
+    def _pipeline(self, collection: str, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> IngestPipeline:
+        s = get_settings()
+        return IngestPipeline(
+            self.get_collection(collection),
+            batch_size=getattr(s, "RAG_INGEST_BATCH_SIZE", 256),
+            progress=progress,
+        )
+
+    async def ingest_urls(
+        self,
+        *,
+        collection: str,
+        urls: List[str],
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Baixa URLs em paralelo e faz upsert incremental (páginas sem mudança são puladas)."""
+        s = get_settings()
+        pipeline = await asyncio.to_thread(self._pipeline, collection, progress)
+        return await pipeline.ingest_urls(urls, per_host=getattr(s, "RAG_INGEST_PER_HOST", 4))
 
     def _chunk_text(self, text: str, chunk_size: int = 1500, overlap: int = 200) -> List[str]:
-        chunks: List[str] = []
-        start = 0
-        n = len(text)
-        if chunk_size <= 0:
-            return [text]
-        while start < n:
-            end = min(start + chunk_size, n)
-            chunk = text[start:end]
-            chunk = chunk.strip()
-            if chunk:
-                chunks.append(chunk)
-            if end >= n:
-                break
-            start = max(end - overlap, start + 1)
-        return chunks
+        return chunk_text(text, chunk_size, overlap)
 
     def _extract_pdf_pages(self, data: bytes) -> List[str]:
-        try:
-            reader = PdfReader(io.BytesIO(data))
-            pages: List[str] = []
-            for p in reader.pages:
-                try:
-                    t = p.extract_text() or ""
-                except Exception:
-                    t = ""
-                if t:
-                    pages.append(t)
-            return pages
-        except Exception:
-            return []
+        return extract_pdf_pages(data)
 
     def _extract_markdown_text(self, data: bytes) -> str:
         try:
@@ -120,75 +97,25 @@ class RagService:
 
     def _split_markdown_by_headings(self, text: str) -> List[Tuple[str, str]]:
         """Divide markdown por headings (#, ##, ### ...) retornando pares (heading, conteudo)."""
-        lines = text.splitlines()
-        sections: List[Tuple[str, List[str]]] = []
-        current_title = "root"
-        current: List[str] = []
-        heading_re = re.compile(r"^\s{0,3}#{1,6}\s+(.*)$")
-        for ln in lines:
-            m = heading_re.match(ln)
-            if m:
-                # inicia nova seção
-                if current:
-                    sections.append((current_title, current))
-                current_title = m.group(1).strip() or "section"
-                current = []
-            else:
-                current.append(ln)
-        if current:
-            sections.append((current_title, current))
-        return [(title, "\n".join(body).strip()) for title, body in sections if "\n".join(body).strip()]
+        return split_markdown_by_headings(text)
 
     def _normalize_text(self, text: str) -> str:
         """Normaliza texto removendo boilerplate simples e tabelas markdown/separadores."""
-        table_sep_re = re.compile(r"^\s*\|?[-+:| ]+\|?\s*$")
-        cleaned_lines: List[str] = []
-        for ln in text.splitlines():
-            s = ln.strip("\u200b\ufeff ")
-            if not s:
-                cleaned_lines.append("")
-                continue
-            if table_sep_re.match(s):
-                continue
-            cleaned_lines.append(s)
-        cleaned = "\n".join(cleaned_lines)
-        # Colapsa múltiplas linhas em branco
-        cleaned = re.sub(r"\n{3,}", "\n\n", cleaned)
-        return cleaned.strip()
-
-    def ingest_files(self, *, collection: str, files: List[Tuple[str, bytes]]) -> Dict[str, Any]:
-        texts: List[str] = []
-        metas: List[Dict[str, Any]] = []
-        for name, data in files:
-            lower = name.lower()
-            if lower.endswith(".pdf"):
-                pages = self._extract_pdf_pages(data)
-                for pidx, page_text in enumerate(pages):
-                    page_text = self._normalize_text(page_text)
-                    for cidx, ch in enumerate(self._chunk_text(page_text)):
-                        texts.append(ch)
-                        metas.append({"source": name, "page": pidx + 1, "chunk": cidx + 1})
-                continue
-            if lower.endswith(".md") or lower.endswith(".markdown"):
-                md = self._extract_markdown_text(data)
-                for title, body in self._split_markdown_by_headings(md):
-                    body = self._normalize_text(body)
-                    for cidx, ch in enumerate(self._chunk_text(body)):
-                        texts.append(ch)
-                        metas.append({"source": name, "section": title, "chunk": cidx + 1})
-                continue
-            if lower.endswith(".txt"):
-                txt = self._extract_markdown_text(data)
-                txt = self._normalize_text(txt)
-                for cidx, ch in enumerate(self._chunk_text(txt)):
-                    texts.append(ch)
-                    metas.append({"source": name, "chunk": cidx + 1})
-                continue
-            # Unsupported
-            continue
-        if not texts:
-            return {"added": 0}
-        return self.add_texts(collection=collection, texts=texts, metadatas=metas)
+        return normalize_text(text)
+
+    def ingest_files(
+        self,
+        *,
+        collection: str,
+        files: List[Tuple[str, bytes]],
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Ingere arquivos .pdf/.md/.txt com parsing em pool de processos e
+        upsert em lotes à medida que cada arquivo fica pronto. Arquivos
+        sem mudança (mesmo hash) são pulados.
+        """
+        return self._pipeline(collection, progress).ingest_files(files)
 
     def list_collections(self) -> List[str]:
         """Lista todas as coleções disponíveis."""
@@ -122,6 +122,35 @@ class ChunkingConfig:
     semantic_threshold: float = 0.7
 
 
+@dataclass
+class IngestionConfig:
+    """Configuração do pipeline de ingestão em estágios."""
+    # Concorrência por estágio (workers simultâneos)
+    chunk_workers: int = 2
+    embed_workers: int = 4
+    extract_workers: int = 8
+    write_workers: int = 2
+    graph_workers: int = 2
+    
+    # Processos para chunking (0 = thread, sem process pool)
+    chunk_processes: int = field(default_factory=lambda: min(4, os.cpu_count() or 1))
+    
+    # Lotes
+    chunk_batch_size: int = 16  # Documentos por tarefa de chunking
+    embed_batch_size: Optional[int] = None  # Chunks por chamada (None = embedding.batch_size)
+    write_batch_size: int = 64  # Documentos por escrita em lote
+    batch_linger_ms: int = 20  # Espera máxima para completar um lote
+    
+    # Backpressure: capacidade das filas entre estágios
+    queue_size: int = 256
+    
+    # Limites por tenant (project_id)
+    tenant_docs_per_second: Optional[float] = None  # None = sem limite
+    tenant_burst: int = 50
+    tenant_max_inflight: int = 1024
+    tenant_rate_overrides: dict[int, float] = field(default_factory=dict)
+
+
 @dataclass
 class RetrievalConfig:
     """Configuração de retrieval."""
@@ -202,6 +231,7 @@ class RAGConfig:
     database: DatabaseConfig = field(default_factory=DatabaseConfig)
     embedding: EmbeddingConfig = field(default_factory=EmbeddingConfig)
     chunking: ChunkingConfig = field(default_factory=ChunkingConfig)
+    ingestion: IngestionConfig = field(default_factory=IngestionConfig)
     retrieval: RetrievalConfig = field(default_factory=RetrievalConfig)
     rerank: RerankConfig = field(default_factory=RerankConfig)
     query: QueryConfig = field(default_factory=QueryConfig)
@@ -17,7 +17,11 @@ import logging
 
 import openai
 from openai import AsyncOpenAI
-import redis.asyncio as redis
+# Cache opcional: sem redis, embeddings não são cacheados
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
 import numpy as np
 
 from .config import RAGConfig, EmbeddingConfig, get_rag_config
@@ -56,16 +60,18 @@ class EmbeddingService:
         self.client = AsyncOpenAI(api_key=self.embedding_config.openai_api_key)
         
         # Redis para cache
-        self._redis: Optional[redis.Redis] = None
+        self._redis: Optional["redis.Redis"] = None
         
         # Métricas
         self.total_requests = 0
         self.cache_hits = 0
         self.total_tokens = 0
     
-    async def _get_redis(self) -> redis.Redis:
+    async def _get_redis(self) -> "redis.Redis":
         """Retorna conexão Redis."""
         if self._redis is None:
+            if redis is None:
+                raise ImportError("redis não instalado: pip install redis")
             self._redis = redis.from_url(
                 self.config.database.redis_url,
                 encoding="utf-8",
@@ -14,8 +14,12 @@ from typing import Optional, Any
 from enum import Enum
 import logging
 
-from neo4j import AsyncGraphDatabase, AsyncDriver
-from neo4j.exceptions import ServiceUnavailable
+# Driver opcional: exigido apenas ao conectar
+try:
+    from neo4j import AsyncGraphDatabase, AsyncDriver
+except ImportError:
+    AsyncGraphDatabase = None
+    AsyncDriver = Any
 
 from .config import RAGConfig, get_rag_config
 
@@ -129,6 +133,8 @@ class GraphStore:
     async def _get_driver(self) -> AsyncDriver:
         """Retorna driver Neo4j."""
         if self._driver is None:
+            if AsyncGraphDatabase is None:
+                raise ImportError("neo4j não instalado: pip install neo4j")
             self._driver = AsyncGraphDatabase.driver(
                 self.config.database.neo4j_uri,
                 auth=(
@@ -281,6 +287,91 @@ class GraphStore:
             for relation in doc.relations:
                 await self.add_relation(relation)
     
+    async def add_documents_batch(self, docs: list[GraphDocument]) -> None:
+        """
+        Adiciona vários documentos com suas entidades/relações ao grafo.
+        
+        Usa UNWIND: uma query para documentos, uma para entidades, uma para
+        menções e uma por tipo de relação (o tipo não pode ser parâmetro).
+        
+        Args:
+            docs: Documentos com entidades e relações
+        """
+        if not docs:
+            return
+        
+        driver = await self._get_driver()
+        
+        documents = []
+        entities: dict[str, dict] = {}
+        mentions = []
+        relations: dict[RelationType, list[dict]] = {}
+        
+        for doc in docs:
+            documents.append({
+                "id": doc.id,
+                "document_id": doc.document_id,
+                "title": doc.title,
+                "source": doc.source
+            })
+            
+            for entity in doc.entities:
+                entity_id = entity.id or f"{entity.entity_type.value}_{entity.name}".lower().replace(" ", "_")
+                entities[entity_id] = {
+                    "id": entity_id,
+                    "name": entity.name,
+                    "type": entity.entity_type.value,
+                    "description": entity.description,
+                    "metadata": str(entity.metadata)
+                }
+                mentions.append({"doc_id": doc.id, "entity_id": entity_id})
+            
+            for relation in doc.relations:
+                relations.setdefault(relation.relation_type, []).append({
+                    "source_id": relation.source_id,
+                    "target_id": relation.target_id,
+                    "strength": relation.strength,
+                    "metadata": str(relation.metadata)
+                })
+        
+        async with driver.session() as session:
+            await session.run("""
+                UNWIND $rows AS row
+                MERGE (d:Document {id: row.id})
+                SET d.document_id = row.document_id,
+                    d.title = row.title,
+                    d.source = row.source,
+                    d.created_at = datetime()
+            """, {"rows": documents})
+            
+            if entities:
+                await session.run("""
+                    UNWIND $rows AS row
+                    MERGE (e:Entity {id: row.id})
+                    SET e.name = row.name,
+                        e.type = row.type,
+                        e.description = row.description,
+                        e.metadata = row.metadata,
+                        e.created_at = datetime()
+                """, {"rows": list(entities.values())})
+                
+                await session.run("""
+                    UNWIND $rows AS row
+                    MATCH (d:Document {id: row.doc_id})
+                    MATCH (e:Entity {id: row.entity_id})
+                    MERGE (d)-[:MENTIONS]->(e)
+                """, {"rows": mentions})
+            
+            for relation_type, rows in relations.items():
+                await session.run(f"""
+                    UNWIND $rows AS row
+                    MATCH (source:Entity {{id: row.source_id}})
+                    MATCH (target:Entity {{id: row.target_id}})
+                    MERGE (source)-[r:{relation_type.value}]->(target)
+                    SET r.strength = row.strength,
+                        r.metadata = row.metadata
+                """, {"rows": rows})
+    
     async def search_entities(
         self,
         query: str,
@@ -6,18 +6,28 @@ Pipeline de ingestão de documentos com:
 - Extração de entidades
 - Geração de embeddings
 - Indexação em vector e graph stores
+
+Em lote (`ingest_batch`), os documentos passam por estágios ligados por
+filas limitadas (backpressure): chunking em process pool, embeddings em
+lotes de chunks de vários documentos, escrita em lote no vector store,
+extração de entidades em paralelo e escrita em lote no grafo. Cada
+estágio tem sua concorrência e suas métricas de throughput; a admissão
+respeita limites por tenant (project_id).
 """
 
 import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Any, Callable
+from typing import Optional, Any, Awaitable, Callable
 from enum import Enum
 import logging
 import re
 import hashlib
+import time
 
-from .config import RAGConfig, ChunkingConfig, get_rag_config
+from .config import RAGConfig, ChunkingConfig, IngestionConfig, get_rag_config
 from .embeddings import EmbeddingService, get_embedding_service
 from .vector_store import VectorStore, Document, DocumentChunk, get_vector_store
 from .graph_store import GraphStore, Entity, Relation, GraphDocument, EntityType, RelationType, get_graph_store
@@ -208,6 +218,135 @@ class SemanticChunker:
         return result
 
 
+def _chunk_documents(config: ChunkingConfig, texts: list[str]) -> list[list[str]]:
+    """Chunking de vários documentos (executado no process pool)."""
+    chunker = SemanticChunker(config)
+    return [chunker.chunk(text).chunks for text in texts]
+
+
+# Sentinela de fim de fila entre estágios
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """Métricas de throughput de um estágio do pipeline."""
+    name: str
+    documents: int = 0
+    chunks: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    first_started: Optional[float] = None
+    last_finished: Optional[float] = None
+    
+    def record(self, documents: int, chunks: int, started: float) -> None:
+        """Registra um lote processado."""
+        now = time.perf_counter()
+        self.documents += documents
+        self.chunks += chunks
+        self.batches += 1
+        self.busy_seconds += now - started
+        if self.first_started is None or started < self.first_started:
+            self.first_started = started
+        self.last_finished = now
+    
+    @property
+    def docs_per_second(self) -> float:
+        """Documentos por segundo entre o início do primeiro lote e o fim do último."""
+        if not self.documents or self.first_started is None:
+            return 0.0
+        return self.documents / max(self.last_finished - self.first_started, 1e-9)
+    
+    def to_dict(self) -> dict:
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "batches": self.batches,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "docs_per_second": round(self.docs_per_second, 1),
+        }
+
+
+class TenantThrottle:
+    """
+    Limites de ingestão por tenant (project_id).
+    
+    - Documentos por segundo: token bucket com burst configurável
+    - Documentos em processamento simultâneo: semáforo por tenant
+    
+    Compartilhado entre chamadas do mesmo pipeline, de modo que lotes
+    concorrentes de um tenant dividem a mesma cota.
+    """
+    
+    def __init__(self, config: IngestionConfig):
+        self.config = config
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._buckets: dict[int, tuple[float, float]] = {}
+        self._inflight: dict[int, asyncio.Semaphore] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+    
+    def _rate(self, tenant: int) -> Optional[float]:
+        return self.config.tenant_rate_overrides.get(tenant, self.config.tenant_docs_per_second)
+    
+    def _bind(self) -> None:
+        """Primitivas asyncio pertencem a um event loop: recria ao trocar de loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._buckets.clear()
+            self._inflight.clear()
+            self._locks.clear()
+    
+    async def acquire(self, tenant: int) -> None:
+        """Aguarda cota para admitir um documento do tenant."""
+        self._bind()
+        semaphore = self._inflight.setdefault(tenant, asyncio.Semaphore(self.config.tenant_max_inflight))
+        await semaphore.acquire()
+        
+        rate = self._rate(tenant)
+        if not rate:
+            return
+        
+        async with self._locks.setdefault(tenant, asyncio.Lock()):
+            burst = max(self.config.tenant_burst, 1)
+            now = time.monotonic()
+            tokens, last = self._buckets.get(tenant, (float(burst), now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens < 1:
+                await asyncio.sleep((1 - tokens) / rate)
+                now = time.monotonic()
+                tokens = 1.0
+            self._buckets[tenant] = (tokens - 1, now)
+    
+    def release(self, tenant: int) -> None:
+        """Libera a vaga de um documento concluído."""
+        semaphore = self._inflight.get(tenant)
+        if semaphore is not None:
+            semaphore.release()
+
+
+@dataclass
+class _IngestionJob:
+    """Documento em trânsito pelos estágios de `ingest_batch`."""
+    index: int
+    title: str
+    content: str
+    project_id: int
+    source: Optional[str] = None
+    content_type: Optional[str] = None
+    metadata: Optional[dict] = None
+    started: float = 0.0
+    chunks: list[str] = field(default_factory=list)
+    embeddings: list = field(default_factory=list)
+    document_id: int = 0
+    extraction: Optional[EntityExtractionResult] = None
+    # Sinalizado pelo estágio de extração (None = extração desativada)
+    extracted: Optional[asyncio.Event] = None
+    done: bool = False
+
+
 class EntityExtractor:
     """
     Extrator de entidades usando LLM.
@@ -366,7 +505,8 @@ class IngestionPipeline:
     """
     Pipeline de ingestão de documentos.
     
-    Fluxo:
+    Fluxo (por documento em `ingest_document`, em estágios paralelos
+    em `ingest_batch`):
     1. Chunking: divide documento em chunks semânticos
     2. Embedding: gera embeddings para cada chunk
     3. Vector Indexing: indexa no PostgreSQL/pgvector
@@ -388,11 +528,17 @@ class IngestionPipeline:
         # Callbacks
         self._progress_callback: Optional[Callable] = None
         
+        # Execução em estágios (ingest_batch)
+        self._throttle = TenantThrottle(self.config.ingestion)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        
         # Métricas
         self.total_documents = 0
         self.total_chunks = 0
         self.total_entities = 0
         self.failed_documents = 0
+        self.stage_metrics: dict[str, StageMetrics] = {}
+        self.last_run: dict = {}
     
     def set_progress_callback(self, callback: Callable[[str, float], None]) -> None:
         """Define callback de progresso."""
@@ -448,13 +594,35 @@ class IngestionPipeline:
         Returns:
             IngestionResult com status e métricas
         """
+        # Mesmos limites por tenant de ingest_batch
+        await self._throttle.acquire(project_id)
+        try:
+            return await self._ingest_one(
+                title, content, project_id, source, content_type, metadata,
+                extract_entities, use_llm_extraction
+            )
+        finally:
+            self._throttle.release(project_id)
+    
+    async def _ingest_one(
+        self,
+        title: str,
+        content: str,
+        project_id: int,
+        source: Optional[str],
+        content_type: Optional[str],
+        metadata: Optional[dict],
+        extract_entities: bool,
+        use_llm_extraction: bool
+    ) -> IngestionResult:
+        """Ingestão de um documento (ver `ingest_document`)."""
         start = datetime.now()
         
         try:
             self._report_progress("chunking", 0.1)
             
             # 1. Chunking
-            chunk_result = self.chunker.chunk(content)
+            chunk_result = await asyncio.to_thread(self.chunker.chunk, content)
             
             if not chunk_result.chunks:
                 return IngestionResult(
@@ -490,22 +658,7 @@ class IngestionPipeline:
             doc_id = await vector_store.add_document(doc)
             
             # 4. Salvar chunks
-            chunks_to_add = []
-            for i, (chunk_text, emb_result) in enumerate(zip(chunk_result.chunks, embeddings)):
-                prev_chunk = chunk_result.chunks[i - 1][:200] if i > 0 else None
-                next_chunk = chunk_result.chunks[i + 1][:200] if i < len(chunk_result.chunks) - 1 else None
-                
-                chunk = DocumentChunk(
-                    document_id=doc_id,
-                    content=chunk_text,
-                    chunk_index=i,
-                    embedding=emb_result.embedding,
-                    previous_chunk=prev_chunk,
-                    next_chunk=next_chunk,
-                    metadata={"char_count": len(chunk_text)}
-                )
-                chunks_to_add.append(chunk)
-            
+            chunks_to_add = self._build_chunks(doc_id, chunk_result.chunks, embeddings)
             await vector_store.add_chunks_batch(chunks_to_add)
             
             # 5. Extração de entidades (opcional)
@@ -579,36 +732,362 @@ class IngestionPipeline:
         documents: list[dict],
         project_id: int,
         extract_entities: bool = True,
-        max_concurrent: int = 5
+        max_concurrent: Optional[int] = None,
+        use_llm_extraction: bool = False
     ) -> list[IngestionResult]:
         """
-        Ingere múltiplos documentos em batch.
+        Ingere múltiplos documentos em batch, em estágios paralelos.
+        
+        Estágios (cada um com seus workers e fila de entrada limitada):
+        1. Chunking: lotes de documentos no process pool
+        2. Embedding: lotes de chunks de vários documentos
+        3. Vector Indexing: documentos e chunks com escritas em lote
+        4. Entity Extraction: em paralelo com embedding/indexação
+        5. Graph Indexing: escrita em lote no grafo
         
         Args:
             documents: Lista de dicts com title, content, source, metadata
-            project_id: ID do projeto
+            project_id: ID do projeto (tenant dos limites de throughput)
             extract_entities: Se deve extrair entidades
-            max_concurrent: Máximo de documentos simultâneos
+            max_concurrent: Máximo de documentos em processamento neste
+                batch (None = apenas o limite por tenant da configuração)
+            use_llm_extraction: Se deve usar LLM para extração
             
         Returns:
-            Lista de IngestionResult
+            Lista de IngestionResult, na ordem de documents
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
+        cfg = self.config.ingestion
+        results: list[Optional[IngestionResult]] = [None] * len(documents)
+        if not documents:
+            return []
+        
+        stages = {
+            name: StageMetrics(name)
+            for name in ("chunking", "embedding", "indexing", "extracting", "graph_indexing")
+        }
+        self.stage_metrics = stages
+        batch_limit = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        finished = 0
+        run_started = time.perf_counter()
+        
+        def finish(job: _IngestionJob, status: DocumentStatus, error: Optional[str] = None) -> None:
+            nonlocal finished
+            if job.done:
+                return
+            job.done = True
+            extraction = job.extraction if status == DocumentStatus.COMPLETED else None
+            entity_count = len(extraction.entities) if extraction else 0
+            relation_count = len(extraction.relations) if extraction else 0
+            
+            results[job.index] = IngestionResult(
+                document_id=job.document_id if status == DocumentStatus.COMPLETED else 0,
+                chunk_count=len(job.chunks) if status == DocumentStatus.COMPLETED else 0,
+                entity_count=entity_count,
+                relation_count=relation_count,
+                total_time_ms=(time.perf_counter() - job.started) * 1000,
+                status=status,
+                error=error
+            )
+            
+            if status == DocumentStatus.COMPLETED:
+                self.total_documents += 1
+                self.total_chunks += len(job.chunks)
+                self.total_entities += entity_count
+            else:
+                self.failed_documents += 1
+            
+            self._throttle.release(job.project_id)
+            if batch_limit:
+                batch_limit.release()
+            finished += 1
+            self._report_progress("ingesting", finished / len(documents))
+        
+        def fail(job: _IngestionJob, error: str) -> None:
+            finish(job, DocumentStatus.FAILED, error)
         
-        async def ingest_with_semaphore(doc: dict) -> IngestionResult:
-            async with semaphore:
-                return await self.ingest_document(
+        size = max(cfg.queue_size, 1)
+        chunk_q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        embed_q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        write_q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        extract_q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        graph_q: asyncio.Queue = asyncio.Queue(maxsize=size)
+        
+        async def admit() -> None:
+            for i, doc in enumerate(documents):
+                if batch_limit:
+                    await batch_limit.acquire()
+                await self._throttle.acquire(project_id)
+                await chunk_q.put(_IngestionJob(
+                    index=i,
                     title=doc.get("title", "Untitled"),
                     content=doc.get("content", ""),
                     project_id=project_id,
                     source=doc.get("source"),
                     content_type=doc.get("content_type"),
                     metadata=doc.get("metadata"),
-                    extract_entities=extract_entities
+                    started=time.perf_counter(),
+                    extracted=asyncio.Event() if extract_entities else None
+                ))
+            await chunk_q.put(_DONE)
+        
+        async def chunk(batch: list[_IngestionJob]) -> list[_IngestionJob]:
+            chunked = await self._chunk_many([job.content for job in batch])
+            passed = []
+            for job, chunks in zip(batch, chunked):
+                if not chunks:
+                    fail(job, "Documento vazio ou inválido")
+                    continue
+                job.chunks = chunks
+                passed.append(job)
+            return passed
+        
+        async def embed(batch: list[_IngestionJob]) -> list[_IngestionJob]:
+            texts = [text for job in batch for text in job.chunks]
+            embedding_service = await self._get_embedding_service()
+            embeddings = await embedding_service.embed_texts(texts)
+            if len(embeddings) != len(texts):
+                raise RuntimeError(f"{len(embeddings)} embeddings para {len(texts)} chunks")
+            
+            offset = 0
+            for job in batch:
+                job.embeddings = embeddings[offset:offset + len(job.chunks)]
+                offset += len(job.chunks)
+            return batch
+        
+        async def index(batch: list[_IngestionJob]) -> list[_IngestionJob]:
+            vector_store = await self._get_vector_store()
+            doc_ids = await vector_store.add_documents_batch([
+                Document(
+                    project_id=job.project_id,
+                    title=job.title,
+                    content=job.content,
+                    source=job.source,
+                    content_type=job.content_type,
+                    metadata=job.metadata
+                )
+                for job in batch
+            ])
+            
+            if len(doc_ids) != len(batch):
+                raise RuntimeError(f"{len(doc_ids)} IDs para {len(batch)} documentos")
+            
+            chunks_to_add = []
+            for job, doc_id in zip(batch, doc_ids):
+                job.document_id = doc_id
+                chunks_to_add.extend(self._build_chunks(doc_id, job.chunks, job.embeddings))
+            await vector_store.add_chunks_batch(chunks_to_add)
+            
+            if not extract_entities:
+                for job in batch:
+                    finish(job, DocumentStatus.COMPLETED)
+                return []
+            return batch
+        
+        async def extract(batch: list[_IngestionJob]) -> list[_IngestionJob]:
+            for job in batch:
+                try:
+                    if use_llm_extraction:
+                        # Extrair de uma amostra dos chunks
+                        sample_text = "\n\n".join(job.chunks[:5])
+                        job.extraction = await self.extractor.extract(sample_text)
+                    else:
+                        job.extraction = await asyncio.to_thread(self.extractor.extract_simple, job.content)
+                except Exception as e:
+                    logger.error(f"Erro na extração de entidades: {e}")
+                    job.extraction = EntityExtractionResult(entities=[], relations=[], extraction_time_ms=0)
+                finally:
+                    job.extracted.set()
+            return []
+        
+        async def graph_index(batch: list[_IngestionJob]) -> list[_IngestionJob]:
+            await asyncio.gather(*(job.extracted.wait() for job in batch))
+            
+            graph_docs = [
+                GraphDocument(
+                    id=f"doc_{job.document_id}",
+                    document_id=job.document_id,
+                    title=job.title,
+                    source=job.source,
+                    entities=job.extraction.entities,
+                    relations=job.extraction.relations
                 )
+                for job in batch
+                if job.extraction and job.extraction.entities
+            ]
+            if graph_docs:
+                graph_store = await self._get_graph_store()
+                await graph_store.add_documents_batch(graph_docs)
+            
+            for job in batch:
+                finish(job, DocumentStatus.COMPLETED)
+            return []
+        
+        embed_limit = cfg.embed_batch_size or self.config.embedding.batch_size
+        tasks = [
+            admit(),
+            self._stage(
+                chunk_q, [embed_q, extract_q] if extract_entities else [embed_q],
+                chunk, cfg.chunk_workers, cfg.chunk_batch_size, stages["chunking"], fail
+            ),
+            self._stage(
+                embed_q, [write_q], embed, cfg.embed_workers, embed_limit,
+                stages["embedding"], fail, weight=lambda job: len(job.chunks)
+            ),
+            self._stage(
+                write_q, [graph_q], index, cfg.write_workers, cfg.write_batch_size,
+                stages["indexing"], fail
+            ),
+        ]
+        if extract_entities:
+            tasks += [
+                self._stage(
+                    extract_q, [], extract, cfg.extract_workers, 1,
+                    stages["extracting"], fail
+                ),
+                self._stage(
+                    graph_q, [], graph_index, cfg.graph_workers, cfg.write_batch_size,
+                    stages["graph_indexing"], fail
+                ),
+            ]
+        
+        await asyncio.gather(*tasks)
+        
+        elapsed = time.perf_counter() - run_started
+        self.last_run = {
+            "documents": len(documents),
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(len(documents) / max(elapsed, 1e-9), 1),
+        }
+        logger.info(
+            f"Ingestão: {len(documents)} documentos em {elapsed:.2f}s "
+            f"({self.last_run['docs_per_second']} docs/s)"
+        )
         
-        tasks = [ingest_with_semaphore(doc) for doc in documents]
-        return await asyncio.gather(*tasks)
+        return results
+    
+    async def _stage(
+        self,
+        inbox: asyncio.Queue,
+        outboxes: list[asyncio.Queue],
+        process: Callable[[list[_IngestionJob]], Awaitable[list[_IngestionJob]]],
+        workers: int,
+        batch_size: int,
+        metrics: StageMetrics,
+        on_error: Callable[[_IngestionJob, str], None],
+        weight: Optional[Callable[[_IngestionJob], int]] = None
+    ) -> None:
+        """
+        Executa um estágio: workers consomem lotes de inbox e repassam os
+        documentos devolvidos por process para cada fila de outboxes.
+        
+        Um erro no lote marca todos os seus documentos como falhos; o
+        estágio segue com os próximos lotes.
+        """
+        async def worker() -> None:
+            while True:
+                batch, done = await self._next_batch(inbox, batch_size, weight)
+                if batch:
+                    started = time.perf_counter()
+                    try:
+                        passed = await process(batch)
+                    except Exception as e:
+                        logger.error(f"Erro no estágio {metrics.name}: {e}")
+                        metrics.errors += len(batch)
+                        for job in batch:
+                            on_error(job, str(e))
+                        passed = []
+                    metrics.record(len(batch), sum(len(job.chunks) for job in batch), started)
+                    
+                    for job in passed:
+                        for outbox in outboxes:
+                            await outbox.put(job)
+                
+                if done:
+                    # Devolve o sentinela para os demais workers
+                    await inbox.put(_DONE)
+                    return
+        
+        await asyncio.gather(*(worker() for _ in range(max(workers, 1))))
+        for outbox in outboxes:
+            await outbox.put(_DONE)
+    
+    async def _next_batch(
+        self,
+        inbox: asyncio.Queue,
+        limit: int,
+        weight: Optional[Callable[[_IngestionJob], int]] = None
+    ) -> tuple[list[_IngestionJob], bool]:
+        """
+        Lê um lote da fila: bloqueia pelo primeiro item e espera até
+        batch_linger_ms pelos demais, até o lote somar limit.
+        
+        Returns:
+            (lote, se o fim da fila foi alcançado)
+        """
+        weight = weight or (lambda job: 1)
+        first = await inbox.get()
+        if first is _DONE:
+            return [], True
+        
+        batch = [first]
+        total = weight(first)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.ingestion.batch_linger_ms / 1000
+        
+        while total < limit:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                getter = asyncio.ensure_future(inbox.get())
+                await asyncio.wait({getter}, timeout=timeout)
+                if not getter.done():
+                    getter.cancel()
+                try:
+                    # Um get que completou junto com o timeout não perde o item
+                    item = await getter
+                except asyncio.CancelledError:
+                    break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+            total += weight(item)
+        
+        return batch, False
+    
+    async def _chunk_many(self, texts: list[str]) -> list[list[str]]:
+        """Chunking fora do event loop: process pool (ou thread, se desativado)."""
+        if self.config.ingestion.chunk_processes <= 0:
+            return await asyncio.to_thread(_chunk_documents, self.config.chunking, texts)
+        
+        if self._process_pool is None:
+            # "spawn", como em src/rag/ingest.py: fork com threads ativas não é seguro
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.config.ingestion.chunk_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._process_pool, _chunk_documents, self.config.chunking, texts)
+    
+    def _build_chunks(self, doc_id: int, chunks: list[str], embeddings: list) -> list[DocumentChunk]:
+        """Monta os DocumentChunk de um documento com contexto dos vizinhos."""
+        result = []
+        for i, (chunk_text, emb_result) in enumerate(zip(chunks, embeddings)):
+            prev_chunk = chunks[i - 1][:200] if i > 0 else None
+            next_chunk = chunks[i + 1][:200] if i < len(chunks) - 1 else None
+            
+            result.append(DocumentChunk(
+                document_id=doc_id,
+                content=chunk_text,
+                chunk_index=i,
+                embedding=emb_result.embedding,
+                previous_chunk=prev_chunk,
+                next_chunk=next_chunk,
+                metadata={"char_count": len(chunk_text)}
+            ))
+        return result
     
     def get_metrics(self) -> dict:
         """Retorna métricas do pipeline."""
@@ -617,7 +1096,9 @@ class IngestionPipeline:
             "total_chunks": self.total_chunks,
             "total_entities": self.total_entities,
             "failed_documents": self.failed_documents,
-            "success_rate": (self.total_documents - self.failed_documents) / max(self.total_documents, 1)
+            "success_rate": (self.total_documents - self.failed_documents) / max(self.total_documents, 1),
+            "last_batch": self.last_run,
+            "stages": {name: m.to_dict() for name, m in self.stage_metrics.items()}
         }
     
     async def close(self) -> None:
@@ -633,6 +1114,10 @@ class IngestionPipeline:
         
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
+        
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
 
 
 # Singleton
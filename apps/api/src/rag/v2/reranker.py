@@ -13,8 +13,11 @@ from dataclasses import dataclass
 from typing import Optional, Any
 import logging
 
-import cohere
-from cohere import AsyncClient as CohereAsyncClient
+# Cliente opcional: sem cohere, o reranking usa o modelo local
+try:
+    from cohere import AsyncClient as CohereAsyncClient
+except ImportError:
+    CohereAsyncClient = None
 
 from .config import RAGConfig, RerankConfig, RerankModel, get_rag_config
 from .vector_store import SearchResult
@@ -48,7 +51,7 @@ class Reranker:
         self.rerank_config = self.config.rerank
         
         # Cliente Cohere
-        self._cohere_client: Optional[CohereAsyncClient] = None
+        self._cohere_client: Optional[Any] = None
         
         # Modelo local (lazy load)
         self._local_model = None
@@ -59,9 +62,11 @@ class Reranker:
         self.cohere_requests = 0
         self.fallback_requests = 0
     
-    async def _get_cohere_client(self) -> CohereAsyncClient:
+    async def _get_cohere_client(self) -> Any:
         """Retorna cliente Cohere."""
         if self._cohere_client is None:
+            if CohereAsyncClient is None:
+                raise ImportError("cohere não instalado: pip install cohere")
             self._cohere_client = CohereAsyncClient(
                 api_key=self.rerank_config.cohere_api_key
             )
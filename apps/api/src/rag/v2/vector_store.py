@@ -10,6 +10,7 @@ Suporta:
 """
 
 import asyncio
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Any
@@ -17,8 +18,13 @@ from enum import Enum
 import json
 import logging
 
-import asyncpg
-from asyncpg import Pool
+# Driver opcional: exigido apenas ao abrir o pool
+try:
+    import asyncpg
+    from asyncpg import Pool
+except ImportError:
+    asyncpg = None
+    Pool = Any
 import numpy as np
 
 from .config import RAGConfig, get_rag_config
@@ -164,6 +170,8 @@ class VectorStore:
     async def _get_pool(self) -> Pool:
         """Retorna pool de conexões."""
         if self._pool is None:
+            if asyncpg is None:
+                raise ImportError("asyncpg não instalado: pip install asyncpg")
             self._pool = await asyncpg.create_pool(
                 self.config.database.postgres_url,
                 min_size=2,
@@ -249,50 +257,108 @@ class VectorStore:
             
             return row["id"]
     
+    async def add_documents_batch(self, docs: list[Document]) -> list[int]:
+        """
+        Adiciona múltiplos documentos com um único INSERT.
+        
+        Args:
+            docs: Lista de documentos
+            
+        Returns:
+            Lista de IDs criados, na ordem de docs
+        """
+        if not docs:
+            return []
+        
+        pool = await self._get_pool()
+        
+        async with pool.acquire() as conn:
+            # IDs reservados por linha (nextval) e devolvidos junto com a
+            # posição de entrada: não depende da ordem de inserção
+            rows = await conn.fetch("""
+                WITH input AS MATERIALIZED (
+                    SELECT nextval(pg_get_serial_sequence('documents', 'id')) AS id, t.*
+                    FROM unnest($1::int[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[], $7::text[])
+                        WITH ORDINALITY AS t(project_id, title, content, source, content_type, metadata, summary, ord)
+                ), inserted AS (
+                    INSERT INTO documents (id, project_id, title, content, source, content_type, metadata, summary)
+                    SELECT id, project_id, title, content, source, content_type, metadata::jsonb, summary
+                    FROM input
+                    RETURNING id
+                )
+                SELECT input.id, input.ord
+                FROM input JOIN inserted USING (id)
+                ORDER BY input.ord
+            """,
+                [d.project_id for d in docs],
+                [d.title for d in docs],
+                [d.content for d in docs],
+                [d.source for d in docs],
+                [d.content_type for d in docs],
+                [json.dumps(d.metadata) if d.metadata else None for d in docs],
+                [d.summary for d in docs])
+        
+        return [row["id"] for row in rows]
+    
     async def add_chunks_batch(self, chunks: list[DocumentChunk]) -> list[int]:
         """
         Adiciona múltiplos chunks em batch.
         
+        Os chunks (de um ou vários documentos) são gravados com um único
+        INSERT e os contadores dos documentos com um único UPDATE.
+        
         Args:
             chunks: Lista de chunks
             
         Returns:
-            Lista de IDs criados
+            Lista de IDs criados, na ordem de chunks
         """
         if not chunks:
             return []
         
         pool = await self._get_pool()
-        ids = []
         
         async with pool.acquire() as conn:
             async with conn.transaction():
-                for chunk in chunks:
-                    embedding_str = None
-                    if chunk.embedding:
-                        embedding_str = "[" + ",".join(str(x) for x in chunk.embedding) + "]"
-                    
-                    row = await conn.fetchrow("""
-                        INSERT INTO document_chunks (document_id, content, chunk_index, embedding,
+                rows = await conn.fetch("""
+                    WITH input AS MATERIALIZED (
+                        SELECT nextval(pg_get_serial_sequence('document_chunks', 'id')) AS id, t.*
+                        FROM unnest($1::int[], $2::text[], $3::int[], $4::text[], $5::text[], $6::text[], $7::text[])
+                            WITH ORDINALITY AS t(document_id, content, chunk_index, embedding,
+                                                 previous_chunk, next_chunk, metadata, ord)
+                    ), inserted AS (
+                        INSERT INTO document_chunks (id, document_id, content, chunk_index, embedding,
                                                     previous_chunk, next_chunk, metadata)
-                        VALUES ($1, $2, $3, $4::vector, $5, $6, $7)
+                        SELECT id, document_id, content, chunk_index, embedding::vector,
+                               previous_chunk, next_chunk, metadata::jsonb
+                        FROM input
                         RETURNING id
-                    """, chunk.document_id, chunk.content, chunk.chunk_index, embedding_str,
-                        chunk.previous_chunk, chunk.next_chunk,
-                        json.dumps(chunk.metadata) if chunk.metadata else None)
-                    
-                    ids.append(row["id"])
+                    )
+                    SELECT input.id, input.ord
+                    FROM input JOIN inserted USING (id)
+                    ORDER BY input.ord
+                """,
+                    [c.document_id for c in chunks],
+                    [c.content for c in chunks],
+                    [c.chunk_index for c in chunks],
+                    [
+                        "[" + ",".join(str(x) for x in c.embedding) + "]" if c.embedding else None
+                        for c in chunks
+                    ],
+                    [c.previous_chunk for c in chunks],
+                    [c.next_chunk for c in chunks],
+                    [json.dumps(c.metadata) if c.metadata else None for c in chunks])
                 
                 # Atualizar contador de chunks
-                doc_ids = list(set(c.document_id for c in chunks))
-                for doc_id in doc_ids:
-                    count = sum(1 for c in chunks if c.document_id == doc_id)
-                    await conn.execute("""
-                        UPDATE documents SET chunk_count = chunk_count + $1, updated_at = NOW()
-                        WHERE id = $2
-                    """, count, doc_id)
-        
-        return ids
+                counts = Counter(c.document_id for c in chunks)
+                await conn.execute("""
+                    UPDATE documents AS d
+                    SET chunk_count = d.chunk_count + t.n, updated_at = NOW()
+                    FROM unnest($1::int[], $2::int[]) AS t(id, n)
+                    WHERE d.id = t.id
+                """, list(counts), list(counts.values()))
+        
+        return [row["id"] for row in rows]
     
     async def search_vector(
         self,
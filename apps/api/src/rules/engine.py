@@ -6,14 +6,18 @@ Coordena validação de regras e validadores.
 
 import asyncio
 import json
-from datetime import datetime
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import Optional, Callable, Any
 import logging
 import os
 
 from .types import (
     Rule, RuleCondition, RuleAction, RuleSeverity, RuleCategory,
-    ValidationResult, Violation, RuleSet
+    ValidationResult, Violation, RuleSet, ConditionOperator
 )
 from .validators import (
     BaseValidator, PIIValidator, SecurityValidator,
@@ -25,6 +29,126 @@ from .validators import (
 logger = logging.getLogger(__name__)
 
 
+# Backreferences numeradas/nomeadas mudam de sentido dentro de uma alternação
+_BACKREF = re.compile(r"\\\d|\(\?P=")
+
+
+def _regex_gate(condition: Optional[RuleCondition]) -> Optional[list[tuple[str, str]]]:
+    """
+    Retorna pares (campo, regex) dos quais a condição depende.
+    
+    Se a condição é satisfeita, pelo menos uma das regexes casa com o seu
+    campo. Retorna None quando a condição não depende só de regexes
+    (função customizada, outros operadores).
+    """
+    if condition is None or condition.custom_fn:
+        return None
+    
+    if condition.operator == ConditionOperator.MATCHES:
+        if condition.target_field and isinstance(condition.value, str):
+            return [(condition.target_field, condition.value)]
+        return None
+    
+    if condition.operator == ConditionOperator.OR and condition.sub_conditions:
+        gates = [_regex_gate(c) for c in condition.sub_conditions]
+        if any(g is None for g in gates):
+            return None
+        return [pair for g in gates for pair in g]
+    
+    if condition.operator == ConditionOperator.AND:
+        for sub in condition.sub_conditions:
+            gate = _regex_gate(sub)
+            if gate is not None:
+                return gate
+    
+    return None
+
+
+@dataclass
+class _RulePlan:
+    """
+    Plano compilado de avaliação de regras.
+    
+    Guarda as regras habilitadas já ordenadas por prioridade e, por campo,
+    uma regex combinada com todas as regexes das quais alguma regra depende.
+    Se a regex combinada não casa, as regras que dependem dela são puladas.
+    """
+    rules: list[Rule]
+    fail_fast: bool = False
+    
+    # campo -> regex combinada
+    prefilters: dict[str, re.Pattern] = field(default_factory=dict)
+    
+    # Campos que precisam casar para avaliar cada regra (None = sempre avaliar)
+    gates: list[Optional[frozenset[str]]] = field(default_factory=list)
+    
+    @classmethod
+    def compile(cls, rules: list[Rule], fail_fast: bool = False) -> "_RulePlan":
+        """Ordena as regras e agrupa as regexes por campo."""
+        rules = sorted((r for r in rules if r.enabled), key=lambda r: r.priority, reverse=True)
+        
+        gates: list[Optional[frozenset[str]]] = []
+        patterns_by_field: dict[str, list[str]] = {}
+        for rule in rules:
+            gate = _regex_gate(rule.condition)
+            if gate is None or any(_BACKREF.search(p) for _, p in gate):
+                gates.append(None)
+                continue
+            gates.append(frozenset(f for f, _ in gate))
+            for target_field, pattern in gate:
+                if pattern not in patterns_by_field.setdefault(target_field, []):
+                    patterns_by_field[target_field].append(pattern)
+        
+        prefilters: dict[str, re.Pattern] = {}
+        for target_field, patterns in patterns_by_field.items():
+            try:
+                prefilters[target_field] = re.compile("|".join(f"(?:{p})" for p in patterns))
+            except re.error:
+                # Padrões incompatíveis com alternação (ex: flags inline): sem pré-filtro
+                gates = [None if g and target_field in g else g for g in gates]
+        
+        return cls(rules=rules, fail_fast=fail_fast, prefilters=prefilters, gates=gates)
+    
+    def evaluate(self, data: dict) -> list[Rule]:
+        """Retorna as regras violadas, em ordem de prioridade."""
+        hits = set()
+        for target_field, prefilter in self.prefilters.items():
+            value = RuleCondition._get_field_value(data, target_field)
+            if isinstance(value, str) and prefilter.search(value):
+                hits.add(target_field)
+        
+        violated = []
+        for rule, gate in zip(self.rules, self.gates):
+            if gate is not None and hits.isdisjoint(gate):
+                continue
+            if rule.evaluate(data):
+                violated.append(rule)
+                if self.fail_fast:
+                    break
+        return violated
+
+
+# Validadores instalados em cada processo do pool de validate_batch
+_worker_validators: list[BaseValidator] = []
+
+
+def _init_validator_worker(payload: bytes) -> None:
+    global _worker_validators
+    _worker_validators = pickle.loads(payload)
+
+
+def _run_validators_chunk(items: list[tuple[str, dict]]) -> list[tuple[list[Violation], float]]:
+    """Executa os validadores do processo sobre um lote de conteúdos."""
+    results = []
+    for content, context in items:
+        start = time.perf_counter()
+        violations = []
+        for validator in _worker_validators:
+            violations.extend(validator.validate(content, context))
+        results.append((violations, (time.perf_counter() - start) * 1000))
+    return results
+
+
 class RulesEngine:
     """
     Motor de regras principal.
@@ -80,6 +204,14 @@ class RulesEngine:
         self._pre_validate_hooks: list[Callable] = []
         self._post_validate_hooks: list[Callable] = []
         
+        # Planos compilados por rule_set_id (None = todas as regras)
+        self._plans: dict[Optional[str], tuple[tuple, _RulePlan]] = {}
+        
+        # Pool de processos de validate_batch (criado sob demanda)
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._pool_workers = 0
+        self._local_validators: list[BaseValidator] = []
+        
         # Métricas
         self.total_validations = 0
         self.total_violations = 0
@@ -99,12 +231,14 @@ class RulesEngine:
             rule: Regra a adicionar
         """
         self._rules[rule.id] = rule
+        self.invalidate_plan()
         logger.debug(f"Regra adicionada: {rule.name}")
     
     def remove_rule(self, rule_id: str) -> bool:
         """Remove uma regra."""
         if rule_id in self._rules:
             del self._rules[rule_id]
+            self.invalidate_plan()
             return True
         return False
     
@@ -121,6 +255,7 @@ class RulesEngine:
         rule = self._rules.get(rule_id)
         if rule:
             rule.enabled = True
+            self.invalidate_plan()
             return True
         return False
     
@@ -129,6 +264,7 @@ class RulesEngine:
         rule = self._rules.get(rule_id)
         if rule:
             rule.enabled = False
+            self.invalidate_plan()
             return True
         return False
     
@@ -137,6 +273,7 @@ class RulesEngine:
     def add_rule_set(self, rule_set: RuleSet) -> None:
         """Adiciona um conjunto de regras."""
         self._rule_sets[rule_set.id] = rule_set
+        self.invalidate_plan()
     
     def get_rule_set(self, rule_set_id: str) -> Optional[RuleSet]:
         """Obtém conjunto de regras."""
@@ -147,20 +284,61 @@ class RulesEngine:
         rule_set = self._rule_sets.get(rule_set_id)
         if rule_set:
             rule_set.enabled = True
+            self.invalidate_plan()
             return True
         return False
     
+    # ==================== Rule Plans ====================
+    
+    def invalidate_plan(self) -> None:
+        """
+        Descarta os planos compilados.
+        
+        Chamado por add/remove/enable/disable. Só é preciso chamar
+        manualmente ao alterar `Rule.enabled` ou a condição de uma regra
+        diretamente.
+        """
+        self._plans.clear()
+    
+    def _get_plan(self, rule_set_id: Optional[str] = None) -> _RulePlan:
+        """Retorna o plano compilado, recompilando se os rule sets mudaram."""
+        # Alterações feitas direto nos RuleSets (add_rule, enabled) mudam a assinatura
+        signature = tuple(
+            (rs.id, rs.enabled, len(rs.rules)) for rs in self._rule_sets.values()
+        )
+        cached = self._plans.get(rule_set_id)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        if rule_set_id:
+            rule_set = self._rule_sets.get(rule_set_id)
+            if rule_set and rule_set.enabled:
+                plan = _RulePlan.compile(rule_set.rules, fail_fast=rule_set.fail_fast)
+            else:
+                plan = _RulePlan.compile([])
+        else:
+            rules = list(self._rules.values())
+            for rs in self._rule_sets.values():
+                if rs.enabled:
+                    rules.extend(rs.rules)
+            plan = _RulePlan.compile(rules)
+        
+        self._plans[rule_set_id] = (signature, plan)
+        return plan
+    
     # ==================== Validators ====================
     
     def add_validator(self, validator: BaseValidator) -> None:
         """Adiciona um validador."""
         self._validators.append(validator)
+        self.shutdown_pool()
     
     def remove_validator(self, name: str) -> bool:
         """Remove validador pelo nome."""
         for i, v in enumerate(self._validators):
             if v.name == name:
                 self._validators.pop(i)
+                self.shutdown_pool()
                 return True
         return False
     
@@ -201,13 +379,32 @@ class RulesEngine:
         Returns:
             ValidationResult com resultado
         """
-        start = datetime.now()
-        context = context or {}
+        start = time.perf_counter()
+        content, context = self._pre_validate(content, context)
+        
+        result = self._evaluate_rules(content, context, rule_set_id)
         
-        # Hooks pré-validação
+        # Executar validadores
+        for validator in self._validators:
+            for v in validator.validate(content, context):
+                result.add_violation(v)
+        
+        return self._finish(result, (time.perf_counter() - start) * 1000)
+    
+    def _pre_validate(self, content: str, context: Optional[dict]) -> tuple[str, dict]:
+        """Aplica hooks pré-validação."""
+        context = context or {}
         for hook in self._pre_validate_hooks:
             content, context = hook(content, context)
-        
+        return content, context
+    
+    def _evaluate_rules(
+        self,
+        content: str,
+        context: dict,
+        rule_set_id: Optional[str]
+    ) -> ValidationResult:
+        """Avalia as regras do plano compilado."""
         result = ValidationResult()
         
         # Preparar dados para avaliação de regras
@@ -217,59 +414,27 @@ class RulesEngine:
             **context
         }
         
-        # Obter regras a avaliar
-        rules_to_evaluate = []
-        
-        if rule_set_id:
-            rule_set = self._rule_sets.get(rule_set_id)
-            if rule_set and rule_set.enabled:
-                rules_to_evaluate = [r for r in rule_set.rules if r.enabled]
-        else:
-            rules_to_evaluate = [r for r in self._rules.values() if r.enabled]
-            
-            # Adicionar regras de todos os rule sets habilitados
-            for rs in self._rule_sets.values():
-                if rs.enabled:
-                    rules_to_evaluate.extend([r for r in rs.rules if r.enabled])
-        
-        # Ordenar por prioridade
-        rules_to_evaluate.sort(key=lambda r: r.priority, reverse=True)
-        
-        # Avaliar regras customizadas
-        for rule in rules_to_evaluate:
-            if rule.evaluate(data):
-                violation = Violation(
-                    rule_id=rule.id,
-                    rule_name=rule.name,
-                    severity=rule.severity,
-                    category=rule.category,
-                    action=rule.action,
-                    message=rule.violation_message or rule.description,
-                    suggestion=rule.fix_suggestion
-                )
-                result.add_violation(violation)
-                
-                # Fail fast se configurado
-                if rule_set_id:
-                    rule_set = self._rule_sets.get(rule_set_id)
-                    if rule_set and rule_set.fail_fast:
-                        break
-        
-        result.rules_evaluated += len(rules_to_evaluate)
-        
-        # Executar validadores
-        for validator in self._validators:
-            violations = validator.validate(content, context)
-            for v in violations:
-                result.add_violation(v)
+        plan = self._get_plan(rule_set_id)
+        for rule in plan.evaluate(data):
+            result.add_violation(Violation(
+                rule_id=rule.id,
+                rule_name=rule.name,
+                severity=rule.severity,
+                category=rule.category,
+                action=rule.action,
+                message=rule.violation_message or rule.description,
+                suggestion=rule.fix_suggestion
+            ))
         
-        # Hooks pós-validação
+        result.rules_evaluated += len(plan.rules)
+        return result
+    
+    def _finish(self, result: ValidationResult, elapsed_ms: float) -> ValidationResult:
+        """Aplica hooks pós-validação e atualiza métricas."""
         for hook in self._post_validate_hooks:
             result = hook(result)
         
-        # Métricas
-        elapsed = (datetime.now() - start).total_seconds() * 1000
-        result.evaluation_time_ms = elapsed
+        result.evaluation_time_ms = elapsed_ms
         
         self.total_validations += 1
         self.total_violations += len(result.violations)
@@ -296,10 +461,102 @@ class RulesEngine:
     def validate_batch(
         self,
         contents: list[str],
-        context: Optional[dict] = None
+        context: Optional[dict] = None,
+        rule_set_id: Optional[str] = None,
+        use_processes: bool = False,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 16
     ) -> list[ValidationResult]:
-        """Valida múltiplos conteúdos."""
-        return [self.validate(c, context) for c in contents]
+        """
+        Valida múltiplos conteúdos.
+        
+        Com `use_processes=True`, os validadores (regex, CPU-bound) rodam
+        em um pool de processos, em lotes de `chunk_size` conteúdos. Regras
+        e hooks continuam no processo atual; validadores que não podem ser
+        serializados (ex: CustomValidator com lambda) também. O contexto
+        precisa ser serializável.
+        
+        Args:
+            contents: Conteúdos a validar
+            context: Contexto compartilhado
+            rule_set_id: ID do rule set a usar (opcional)
+            use_processes: Usar pool de processos para os validadores
+            max_workers: Número de processos (padrão: os.cpu_count())
+            chunk_size: Conteúdos por tarefa enviada ao pool
+            
+        Returns:
+            Resultados na mesma ordem de `contents`
+        """
+        if not use_processes or len(contents) <= 1:
+            return [self.validate(c, context, rule_set_id) for c in contents]
+        
+        pool = self._get_pool(max_workers)
+        if pool is None:
+            return [self.validate(c, context, rule_set_id) for c in contents]
+        
+        prepared = [self._pre_validate(c, context) for c in contents]
+        futures = [
+            pool.submit(_run_validators_chunk, prepared[i:i + chunk_size])
+            for i in range(0, len(prepared), chunk_size)
+        ]
+        
+        # Regras e validadores locais rodam enquanto o pool processa
+        partial = []
+        for content, ctx in prepared:
+            start = time.perf_counter()
+            result = self._evaluate_rules(content, ctx, rule_set_id)
+            remote_index = len(result.violations)
+            for validator in self._local_validators:
+                for v in validator.validate(content, ctx):
+                    result.add_violation(v)
+            partial.append((result, remote_index, (time.perf_counter() - start) * 1000))
+        
+        results = []
+        remote = (item for future in futures for item in future.result())
+        for (result, remote_index, elapsed_ms), (violations, remote_ms) in zip(partial, remote):
+            # Mantém a ordem de validate(): regras, depois validadores
+            local = result.violations[remote_index:]
+            del result.violations[remote_index:]
+            for v in violations + local:
+                result.add_violation(v)
+            results.append(self._finish(result, elapsed_ms + remote_ms))
+        
+        return results
+    
+    def _get_pool(self, max_workers: Optional[int] = None) -> Optional[ProcessPoolExecutor]:
+        """Cria (ou reutiliza) o pool com os validadores serializáveis."""
+        workers = max_workers or os.cpu_count() or 1
+        if self._process_pool is not None and self._pool_workers == workers:
+            return self._process_pool
+        self.shutdown_pool()
+        
+        remote, local = [], []
+        for validator in self._validators:
+            try:
+                pickle.dumps(validator)
+                remote.append(validator)
+            except Exception:
+                local.append(validator)
+        if not remote:
+            return None
+        
+        self._process_pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_validator_worker,
+            initargs=(pickle.dumps(remote),)
+        )
+        self._pool_workers = workers
+        # Violações dos validadores locais entram depois das dos remotos
+        self._local_validators = local
+        return self._process_pool
+    
+    def shutdown_pool(self) -> None:
+        """Encerra o pool de processos de validate_batch."""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+            self._pool_workers = 0
+            self._local_validators = []
     
     # ==================== Persistence ====================
     
@@ -408,7 +665,7 @@ def create_max_length_rule(max_length: int = 10000) -> Rule:
         name="max_length",
         description=f"Limit output to {max_length} characters",
         condition=RuleCondition(
-            field="length",
+            target_field="length",
             operator=ConditionOperator.GREATER_THAN,
             value=max_length
         ),
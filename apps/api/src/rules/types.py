@@ -80,6 +80,16 @@ class RuleCondition:
     # Função customizada
     custom_fn: Optional[Callable[[Any], bool]] = None
     
+    # Regex compilada (MATCHES), criada no primeiro uso
+    _pattern: Optional[re.Pattern] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def pattern(self) -> Optional[re.Pattern]:
+        """Regex compilada para o operador MATCHES."""
+        if self._pattern is None or self._pattern.pattern != self.value:
+            self._pattern = re.compile(self.value) if isinstance(self.value, str) else None
+        return self._pattern
+    
     def evaluate(self, data: dict) -> bool:
         """
         Avalia a condição contra os dados.
@@ -113,7 +123,8 @@ class RuleCondition:
         
         return self._evaluate_operator(field_value)
     
-    def _get_field_value(self, data: dict, field_path: str) -> Any:
+    @staticmethod
+    def _get_field_value(data: dict, field_path: str) -> Any:
         """Obtém valor de campo com suporte a dot notation."""
         parts = field_path.split(".")
         value = data
@@ -152,7 +163,7 @@ class RuleCondition:
         
         elif self.operator == ConditionOperator.MATCHES:
             if isinstance(field_value, str) and isinstance(self.value, str):
-                return bool(re.search(self.value, field_value))
+                return self.pattern.search(field_value) is not None
             return False
         
         elif self.operator == ConditionOperator.STARTS_WITH:
@@ -191,12 +202,12 @@ class RuleCondition:
         """Converte para dicionário."""
         result = {"operator": self.operator.value}
         
-        if self.field:
-            result["field"] = self.field
+        if self.target_field:
+            result["field"] = self.target_field
         if self.value is not None:
             result["value"] = self.value
-        if self.conditions:
-            result["conditions"] = [c.to_dict() for c in self.conditions]
+        if self.sub_conditions:
+            result["conditions"] = [c.to_dict() for c in self.sub_conditions]
         
         return result
     
@@ -208,33 +219,33 @@ class RuleCondition:
         ]
         
         return cls(
-            field=data.get("field"),
+            target_field=data.get("field"),
             operator=ConditionOperator(data.get("operator", "equals")),
             value=data.get("value"),
-            conditions=conditions
+            sub_conditions=conditions
         )
     
     # Factory methods para facilitar criação
     
     @classmethod
     def equals(cls, field: str, value: Any) -> "RuleCondition":
-        return cls(field=field, operator=ConditionOperator.EQUALS, value=value)
+        return cls(target_field=field, operator=ConditionOperator.EQUALS, value=value)
     
     @classmethod
     def contains(cls, field: str, value: str) -> "RuleCondition":
-        return cls(field=field, operator=ConditionOperator.CONTAINS, value=value)
+        return cls(target_field=field, operator=ConditionOperator.CONTAINS, value=value)
     
     @classmethod
     def matches(cls, field: str, pattern: str) -> "RuleCondition":
-        return cls(field=field, operator=ConditionOperator.MATCHES, value=pattern)
+        return cls(target_field=field, operator=ConditionOperator.MATCHES, value=pattern)
     
     @classmethod
-    def and_(*conditions: "RuleCondition") -> "RuleCondition":
-        return cls(operator=ConditionOperator.AND, conditions=list(conditions))
+    def and_(cls, *conditions: "RuleCondition") -> "RuleCondition":
+        return cls(operator=ConditionOperator.AND, sub_conditions=list(conditions))
     
     @classmethod
-    def or_(*conditions: "RuleCondition") -> "RuleCondition":
-        return cls(operator=ConditionOperator.OR, conditions=list(conditions))
+    def or_(cls, *conditions: "RuleCondition") -> "RuleCondition":
+        return cls(operator=ConditionOperator.OR, sub_conditions=list(conditions))
     
     @classmethod
     def custom(cls, fn: Callable[[Any], bool]) -> "RuleCondition":
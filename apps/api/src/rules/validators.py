@@ -139,17 +139,18 @@ class PIIValidator(BaseValidator):
     ):
         self.enabled_patterns = enabled_patterns or list(self.PATTERNS.keys())
         self.default_action = action
+        self._compiled = {
+            name: re.compile(self.PATTERNS[name]["pattern"], re.IGNORECASE)
+            for name in self.enabled_patterns if name in self.PATTERNS
+        }
     
     def validate(self, content: str, context: Optional[dict] = None) -> list[Violation]:
         """Valida conteúdo para PII."""
         violations = []
         
-        for pattern_name in self.enabled_patterns:
-            if pattern_name not in self.PATTERNS:
-                continue
-            
+        for pattern_name, regex in self._compiled.items():
             config = self.PATTERNS[pattern_name]
-            matches = re.findall(config["pattern"], content, re.IGNORECASE)
+            matches = regex.findall(content)
             
             for match in matches:
                 # Mascarar valor encontrado
@@ -248,18 +249,19 @@ class SecurityValidator(BaseValidator):
     ):
         self.enabled_checks = enabled_checks or list(self.PATTERNS.keys())
         self.default_action = action
+        self._compiled = {
+            name: re.compile(self.PATTERNS[name]["pattern"], re.IGNORECASE)
+            for name in self.enabled_checks if name in self.PATTERNS
+        }
     
     def validate(self, content: str, context: Optional[dict] = None) -> list[Violation]:
         """Valida conteúdo para problemas de segurança."""
         violations = []
         
-        for check_name in self.enabled_checks:
-            if check_name not in self.PATTERNS:
-                continue
-            
+        for check_name, regex in self._compiled.items():
             config = self.PATTERNS[check_name]
             
-            if re.search(config["pattern"], content, re.IGNORECASE):
+            if regex.search(content):
                 violations.append(self._create_violation(
                     rule_name=check_name,
                     message=config["message"],
@@ -427,25 +429,28 @@ class ComplianceValidator(BaseValidator):
     ):
         self.regulations = regulations or ["gdpr", "hipaa", "pci"]
         self.default_action = action
+        # Termos de cada regulamentação unidos em uma única regex
+        self._compiled = {
+            regulation: re.compile(
+                "|".join(f"(?:{p})" for p in self.SENSITIVE_TERMS[regulation]), re.IGNORECASE
+            )
+            for regulation in self.regulations if regulation in self.SENSITIVE_TERMS
+        }
     
     def validate(self, content: str, context: Optional[dict] = None) -> list[Violation]:
         """Valida compliance."""
         violations = []
         
-        for regulation in self.regulations:
-            if regulation not in self.SENSITIVE_TERMS:
-                continue
-            
-            for pattern in self.SENSITIVE_TERMS[regulation]:
-                if re.search(pattern, content, re.IGNORECASE):
-                    violations.append(self._create_violation(
-                        rule_name=f"{regulation}_sensitive",
-                        message=f"Content may contain {regulation.upper()}-sensitive information",
-                        severity=RuleSeverity.WARNING,
-                        action=self.default_action,
-                        suggestion=f"Review content for {regulation.upper()} compliance"
-                    ))
-                    break  # Uma violação por regulamentação
+        for regulation, regex in self._compiled.items():
+            # Uma violação por regulamentação
+            if regex.search(content):
+                violations.append(self._create_violation(
+                    rule_name=f"{regulation}_sensitive",
+                    message=f"Content may contain {regulation.upper()}-sensitive information",
+                    severity=RuleSeverity.WARNING,
+                    action=self.default_action,
+                    suggestion=f"Review content for {regulation.upper()} compliance"
+                ))
         
         return violations
 
@@ -522,6 +527,12 @@ class ToxicityValidator(BaseValidator):
     
     def __init__(self, action: RuleAction = RuleAction.BLOCK):
         self.default_action = action
+        self._compiled = {
+            check_name: re.compile(
+                "|".join(f"(?:{p})" for p in self.PATTERNS[check_name]["patterns"]), re.IGNORECASE
+            )
+            for check_name in ("hate_speech", "threats")
+        }
     
     def validate(self, content: str, context: Optional[dict] = None) -> list[Violation]:
         """Valida conteúdo tóxico."""
@@ -542,18 +553,16 @@ class ToxicityValidator(BaseValidator):
                 break
         
         # Padrões de hate speech e threats
-        for check_name in ["hate_speech", "threats"]:
+        for check_name, regex in self._compiled.items():
             config = self.PATTERNS[check_name]
-            for pattern in config["patterns"]:
-                if re.search(pattern, content, re.IGNORECASE):
-                    violations.append(self._create_violation(
-                        rule_name=check_name,
-                        message=config["message"],
-                        severity=config["severity"],
-                        action=self.default_action,
-                        suggestion="Remove harmful content"
-                    ))
-                    break
+            if regex.search(content):
+                violations.append(self._create_violation(
+                    rule_name=check_name,
+                    message=config["message"],
+                    severity=config["severity"],
+                    action=self.default_action,
+                    suggestion="Remove harmful content"
+                ))
         
         return violations
 
@@ -601,13 +610,14 @@ class CustomValidator(BaseValidator):
         
         for name, config in self.patterns.items():
             pattern = config.get("pattern", "")
-            if pattern and re.search(pattern, content, re.IGNORECASE):
+            match = re.search(pattern, content, re.IGNORECASE) if pattern else None
+            if match:
                 violations.append(self._create_violation(
                     rule_name=f"custom_{name}",
                     message=config.get("message", f"Pattern '{name}' matched"),
                     severity=config.get("severity", RuleSeverity.WARNING),
                     action=self.default_action,
-                    matched=re.search(pattern, content, re.IGNORECASE).group()
+                    matched=match.group()
                 ))
         
         return violations
@@ -0,0 +1,227 @@
+"""
+Motor de expressões cron compartilhado.
+
+Compila cada campo de uma expressão cron em um bitset de valores
+permitidos e calcula a próxima execução pulando campo a campo (mês,
+dia, hora, minuto), em vez de testar minuto a minuto.
+
+Usado por `scheduler.CronExpression` e `workflows.triggers.schedule`.
+
+Formato: minute hour day_of_month month day_of_week
+Suporta: *, */N, N, N-M, N-M/S, N/S, listas (N,M-O), nomes (jan, mon)
+e presets (@hourly, @daily, @weekly, @monthly, @yearly).
+
+Semântica padrão do cron:
+- day_of_week: 0-7, onde 0 e 7 são domingo
+- Se day_of_month e day_of_week são restritos, basta um dos dois casar
+"""
+
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+
+PRESETS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+}
+
+MONTH_NAMES = {
+    name: i for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1
+    )
+}
+
+WEEKDAY_NAMES = {
+    name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])
+}
+
+# Limite de busca: ciclo completo do calendário gregoriano para dia/mês/dia da semana
+_MAX_YEARS = 28
+
+
+def _next_bit(mask: int, value: int) -> Optional[int]:
+    """Menor valor >= `value` presente no bitset, ou None."""
+    rest = mask >> value
+    if not rest:
+        return None
+    return value + (rest & -rest).bit_length() - 1
+
+
+def _parse_value(token: str, names: dict, min_val: int, max_val: int) -> int:
+    value = names.get(token.lower()) if names else None
+    if value is None:
+        try:
+            value = int(token)
+        except ValueError:
+            raise ValueError(f"Valor inválido no cron: {token!r}")
+    if not min_val <= value <= max_val:
+        raise ValueError(f"Valor fora do intervalo {min_val}-{max_val} no cron: {token!r}")
+    return value
+
+
+def _parse_field(field: str, min_val: int, max_val: int, names: Optional[dict] = None) -> int:
+    """Converte um campo cron em bitset (bit i = valor i permitido)."""
+    mask = 0
+    for item in field.split(","):
+        if not item:
+            raise ValueError(f"Campo cron inválido: {field!r}")
+
+        base, _, step_str = item.partition("/")
+        step = 1
+        if step_str:
+            try:
+                step = int(step_str)
+            except ValueError:
+                raise ValueError(f"Passo inválido no cron: {item!r}")
+            if step <= 0:
+                raise ValueError(f"Passo inválido no cron: {item!r}")
+
+        if base == "*":
+            start, end = min_val, max_val
+        elif "-" in base:
+            start_str, _, end_str = base.partition("-")
+            start = _parse_value(start_str, names, min_val, max_val)
+            end = _parse_value(end_str, names, min_val, max_val)
+            if start > end:
+                raise ValueError(f"Intervalo invertido no cron: {item!r}")
+        else:
+            start = _parse_value(base, names, min_val, max_val)
+            # "N/S" vai de N até o máximo
+            end = max_val if step_str else start
+
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask
+
+
+class CronSchedule:
+    """
+    Expressão cron compilada em bitsets.
+
+    Imutável; use `CronSchedule.parse` (com cache por expressão).
+
+    Exemplo:
+        schedule = CronSchedule.parse("0 9 * * 1-5")
+        schedule.next_after(datetime(2025, 1, 3, 10, 0))  # segunda 06/01 09:00
+    """
+
+    __slots__ = (
+        "expression", "minutes", "hours", "days", "months", "weekdays",
+        "dom_restricted", "dow_restricted"
+    )
+
+    def __init__(self, expression: str):
+        expression = " ".join(expression.split())
+        parts = PRESETS.get(expression.lower(), expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"Expressão cron deve ter 5 campos: {expression!r}")
+
+        minute, hour, day, month, weekday = parts
+        self.expression = expression
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(day, 1, 31)
+        self.months = _parse_field(month, 1, 12, MONTH_NAMES)
+        weekdays = _parse_field(weekday, 0, 7, WEEKDAY_NAMES)
+        # 7 também é domingo
+        self.weekdays = (weekdays | (weekdays >> 7)) & 0x7F
+
+        self.dom_restricted = not day.startswith("*")
+        self.dow_restricted = not weekday.startswith("*")
+
+    @staticmethod
+    def parse(expression: str) -> "CronSchedule":
+        """Compila (ou reutiliza) a expressão."""
+        return _compile(expression)
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    def _day_matches(self, year: int, month: int, day: int) -> bool:
+        dom = bool(self.days >> day & 1)
+        # isoweekday: segunda=1..domingo=7 -> domingo=0
+        dow = bool(self.weekdays >> (datetime(year, month, day).isoweekday() % 7) & 1)
+        if self.dom_restricted and self.dow_restricted:
+            return dom or dow
+        return dom and dow
+
+    def matches(self, dt: datetime) -> bool:
+        """Verifica se o minuto de `dt` corresponde à expressão."""
+        return bool(
+            self.minutes >> dt.minute & 1 and
+            self.hours >> dt.hour & 1 and
+            self.months >> dt.month & 1 and
+            self._day_matches(dt.year, dt.month, dt.day)
+        )
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Próxima execução estritamente após `after` (resolução de minuto).
+
+        Preserva o tzinfo de `after`.
+
+        Raises:
+            ValueError: se a expressão nunca casa (ex: 30 de fevereiro)
+        """
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        year, month, day = start.year, start.month, start.day
+        hour, minute = start.hour, start.minute
+
+        while year <= start.year + _MAX_YEARS:
+            # Mês
+            next_month = _next_bit(self.months, month)
+            if next_month is None:
+                year, month, day, hour, minute = year + 1, 1, 1, 0, 0
+                continue
+            if next_month != month:
+                month, day, hour, minute = next_month, 1, 0, 0
+
+            # Dia
+            days_in_month = calendar.monthrange(year, month)[1]
+            while day <= days_in_month and not self._day_matches(year, month, day):
+                day, hour, minute = day + 1, 0, 0
+            if day > days_in_month:
+                month, day, hour, minute = month + 1, 1, 0, 0
+                if month > 12:
+                    year, month = year + 1, 1
+                continue
+
+            # Hora
+            next_hour = _next_bit(self.hours, hour)
+            if next_hour is None:
+                day, hour, minute = day + 1, 0, 0
+                if day > days_in_month:
+                    month, day = month + 1, 1
+                    if month > 12:
+                        year, month = year + 1, 1
+                continue
+            if next_hour != hour:
+                hour, minute = next_hour, 0
+
+            # Minuto
+            next_minute = _next_bit(self.minutes, minute)
+            if next_minute is None:
+                hour, minute = hour + 1, 0
+                if hour > 23:
+                    day, hour = day + 1, 0
+                    if day > days_in_month:
+                        month, day = month + 1, 1
+                        if month > 12:
+                            year, month = year + 1, 1
+                continue
+
+            return start.replace(year=year, month=month, day=day, hour=hour, minute=next_minute)
+
+        raise ValueError(f"Expressão cron nunca casa: {self.expression!r}")
+
+
+@lru_cache(maxsize=4096)
+def _compile(expression: str) -> CronSchedule:
+    return CronSchedule(expression)
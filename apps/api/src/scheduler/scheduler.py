@@ -6,13 +6,23 @@ Permite agendar execuções de agentes com expressões cron-like.
 
 import os
 import json
+import time
+import heapq
 import asyncio
-from typing import Optional, List, Dict, Any, Callable
+import itertools
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Callable, Deque, Tuple
 from dataclasses import dataclass, field, asdict
-from datetime import datetime, timedelta
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
-import re
+import logging
+
+from .cron import CronSchedule, PRESETS
+
+
+logger = logging.getLogger(__name__)
 
 
 class TaskStatus(Enum):
@@ -31,7 +41,7 @@ class CronExpression:
     Parser de expressões cron simplificadas.
     
     Formato: minute hour day_of_month month day_of_week
-    Suporta: *, */N, N, N-M, N,M,O
+    Suporta: *, */N, N, N-M, N-M/S, N,M,O
     
     Exemplos:
         "* * * * *"       - A cada minuto
@@ -39,6 +49,9 @@ class CronExpression:
         "0 9 * * 1-5"     - 9h em dias úteis
         "*/15 * * * *"    - A cada 15 minutos
         "0 0 1 * *"       - Primeiro dia de cada mês
+    
+    O cálculo é feito por `CronSchedule` (bitsets por campo), compartilhado
+    com os triggers de workflow.
     """
     expression: str
     minute: str = "*"
@@ -51,63 +64,23 @@ class CronExpression:
         parts = self.expression.split()
         if len(parts) == 5:
             self.minute, self.hour, self.day_of_month, self.month, self.day_of_week = parts
-        elif len(parts) == 1:
-            # Presets
-            presets = {
-                "@hourly": "0 * * * *",
-                "@daily": "0 0 * * *",
-                "@weekly": "0 0 * * 0",
-                "@monthly": "0 0 1 * *",
-                "@yearly": "0 0 1 1 *",
-            }
-            if self.expression in presets:
-                self.__init__(presets[self.expression])
+        elif len(parts) == 1 and self.expression in PRESETS:
+            self.__init__(PRESETS[self.expression])
     
-    def matches(self, dt: datetime) -> bool:
-        """Verifica se datetime corresponde à expressão."""
-        return (
-            self._matches_field(self.minute, dt.minute, 0, 59) and
-            self._matches_field(self.hour, dt.hour, 0, 23) and
-            self._matches_field(self.day_of_month, dt.day, 1, 31) and
-            self._matches_field(self.month, dt.month, 1, 12) and
-            self._matches_field(self.day_of_week, dt.weekday(), 0, 6)
+    @property
+    def schedule(self) -> CronSchedule:
+        """Expressão compilada (ValueError se inválida)."""
+        return CronSchedule.parse(
+            f"{self.minute} {self.hour} {self.day_of_month} {self.month} {self.day_of_week}"
         )
     
-    def _matches_field(self, field: str, value: int, min_val: int, max_val: int) -> bool:
-        """Verifica se valor corresponde ao campo."""
-        if field == "*":
-            return True
-        
-        # */N - a cada N
-        if field.startswith("*/"):
-            step = int(field[2:])
-            return value % step == 0
-        
-        # N-M - range
-        if "-" in field:
-            start, end = map(int, field.split("-"))
-            return start <= value <= end
-        
-        # N,M,O - lista
-        if "," in field:
-            values = [int(v) for v in field.split(",")]
-            return value in values
-        
-        # N - valor exato
-        return value == int(field)
+    def matches(self, dt: datetime) -> bool:
+        """Verifica se datetime corresponde à expressão."""
+        return self.schedule.matches(dt)
     
     def next_run(self, after: Optional[datetime] = None) -> datetime:
         """Calcula próxima execução."""
-        dt = after or datetime.now()
-        dt = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
-        
-        # Máximo 1 ano de busca
-        for _ in range(525600):  # minutos em 1 ano
-            if self.matches(dt):
-                return dt
-            dt += timedelta(minutes=1)
-        
-        raise ValueError("Não foi possível calcular próxima execução")
+        return self.schedule.next_after(after or datetime.now())
 
 
 @dataclass
@@ -176,6 +149,17 @@ class Scheduler:
     - Retry automático
     - Histórico de execuções
     
+    As tarefas ficam em um heap ordenado por next_run: o loop dorme até
+    a próxima tarefa vencer (ou até ser acordado por um novo agendamento)
+    em vez de varrer todas as tarefas periodicamente. Entradas obsoletas
+    do heap (tarefa removida, pausada ou reagendada) são descartadas ao
+    sair do topo.
+    
+    A persistência é agrupada: com o loop rodando, grava no máximo a cada
+    `flush_interval` segundos. Execuções só acrescentam o estado da tarefa
+    ao log `runs.jsonl`; `tasks.json` é regravado em mudanças estruturais
+    (agendar, remover, pausar) e quando o log é compactado.
+    
     Exemplo:
         scheduler = Scheduler()
         
@@ -192,17 +176,39 @@ class Scheduler:
     def __init__(
         self,
         storage_path: Optional[str] = None,
-        agent_executor: Optional[Callable] = None
+        agent_executor: Optional[Callable] = None,
+        flush_interval: float = 1.0,
+        max_concurrent: Optional[int] = None,
+        max_executions: int = 1000
     ):
         self.storage_path = Path(storage_path or os.getenv("SCHEDULER_STORAGE_PATH", "./data/scheduler"))
         self.storage_path.mkdir(parents=True, exist_ok=True)
         
         self.agent_executor = agent_executor
+        self.flush_interval = flush_interval
         self._tasks: Dict[str, ScheduledTask] = {}
-        self._executions: List[TaskExecution] = []
+        self._executions: Deque[TaskExecution] = deque(maxlen=max_executions)
         self._running = False
         self._task: Optional[asyncio.Task] = None
         
+        # Heap de (next_run, seq, task_id)
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent else None
+        
+        # Persistência agrupada: mudanças estruturais regravam tasks.json;
+        # estado de execução vai para o log runs.jsonl (um registro por tarefa)
+        self._dirty = False
+        self._pending_runs: Dict[str, Dict[str, Any]] = {}
+        self._log_records = 0
+        # Geração do snapshot: registros do log de outra geração (o log
+        # anterior, se o processo caiu antes de removê-lo) são ignorados
+        self._generation = 0
+        self._batch_depth = 0
+        self._last_flush = 0.0
+        
         self._load_tasks()
     
     def _load_tasks(self):
@@ -210,6 +216,7 @@ class Scheduler:
         tasks_file = self.storage_path / "tasks.json"
         if tasks_file.exists():
             data = json.loads(tasks_file.read_text())
+            self._generation = data.get("generation", 0)
             for t in data.get("tasks", []):
                 task = ScheduledTask(
                     id=t["id"],
@@ -228,11 +235,148 @@ class Scheduler:
                     metadata=t.get("metadata", {})
                 )
                 self._tasks[task.id] = task
+        
+        # Reaplicar estado de execução registrado após o último snapshot
+        runs_file = self.storage_path / "runs.jsonl"
+        if runs_file.exists():
+            with open(runs_file) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Linha incompleta de uma gravação interrompida
+                        continue
+                    if record.get("gen", 0) != self._generation:
+                        continue
+                    task = self._tasks.get(record["id"])
+                    if task:
+                        self._apply_run_state(task, record)
+                    self._log_records += 1
+        
+        for task in self._tasks.values():
+            self._push(task)
+    
+    @staticmethod
+    def _run_state(task: ScheduledTask) -> Dict[str, Any]:
+        """Campos de uma tarefa alterados por execuções."""
+        return {
+            "id": task.id,
+            "status": task.status.value,
+            "last_run": task.last_run.isoformat() if task.last_run else None,
+            "next_run": task.next_run.isoformat() if task.next_run else None,
+            "run_count": task.run_count,
+            "error_count": task.error_count,
+            "last_error": task.last_error
+        }
+    
+    @staticmethod
+    def _apply_run_state(task: ScheduledTask, record: Dict[str, Any]):
+        task.status = TaskStatus(record["status"])
+        task.last_run = datetime.fromisoformat(record["last_run"]) if record.get("last_run") else None
+        task.next_run = datetime.fromisoformat(record["next_run"]) if record.get("next_run") else None
+        task.run_count = record.get("run_count", 0)
+        task.error_count = record.get("error_count", 0)
+        task.last_error = record.get("last_error")
+    
+    def _write(
+        self,
+        tasks: Optional[List[ScheduledTask]],
+        records: List[Dict[str, Any]],
+        generation: int
+    ):
+        """
+        Grava snapshot completo (tasks.json, zerando o log) ou apenas
+        acrescenta registros de execução ao runs.jsonl.
+        
+        O snapshot leva a nova geração antes de o log ser removido: se o
+        processo cair entre os dois passos, o log antigo é ignorado.
+        """
+        runs_file = self.storage_path / "runs.jsonl"
+        if tasks is not None:
+            data = {"generation": generation, "tasks": [t.to_dict() for t in tasks]}
+            tasks_file = self.storage_path / "tasks.json"
+            tmp_file = tasks_file.with_suffix(".json.tmp")
+            tmp_file.write_text(json.dumps(data))
+            os.replace(tmp_file, tasks_file)
+            runs_file.unlink(missing_ok=True)
+        elif records:
+            with open(runs_file, "a") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in records))
+    
+    def _take_pending(self) -> Tuple[Optional[List[ScheduledTask]], List[Dict[str, Any]], int]:
+        """Retira o que está pendente de gravação."""
+        records = list(self._pending_runs.values())
+        self._pending_runs.clear()
+        
+        # Compactar o log quando ele passa de algumas vezes o número de tarefas
+        compact = self._log_records + len(records) > max(1000, 4 * len(self._tasks))
+        if self._dirty or compact:
+            self._dirty = False
+            self._log_records = 0
+            self._generation += 1
+            return list(self._tasks.values()), [], self._generation
+        
+        self._log_records += len(records)
+        for record in records:
+            record["gen"] = self._generation
+        return None, records, self._generation
+    
+    def _has_pending(self) -> bool:
+        return self._dirty or bool(self._pending_runs)
+    
+    def _request_flush(self):
+        """Sem o loop rodando (e fora de `batch()`), grava já; senão, acorda o loop."""
+        if not self._running:
+            if self._batch_depth == 0:
+                self.flush()
+        elif self._wakeup is not None:
+            self._wakeup.set()
     
     def _save_tasks(self):
-        """Salva tarefas."""
-        data = {"tasks": [t.to_dict() for t in self._tasks.values()]}
-        (self.storage_path / "tasks.json").write_text(json.dumps(data, indent=2))
+        """Marca tarefas para persistência (snapshot completo)."""
+        self._dirty = True
+        self._request_flush()
+    
+    def _record_run(self, task: ScheduledTask):
+        """Marca estado de execução de uma tarefa para persistência."""
+        was_pending = self._has_pending()
+        self._pending_runs[task.id] = self._run_state(task)
+        if not self._running or not was_pending:
+            self._request_flush()
+    
+    def flush(self):
+        """Grava as alterações pendentes imediatamente."""
+        if not self._has_pending():
+            return
+        self._last_flush = time.monotonic()
+        self._write(*self._take_pending())
+    
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa a persistência de várias operações.
+        
+        Exemplo:
+            with scheduler.batch():
+                for report in reports:
+                    scheduler.schedule(...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and not self._running:
+                self.flush()
+    
+    def _push(self, task: ScheduledTask):
+        """Insere a tarefa no heap e acorda o loop se ela for a próxima."""
+        if not task.enabled or task.next_run is None:
+            return
+        entry = (task.next_run, next(self._seq), task.id)
+        heapq.heappush(self._heap, entry)
+        if self._wakeup is not None and self._heap[0] is entry:
+            self._wakeup.set()
     
     def schedule(
         self,
@@ -264,6 +408,7 @@ class Scheduler:
         )
         
         self._tasks[task.id] = task
+        self._push(task)
         self._save_tasks()
         
         return task
@@ -293,6 +438,7 @@ class Scheduler:
             task.status = TaskStatus.PENDING
             cron = CronExpression(task.cron_expression)
             task.next_run = cron.next_run()
+            self._push(task)
             self._save_tasks()
             return True
         return False
@@ -321,6 +467,7 @@ class Scheduler:
             return
         
         self._running = True
+        self._wakeup = asyncio.Event()
         self._task = asyncio.create_task(self._run_loop())
     
     async def stop(self):
@@ -332,21 +479,77 @@ class Scheduler:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        self._wakeup = None
+        self.flush()
+    
+    def _pop_due(self, now: datetime) -> List[Tuple[datetime, ScheduledTask]]:
+        """Remove do heap as tarefas vencidas, descartando entradas obsoletas."""
+        due = []
+        seen = set()
+        while self._heap and self._heap[0][0] <= now:
+            scheduled, _, task_id = heapq.heappop(self._heap)
+            task = self._tasks.get(task_id)
+            if task is None or not task.enabled or task.next_run != scheduled or task_id in seen:
+                continue
+            seen.add(task_id)
+            due.append((scheduled, task))
+        return due
     
     async def _run_loop(self):
         """Loop principal do scheduler."""
         while self._running:
             now = datetime.now()
             
-            for task in self._tasks.values():
-                if not task.enabled:
-                    continue
+            for scheduled, task in self._pop_due(now):
+                # Próxima ocorrência calculada no disparo: execuções longas
+                # não disparam a mesma ocorrência de novo
+                task.next_run = CronExpression(task.cron_expression).next_run(max(scheduled, now))
+                self._push(task)
+                self._pending_runs[task.id] = self._run_state(task)
                 
-                if task.next_run and task.next_run <= now:
-                    asyncio.create_task(self._execute_task(task))
+                if task.id in self._in_flight:
+                    # Execução anterior ainda rodando: ocorrência ignorada
+                    continue
+                self._in_flight[task.id] = asyncio.create_task(self._dispatch(task))
             
-            # Checar a cada 30 segundos
-            await asyncio.sleep(30)
+            # Persistência agrupada
+            since_flush = time.monotonic() - self._last_flush
+            if self._has_pending() and since_flush >= self.flush_interval:
+                self._last_flush = time.monotonic()
+                try:
+                    await asyncio.to_thread(self._write, *self._take_pending())
+                except Exception as e:
+                    logger.error(f"Erro ao salvar tarefas agendadas: {e}")
+                    # Próxima gravação será um snapshot completo
+                    self._dirty = True
+            
+            # Dormir até a próxima tarefa (ou próxima gravação pendente)
+            timeout = 60.0
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - datetime.now()).total_seconds())
+            if self._has_pending():
+                timeout = min(timeout, self.flush_interval - (time.monotonic() - self._last_flush))
+            
+            self._wakeup.clear()
+            if timeout > 0:
+                # call_later em vez de wait_for: no 3.11 wait_for pode engolir
+                # o cancelamento de stop() quando o evento dispara ao mesmo tempo
+                timer = asyncio.get_running_loop().call_later(timeout, self._wakeup.set)
+                try:
+                    await self._wakeup.wait()
+                finally:
+                    timer.cancel()
+    
+    async def _dispatch(self, task: ScheduledTask):
+        """Executa tarefa disparada pelo loop, respeitando max_concurrent."""
+        try:
+            if self._semaphore is not None:
+                async with self._semaphore:
+                    await self._execute_task(task)
+            else:
+                await self._execute_task(task)
+        finally:
+            self._in_flight.pop(task.id, None)
     
     async def _execute_task(self, task: ScheduledTask) -> TaskExecution:
         """Executa uma tarefa."""
@@ -387,14 +590,16 @@ class Scheduler:
                 execution.completed_at - execution.started_at
             ).total_seconds()
             
-            # Calcular próxima execução
+            # Calcular próxima execução (o loop já calcula ao disparar)
             if task.enabled:
-                cron = CronExpression(task.cron_expression)
-                task.next_run = cron.next_run()
+                if task.next_run is None or task.next_run <= datetime.now():
+                    cron = CronExpression(task.cron_expression)
+                    task.next_run = cron.next_run()
+                    self._push(task)
                 task.status = TaskStatus.PENDING
             
             self._executions.append(execution)
-            self._save_tasks()
+            self._record_run(task)
         
         return execution
     
@@ -404,7 +609,7 @@ class Scheduler:
         limit: int = 100
     ) -> List[TaskExecution]:
         """Lista execuções."""
-        executions = self._executions
+        executions = list(self._executions)
         if task_id:
             executions = [e for e in executions if e.task_id == task_id]
         return sorted(executions, key=lambda e: e.started_at, reverse=True)[:limit]
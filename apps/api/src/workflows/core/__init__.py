@@ -6,12 +6,14 @@ Componentes:
 - ExecutionContext: Contexto de execução
 - StateManager: Gerenciamento de estado durável
 - WorkflowRegistry: Registro de workflows
+- WorkflowStore: Persistência SQLite do registro
 """
 
 from .engine import WorkflowEngine, create_engine
 from .execution import ExecutionContext, ExecutionResult, ExecutionStatus
 from .state import StateManager, WorkflowState, Checkpoint
 from .registry import WorkflowRegistry, get_registry
+from .store import WorkflowStore
 from .variables import VariableResolver, Expression
 
 __all__ = [
@@ -25,6 +27,7 @@ __all__ = [
     "Checkpoint",
     "WorkflowRegistry",
     "get_registry",
+    "WorkflowStore",
     "VariableResolver",
     "Expression",
 ]
@@ -5,18 +5,20 @@ Funcionalidades:
 - CRUD de workflows
 - Validação de definições
 - Versionamento básico
-- Persistência
+- Persistência incremental (um registro por workflow)
 """
 
 import json
 import time
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from dataclasses import dataclass, field
 from pathlib import Path
 import threading
 import logging
 
+from .store import WorkflowIndexEntry, WorkflowStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -178,9 +180,14 @@ class WorkflowRegistry:
     Features:
     - CRUD de definições
     - Validação
-    - Persistência em arquivo/SQLite
+    - Persistência em SQLite, um registro por workflow (WorkflowStore)
+    - Definições carregadas sob demanda; índice de ids, tags e enabled
+      em memória para `list`
     - Thread-safe
     
+    Um `storage_path` terminado em .json (formato antigo, arquivo único)
+    usa o banco `<nome>.db` ao lado, importando o JSON na primeira vez.
+    
     Exemplo:
         registry = WorkflowRegistry()
         
@@ -204,15 +211,59 @@ class WorkflowRegistry:
     """
     
     def __init__(self, storage_path: Optional[str] = None):
+        # Definições carregadas (com storage, cache preenchido sob demanda)
         self._workflows: Dict[str, WorkflowDefinition] = {}
         self._versions: Dict[str, List[WorkflowDefinition]] = {}
+        self._index: Dict[str, WorkflowIndexEntry] = {}
+        self._tag_index: Dict[str, Set[str]] = {}
         self._lock = threading.RLock()
         self._storage_path = Path(storage_path) if storage_path else None
+        self._store: Optional[WorkflowStore] = None
         
-        # Carregar do storage se existir
-        if self._storage_path and self._storage_path.exists():
+        if self._storage_path:
             self._load_from_storage()
     
+    def _index_add(self, definition: WorkflowDefinition) -> None:
+        self._index_remove(definition.id)
+        self._index[definition.id] = WorkflowIndexEntry(
+            id=definition.id,
+            name=definition.name,
+            version=definition.version,
+            enabled=definition.enabled,
+            tags=list(definition.tags)
+        )
+        for tag in definition.tags:
+            self._tag_index.setdefault(tag, set()).add(definition.id)
+    
+    def _index_remove(self, workflow_id: str) -> None:
+        entry = self._index.pop(workflow_id, None)
+        if entry:
+            for tag in entry.tags:
+                ids = self._tag_index.get(tag)
+                if ids:
+                    ids.discard(workflow_id)
+                    if not ids:
+                        del self._tag_index[tag]
+    
+    def _load(self, workflow_id: str) -> Optional[WorkflowDefinition]:
+        """Definição atual, lida do store na primeira vez."""
+        definition = self._workflows.get(workflow_id)
+        if definition is None and self._store and workflow_id in self._index:
+            data = self._store.load(workflow_id)
+            if data:
+                definition = self._workflows[workflow_id] = WorkflowDefinition.from_dict(data)
+        return definition
+    
+    def _load_versions(self, workflow_id: str) -> List[WorkflowDefinition]:
+        """Versões anteriores, lidas do store na primeira vez."""
+        versions = self._versions.get(workflow_id)
+        if versions is None:
+            versions = []
+            if self._store and workflow_id in self._index:
+                versions = [WorkflowDefinition.from_dict(d) for d in self._store.load_versions(workflow_id)]
+            self._versions[workflow_id] = versions
+        return versions
+    
     def register(
         self,
         definition: WorkflowDefinition,
@@ -241,11 +292,11 @@ class WorkflowRegistry:
             definition.updated_at = datetime.now()
             
             # Guardar versão anterior
-            if definition.id in self._workflows:
-                old = self._workflows[definition.id]
-                if definition.id not in self._versions:
-                    self._versions[definition.id] = []
-                self._versions[definition.id].append(old)
+            previous = None
+            old = self._load(definition.id)
+            if old is not None:
+                previous = old.to_dict()
+                self._load_versions(definition.id).append(old)
                 
                 # Incrementar versão
                 parts = definition.version.split(".")
@@ -253,10 +304,14 @@ class WorkflowRegistry:
                 definition.version = ".".join(parts)
             
             self._workflows[definition.id] = definition
+            self._index_add(definition)
             
-            # Persistir
-            if self._storage_path:
-                self._save_to_storage()
+            # Persistir (só este workflow)
+            if self._store:
+                try:
+                    self._store.save(definition.to_dict(), previous=previous)
+                except Exception as e:
+                    logger.error(f"Failed to save workflow {definition.id}: {e}")
             
             logger.info(f"Registered workflow: {definition.id} v{definition.version}")
             return definition
@@ -264,7 +319,7 @@ class WorkflowRegistry:
     def get(self, workflow_id: str) -> Optional[WorkflowDefinition]:
         """Obtém workflow por ID."""
         with self._lock:
-            return self._workflows.get(workflow_id)
+            return self._load(workflow_id)
     
     def get_version(
         self,
@@ -274,13 +329,12 @@ class WorkflowRegistry:
         """Obtém versão específica de um workflow."""
         with self._lock:
             # Verificar versão atual
-            current = self._workflows.get(workflow_id)
+            current = self._load(workflow_id)
             if current and current.version == version:
                 return current
             
             # Buscar em versões anteriores
-            versions = self._versions.get(workflow_id, [])
-            for v in versions:
+            for v in self._load_versions(workflow_id):
                 if v.version == version:
                     return v
             
@@ -291,97 +345,119 @@ class WorkflowRegistry:
         enabled_only: bool = True,
         tags: Optional[List[str]] = None
     ) -> List[WorkflowDefinition]:
-        """Lista workflows com filtros."""
+        """Lista workflows com filtros (filtrados pelo índice, carregados sob demanda)."""
         with self._lock:
-            results = list(self._workflows.values())
+            if tags:
+                matched: Set[str] = set()
+                for tag in tags:
+                    matched |= self._tag_index.get(tag, set())
+                ids = [wid for wid in self._index if wid in matched]
+            else:
+                ids = list(self._index)
             
             if enabled_only:
-                results = [w for w in results if w.enabled]
+                ids = [wid for wid in ids if self._index[wid].enabled]
             
-            if tags:
-                results = [w for w in results if any(t in w.tags for t in tags)]
+            missing = [wid for wid in ids if wid not in self._workflows]
+            if missing and self._store:
+                for wid, data in self._store.load_many(missing).items():
+                    self._workflows[wid] = WorkflowDefinition.from_dict(data)
             
-            return results
+            return [self._workflows[wid] for wid in ids if wid in self._workflows]
     
     def delete(self, workflow_id: str) -> bool:
         """Remove workflow do registro."""
         with self._lock:
-            if workflow_id in self._workflows:
-                del self._workflows[workflow_id]
-                if workflow_id in self._versions:
-                    del self._versions[workflow_id]
+            if workflow_id in self._index:
+                self._index_remove(workflow_id)
+                self._workflows.pop(workflow_id, None)
+                self._versions.pop(workflow_id, None)
                 
-                if self._storage_path:
-                    self._save_to_storage()
+                if self._store:
+                    try:
+                        self._store.delete(workflow_id)
+                    except Exception as e:
+                        logger.error(f"Failed to delete workflow {workflow_id}: {e}")
                 
                 logger.info(f"Deleted workflow: {workflow_id}")
                 return True
             return False
     
-    def enable(self, workflow_id: str) -> bool:
-        """Habilita workflow."""
+    def _set_enabled(self, workflow_id: str, enabled: bool) -> bool:
         with self._lock:
+            entry = self._index.get(workflow_id)
+            if entry is None:
+                return False
+            entry.enabled = enabled
             if workflow_id in self._workflows:
-                self._workflows[workflow_id].enabled = True
-                if self._storage_path:
-                    self._save_to_storage()
-                return True
-            return False
+                self._workflows[workflow_id].enabled = enabled
+            if self._store:
+                try:
+                    self._store.set_enabled(workflow_id, enabled)
+                except Exception as e:
+                    logger.error(f"Failed to save workflow {workflow_id}: {e}")
+            return True
+    
+    def enable(self, workflow_id: str) -> bool:
+        """Habilita workflow."""
+        return self._set_enabled(workflow_id, True)
     
     def disable(self, workflow_id: str) -> bool:
         """Desabilita workflow."""
-        with self._lock:
-            if workflow_id in self._workflows:
-                self._workflows[workflow_id].enabled = False
-                if self._storage_path:
-                    self._save_to_storage()
-                return True
-            return False
+        return self._set_enabled(workflow_id, False)
     
     def get_versions(self, workflow_id: str) -> List[str]:
         """Lista todas as versões de um workflow."""
         with self._lock:
             versions = []
             
-            current = self._workflows.get(workflow_id)
-            if current:
-                versions.append(current.version)
+            entry = self._index.get(workflow_id)
+            if entry:
+                versions.append(entry.version)
             
-            for v in self._versions.get(workflow_id, []):
+            for v in self._load_versions(workflow_id):
                 versions.append(v.version)
             
             return sorted(versions, reverse=True)
     
     def _load_from_storage(self) -> None:
-        """Carrega workflows do storage."""
+        """Abre o store e carrega apenas o índice."""
         try:
-            with open(self._storage_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            db_path = self._storage_path
+            legacy = None
+            if db_path.suffix == ".json":
+                legacy = db_path
+                db_path = db_path.with_suffix(".db")
+            
+            self._store = WorkflowStore(str(db_path))
+            # Importa o JSON enquanto o banco estiver vazio e sem importação
+            # concluída: uma importação que falhou é repetida na próxima
+            # inicialização; depois dela, o banco é a fonte de verdade
+            if (
+                legacy and legacy.exists()
+                and self._store.count() == 0
+                and not self._store.get_meta("legacy_imported")
+            ):
+                try:
+                    self._import_legacy(legacy)
+                except Exception as e:
+                    logger.error(f"Failed to import legacy workflows from {legacy}: {e}")
             
-            for wf_data in data.get("workflows", []):
-                definition = WorkflowDefinition.from_dict(wf_data)
-                self._workflows[definition.id] = definition
+            for entry in self._store.load_index():
+                self._index[entry.id] = entry
+                for tag in entry.tags:
+                    self._tag_index.setdefault(tag, set()).add(entry.id)
             
-            logger.info(f"Loaded {len(self._workflows)} workflows from storage")
+            logger.info(f"Loaded {len(self._index)} workflows from storage")
         except Exception as e:
             logger.error(f"Failed to load workflows: {e}")
     
-    def _save_to_storage(self) -> None:
-        """Salva workflows no storage."""
-        try:
-            self._storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            data = {
-                "workflows": [w.to_dict() for w in self._workflows.values()],
-                "updated_at": datetime.now().isoformat()
-            }
-            
-            with open(self._storage_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            logger.debug(f"Saved {len(self._workflows)} workflows to storage")
-        except Exception as e:
-            logger.error(f"Failed to save workflows: {e}")
+    def _import_legacy(self, path: Path) -> None:
+        """Importa o arquivo JSON único do formato antigo."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        count = self._store.save_many(data.get("workflows", []), meta={"legacy_imported": str(path)})
+        logger.info(f"Imported {count} workflows from {path}")
     
     def export(self, workflow_id: str) -> Optional[Dict]:
         """Exporta workflow como dict."""
@@ -392,7 +468,7 @@ class WorkflowRegistry:
         """Importa workflow de dict."""
         definition = WorkflowDefinition.from_dict(data)
         
-        if not overwrite and definition.id in self._workflows:
+        if not overwrite and definition.id in self._index:
             raise ValueError(f"Workflow {definition.id} already exists")
         
         return self.register(definition)
@@ -40,6 +40,62 @@ class StepStatus(Enum):
     COMPENSATED = "compensated"
 
 
+class TrackedDict(dict):
+    """
+    Dict que registra chaves alteradas/removidas desde o último checkpoint.
+    
+    Mutações aninhadas in-place (ex: `variables["lista"].append(x)`) não
+    são detectadas; use `set_variable` para que entrem no próximo delta.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty: set = set()
+        self.removed: set = set()
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+        self.removed.discard(key)
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.discard(key)
+        self.removed.add(key)
+    
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+    
+    def pop(self, key, *default):
+        if key in self:
+            value = super().pop(key)
+            self.dirty.discard(key)
+            self.removed.add(key)
+            return value
+        return super().pop(key, *default)
+    
+    def popitem(self):
+        key, value = super().popitem()
+        self.dirty.discard(key)
+        self.removed.add(key)
+        return key, value
+    
+    def clear(self):
+        self.removed.update(self.keys())
+        self.dirty.clear()
+        super().clear()
+    
+    def reset_tracking(self):
+        self.dirty = set()
+        self.removed = set()
+
+
 @dataclass
 class StepState:
     """Estado de um step individual."""
@@ -94,6 +150,12 @@ class WorkflowState:
     completed_at: Optional[datetime] = None
     error: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Steps alterados desde o último checkpoint
+    dirty_steps: set = field(default_factory=set, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if not isinstance(self.variables, TrackedDict):
+            self.variables = TrackedDict(self.variables)
     
     @property
     def is_complete(self) -> bool:
@@ -121,6 +183,7 @@ class WorkflowState:
             self.step_states[step_id] = StepState(step_id=step_id)
         
         state = self.step_states[step_id]
+        self.dirty_steps.add(step_id)
         state.status = StepStatus.RUNNING
         state.started_at = datetime.now()
         state.input_data = input_data
@@ -130,6 +193,7 @@ class WorkflowState:
         """Marca step como completado."""
         if step_id in self.step_states:
             state = self.step_states[step_id]
+            self.dirty_steps.add(step_id)
             state.status = StepStatus.COMPLETED
             state.completed_at = datetime.now()
             state.output_data = output_data
@@ -140,6 +204,7 @@ class WorkflowState:
         """Marca step como falho."""
         if step_id in self.step_states:
             state = self.step_states[step_id]
+            self.dirty_steps.add(step_id)
             state.status = StepStatus.FAILED
             state.completed_at = datetime.now()
             state.error = error
@@ -151,7 +216,7 @@ class WorkflowState:
             "workflow_id": self.workflow_id,
             "status": self.status.value,
             "current_step_id": self.current_step_id,
-            "variables": self.variables,
+            "variables": dict(self.variables),
             "step_states": {k: v.to_dict() for k, v in self.step_states.items()},
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
@@ -159,6 +224,47 @@ class WorkflowState:
             "metadata": self.metadata
         }
     
+    def to_delta(self) -> Dict:
+        """
+        Alterações desde o último checkpoint: variáveis e steps alterados,
+        mais os campos escalares (pequenos). Zera o rastreamento.
+        """
+        variables = self.variables
+        delta = {
+            "status": self.status.value,
+            "current_step_id": self.current_step_id,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "error": self.error,
+            "metadata": self.metadata,
+            "variables": {k: variables[k] for k in variables.dirty if k in variables},
+            "removed_variables": sorted(variables.removed),
+            "step_states": {
+                k: self.step_states[k].to_dict() for k in self.dirty_steps if k in self.step_states
+            },
+        }
+        self.reset_tracking()
+        return delta
+    
+    def apply_delta(self, delta: Dict) -> None:
+        """Aplica um delta produzido por `to_delta` (recovery)."""
+        self.status = WorkflowStatus(delta["status"])
+        self.current_step_id = delta.get("current_step_id")
+        self.completed_at = datetime.fromisoformat(delta["completed_at"]) if delta.get("completed_at") else None
+        self.error = delta.get("error")
+        self.metadata = delta.get("metadata", {})
+        for key in delta.get("removed_variables", []):
+            self.variables.pop(key, None)
+        self.variables.update(delta.get("variables", {}))
+        for step_id, step_data in delta.get("step_states", {}).items():
+            self.step_states[step_id] = StepState.from_dict(step_data)
+    
+    def reset_tracking(self) -> None:
+        """Zera o rastreamento de alterações."""
+        if not isinstance(self.variables, TrackedDict):
+            self.variables = TrackedDict(self.variables)
+        self.variables.reset_tracking()
+        self.dirty_steps = set()
+    
     @classmethod
     def from_dict(cls, data: Dict) -> "WorkflowState":
         state = cls(
@@ -181,43 +287,76 @@ class WorkflowState:
 
 @dataclass
 class Checkpoint:
-    """Checkpoint de estado para recovery."""
+    """
+    Checkpoint de estado para recovery.
+    
+    kind="full" guarda o estado inteiro; kind="delta" guarda apenas o
+    que mudou desde o checkpoint anterior (ver `WorkflowState.to_delta`).
+    O conteúdo é congelado como JSON (`payload`), que também é a base do
+    checksum; dados não alterados são compartilhados com os checkpoints
+    anteriores, não copiados.
+    """
     checkpoint_id: str
     execution_id: str
-    state: WorkflowState
+    state: Optional[WorkflowState] = None
     created_at: datetime = field(default_factory=datetime.now)
     checksum: str = ""
+    kind: str = "full"
+    payload: Optional[str] = None
     
     def __post_init__(self):
+        if self.payload is None and self.state is not None:
+            self.payload = json.dumps(self.state.to_dict(), sort_keys=True, default=str)
         if not self.checksum:
             self.checksum = self._compute_checksum()
     
+    @property
+    def is_full(self) -> bool:
+        return self.kind == "full"
+    
     def _compute_checksum(self) -> str:
-        """Computa checksum do estado para validação."""
-        data = json.dumps(self.state.to_dict(), sort_keys=True)
-        return hashlib.sha256(data.encode()).hexdigest()[:16]
+        """Computa checksum do conteúdo para validação."""
+        return hashlib.sha256((self.payload or "").encode()).hexdigest()[:16]
     
     def validate(self) -> bool:
         """Valida integridade do checkpoint."""
         return self.checksum == self._compute_checksum()
     
+    def restore(self) -> WorkflowState:
+        """Novo WorkflowState a partir de um checkpoint completo."""
+        if not self.is_full:
+            raise ValueError(
+                f"Checkpoint {self.checkpoint_id} é um delta; "
+                "use StateManager.get_latest_checkpoint para materializá-lo"
+            )
+        return WorkflowState.from_dict(json.loads(self.payload))
+    
     def to_dict(self) -> Dict:
-        return {
+        data = {
             "checkpoint_id": self.checkpoint_id,
             "execution_id": self.execution_id,
-            "state": self.state.to_dict(),
             "created_at": self.created_at.isoformat(),
-            "checksum": self.checksum
+            "checksum": self.checksum,
+            "kind": self.kind,
         }
+        if self.is_full:
+            data["state"] = json.loads(self.payload)
+        else:
+            data["delta"] = json.loads(self.payload)
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict) -> "Checkpoint":
+        kind = data.get("kind", "full")
+        content = data["state"] if kind == "full" else data["delta"]
         return cls(
             checkpoint_id=data["checkpoint_id"],
             execution_id=data["execution_id"],
-            state=WorkflowState.from_dict(data["state"]),
+            state=WorkflowState.from_dict(content) if kind == "full" else None,
             created_at=datetime.fromisoformat(data["created_at"]),
-            checksum=data["checksum"]
+            checksum=data["checksum"],
+            kind=kind,
+            payload=json.dumps(content, sort_keys=True, default=str)
         )
 
 
@@ -226,11 +365,17 @@ class StateManager:
     Gerenciador de estado com durable execution.
     
     Features:
-    - Checkpointing automático
-    - Recovery de falhas
+    - Checkpointing automático, incremental: deltas com apenas as
+      variáveis e steps alterados, e um snapshot completo a cada
+      `full_snapshot_every` checkpoints
+    - Recovery de falhas (snapshot + replay dos deltas)
     - Thread-safe
     - Persistência opcional
     
+    A persistência (opcional) recebe `save_state` e `save_checkpoint` e,
+    para recovery após restart, deve expor `get_checkpoints(execution_id)`
+    com os checkpoints em ordem de criação (snapshots e deltas).
+    
     Exemplo:
         manager = StateManager()
         
@@ -244,11 +389,21 @@ class StateManager:
         state = manager.recover("exec_1")
     """
     
-    def __init__(self, persistence: Optional[Any] = None):
+    def __init__(
+        self,
+        persistence: Optional[Any] = None,
+        full_snapshot_every: int = 10,
+        max_checkpoints: int = 10
+    ):
         self._states: Dict[str, WorkflowState] = {}
         self._checkpoints: Dict[str, List[Checkpoint]] = {}
         self._lock = threading.RLock()
         self._persistence = persistence
+        self.full_snapshot_every = full_snapshot_every
+        self.max_checkpoints = max_checkpoints
+        # Estado cujo rastreamento de alterações parte do último checkpoint
+        self._tracked: Dict[str, WorkflowState] = {}
+        self._sequence: Dict[str, int] = {}
     
     def create_state(
         self,
@@ -288,41 +443,98 @@ class StateManager:
             if self._persistence:
                 self._persistence.save_state(state)
     
-    def checkpoint(self, state: WorkflowState) -> Checkpoint:
-        """Cria checkpoint do estado atual."""
+    def checkpoint(self, state: WorkflowState, full: bool = False) -> Checkpoint:
+        """
+        Cria checkpoint do estado atual.
+        
+        Gera um delta se o estado é o mesmo objeto do checkpoint anterior
+        (rastreamento contínuo); caso contrário, ou a cada
+        `full_snapshot_every` checkpoints, gera um snapshot completo.
+        """
         with self._lock:
-            checkpoint = Checkpoint(
-                checkpoint_id=f"cp_{state.execution_id}_{len(self._checkpoints.get(state.execution_id, []))}",
-                execution_id=state.execution_id,
-                state=WorkflowState.from_dict(state.to_dict())  # Deep copy
+            execution_id = state.execution_id
+            checkpoints = self._checkpoints.setdefault(execution_id, [])
+            sequence = self._sequence.get(execution_id, 0)
+            
+            full = (
+                full
+                or not checkpoints
+                or self._tracked.get(execution_id) is not state
+                or not isinstance(state.variables, TrackedDict)
+                or sequence % max(self.full_snapshot_every, 1) == 0
             )
             
-            if state.execution_id not in self._checkpoints:
-                self._checkpoints[state.execution_id] = []
+            if full:
+                state.reset_tracking()
+                payload = json.dumps(state.to_dict(), sort_keys=True, default=str)
+            else:
+                payload = json.dumps(state.to_delta(), sort_keys=True, default=str)
+            
+            checkpoint = Checkpoint(
+                checkpoint_id=f"cp_{execution_id}_{sequence}",
+                execution_id=execution_id,
+                kind="full" if full else "delta",
+                payload=payload
+            )
+            self._tracked[execution_id] = state
+            self._sequence[execution_id] = sequence + 1
             
-            self._checkpoints[state.execution_id].append(checkpoint)
+            checkpoints.append(checkpoint)
             
-            # Manter apenas últimos 10 checkpoints
-            if len(self._checkpoints[state.execution_id]) > 10:
-                self._checkpoints[state.execution_id] = self._checkpoints[state.execution_id][-10:]
+            # Manter os últimos checkpoints, sempre a partir de um snapshot completo
+            while len(checkpoints) > self.max_checkpoints:
+                next_full = next((i for i, cp in enumerate(checkpoints) if i > 0 and cp.is_full), None)
+                if next_full is None:
+                    break
+                del checkpoints[:next_full]
             
             if self._persistence:
                 self._persistence.save_checkpoint(checkpoint)
             
             return checkpoint
     
+    def _materialize(self, checkpoints: List[Checkpoint]) -> Optional[Checkpoint]:
+        """Último snapshot válido + replay dos deltas válidos seguintes."""
+        for start in range(len(checkpoints) - 1, -1, -1):
+            base = checkpoints[start]
+            if not base.is_full or not base.validate():
+                continue
+            
+            state = base.restore()
+            last = base
+            for cp in checkpoints[start + 1:]:
+                if cp.is_full or not cp.validate():
+                    break
+                state.apply_delta(json.loads(cp.payload))
+                last = cp
+            
+            state.reset_tracking()
+            return Checkpoint(
+                checkpoint_id=last.checkpoint_id,
+                execution_id=last.execution_id,
+                state=state,
+                created_at=last.created_at
+            )
+        return None
+    
     def get_latest_checkpoint(self, execution_id: str) -> Optional[Checkpoint]:
-        """Obtém último checkpoint válido."""
+        """Obtém último checkpoint válido (como snapshot completo)."""
         with self._lock:
-            checkpoints = self._checkpoints.get(execution_id, [])
-            
-            for cp in reversed(checkpoints):
-                if cp.validate():
-                    return cp
+            checkpoint = self._materialize(self._checkpoints.get(execution_id, []))
+            if checkpoint:
+                return checkpoint
             
-            # Tentar carregar de persistência
+            # Tentar carregar de persistência: a cadeia persistida pode
+            # terminar em deltas, então é materializada como a em memória
             if self._persistence:
-                return self._persistence.get_latest_checkpoint(execution_id)
+                if hasattr(self._persistence, "get_checkpoints"):
+                    return self._materialize(self._persistence.get_checkpoints(execution_id))
+                
+                # Persistência que só expõe o último checkpoint: um delta
+                # isolado não é restaurável
+                latest = self._persistence.get_latest_checkpoint(execution_id)
+                if latest and latest.is_full and latest.validate():
+                    return latest
             
             return None
     
@@ -332,8 +544,10 @@ class StateManager:
         
         if checkpoint:
             with self._lock:
-                state = WorkflowState.from_dict(checkpoint.state.to_dict())
+                state = checkpoint.restore()
                 self._states[execution_id] = state
+                # Estado novo: o próximo checkpoint é completo
+                self._tracked.pop(execution_id, None)
                 return state
         
         return None
@@ -394,7 +608,8 @@ class StateManager:
             
             for exec_id in to_remove:
                 del self._states[exec_id]
-                if exec_id in self._checkpoints:
-                    del self._checkpoints[exec_id]
+                self._checkpoints.pop(exec_id, None)
+                self._tracked.pop(exec_id, None)
+                self._sequence.pop(exec_id, None)
             
             return len(to_remove)
@@ -0,0 +1,197 @@
+"""
+Workflow Store - Persistência de definições de workflows em SQLite.
+
+Cada workflow é um registro próprio: register/delete/enable/disable
+escrevem só a linha afetada, em transação (atômico). Versões anteriores
+ficam em tabela separada e só são lidas quando solicitadas.
+
+O índice (id, nome, versão, enabled, tags) é lido sem decodificar as
+definições, que são carregadas sob demanda.
+"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WorkflowIndexEntry:
+    """Dados de um workflow mantidos em memória para listagem."""
+    id: str
+    name: str
+    version: str
+    enabled: bool = True
+    tags: List[str] = field(default_factory=list)
+
+
+class WorkflowStore:
+    """
+    Store SQLite (WAL) de workflows.
+
+    Exemplo:
+        store = WorkflowStore("./data/workflows/registry.db")
+        store.save(definition.to_dict())
+        for entry in store.load_index():
+            ...
+        data = store.load(entry.id)
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS workflows (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                version TEXT NOT NULL,
+                enabled INTEGER NOT NULL DEFAULT 1,
+                tags TEXT NOT NULL DEFAULT '[]',
+                updated_at TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS workflow_versions (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                workflow_id TEXT NOT NULL,
+                version TEXT NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_workflow_versions
+                ON workflow_versions(workflow_id);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def save(self, data: Dict[str, Any], previous: Optional[Dict[str, Any]] = None) -> None:
+        """Grava um workflow (e arquiva a versão anterior, se houver) em uma transação."""
+        with self._lock, self._conn:
+            if previous is not None:
+                self._conn.execute(
+                    "INSERT INTO workflow_versions (workflow_id, version, data) VALUES (?, ?, ?)",
+                    (previous["id"], previous["version"], json.dumps(previous, ensure_ascii=False))
+                )
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO workflows (id, name, version, enabled, tags, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    data["id"],
+                    data["name"],
+                    data["version"],
+                    int(data.get("enabled", True)),
+                    json.dumps(data.get("tags", []), ensure_ascii=False),
+                    data.get("updated_at"),
+                    json.dumps(data, ensure_ascii=False),
+                )
+            )
+
+    def save_many(self, items: Iterable[Dict[str, Any]], meta: Optional[Dict[str, str]] = None) -> int:
+        """Grava vários workflows (e metadados do store) em uma transação (importação)."""
+        rows = [
+            (
+                d["id"], d["name"], d.get("version", "1.0.0"), int(d.get("enabled", True)),
+                json.dumps(d.get("tags", []), ensure_ascii=False), d.get("updated_at"),
+                json.dumps(d, ensure_ascii=False),
+            )
+            for d in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO workflows (id, name, version, enabled, tags, updated_at, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows
+            )
+            if meta:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    list(meta.items())
+                )
+        return len(rows)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """Lê um metadado do store."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_enabled(self, workflow_id: str, enabled: bool) -> None:
+        """Atualiza apenas o estado enabled (a coluna prevalece sobre o JSON)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE workflows SET enabled = ? WHERE id = ?",
+                (int(enabled), workflow_id)
+            )
+
+    def delete(self, workflow_id: str) -> None:
+        """Remove um workflow e suas versões."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
+            self._conn.execute("DELETE FROM workflow_versions WHERE workflow_id = ?", (workflow_id,))
+
+    def load_index(self) -> List[WorkflowIndexEntry]:
+        """Lê o índice de todos os workflows, sem as definições."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, name, version, enabled, tags FROM workflows"
+            ).fetchall()
+        return [
+            WorkflowIndexEntry(id=r[0], name=r[1], version=r[2], enabled=bool(r[3]), tags=json.loads(r[4]))
+            for r in rows
+        ]
+
+    def load(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        """Lê a definição atual de um workflow."""
+        loaded = self.load_many([workflow_id])
+        return loaded.get(workflow_id)
+
+    def load_many(self, workflow_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Lê definições atuais de vários workflows."""
+        result: Dict[str, Dict[str, Any]] = {}
+        # Limite de parâmetros do SQLite
+        for i in range(0, len(workflow_ids), 500):
+            batch = workflow_ids[i:i + 500]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT data, enabled FROM workflows WHERE id IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall()
+            for data, enabled in rows:
+                item = json.loads(data)
+                item["enabled"] = bool(enabled)
+                result[item["id"]] = item
+        return result
+
+    def load_versions(self, workflow_id: str) -> List[Dict[str, Any]]:
+        """Lê as versões anteriores de um workflow (mais antigas primeiro)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM workflow_versions WHERE workflow_id = ? ORDER BY seq",
+                (workflow_id,)
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def count(self) -> int:
+        """Número de workflows."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+
+    def close(self) -> None:
+        """Fecha a conexão."""
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,16 @@
 """Runner para o workflow licitacoes_monitor."""
 
+import asyncio
 import json
 import logging
 import time
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import date, datetime, timedelta, timezone
 from typing import Any
 
+from src.domains.licitacoes.services.near_dedup import normalize_objeto
+
 from .models import (
     LicitacoesMonitorInput,
     LicitacoesMonitorResult,
@@ -22,6 +26,15 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_STAGE_CONCURRENCY = 4
+DEFAULT_MAX_COST_USD = 0.005
+
+# Custo estimado de uma consulta ao RAG jurídico (cache hit não custa nada)
+ANALISE_TOKENS_PER_ITEM = 100
+ANALISE_COST_PER_ITEM = 0.001
+
+_DONE = object()
+
 
 class AuditEntry:
     """Entrada de audit log."""
@@ -35,6 +48,11 @@ class AuditEntry:
         self.cost_usd = 0.0
         self.status = "running"
         self.error: str | None = None
+        self.item_timings: dict[str, int] = {}
+
+    def record_item(self, item_id: str, started: float) -> None:
+        """Registra a duração (ms) do processamento de um item no step."""
+        self.item_timings[item_id] = int((time.perf_counter() - started) * 1000)
 
     def complete(self, tokens: int = 0, cost: float = 0.0):
         self.finished_at = datetime.now(timezone.utc)
@@ -58,9 +76,30 @@ class AuditEntry:
             "cost_usd": self.cost_usd,
             "status": self.status,
             "error": self.error,
+            "item_timings": self.item_timings,
         }
 
 
+class SpendBudget:
+    """Teto de gasto com LLM/RAG em uma execução."""
+
+    def __init__(self, max_cost_usd: float):
+        self.max_cost_usd = max_cost_usd
+        self.tokens_used = 0
+        self.cost_usd = 0.0
+        self.skipped = 0
+
+    def reserve(self, tokens: int, cost: float) -> bool:
+        """Reserva o gasto de uma chamada; False se estouraria o teto."""
+        if self.cost_usd + cost > self.max_cost_usd + 1e-9:
+            self.skipped += 1
+            return False
+        self.tokens_used += tokens
+        self.cost_usd += cost
+        return True
+
+
+
 class LicitacoesMonitorRunner:
     """
     Runner para o workflow de monitoramento de licitações.
@@ -73,16 +112,34 @@ class LicitacoesMonitorRunner:
     5. analise - Análise com RAG jurídico
     6. compliance - Validação de conformidade
     7. output - Formatação e exportação
+
+    Coleta, dedup, triagem e análise rodam como pipeline assíncrono: cada
+    item segue para o próximo estágio assim que sai do anterior, com
+    concorrência limitada por estágio e teto de gasto com LLM/RAG.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        stage_concurrency: int = DEFAULT_STAGE_CONCURRENCY,
+        max_cost_usd: float = DEFAULT_MAX_COST_USD,
+    ):
+        """
+        Args:
+            stage_concurrency: Itens processados em paralelo por estágio
+            max_cost_usd: Teto de gasto com LLM/RAG por execução
+        """
         self.audit_log: list[AuditEntry] = []
         self.run_id = ""
+        self.stage_concurrency = max(1, stage_concurrency)
+        self.max_cost_usd = max_cost_usd
         self._watcher = None
         self._triage = None
         self._analyst = None
         self._compliance = None
         self._rag_juridico = None
+        # Consultas de contexto jurídico em voo, por objeto normalizado
+        # (o cache de resultados fica no RagJuridicoService)
+        self._contexto_pending: dict[str, asyncio.Task] = {}
 
     def _init_agents(self):
         """Inicializa agentes do domínio licitações."""
@@ -125,34 +182,21 @@ class LicitacoesMonitorRunner:
             validated_input = self._validate_input(input_data)
             audit.complete()
 
-            # Step 2: Coleta
-            audit = self._audit("coleta")
-            itens = await self._coleta(validated_input)
-            result.itens_encontrados = itens
-            audit.complete(tokens=100, cost=0.001)
-
-            # Step 3: Dedup
-            audit = self._audit("dedup")
-            itens_unicos = self._dedup(itens)
+            # Steps 2-5: Coleta -> Dedup -> Triagem -> Análise (pipeline)
+            itens_unicos, scores, contextos = await self._pipeline(validated_input)
             result.itens_encontrados = itens_unicos
-            audit.complete()
 
-            # Step 4: Triagem
-            audit = self._audit("triagem")
-            triagem = self._triagem(itens_unicos)
+            triagem = self._build_triagem(scores)
             result.triagem = triagem
-            audit.complete(tokens=200, cost=0.002)
-
-            # Step 5: Análise (apenas P0/P1)
-            audit = self._audit("analise")
-            p0_p1_ids = [s.licitacao_id for s in triagem.scores if s.prioridade in ["P0", "P1"]]
-            p0_p1_itens = [i for i in itens_unicos if i.external_id in p0_p1_ids]
 
-            analise, evidencias, recomendacoes = await self._analise(p0_p1_itens)
+            p0_p1_itens = [
+                item for item, score in zip(itens_unicos, scores)
+                if score.prioridade in ["P0", "P1"]
+            ]
+            analise, evidencias, recomendacoes = self._consolidar_analise(p0_p1_itens, contextos)
             result.analise_juridica = analise
             result.evidencias = evidencias
             result.recomendacoes = recomendacoes
-            audit.complete(tokens=500, cost=0.005)
 
             # Step 6: Compliance
             audit = self._audit("compliance")
@@ -183,8 +227,9 @@ class LicitacoesMonitorRunner:
             logger.error(f"Workflow failed: {e}")
             result.status = "error"
             result.errors.append(str(e))
-            if self.audit_log:
-                self.audit_log[-1].fail(str(e))
+            for entry in self.audit_log:
+                if entry.status == "running":
+                    entry.fail(str(e))
 
         return result
 
@@ -196,9 +241,123 @@ class LicitacoesMonitorRunner:
             input_data.periodo_fim = date.today()
         return input_data
 
-    async def _coleta(self, input_data: LicitacoesMonitorInput) -> list[ItemEncontrado]:
+    # ============================================================
+    # PIPELINE
+    # ============================================================
+
+    async def _pipeline(
+        self, input_data: LicitacoesMonitorInput
+    ) -> tuple[list[ItemEncontrado], list[TriagemScore], dict[str, dict[str, Any]]]:
+        """
+        Executa coleta -> dedup -> triagem -> análise como estágios ligados
+        por filas limitadas.
+
+        Returns:
+            Itens únicos (ordem de coleta), scores alinhados aos itens e
+            contexto jurídico por external_id dos itens analisados
+        """
+        maxsize = self.stage_concurrency * 4
+        coletados: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        unicos_q: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        prioritarios: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+        unicos: list[ItemEncontrado] = []
+        scores: dict[int, TriagemScore] = {}
+        contextos: dict[str, dict[str, Any]] = {}
+        seen: set[str] = set()
+        budget = SpendBudget(self.max_cost_usd)
+
+        coleta_audit = self._audit("coleta")
+        dedup_audit = self._audit("dedup")
+        triagem_audit = self._audit("triagem")
+        analise_audit = self._audit("analise")
+
+        async def coleta() -> None:
+            async for item in self._coleta(input_data):
+                await coletados.put(item)
+            await coletados.put(_DONE)
+            coleta_audit.complete(tokens=100, cost=0.001)
+
+        async def dedup(item: ItemEncontrado) -> tuple[int, ItemEncontrado] | None:
+            key = f"{item.external_id}:{item.fonte}"
+            if key in seen:
+                return None
+            seen.add(key)
+            unicos.append(item)
+            return len(unicos) - 1, item
+
+        async def triagem(entry: tuple[int, ItemEncontrado]) -> tuple[int, ItemEncontrado] | None:
+            index, item = entry
+            score = self._score_item(item)
+            scores[index] = score
+            return entry if score.prioridade in ["P0", "P1"] else None
+
+        async def analise(entry: tuple[int, ItemEncontrado]) -> None:
+            _, item = entry
+            ctx = await self._contexto_juridico(item.objeto, budget)
+            if ctx is not None:
+                contextos[item.external_id] = ctx
+
+        stages = [
+            coleta(),
+            # Dedup mantém a ordem de chegada: "primeiro vence"
+            self._stage(coletados, unicos_q, dedup, 1, dedup_audit, lambda item: item.external_id),
+            self._stage(unicos_q, prioritarios, triagem, self.stage_concurrency, triagem_audit),
+            self._stage(prioritarios, None, analise, self.stage_concurrency, analise_audit),
+        ]
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        triagem_audit.complete(tokens=200, cost=0.002)
+        dedup_audit.complete()
+        analise_audit.complete(tokens=budget.tokens_used, cost=budget.cost_usd)
+        if budget.skipped:
+            logger.warning(f"Spend cap reached: {budget.skipped} items not analysed")
+
+        return unicos, [scores[i] for i in range(len(unicos))], contextos
+
+    async def _stage(
+        self,
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue | None,
+        worker: Callable[[Any], Awaitable[Any]],
+        concurrency: int,
+        audit: AuditEntry,
+        item_id: Callable[[Any], str] = lambda entry: entry[1].external_id,
+    ) -> None:
+        """
+        Consome inbox com `concurrency` workers, repassando para outbox o
+        que o worker devolver (None = item para no estágio).
+        """
+
+        async def run_worker() -> None:
+            while True:
+                entry = await inbox.get()
+                if entry is _DONE:
+                    # Devolve o sentinela para os demais workers
+                    await inbox.put(_DONE)
+                    return
+                started = time.perf_counter()
+                out = await worker(entry)
+                audit.record_item(item_id(entry), started)
+                if out is not None and outbox is not None:
+                    await outbox.put(out)
+
+        await asyncio.gather(*(run_worker() for _ in range(concurrency)))
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    # ============================================================
+    # ESTÁGIOS
+    # ============================================================
+
+    async def _coleta(self, input_data: LicitacoesMonitorInput) -> AsyncIterator[ItemEncontrado]:
         """Coleta itens das fontes."""
-        itens: list[ItemEncontrado] = []
+        found = False
 
         if self._watcher:
             try:
@@ -209,7 +368,8 @@ class LicitacoesMonitorRunner:
                     data_fim=input_data.periodo_fim,
                 )
                 for item in result.items:
-                    itens.append(ItemEncontrado(
+                    found = True
+                    yield ItemEncontrado(
                         external_id=item.external_id,
                         fonte=item.source,
                         objeto=item.objeto,
@@ -217,14 +377,13 @@ class LicitacoesMonitorRunner:
                         uf=item.uf,
                         valor_estimado=item.valor_estimado,
                         data_abertura=item.data_abertura.isoformat() if item.data_abertura else None,
-                    ))
+                    )
             except Exception as e:
                 logger.warning(f"Watcher failed: {e}")
 
-        if not itens:
-            itens = self._mock_coleta(input_data)
-
-        return itens
+        if not found:
+            for item in self._mock_coleta(input_data):
+                yield item
 
     def _mock_coleta(self, input_data: LicitacoesMonitorInput) -> list[ItemEncontrado]:
         """Mock de coleta para testes."""
@@ -241,83 +400,104 @@ class LicitacoesMonitorRunner:
             for i in range(1, 4)
         ]
 
-    def _dedup(self, itens: list[ItemEncontrado]) -> list[ItemEncontrado]:
-        """Remove duplicatas."""
-        seen: set[str] = set()
-        unicos: list[ItemEncontrado] = []
-        for item in itens:
-            key = f"{item.external_id}:{item.fonte}"
-            if key not in seen:
-                seen.add(key)
-                unicos.append(item)
-        return unicos
-
-    def _triagem(self, itens: list[ItemEncontrado]) -> TriagemResult:
-        """Classifica itens por prioridade."""
-        scores: list[TriagemScore] = []
-        p0 = p1 = p2 = p3 = 0
+    def _score_item(self, item: ItemEncontrado) -> TriagemScore:
+        """Classifica um item por prioridade."""
+        score = 0.5
+        motivos: list[str] = []
+
+        obj_lower = item.objeto.lower()
+        if "dengue" in obj_lower or "drone" in obj_lower:
+            score += 0.3
+            motivos.append("Keyword match")
+
+        if item.uf in ["SP", "RJ", "MG", "PR"]:
+            score += 0.1
+            motivos.append("Strategic region")
+
+        if item.valor_estimado and item.valor_estimado > 500000:
+            score += 0.1
+            motivos.append("High value")
+
+        if score >= 0.8:
+            prioridade = "P0"
+        elif score >= 0.6:
+            prioridade = "P1"
+        elif score >= 0.4:
+            prioridade = "P2"
+        else:
+            prioridade = "P3"
+
+        return TriagemScore(
+            licitacao_id=item.external_id,
+            score=score,
+            prioridade=prioridade,
+            motivos=motivos,
+        )
 
-        for item in itens:
-            score = 0.5
-            motivos: list[str] = []
-
-            obj_lower = item.objeto.lower()
-            if "dengue" in obj_lower or "drone" in obj_lower:
-                score += 0.3
-                motivos.append("Keyword match")
-
-            if item.uf in ["SP", "RJ", "MG", "PR"]:
-                score += 0.1
-                motivos.append("Strategic region")
-
-            if item.valor_estimado and item.valor_estimado > 500000:
-                score += 0.1
-                motivos.append("High value")
-
-            if score >= 0.8:
-                prioridade = "P0"
-                p0 += 1
-            elif score >= 0.6:
-                prioridade = "P1"
-                p1 += 1
-            elif score >= 0.4:
-                prioridade = "P2"
-                p2 += 1
-            else:
-                prioridade = "P3"
-                p3 += 1
-
-            scores.append(TriagemScore(
-                licitacao_id=item.external_id,
-                score=score,
-                prioridade=prioridade,
-                motivos=motivos,
-            ))
+    def _build_triagem(self, scores: list[TriagemScore]) -> TriagemResult:
+        """Consolida os scores por prioridade."""
+        counts = {"P0": 0, "P1": 0, "P2": 0, "P3": 0}
+        for score in scores:
+            counts[score.prioridade] += 1
 
         return TriagemResult(
-            total=len(itens),
-            p0_count=p0,
-            p1_count=p1,
-            p2_count=p2,
-            p3_count=p3,
+            total=len(scores),
+            p0_count=counts["P0"],
+            p1_count=counts["P1"],
+            p2_count=counts["P2"],
+            p3_count=counts["P3"],
             scores=scores,
         )
 
-    async def _analise(
-        self, itens: list[ItemEncontrado]
+    async def _contexto_juridico(self, objeto: str, budget: SpendBudget) -> dict[str, Any] | None:
+        """
+        Contexto jurídico do objeto.
+
+        Resultados vêm do cache do RagJuridicoService; consultas simultâneas
+        do mesmo objeto normalizado compartilham a mesma chamada, e o
+        cancelamento de uma não afeta as demais. Retorna None sem RAG
+        disponível ou quando o teto de gasto foi atingido.
+        """
+        if not self._rag_juridico:
+            return None
+
+        key = normalize_objeto(objeto)
+        task = self._contexto_pending.get(key)
+        if task is None:
+            cached = self._rag_juridico.peek_contexto_juridico(objeto)
+            if cached is not None:
+                return cached
+            if not budget.reserve(ANALISE_TOKENS_PER_ITEM, ANALISE_COST_PER_ITEM):
+                return None
+            task = asyncio.ensure_future(
+                asyncio.to_thread(self._rag_juridico.get_contexto_juridico, objeto)
+            )
+            self._contexto_pending[key] = task
+            task.add_done_callback(lambda t: self._contexto_done(key, t))
+
+        return await asyncio.shield(task)
+
+    def _contexto_done(self, key: str, task: asyncio.Task) -> None:
+        if self._contexto_pending.get(key) is task:
+            del self._contexto_pending[key]
+        # Marca a exceção como lida caso ninguém esteja aguardando
+        if not task.cancelled():
+            task.exception()
+
+    def _consolidar_analise(
+        self, itens: list[ItemEncontrado], contextos: dict[str, dict[str, Any]]
     ) -> tuple[AnaliseJuridica, list[Evidencia], list[Recomendacao]]:
-        """Análise detalhada com RAG jurídico."""
+        """Consolida a análise dos itens P0/P1, na ordem de coleta."""
         analise = AnaliseJuridica()
         evidencias: list[Evidencia] = []
         recomendacoes: list[Recomendacao] = []
 
-        if self._rag_juridico:
-            for item in itens[:5]:
-                ctx = self._rag_juridico.get_contexto_juridico(item.objeto)
+        for item in itens:
+            ctx = contextos.get(item.external_id)
+            if ctx is not None:
                 analise.artigos_relevantes.extend(ctx.get("artigos_relevantes", []))
                 analise.checklist_habilitacao = ctx.get("checklist_habilitacao", [])
 
-        for item in itens:
             evidencias.append(Evidencia(
                 tipo="url",
                 url=f"https://pncp.gov.br/app/editais/{item.external_id}",
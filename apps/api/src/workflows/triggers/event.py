@@ -3,14 +3,18 @@ Event Trigger - Dispara workflows via eventos do sistema.
 
 Features:
 - Event bus in-memory e Redis
-- Pattern matching de eventos
+- Pattern matching de eventos (trie por segmento + cache por tipo)
+- Handlers concorrentes com limite e timeout
 - Filtros por payload
 - Debounce/throttle
 """
 
 import asyncio
+import contextvars
+from collections import deque
 from datetime import datetime
-from typing import Any, Dict, Optional, List, Callable, Awaitable, Set
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Callable, Awaitable, Set, Tuple
 from dataclasses import dataclass, field
 import logging
 import re
@@ -20,6 +24,126 @@ from .base import BaseTrigger, TriggerConfig, TriggerResult, TriggerType
 
 logger = logging.getLogger(__name__)
 
+# Marca execução dentro de um handler: emits aninhados não disputam o
+# semáforo (evita deadlock quando todos os slots aguardam sub-eventos)
+_in_handler: contextvars.ContextVar[bool] = contextvars.ContextVar("event_bus_in_handler", default=False)
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """
+    Compila um padrão de evento em função de match.
+    
+    `*` casa qualquer sequência (inclusive pontos): "user.*" casa
+    "user.created" e "user.profile.updated"; "*.failed" casa
+    "workflow.failed".
+    """
+    if pattern == "*":
+        return lambda value: True
+    if "*" not in pattern:
+        return pattern.__eq__
+    regex = re.compile(".*".join(re.escape(part) for part in pattern.split("*")))
+    return lambda value: regex.fullmatch(value) is not None
+
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "subtree")
+    
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.exact = False      # padrão termina aqui ("user.created")
+        self.subtree = False    # padrão é este prefixo + ".*" ("user.*")
+
+
+class PatternIndex:
+    """
+    Índice de padrões de evento.
+    
+    Padrões exatos e "prefixo.*" ficam em uma trie por segmento
+    (resolução O(profundidade)); demais wildcards usam regex
+    pré-compilada. O resultado é memoizado por event_type até o
+    conjunto de padrões mudar.
+    """
+    
+    def __init__(self, max_cache: int = 4096):
+        self._root = _TrieNode()
+        self._match_all = False
+        self._globs: Dict[str, Callable[[str], bool]] = {}
+        self._patterns: Set[str] = set()
+        self._cache: Dict[str, Tuple[str, ...]] = {}
+        self._max_cache = max_cache
+    
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self._patterns
+    
+    def _node(self, segments: List[str], create: bool) -> Optional[_TrieNode]:
+        node = self._root
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[segment] = _TrieNode()
+            node = child
+        return node
+    
+    def _set(self, pattern: str, value: bool):
+        if pattern == "*":
+            self._match_all = value
+        elif pattern.endswith(".*") and "*" not in pattern[:-2]:
+            node = self._node(pattern[:-2].split("."), create=value)
+            if node:
+                node.subtree = value
+        elif "*" not in pattern:
+            node = self._node(pattern.split("."), create=value)
+            if node:
+                node.exact = value
+        elif value:
+            self._globs[pattern] = compile_pattern(pattern)
+        else:
+            self._globs.pop(pattern, None)
+        self._cache.clear()
+    
+    def add(self, pattern: str):
+        """Adiciona padrão (idempotente)."""
+        if pattern not in self._patterns:
+            self._patterns.add(pattern)
+            self._set(pattern, True)
+    
+    def remove(self, pattern: str):
+        """Remove padrão (nós vazios da trie são mantidos)."""
+        if pattern in self._patterns:
+            self._patterns.discard(pattern)
+            self._set(pattern, False)
+    
+    def match(self, event_type: str) -> Tuple[str, ...]:
+        """Padrões que casam com o event_type."""
+        cached = self._cache.get(event_type)
+        if cached is not None:
+            return cached
+        
+        matched: List[str] = ["*"] if self._match_all else []
+        segments = event_type.split(".")
+        node = self._root
+        prefix: List[str] = []
+        for i, segment in enumerate(segments):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            prefix.append(segment)
+            if node.subtree and i < len(segments) - 1:
+                matched.append(".".join(prefix) + ".*")
+        else:
+            if node.exact:
+                matched.append(event_type)
+        
+        matched.extend(p for p, matches in self._globs.items() if matches(event_type))
+        
+        if len(self._cache) >= self._max_cache:
+            self._cache.clear()
+        result = self._cache[event_type] = tuple(matched)
+        return result
+
 
 @dataclass
 class WorkflowEvent:
@@ -83,12 +207,7 @@ class EventFilter:
     
     def _pattern_matches(self, pattern: str, value: str) -> bool:
         """Match pattern com suporte a wildcards."""
-        if pattern == "*":
-            return True
-        if "*" in pattern:
-            regex = pattern.replace(".", r"\.").replace("*", ".*")
-            return bool(re.match(f"^{regex}$", value))
-        return pattern == value
+        return compile_pattern(pattern)(value)
     
     def to_dict(self) -> Dict:
         return {
@@ -115,8 +234,9 @@ class EventBus:
     
     Suporta:
     - Pub/Sub de eventos
-    - Pattern matching
-    - Múltiplos subscribers
+    - Pattern matching (trie por segmento, memoizado por tipo)
+    - Múltiplos subscribers, executados concorrentemente
+    - Limite de handlers simultâneos e timeout por handler
     - Histórico de eventos
     
     Exemplo:
@@ -153,8 +273,16 @@ class EventBus:
         
         self._subscribers: Dict[str, List[EventHandler]] = {}
         self._filters: Dict[str, EventFilter] = {}
-        self._history: List[WorkflowEvent] = []
+        self._index = PatternIndex()
         self._max_history = 1000
+        self._history: deque = deque(maxlen=self._max_history)
+        
+        # Handlers simultâneos (entre todos os emits) e timeout por handler
+        self.max_concurrency = 64
+        self.handler_timeout: Optional[float] = 30.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        
         self._initialized = True
     
     def subscribe(
@@ -178,6 +306,7 @@ class EventBus:
         
         if event_pattern not in self._subscribers:
             self._subscribers[event_pattern] = []
+            self._index.add(event_pattern)
         
         self._subscribers[event_pattern].append(handler)
         
@@ -192,15 +321,54 @@ class EventBus:
         if pattern in self._subscribers:
             try:
                 self._subscribers[pattern].remove(handler)
-                return True
             except ValueError:
-                pass
+                return False
+            if not self._subscribers[pattern]:
+                del self._subscribers[pattern]
+                self._index.remove(pattern)
+            return True
+        return False
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Semáforo do event loop corrente (o bus é singleton entre loops)."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    def _resolve(self, event_type: str) -> List[EventHandler]:
+        """Handlers inscritos em padrões que casam com o event_type."""
+        handlers: List[EventHandler] = []
+        for pattern in self._index.match(event_type):
+            handlers.extend(self._subscribers.get(pattern, ()))
+        return handlers
+    
+    async def _call(self, handler: EventHandler, event: WorkflowEvent, semaphore: Optional[asyncio.Semaphore]) -> bool:
+        if semaphore is not None:
+            async with semaphore:
+                return await self._call(handler, event, None)
+        
+        token = _in_handler.set(True)
+        try:
+            async with asyncio.timeout(self.handler_timeout):
+                await handler(event)
+            return True
+        except TimeoutError:
+            logger.error(f"Event handler timeout after {self.handler_timeout}s: {event.event_type}")
+        except Exception as e:
+            logger.error(f"Event handler error: {e}")
+        finally:
+            _in_handler.reset(token)
         return False
     
     async def emit(self, event: WorkflowEvent) -> int:
         """
         Emite um evento.
         
+        Handlers rodam concorrentemente (até `max_concurrency` no total),
+        cada um limitado a `handler_timeout` segundos.
+        
         Args:
             event: Evento a emitir
             
@@ -209,19 +377,17 @@ class EventBus:
         """
         # Adicionar ao histórico
         self._history.append(event)
-        if len(self._history) > self._max_history:
-            self._history = self._history[-self._max_history:]
         
-        notified = 0
+        handlers = self._resolve(event.event_type)
+        if not handlers:
+            return 0
         
-        for pattern, handlers in self._subscribers.items():
-            if self._matches_pattern(pattern, event.event_type):
-                for handler in handlers:
-                    try:
-                        await handler(event)
-                        notified += 1
-                    except Exception as e:
-                        logger.error(f"Event handler error: {e}")
+        semaphore = None if _in_handler.get() else self._get_semaphore()
+        if len(handlers) == 1:
+            notified = int(await self._call(handlers[0], event, semaphore))
+        else:
+            results = await asyncio.gather(*(self._call(h, event, semaphore) for h in handlers))
+            notified = sum(results)
         
         logger.debug(f"Event {event.event_type} emitted to {notified} handlers")
         return notified
@@ -273,24 +439,17 @@ class EventBus:
         limit: int = 100
     ) -> List[WorkflowEvent]:
         """Retorna histórico de eventos."""
-        events = self._history
+        events = list(self._history)
         
         if event_type:
-            events = [e for e in events if self._matches_pattern(event_type, e.event_type)]
+            matches = compile_pattern(event_type)
+            events = [e for e in events if matches(e.event_type)]
         
         return events[-limit:]
     
     def _matches_pattern(self, pattern: str, event_type: str) -> bool:
         """Verifica se event_type matches pattern."""
-        if pattern == "*":
-            return True
-        if pattern.endswith(".*"):
-            prefix = pattern[:-2]
-            return event_type.startswith(prefix)
-        if "*" in pattern:
-            regex = pattern.replace(".", r"\.").replace("*", ".*")
-            return bool(re.match(f"^{regex}$", event_type))
-        return pattern == event_type
+        return compile_pattern(pattern)(event_type)
     
     def clear_history(self) -> None:
         """Limpa histórico de eventos."""
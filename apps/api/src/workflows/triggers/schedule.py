@@ -15,6 +15,7 @@ from dataclasses import dataclass, field
 import logging
 
 from .base import BaseTrigger, TriggerConfig, TriggerResult, TriggerType
+from src.scheduler.cron import CronSchedule, PRESETS
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,9 @@ class CronExpression:
     
     Formato: minute hour day month weekday
     
+    Matching e próxima execução usam o `CronSchedule` compartilhado com
+    o scheduler de agentes.
+    
     Exemplos:
     - "0 8 * * *" - Todo dia às 8h
     - "*/15 * * * *" - A cada 15 minutos
@@ -41,7 +45,7 @@ class CronExpression:
     @classmethod
     def from_string(cls, expr: str) -> "CronExpression":
         """Parse expressão cron de string."""
-        parts = expr.strip().split()
+        parts = PRESETS.get(expr.strip(), expr).strip().split()
         
         if len(parts) < 5:
             parts.extend(["*"] * (5 - len(parts)))
@@ -57,66 +61,25 @@ class CronExpression:
     def __str__(self) -> str:
         return f"{self.minute} {self.hour} {self.day} {self.month} {self.weekday}"
     
+    @property
+    def schedule(self) -> CronSchedule:
+        """Expressão compilada (ValueError se inválida)."""
+        return CronSchedule.parse(str(self))
+    
     def matches(self, dt: datetime) -> bool:
         """Verifica se datetime matches a expressão."""
-        return (
-            self._matches_field(self.minute, dt.minute, 0, 59) and
-            self._matches_field(self.hour, dt.hour, 0, 23) and
-            self._matches_field(self.day, dt.day, 1, 31) and
-            self._matches_field(self.month, dt.month, 1, 12) and
-            self._matches_field(self.weekday, dt.weekday(), 0, 6)
-        )
-    
-    def _matches_field(self, pattern: str, value: int, min_val: int, max_val: int) -> bool:
-        """Verifica se valor matches o pattern."""
-        if pattern == "*":
-            return True
-        
-        # Suporte a ranges (e.g., "9-17")
-        if "-" in pattern and "/" not in pattern:
-            try:
-                start, end = pattern.split("-")
-                return int(start) <= value <= int(end)
-            except ValueError:
-                return False
-        
-        # Suporte a step (e.g., "*/15")
-        if pattern.startswith("*/"):
-            try:
-                step = int(pattern[2:])
-                return value % step == 0
-            except ValueError:
-                return False
-        
-        # Suporte a lista (e.g., "1,3,5")
-        if "," in pattern:
-            try:
-                values = [int(v.strip()) for v in pattern.split(",")]
-                return value in values
-            except ValueError:
-                return False
-        
-        # Valor exato
         try:
-            return value == int(pattern)
+            return self.schedule.matches(dt)
         except ValueError:
             return False
     
     def next_run(self, after: Optional[datetime] = None) -> datetime:
         """Calcula próxima execução após uma data."""
-        dt = (after or datetime.now()).replace(second=0, microsecond=0)
-        dt += timedelta(minutes=1)
-        
-        # Buscar próximo match (máximo 1 ano)
-        max_iterations = 365 * 24 * 60
-        
-        for _ in range(max_iterations):
-            if self.matches(dt):
-                return dt
-            dt += timedelta(minutes=1)
-        
-        # Fallback: 1 hora no futuro
-        return datetime.now() + timedelta(hours=1)
+        try:
+            return self.schedule.next_after(after or datetime.now())
+        except ValueError:
+            # Fallback: 1 hora no futuro
+            return datetime.now() + timedelta(hours=1)
 
 
 @dataclass
@@ -277,7 +240,7 @@ class ScheduleTrigger(BaseTrigger):
     def validate(self) -> List[str]:
         errors = super().validate()
         try:
-            CronExpression.from_string(self.schedule_config.cron)
+            CronExpression.from_string(self.schedule_config.cron).schedule
         except Exception:
             errors.append(f"Invalid cron expression: {self.schedule_config.cron}")
         return errors
@@ -253,3 +253,146 @@ class TestLicitacoesMonitorModels:
         assert result.payload_json == "{}"
         assert result.errors == []
         assert result.itens_encontrados == []
+
+
+class TestLicitacoesMonitorPipeline:
+    """Testes do pipeline concorrente (coleta -> dedup -> triagem -> análise)."""
+
+    @staticmethod
+    def make_rag(delay: float = 0.01):
+        """RagJuridicoService real (cache incluso) com cálculo simulado."""
+        from src.domains.licitacoes.services.rag_juridico import RagJuridicoService
+
+        class FakeRag(RagJuridicoService):
+            def __init__(self):
+                super().__init__(rag_service=None)
+                self.delay = delay
+                self.calls: list[str] = []
+                self.in_flight = 0
+                self.max_in_flight = 0
+
+            def _contexto_juridico(self, objeto: str) -> dict:
+                import time
+
+                self.calls.append(objeto)
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                time.sleep(self.delay)
+                self.in_flight -= 1
+                return {
+                    "artigos_relevantes": [{"artigo": "Art. 1", "objeto": objeto}],
+                    "checklist_habilitacao": [{"item": "Habilitação Jurídica"}],
+                }
+
+        return FakeRag()
+
+    def make_runner(self, objetos: list[str], **kwargs):
+        from src.workflows.licitacoes.licitacoes_monitor.models import ItemEncontrado
+        from src.workflows.licitacoes.licitacoes_monitor.runner import (
+            LicitacoesMonitorRunner,
+        )
+
+        rag = self.make_rag()
+
+        class Runner(LicitacoesMonitorRunner):
+            def _init_agents(self):
+                self._rag_juridico = rag
+
+            def _mock_coleta(self, input_data):
+                return [
+                    ItemEncontrado(
+                        external_id=f"PNCP-{i}",
+                        fonte="pncp",
+                        objeto=objeto,
+                        orgao="Prefeitura Municipal",
+                        uf="SP",
+                    )
+                    for i, objeto in enumerate(objetos)
+                ]
+
+        return Runner(**kwargs), rag
+
+    def run(self, runner):
+        import asyncio
+        from src.workflows.licitacoes.licitacoes_monitor.models import (
+            LicitacoesMonitorInput,
+        )
+
+        return asyncio.run(runner.run(LicitacoesMonitorInput(termo_busca="drone")))
+
+    def test_analise_concurrent_and_ordered(self):
+        objetos = [f"Drone modelo {i}" for i in range(12)]
+        runner, rag = self.make_runner(objetos, stage_concurrency=4, max_cost_usd=1.0)
+
+        result = self.run(runner)
+
+        assert result.status == "success"
+        assert len(rag.calls) == 12
+        assert 1 < rag.max_in_flight <= 4
+        assert [a["objeto"] for a in result.analise_juridica.artigos_relevantes] == objetos
+        assert [i.external_id for i in result.itens_encontrados] == [f"PNCP-{i}" for i in range(12)]
+
+    def test_contexto_memoized_by_normalized_objeto(self):
+        objetos = ["Aquisição de DRONES", "aquisicao de drones.", "Aquisição de drones!"] * 3
+        runner, rag = self.make_runner(objetos, max_cost_usd=1.0)
+
+        result = self.run(runner)
+
+        assert len(rag.calls) == 1
+        assert len(result.analise_juridica.artigos_relevantes) == 9
+
+        # Segunda execução reaproveita o cache do serviço, sem gasto
+        result = self.run(runner)
+        assert len(rag.calls) == 1
+        analise = next(r for r in result.runs if r["step"] == "analise")
+        assert analise["cost_usd"] == 0
+        assert runner._contexto_pending == {}
+
+    def test_cancelled_caller_does_not_fail_waiters(self):
+        import asyncio
+        from src.workflows.licitacoes.licitacoes_monitor.runner import SpendBudget
+
+        runner, rag = self.make_runner([], max_cost_usd=1.0)
+        runner._init_agents()
+        rag.delay = 0.05
+        budget = SpendBudget(1.0)
+
+        async def main():
+            first = asyncio.create_task(runner._contexto_juridico("Drone A", budget))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(runner._contexto_juridico("drone a", budget))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        ctx = asyncio.run(main())
+
+        assert ctx["artigos_relevantes"][0]["objeto"] == "Drone A"
+        assert rag.calls == ["Drone A"]
+        assert budget.cost_usd > 0
+
+    def test_spend_cap(self):
+        from src.workflows.licitacoes.licitacoes_monitor.runner import ANALISE_COST_PER_ITEM
+
+        objetos = [f"Drone modelo {i}" for i in range(10)]
+        runner, rag = self.make_runner(objetos, max_cost_usd=3 * ANALISE_COST_PER_ITEM)
+
+        result = self.run(runner)
+
+        assert result.status == "success"
+        assert len(rag.calls) == 3
+        # Todos os P0/P1 ainda recebem recomendação
+        assert len(result.recomendacoes) == 10
+        analise = next(r for r in result.runs if r["step"] == "analise")
+        assert analise["cost_usd"] == pytest.approx(3 * ANALISE_COST_PER_ITEM)
+
+    def test_per_item_audit_timing(self):
+        objetos = ["Drone A", "Drone B", "Drone A"]
+        runner, _ = self.make_runner(objetos, max_cost_usd=1.0)
+
+        result = self.run(runner)
+
+        runs = {r["step"]: r for r in result.runs}
+        assert set(runs["triagem"]["item_timings"]) == {"PNCP-0", "PNCP-1", "PNCP-2"}
+        assert set(runs["analise"]["item_timings"]) == {"PNCP-0", "PNCP-1", "PNCP-2"}
+        assert runs["analise"]["item_timings"]["PNCP-0"] >= 10
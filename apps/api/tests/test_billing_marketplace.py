@@ -1399,6 +1399,134 @@ class TestMarketplaceSearch:
         assert "categories" in filters
         assert "tags" in filters
         assert "price_ranges" in filters
+    
+    def test_search_follows_publish_update_unpublish(self):
+        """Testa índice atualizado a cada publicação, edição e remoção."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.publisher import Publisher
+        from marketplace.search import MarketplaceSearch
+        from marketplace.types import ListingType, ListingCategory
+        
+        mp = Marketplace()
+        publisher = Publisher(mp)
+        search = MarketplaceSearch(mp)
+        
+        listing = publisher.create_listing(
+            author_id="author-idx",
+            author_name="Author",
+            name="Zephyr Translator",
+            description="Translates support tickets between languages with glossary handling built in",
+            type=ListingType.TOOL,
+            category=ListingCategory.CUSTOMER_SERVICE,
+            tags=["translation"]
+        )
+        publisher.add_version(listing.id, "author-idx", version="1.0.0", changelog="Initial")
+        
+        # Draft não aparece
+        assert search.search("zephyr")["total"] == 0
+        
+        publisher.submit_for_review(listing.id, "author-idx")
+        publisher.publish(listing.id)
+        results = search.search("zephyr")
+        assert [r["id"] for r in results["results"]] == [listing.id]
+        assert results["results"][0]["highlights"]["name"] == ["zephyr"]
+        assert search.suggest("zeph") == ["Zephyr Translator"]
+        
+        publisher.update_listing(listing.id, "author-idx", name="Boreas Translator")
+        assert search.search("zephyr")["total"] == 0
+        assert search.search("boreas")["results"][0]["id"] == listing.id
+        assert search.suggest("zeph") == []
+        
+        publisher.unpublish(listing.id, "author-idx")
+        assert search.search("boreas")["total"] == 0
+        assert search.suggest("bore") == []
+    
+    def test_search_relevance_ranks_name_matches_first(self):
+        """Testa ranking BM25: match no nome antes de match só na descrição."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.search import MarketplaceSearch
+        
+        search = MarketplaceSearch(Marketplace())
+        results = search.search("agent support")
+        
+        assert results["results"][0]["id"] == "cs-agent-001"
+        assert results["total"] == len(results["results"])
+        assert search.search("customer-support-agent")["results"][0]["id"] == "cs-agent-001"
+    
+    def test_search_total_counts_all_matches(self):
+        """Testa total com página menor que o número de matches."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.search import MarketplaceSearch
+        from marketplace.types import Listing, ListingStatus
+        
+        mp = Marketplace()
+        for i in range(30):
+            listing = Listing(
+                id=f"bulk-{i}",
+                name=f"Bulk Agent {i}",
+                description="Bulk generated agent",
+                downloads=i,
+                status=ListingStatus.PUBLISHED
+            )
+            mp._listings[listing.id] = listing
+            mp.reindex(listing.id)
+        search = MarketplaceSearch(mp)
+        
+        results = search.search("bulk agent", limit=5, offset=5)
+        
+        assert results["total"] == 31  # 30 bulk + Customer Support Agent
+        assert len(results["results"]) == 5
+        
+        by_downloads = search.search("bulk", sort_by="downloads", limit=3)
+        assert [r["id"] for r in by_downloads["results"]] == ["bulk-29", "bulk-28", "bulk-27"]
+    
+    def test_search_indexes_listings_added_directly(self):
+        """Testa indexação de listings inseridos sem passar pelo Publisher."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.search import MarketplaceSearch
+        from marketplace.types import Listing, ListingStatus
+        
+        mp = Marketplace()
+        search = MarketplaceSearch(mp)
+        search.search("")
+        
+        mp._listings["direct-001"] = Listing(
+            id="direct-001",
+            name="Direct Listing",
+            downloads=50000,
+            status=ListingStatus.PUBLISHED
+        )
+        
+        assert search.search("")["results"][0]["id"] == "direct-001"
+    
+    def test_sort_reflects_installs_and_reviews(self):
+        """Testa ordenações atualizadas após instalações e reviews."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.search import MarketplaceSearch
+        
+        mp = Marketplace()
+        search = MarketplaceSearch(mp)
+        
+        mp.add_review("sales-agent-001", "user-1", "User", 5, "Great", "Works")
+        top_rated = search.search("", sort_by="rating", limit=1)
+        assert top_rated["results"][0]["id"] == "sales-agent-001"
+        
+        mp._listings["code-review-001"].downloads = 8920
+        mp.install("code-review-001", "user-1")
+        top_downloads = search.search("", sort_by="downloads", limit=1)
+        assert top_downloads["results"][0]["id"] == "code-review-001"
+        assert [listing.id for listing in search.get_trending(limit=1)] == ["code-review-001"]
+    
+    def test_suggest_prefix(self):
+        """Testa autocomplete por prefixo de palavras do nome e tags."""
+        from marketplace.marketplace import Marketplace
+        from marketplace.search import MarketplaceSearch
+        
+        search = MarketplaceSearch(Marketplace())
+        
+        assert search.suggest("slac") == ["Slack Integration", "slack"]
+        assert search.suggest("ai code") == ["AI Code Reviewer"]
+        assert search.suggest("xyz") == []
 
 
 # =============================================================================
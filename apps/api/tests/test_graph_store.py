@@ -0,0 +1,358 @@
+"""
+Testes do GraphStore indexado usado pelo GraphRAGEngine.
+"""
+
+import random
+
+
+def _naive_neighbors(entities, relationships, entity_id, relationship_types=None, direction="both"):
+    """Varredura completa (implementação original) como referência."""
+    neighbors = []
+    for rel in relationships:
+        if relationship_types and rel.type not in relationship_types:
+            continue
+        if direction in ("out", "both") and rel.source_id == entity_id and rel.target_id in entities:
+            neighbors.append((rel.target_id, rel.id))
+        if direction in ("in", "both") and rel.target_id == entity_id and rel.source_id in entities:
+            neighbors.append((rel.source_id, rel.id))
+    return neighbors
+
+
+def _random_graph(nodes=60, edges=400, seed=7):
+    from src.domain_studio.engines.graph_rag import Entity, Relationship
+    from src.domain_studio.engines.graph_store import GraphStore
+
+    rng = random.Random(seed)
+    store = GraphStore()
+    for i in range(nodes):
+        store.add_entity(Entity(id=f"e{i}", name=f"Entidade {i}", type="t"))
+    for i in range(edges):
+        store.add_relationship(Relationship(
+            id=f"r{i}",
+            source_id=f"e{rng.randrange(nodes)}",
+            target_id=f"e{rng.randrange(nodes)}",
+            type=rng.choice(["cita", "regula", "revoga"]),
+        ))
+    return store
+
+
+class TestGraphStore:
+    """Testes para adjacência, índice de nomes e CSR."""
+
+    def test_neighbors_match_full_scan(self):
+        store = _random_graph()
+        store.remove_relationship("r5")
+        store.remove_entity("e3")
+        relationships = list(store.relationships.values())
+
+        for entity_id in ("e0", "e1", "e2", "e3"):
+            for direction in ("in", "out", "both"):
+                for types in (None, ["cita"], ["regula", "revoga"]):
+                    got = [(e.id, r.id) for e, r in store.neighbors(entity_id, types, direction)]
+                    assert got == _naive_neighbors(store.entities, relationships, entity_id, types, direction)
+
+    def test_match_name_keeps_first_match_semantics(self):
+        from src.domain_studio.engines.graph_rag import Entity
+        from src.domain_studio.engines.graph_store import GraphStore
+
+        store = GraphStore()
+        store.add_entity(Entity(id="lei", name="Lei 8.666 de Licitações", type="law"))
+        store.add_entity(Entity(id="cf", name="CF", type="law"))
+        store.add_entity(Entity(id="lic", name="Licitações", type="concept"))
+
+        assert store.match_name("licitações").id == "lei"
+        assert store.match_name("a CF/88 garante").id == "cf"
+        assert store.match_name("cf").id == "cf"
+        assert store.match_name("decreto") is None
+
+        store.add_entity(Entity(id="lei", name="Lei 14.133", type="law"))
+        assert store.match_name("licitações").id == "lic"
+
+    def test_csr_export(self):
+        store = _random_graph()
+        csr = store.to_csr(["cita"])
+
+        for eid, i in csr.node_index.items():
+            expected = [e.id for e, _ in store.neighbors(eid, ["cita"], "out")]
+            assert [csr.node_ids[n] for n in csr.neighbors(i)] == expected
+
+        distances = csr.bfs(["e0"], depth=2)
+        assert distances["e0"] == 0
+        assert all(d <= 2 for d in distances.values())
+
+
+class TestGraphRAGEngineIndexed:
+    """Testes do GraphRAGEngine sobre o GraphStore."""
+
+    def test_subgraph_and_stats(self):
+        from src.domain_studio.core.types import DomainType
+        from src.domain_studio.engines.graph_rag import Entity, GraphRAGEngine, Relationship
+
+        engine = GraphRAGEngine(domain=DomainType.LEGAL)
+        for i in range(6):
+            engine.add_entity(Entity(id=f"n{i}", name=f"Nó {i}", type="node"))
+        for i in range(5):
+            engine.add_relationship(Relationship(source_id=f"n{i}", target_id=f"n{i + 1}", type="next"))
+
+        subgraph = engine.get_subgraph(["n2"], depth=1)
+        assert [e.id for e in subgraph.entities] == ["n2", "n1", "n3"]
+
+        limited = engine.get_subgraph(["n0"], depth=5, max_nodes=3)
+        assert [e.id for e in limited.entities] == ["n0", "n1", "n2"]
+
+        stats = engine.get_stats()
+        assert stats["total_entities"] == 6
+        assert stats["total_relationships"] == 5
+
+
+def _all_simple_paths(store, source_id, target_id, max_depth, relationship_types=None):
+    """DFS exaustiva (implementação original do find_paths) como referência."""
+    paths = []
+
+    def dfs(current, path, rels):
+        if len(rels) > max_depth:
+            return
+        if current == target_id:
+            paths.append((list(path), list(rels)))
+            return
+        for neighbor, rel in store.neighbors(current, relationship_types, "out"):
+            if neighbor.id not in path:
+                path.append(neighbor.id)
+                rels.append(rel)
+                dfs(neighbor.id, path, rels)
+                path.pop()
+                rels.pop()
+
+    dfs(source_id, [source_id], [])
+    return paths
+
+
+class TestPathFinder:
+    """Testes para menor caminho e K menores caminhos."""
+
+    def test_k_shortest_matches_exhaustive_enumeration(self):
+        from src.domain_studio.engines.graph_paths import PathBudget, PathConstraints, PathFinder
+
+        store = _random_graph(nodes=25, edges=90, seed=3)
+        finder = PathFinder(store)
+
+        for target in ("e1", "e7", "e19"):
+            expected = _all_simple_paths(store, "e0", target, max_depth=4)
+            result = finder.k_shortest_paths(
+                "e0", target,
+                constraints=PathConstraints(max_depth=4),
+                budget=PathBudget(max_paths=1_000, time_budget_ms=10_000),
+            )
+            assert not result.truncated
+            assert sorted(p.hops for p in result.paths) == [p.hops for p in result.paths]
+            assert sorted(len(r) for _, r in expected) == [p.hops for p in result.paths]
+            assert {tuple(p.relationship_ids) for p in result.paths} == {
+                tuple(r.id for r in rels) for _, rels in expected
+            }
+
+    def test_constraints_and_weighted_cost(self):
+        from src.domain_studio.engines.graph_rag import Entity, Relationship
+        from src.domain_studio.engines.graph_paths import PathConstraints, PathFinder
+        from src.domain_studio.engines.graph_store import GraphStore
+
+        store = GraphStore()
+        for name in "abcd":
+            store.add_entity(Entity(id=name, name=name))
+        store.add_relationship(Relationship(id="ad", source_id="a", target_id="d", type="cita", weight=0.1))
+        store.add_relationship(Relationship(id="ab", source_id="a", target_id="b", type="cita", weight=1.0))
+        store.add_relationship(Relationship(id="bc", source_id="b", target_id="c", type="cita", weight=1.0))
+        store.add_relationship(Relationship(id="cd", source_id="c", target_id="d", type="regula", weight=1.0))
+        finder = PathFinder(store)
+
+        assert finder.shortest_path("a", "d").paths[0].node_ids == ["a", "d"]
+        assert finder.shortest_path(
+            "a", "d", PathConstraints(min_weight=0.5)
+        ).paths[0].node_ids == ["a", "b", "c", "d"]
+        assert finder.shortest_path("a", "d", PathConstraints(min_weight=0.5, max_depth=2)).paths == []
+        assert finder.shortest_path("a", "d", PathConstraints(relationship_types=["cita"], min_weight=0.5)).paths == []
+
+        # Custo = 1/peso: o caminho longo e forte vence a aresta fraca
+        weighted = finder.k_shortest_paths("a", "d", PathConstraints(cost=lambda r: 1 / r.weight))
+        assert [p.node_ids for p in weighted.paths] == [["a", "b", "c", "d"], ["a", "d"]]
+        assert weighted.paths[0].cost == 3.0
+
+    def test_budget_stops_dense_search(self):
+        from src.domain_studio.engines.graph_paths import PathBudget, PathConstraints, PathFinder
+
+        store = _random_graph(nodes=200, edges=8_000, seed=1)
+        result = PathFinder(store).k_shortest_paths(
+            "e0", "e1",
+            constraints=PathConstraints(max_depth=6),
+            budget=PathBudget(max_paths=100_000, max_expansions=2_000),
+        )
+
+        assert result.truncated
+        assert result.paths
+        assert result.expansions <= 2_001
+
+    def test_long_chain_does_not_recurse(self):
+        import asyncio
+
+        from src.domain_studio.core.types import DomainType
+        from src.domain_studio.engines.graph_rag import Entity, GraphRAGEngine, Relationship
+
+        engine = GraphRAGEngine(domain=DomainType.LEGAL)
+        for i in range(3_000):
+            engine.add_entity(Entity(id=f"n{i}", name=f"n{i}"))
+        for i in range(2_999):
+            engine.add_relationship(Relationship(source_id=f"n{i}", target_id=f"n{i + 1}", type="next"))
+
+        paths = asyncio.run(engine.graph_traverser.find_paths("n0", "n2999", max_depth=5_000))
+        assert len(paths) == 1
+        assert len(paths[0]) == 3_000
+
+
+class TestGraphSnapshot:
+    """Testes para snapshot binário, log de append e warm start."""
+
+    def test_mapped_graph_matches_store(self, tmp_path):
+        from src.domain_studio.engines.graph_rag import Entity
+        from src.domain_studio.engines.graph_snapshot import MappedGraph, write_snapshot
+
+        store = _random_graph()
+        store.add_entity(Entity(id="lei", name="Lei 8.666 de Licitações", type="law",
+                                properties={"ano": 1993}, embedding=[0.1, 0.2]))
+        path = write_snapshot(store, str(tmp_path / "legal.graph"))
+
+        mapped = MappedGraph(str(path))
+        try:
+            assert len(mapped.entities) == len(store.entities)
+            assert list(mapped.relationships) == list(store.relationships)
+            assert mapped.entities["lei"] == store.entities["lei"]
+            assert "nada" not in mapped.entities
+            assert mapped.type_index == store.type_index
+
+            for entity_id in ("e0", "e1", "e5"):
+                for direction in ("in", "out", "both"):
+                    for types in (None, ["cita"], ["regula", "revoga"]):
+                        expected = [(e.id, r) for e, r in store.neighbors(entity_id, types, direction)]
+                        got = [(e.id, r) for e, r in mapped.neighbors(entity_id, types, direction)]
+                        assert got == expected
+
+            for name in ("licitações", "a lei 8.666 de licitações vigente", "entidade 1", "e", "xyz"):
+                expected = store.match_name(name)
+                got = mapped.match_name(name)
+                assert (got and got.id) == (expected and expected.id)
+        finally:
+            mapped.close()
+
+    def test_append_log_replay_and_compaction(self, tmp_path):
+        from src.domain_studio.engines.graph_rag import Entity, Relationship
+        from src.domain_studio.engines.graph_snapshot import LayeredGraph, MappedGraph, write_snapshot
+
+        path = str(tmp_path / "g.graph")
+        log_path = str(tmp_path / "g.graph.log")
+        write_snapshot(_random_graph(nodes=10, edges=30), path)
+
+        graph = LayeredGraph(MappedGraph(path), log_path=log_path)
+        graph.add_entity(Entity(id="novo", name="Nova Entidade", type="t"))
+        graph.add_entity(Entity(id="e1", name="Renomeada", type="outro"))
+        graph.add_relationship(Relationship(id="rx", source_id="e0", target_id="novo", type="cita"))
+        graph.close()
+        with open(log_path, "a") as f:
+            f.write('{"op": "entity", "data": {"id": "parcial"')  # escrita interrompida
+
+        reopened = LayeredGraph(MappedGraph(path), log_path=log_path)
+        assert len(reopened.entities) == 11
+        assert reopened.entities["e1"].name == "Renomeada"
+        assert "e1" in reopened.type_index["outro"]
+        assert ("novo", "rx") in [(e.id, r.id) for e, r in reopened.neighbors("e0", direction="out")]
+        assert reopened.match_name("renomeada").id == "e1"
+
+        reopened.compact(path)
+        assert not (tmp_path / "g.graph.log").exists()
+        compacted = MappedGraph(path)
+        assert compacted.entities["e1"].name == "Renomeada"
+        assert compacted.relationships["rx"].target_id == "novo"
+        compacted.close()
+
+    def test_engine_warm_start(self, tmp_path):
+        import asyncio
+
+        from src.domain_studio.core.types import DomainType
+        from src.domain_studio.engines.graph_rag import Entity, GraphRAGEngine, Relationship
+
+        path = str(tmp_path / "legal.graph")
+        log_path = str(tmp_path / "legal.graph.log")
+        engine = GraphRAGEngine(domain=DomainType.LEGAL)
+        for i in range(5):
+            engine.add_entity(Entity(id=f"n{i}", name=f"Nó {i}", type="node"))
+        for i in range(4):
+            engine.add_relationship(Relationship(source_id=f"n{i}", target_id=f"n{i + 1}", type="next"))
+        engine.save_snapshot(path)
+
+        warm = GraphRAGEngine(domain=DomainType.LEGAL, snapshot_path=path, snapshot_log_path=log_path)
+        assert warm.get_stats()["total_relationships"] == 4
+        assert [e.id for e in warm.get_subgraph(["n2"], depth=1).entities] == ["n2", "n1", "n3"]
+
+        warm.add_entity(Entity(id="n5", name="Nó 5", type="node"))
+        warm.add_relationship(Relationship(source_id="n4", target_id="n5", type="next"))
+        paths = asyncio.run(warm.graph_traverser.find_paths("n0", "n5", max_depth=5))
+        assert paths == [["n0", "n1", "n2", "n3", "n4", "n5"]]
+
+        again = GraphRAGEngine(domain=DomainType.LEGAL, snapshot_path=path, snapshot_log_path=log_path)
+        assert again.get_entity("n5").name == "Nó 5"
+        again.save_snapshot(path)
+        assert again.get_stats()["entities_by_type"] == {"node": 6}
+
+    def test_layered_type_index_is_incremental(self, tmp_path):
+        from src.domain_studio.engines.graph_rag import Entity
+        from src.domain_studio.engines.graph_snapshot import LayeredGraph, MappedGraph, write_snapshot
+
+        path = str(tmp_path / "g.graph")
+        write_snapshot(_random_graph(nodes=10, edges=30), path)
+        graph = LayeredGraph(MappedGraph(path))
+
+        index = graph.type_index
+        graph.add_entity(Entity(id="e1", name="Renomeada", type="outro"))
+        graph.add_entity(Entity(id="novo", name="Nova", type="outro"))
+        graph.add_entity(Entity(id="novo", name="Nova", type="final"))
+
+        # Mesmo índice, atualizado pelas escritas (sem reconstrução)
+        assert graph.type_index is index
+        assert graph.type_index == {"t": {f"e{i}" for i in range(10)} - {"e1"}, "outro": {"e1"}, "final": {"novo"}}
+
+    def test_layered_write_failures_and_compaction_keep_log_consistent(self, tmp_path):
+        import threading
+
+        import pytest
+
+        from src.domain_studio.engines.graph_rag import Entity
+        from src.domain_studio.engines.graph_snapshot import LayeredGraph, MappedGraph, write_snapshot
+
+        path = str(tmp_path / "g.graph")
+        log_path = str(tmp_path / "g.graph.log")
+        write_snapshot(_random_graph(nodes=10, edges=30), path)
+        graph = LayeredGraph(MappedGraph(path), log_path=log_path)
+
+        # Valor não serializável: nem memória nem log são alterados
+        with pytest.raises(TypeError):
+            graph.add_entity(Entity(id="ruim", name="Ruim", type="t", properties={"x": object()}))
+        assert "ruim" not in graph.entities
+
+        # Escritas concorrentes com compact: cada uma está no snapshot ou no log
+        stop = threading.Event()
+        written = []
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                graph.add_entity(Entity(id=f"w{i}", name=f"W {i}", type="w"))
+                written.append(f"w{i}")
+                i += 1
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        for _ in range(5):
+            graph.compact(path)
+        stop.set()
+        thread.join()
+        graph.close()
+
+        reopened = LayeredGraph(MappedGraph(path), log_path=log_path)
+        assert all(entity_id in reopened.entities for entity_id in written)
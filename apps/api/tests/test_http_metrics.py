@@ -0,0 +1,176 @@
+"""
+Testes das métricas HTTP por template de rota e do log por requisição.
+"""
+
+import json
+import logging
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+
+def _app(metrics):
+    from src.observability.http import route_template
+
+    app = FastAPI()
+
+    @app.get("/agents/{name}/run")
+    async def run_agent(name: str):
+        return {"name": name}
+
+    @app.middleware("http")
+    async def middleware(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        metrics.record(
+            request.method,
+            route_template(request.scope),
+            response.status_code,
+            (time.perf_counter() - start) * 1000.0,
+        )
+        return response
+
+    return app
+
+
+class TestHTTPMetrics:
+    """Testes para HTTPMetrics e route_template."""
+
+    def test_metrics_keyed_by_route_template(self):
+        from src.observability.http import HTTPMetrics, UNMATCHED_ROUTE
+
+        metrics = HTTPMetrics(export_prometheus=False)
+        client = TestClient(_app(metrics))
+
+        for i in range(50):
+            assert client.get(f"/agents/agent-{i}/run").status_code == 200
+        client.get("/nao-existe/123")
+
+        snapshot = metrics.snapshot()
+        assert set(snapshot["per_route"]) == {"/agents/{name}/run", UNMATCHED_ROUTE}
+        route = snapshot["per_route"]["/agents/{name}/run"]
+        assert route["count"] == 50
+        assert route["buckets_ms"]["+Inf"] == 50
+        assert snapshot["per_route_status"][UNMATCHED_ROUTE] == {404: 1}
+
+    def test_route_cardinality_is_bounded(self):
+        from src.observability.http import HTTPMetrics, OTHER_ROUTE
+
+        metrics = HTTPMetrics(max_routes=3, export_prometheus=False)
+        for i in range(10):
+            metrics.record("GET", f"/r{i}", 200, 1.0)
+
+        snapshot = metrics.snapshot()
+        assert len(snapshot["per_route"]) == 3
+        assert snapshot["per_route"][OTHER_ROUTE]["count"] == 8
+        assert snapshot["requests"] == 10
+
+    def test_histogram_buckets_and_quantiles(self):
+        from src.observability.http import HTTPMetrics
+
+        metrics = HTTPMetrics(buckets_ms=(10, 100), export_prometheus=False)
+        for duration in (1, 5, 10, 50, 500):
+            metrics.record("GET", "/x", 200, duration)
+
+        route = metrics.snapshot()["per_route"]["/x"]
+        assert route["buckets_ms"] == {"10": 3, "100": 4, "+Inf": 5}
+        assert route["p50_ms"] == 10.0
+        assert route["p95_ms"] is None  # acima do maior bucket
+
+    def test_prometheus_export_uses_template(self):
+        from src.observability.http import HTTPMetrics
+        from src.observability.metrics import get_metrics_text
+
+        metrics = HTTPMetrics()
+        client = TestClient(_app(metrics))
+        client.get("/agents/prom-1/run")
+
+        text = get_metrics_text()
+        assert 'endpoint="/agents/{name}/run"' in text
+        assert "prom-1" not in text
+
+
+class TestRequestLog:
+    """Testes para RequestLog."""
+
+    class _Capture(logging.Handler):
+        def __init__(self):
+            super().__init__()
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(json.loads(record.getMessage()))
+
+    def _logger(self, name):
+        capture = self._Capture()
+        logger = logging.getLogger(name)
+        logger.handlers = [capture]
+        logger.setLevel(logging.INFO)
+        return logger, capture
+
+    def test_sampling_keeps_errors(self):
+        from src.observability.http import RequestLog
+
+        logger, capture = self._logger("test.request_log.sampling")
+        request_log = RequestLog(logger, sample_rate=0.0)
+        for _ in range(20):
+            request_log.log({"status": 200})
+        request_log.log({"status": 503})
+        request_log.log({"status": 429})
+        request_log.close()
+
+        assert [r["status"] for r in capture.records] == [503, 429]
+
+    def test_disabled_and_full_rate(self):
+        from src.observability.http import RequestLog
+
+        logger, capture = self._logger("test.request_log.rate")
+        disabled = RequestLog(logger, enabled=False)
+        disabled.log({"status": 500})
+        disabled.close()
+        assert capture.records == []
+
+        request_log = RequestLog(logger, sample_rate=1.0)
+        for i in range(5):
+            request_log.log({"status": 200, "i": i})
+        request_log.close()
+        assert [r["i"] for r in capture.records] == list(range(5))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        from src.observability.http import RequestLog
+
+        logger, capture = self._logger("test.request_log.drop")
+        request_log = RequestLog(logger, max_queue=1)
+        request_log._listener.stop()  # ninguém consome a fila
+
+        for _ in range(5):
+            request_log.log({"status": 200})
+        assert request_log.dropped == 4
+
+    def test_listener_stopped_on_app_shutdown(self):
+        from contextlib import asynccontextmanager
+
+        from src.observability.http import RequestLog
+
+        events = []
+
+        @asynccontextmanager
+        async def lifespan(app):
+            events.append("startup")
+            yield
+            events.append("shutdown")
+
+        logger, capture = self._logger("test.request_log.shutdown")
+        app = FastAPI(lifespan=lifespan)
+        request_log = RequestLog(logger)
+        request_log.close_on_shutdown(app)
+
+        with TestClient(app):
+            assert request_log._listener._thread.is_alive()
+            request_log.log({"status": 200})
+
+        assert events == ["startup", "shutdown"]
+        assert request_log._listener._thread is None
+        assert [r["status"] for r in capture.records] == [200]
+        request_log.close()  # idempotente
@@ -0,0 +1,165 @@
+"""
+Testes do módulo MCP (Model Context Protocol).
+
+Cobre o cache opt-in de tools/resources do MCPClient.
+"""
+
+import asyncio
+
+import pytest
+
+
+def _make_client(cache_config, subscribe=True):
+    """Cria MCPClient com _request falso que registra as chamadas."""
+    from src.mcp.client import MCPClient
+    from src.mcp.types import MCPServer, MCPMessage
+
+    client = MCPClient(MCPServer(name="test", cache=cache_config))
+    client.server.capabilities.resources_subscribe = subscribe
+    calls: list[tuple[str, dict]] = []
+
+    async def fake_request(method, params=None, timeout=30.0):
+        calls.append((method, params))
+        await asyncio.sleep(0.01)
+        if method == "resources/subscribe":
+            return MCPMessage(id=1, result={})
+        if method == "resources/read":
+            return MCPMessage(id=1, result={"contents": [{"uri": params["uri"], "text": "data"}]})
+        return MCPMessage(id=1, result={"content": [{"type": "text", "text": "ok"}]})
+
+    client._request = fake_request
+    return client, calls
+
+
+class TestMCPResultCache:
+    """Testes para o cache de resultados MCP."""
+
+    def test_canonical_key_ignores_argument_order(self):
+        from src.mcp.cache import canonical_key
+
+        assert canonical_key("search", {"a": 1, "b": 2}) == canonical_key("search", {"b": 2, "a": 1})
+        assert canonical_key("search", {"a": 1}) != canonical_key("search", {"a": 2})
+
+    def test_ttl_and_lru_bounds(self):
+        from src.mcp.cache import MCPResultCache, CacheConfig, CachePolicy
+
+        now = [0.0]
+        cache = MCPResultCache(
+            CacheConfig(tools={"t": CachePolicy(ttl_seconds=10, max_entries=2)}),
+            clock=lambda: now[0]
+        )
+
+        async def load(value):
+            return value
+
+        async def run():
+            await cache.get_or_load("t", {"i": 1}, lambda: load(1))
+            await cache.get_or_load("t", {"i": 2}, lambda: load(2))
+            await cache.get_or_load("t", {"i": 3}, lambda: load(3))
+            assert cache.get_stats()["t"]["evictions"] == 1
+
+            now[0] = 11.0
+            assert await cache.get_or_load("t", {"i": 3}, lambda: load("fresh")) == "fresh"
+
+        asyncio.run(run())
+
+    def test_uncached_tool_always_calls_server(self):
+        from src.mcp.cache import CacheConfig
+
+        client, calls = _make_client(CacheConfig())
+
+        async def run():
+            await client.call_tool("search", {"q": "x"})
+            await client.call_tool("search", {"q": "x"})
+
+        asyncio.run(run())
+        assert len(calls) == 2
+
+    def test_concurrent_calls_are_deduplicated(self):
+        from src.mcp.cache import CacheConfig, CachePolicy
+
+        client, calls = _make_client(CacheConfig(tools={"search": CachePolicy()}))
+
+        async def run():
+            results = await asyncio.gather(*[
+                client.call_tool("search", {"q": "x", "n": 1}) for _ in range(5)
+            ])
+            await client.call_tool("search", {"n": 1, "q": "x"})
+            return results
+
+        results = asyncio.run(run())
+
+        assert len(calls) == 1
+        assert all(r.content == "ok" for r in results)
+        stats = client.get_cache_stats()["search"]
+        assert stats["deduplicated"] == 4
+        assert stats["hits"] == 1
+
+    def test_resource_update_notification_invalidates(self):
+        from src.mcp.cache import CacheConfig, CachePolicy
+        from src.mcp.types import MCPMessage
+
+        client, calls = _make_client(CacheConfig(resources=CachePolicy()))
+
+        async def run():
+            await client.read_resource("file:///a")
+            await client.read_resource("file:///a")
+            client._on_message(MCPMessage.notification(
+                "notifications/resources/updated", {"uri": "file:///a"}
+            ))
+            await client.read_resource("file:///a")
+
+        asyncio.run(run())
+        assert [m for m, _ in calls] == ["resources/subscribe", "resources/read", "resources/read"]
+
+    def test_unsubscribable_resource_is_not_cached(self):
+        from src.mcp.cache import CacheConfig, CachePolicy
+
+        client, calls = _make_client(CacheConfig(resources=CachePolicy()), subscribe=False)
+
+        async def run():
+            for _ in range(3):
+                await client.read_resource("file:///a")
+
+        asyncio.run(run())
+        assert [m for m, _ in calls] == ["resources/read"] * 3
+
+    def test_cancelled_leader_does_not_fail_waiters(self):
+        from src.mcp.cache import MCPResultCache, CacheConfig, CachePolicy
+
+        cache = MCPResultCache(CacheConfig(tools={"t": CachePolicy()}))
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.02)
+            return "value"
+
+        async def run():
+            leader = asyncio.create_task(cache.get_or_load("t", {}, load))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(cache.get_or_load("t", {}, load))
+            await asyncio.sleep(0)
+            leader.cancel()
+            result = await waiter
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+            return result, await cache.get_or_load("t", {}, load)
+
+        assert asyncio.run(run()) == ("value", "value")
+        assert len(loads) == 1
+
+    def test_registry_reports_hit_rate_per_tool(self):
+        from src.mcp.cache import CacheConfig, CachePolicy
+        from src.mcp.registry import MCPRegistry
+
+        client, _ = _make_client(CacheConfig(tools={"search": CachePolicy()}))
+        registry = MCPRegistry(config_path="/nonexistent/mcp.json")
+        registry._clients[client.server.id] = client
+
+        async def run():
+            for _ in range(4):
+                await client.call_tool("search", {"q": "x"})
+
+        asyncio.run(run())
+        assert registry.get_metrics()["cache"]["search"]["hit_rate"] == pytest.approx(0.75)
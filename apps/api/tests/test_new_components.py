@@ -245,3 +245,217 @@ def test_rate_limiter_blocking():
 
     # Próxima deve ser bloqueada (limite padrão é 120)
     assert limiter.check("user_test", "default") is False
+
+
+def test_rate_limiter_interpolates_previous_window():
+    """Janela anterior deve pesar proporcionalmente ao tempo restante."""
+    from src.os.middleware.rate_limit import MemoryBackend
+
+    backend = MemoryBackend()
+    for _ in range(10):
+        assert backend.hit("k", 10, 60, 0.5) == (True, 0)
+
+    # Início da janela seguinte: anterior ainda pesa 10
+    assert backend.hit("k", 10, 60, 60.0) == (False, 6)
+    # Na metade, a anterior pesa 5: cabem mais 5
+    results = [backend.hit("k", 10, 60, 90.0)[0] for _ in range(6)]
+    assert results == [True] * 5 + [False]
+
+
+def test_rate_limiter_memory_is_bounded():
+    """Chaves menos recentes devem ser despejadas acima de max_keys."""
+    from src.os.middleware.rate_limit import RateLimiter
+
+    limiter = RateLimiter(window_seconds=60, max_keys=100)
+    for i in range(1000):
+        limiter.check(f"10.0.{i // 256}.{i % 256}", "default")
+
+    assert len(limiter.backend) == 100
+
+
+def test_rate_limit_dependency_returns_429():
+    """Dependência deve responder 429 com Retry-After."""
+    from fastapi import APIRouter, Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.config import get_settings
+    from src.os.middleware.rate_limit import RateLimiter, create_rate_limit_dependency
+
+    limiter = RateLimiter(window_seconds=60)
+    limiter._limits["auth"] = 2
+    router = APIRouter(dependencies=[Depends(create_rate_limit_dependency(limiter))])
+
+    @router.get("/auth/ping")
+    def ping():
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    settings = get_settings()
+    enabled = settings.RATE_LIMIT_ENABLED
+    settings.RATE_LIMIT_ENABLED = True
+    try:
+        statuses = [client.get("/auth/ping").status_code for _ in range(3)]
+        blocked = client.get("/auth/ping")
+        other = client.get("/auth/ping", headers={"Authorization": "Bearer outro"})
+    finally:
+        settings.RATE_LIMIT_ENABLED = enabled
+
+    assert statuses == [200, 200, 429]
+    assert int(blocked.headers["Retry-After"]) >= 1
+    assert other.status_code == 200
+
+
+# ==================== TESTES DE GUARDRAILS ====================
+
+def test_pii_scan_detects_and_masks_in_one_pass():
+    """scan deve retornar findings e texto mascarado sem sobreposições."""
+    from src.agents.guardrails import PIIDetector
+
+    detector = PIIDetector()
+    text = "Email joao@example.com, CPF 123.456.789-09, CNPJ 12.345.678/0001-90"
+    findings, masked = detector.scan(text)
+
+    assert [f["type"] for f in findings] == ["email", "cpf", "cnpj"]
+    assert "joao@example.com" not in masked
+    assert "123.456.789-09" not in masked
+    assert detector.mask(text) == masked
+
+
+def test_streaming_pii_masker_matches_full_mask():
+    """Masking em chunks deve ser igual ao masking do texto completo."""
+    from src.agents.guardrails import PIIDetector, StreamingPIIMasker
+
+    text = ("resposta parcial " * 10 + "contato: maria.souza@example.com tel 11 98765-4321. ") * 5
+    masker = StreamingPIIMasker()
+
+    out = []
+    for i in range(0, len(text), 7):
+        out.append(masker.feed(text[i:i + 7]))
+    out.append(masker.flush())
+
+    assert "".join(out) == PIIDetector().mask(text)
+    assert len(masker.findings) == 10
+
+
+
+def test_streaming_pii_masker_random_chunkings():
+    """Qualquer divisão em chunks deve produzir o mesmo masking do texto completo."""
+    import random
+    from src.agents.guardrails import PIIDetector, StreamingPIIMasker
+
+    rng = random.Random(0)
+    words = [
+        "edital", "pregão", "maria.souza@example.com", "123.456.789-09",
+        "11 98765-4321", "4111 1111 1111 1111", "192.168.0.1",
+        "protocolo" + "7" * 80, "x" * 70 + "12345678909", "12.345.678/0001-95",
+    ]
+    detector = PIIDetector()
+
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(5, 40)))
+        masker = StreamingPIIMasker(holdback=rng.choice([24, 64]))
+        out, i = [], 0
+        while i < len(text):
+            size = rng.randint(1, 40)
+            out.append(masker.feed(text[i:i + size]))
+            i += size
+        out.append(masker.flush())
+
+        assert "".join(out) == detector.mask(text)
+        assert masker.findings == detector.detect(text)
+
+def test_input_guard_rejects_long_input_early():
+    """Input acima do limite deve ser bloqueado antes dos scans de conteúdo."""
+    from src.agents.guardrails import Guardrails, GuardrailsConfig, GuardAction, ViolationType
+
+    guardrails = Guardrails(GuardrailsConfig(max_input_length=100, rate_limit_enabled=False))
+    result = guardrails.check_input("joao@example.com " * 20)
+
+    assert result.action == GuardAction.BLOCK
+    assert ViolationType.PII_DETECTED not in result.violations
+    assert ViolationType.INPUT_TOO_LONG in result.violations
+
+
+# ==================== TESTES DE MEMÓRIA DE AGENTES ====================
+
+def test_long_term_memory_fts_search(tmp_path):
+    """Busca FTS deve ranquear por relevância e acompanhar updates/deletes."""
+    from src.agents.memory import LongTermMemory, MemoryItem, MemoryType
+
+    memory = LongTermMemory(db_path=str(tmp_path / "lt.db"), agent_id="agent")
+    memory.remember("Usuário prefere linguagem formal", category="preference")
+    memory.remember("Usuário mora em São Paulo", category="fact")
+    removed = memory.remember("Nota temporária sobre python")
+
+    assert [m.content for m in memory.search("prefer")] == ["Usuário prefere linguagem formal"]
+    assert [m.content for m in memory.search("sao paulo")] == ["Usuário mora em São Paulo"]
+
+    assert memory.forget(removed) is True
+    assert memory.search("python") == []
+
+    memory.add(MemoryItem(id="x", content="versão antiga", memory_type=MemoryType.LONG_TERM))
+    memory.add(MemoryItem(id="x", content="versão nova", memory_type=MemoryType.LONG_TERM))
+    assert [m.content for m in memory.search("versão")] == ["versão nova"]
+    assert memory.search("antiga") == []
+
+
+def test_episodic_memory_async_search(tmp_path):
+    """Variantes async devem rodar no thread pool e retornar os mesmos dados."""
+    import asyncio
+    from src.agents.memory import EpisodicMemory
+
+    memory = EpisodicMemory(db_path=str(tmp_path / "ep.db"))
+    memory.record("Deploy falhou por timeout", "failure", lesson="Aumentar o timeout")
+
+    episodes = asyncio.run(memory.asearch("timeout"))
+
+    assert [e.outcome for e in episodes] == ["failure"]
+    assert memory.get_lessons() == ["Aumentar o timeout"]
+
+
+# ==================== TESTES DE TELEMETRIA ====================
+
+def test_metrics_collector_merges_thread_shards():
+    """Counters escritos por várias threads devem ser somados na leitura."""
+    import threading
+    from src.agents.telemetry import MetricsCollector
+
+    metrics = MetricsCollector(max_history=100)
+
+    def work():
+        for _ in range(1000):
+            metrics.increment("calls", labels={"model_id": "m", "agent_id": "a"})
+            metrics.observe("latency_ms", 10.0, {"model_id": "m"})
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Ordem dos labels não altera a chave
+    assert metrics.get_counter("calls", {"agent_id": "a", "model_id": "m"}) == 8000
+    assert metrics.get_histogram_stats("latency_ms", {"model_id": "m"})["count"] == 8000
+    assert metrics.get_all_metrics()["counters"] == {"calls{agent_id=a,model_id=m}": 8000}
+    assert len(metrics.get_recent()) == 100
+
+
+def test_metrics_collector_histogram_quantiles():
+    """Percentis do sketch devem ficar próximos dos exatos, com buckets fixos."""
+    from src.agents.telemetry import MetricsCollector
+
+    metrics = MetricsCollector(buckets=(10, 100, 1000))
+    for v in range(1, 2001):
+        metrics.observe("latency_ms", float(v))
+
+    stats = metrics.get_histogram_stats("latency_ms")
+    assert stats["count"] == 2000
+    assert stats["mean"] == 1000.5
+    assert abs(stats["p50"] - 1000) / 1000 < 0.02
+    assert abs(stats["p99"] - 1980) / 1980 < 0.02
+    assert metrics.get_histogram_buckets("latency_ms") == {
+        "10": 10, "100": 100, "1000": 1000, "+Inf": 2000
+    }
@@ -0,0 +1,151 @@
+"""
+Testes do pipeline de ingestão do RagService.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+pytest.importorskip("chromadb")
+
+
+class _Collection:
+    """Coleção em memória com a interface usada pelo pipeline."""
+
+    def __init__(self):
+        self.rows = {}
+        self.upserts = []
+        self.deletes = []
+
+    def get(self, where, include):
+        sources = set(where["source"]["$in"])
+        return {"metadatas": [meta for _, meta in self.rows.values() if meta["source"] in sources]}
+
+    def upsert(self, ids, documents, metadatas):
+        self.upserts.append(len(ids))
+        for id_, doc, meta in zip(ids, documents, metadatas):
+            self.rows[id_] = (doc, meta)
+
+    def delete(self, where):
+        self.deletes.append(where["source"])
+        for id_ in [i for i, (_, meta) in self.rows.items() if meta["source"] == where["source"]]:
+            del self.rows[id_]
+
+
+def _markdown(i, words=400):
+    return (f"# Seção {i}\n" + "palavra " * words).encode()
+
+
+class TestIngestFiles:
+    """Testes para ingestão de arquivos."""
+
+    def test_batches_upserts_and_reports_progress(self):
+        from src.rag.ingest import IngestPipeline
+
+        collection = _Collection()
+        progress = []
+        pipeline = IngestPipeline(collection, batch_size=4, progress=progress.append)
+        stats = pipeline.ingest_files([(f"doc{i}.md", _markdown(i)) for i in range(10)])
+
+        assert stats["processed"] == 10
+        assert stats["added"] == len(collection.rows) == 30
+        assert max(collection.upserts) == 4
+        assert [p["processed"] for p in progress] == list(range(1, 11))
+
+    def test_unchanged_documents_are_skipped(self):
+        from src.rag.ingest import IngestPipeline
+
+        collection = _Collection()
+        files = [(f"doc{i}.md", _markdown(i)) for i in range(5)]
+        IngestPipeline(collection).ingest_files(files)
+        before = dict(collection.rows)
+
+        files[0] = ("doc0.md", b"# Novo\nconteudo alterado")
+        stats = IngestPipeline(collection).ingest_files(files)
+
+        assert stats["skipped"] == 4
+        assert stats["processed"] == 1
+        assert collection.deletes == ["doc0.md"]
+        assert [doc for doc, meta in collection.rows.values() if meta["source"] == "doc0.md"] == ["conteudo alterado"]
+        assert len(collection.rows) == len(before) - 2
+
+    def test_legacy_chunks_without_hash_are_replaced(self):
+        from src.rag.ingest import IngestPipeline
+
+        collection = _Collection()
+        collection.rows["legado-0"] = ("texto antigo", {"source": "doc0.md"})
+
+        stats = IngestPipeline(collection).ingest_files([("doc0.md", _markdown(0))])
+
+        assert stats["processed"] == 1
+        assert collection.deletes == ["doc0.md"]
+        assert "legado-0" not in collection.rows
+
+    def test_duplicate_file_names_keep_last(self):
+        from src.rag.ingest import IngestPipeline
+
+        collection = _Collection()
+        stats = IngestPipeline(collection).ingest_files(
+            [("doc.md", b"# A\nprimeira versao"), ("doc.md", b"# B\nsegunda versao")]
+        )
+
+        assert stats["documents"] == stats["processed"] == 1
+        assert [doc for doc, _ in collection.rows.values()] == ["segunda versao"]
+
+    def test_large_files_are_parsed_in_pool(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.rag.ingest import INLINE_PARSE_BYTES, IngestPipeline
+
+        class _Pool(ThreadPoolExecutor):
+            submitted = 0
+
+            def submit(self, fn, *args, **kwargs):
+                _Pool.submitted += 1
+                return super().submit(fn, *args, **kwargs)
+
+        big = ("linha de texto\n" * (INLINE_PARSE_BYTES // 10)).encode()
+        with _Pool(2) as pool:
+            stats = IngestPipeline(_Collection(), pool=pool).ingest_files(
+                [("grande.txt", big), ("pequeno.txt", b"curto")]
+            )
+
+        assert _Pool.submitted == 1
+        assert stats["processed"] == 2
+
+
+class TestIngestUrls:
+    """Testes para ingestão de URLs."""
+
+    def test_concurrent_fetch_with_per_host_limit(self):
+        pytest.importorskip("bs4")
+        from src.rag.ingest import IngestPipeline
+
+        state = {"active": 0, "max": 0}
+
+        async def handler(request):
+            state["active"] += 1
+            state["max"] = max(state["max"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            if request.url.path == "/erro":
+                return httpx.Response(500)
+            return httpx.Response(200, text=f"<title>{request.url.path}</title><p>texto {request.url.path}</p>")
+
+        collection = _Collection()
+        urls = [f"http://site.test/p{i}" for i in range(12)] + ["http://site.test/erro"]
+
+        async def run():
+            pipeline = IngestPipeline(collection)
+            return await pipeline.ingest_urls(urls, per_host=3, transport=httpx.MockTransport(handler))
+
+        stats = asyncio.run(run())
+        assert stats["processed"] == 12
+        assert stats["failed"] == 1
+        assert 1 < state["max"] <= 3
+
+        again = asyncio.run(
+            IngestPipeline(collection).ingest_urls(urls, transport=httpx.MockTransport(handler))
+        )
+        assert again["skipped"] == 12
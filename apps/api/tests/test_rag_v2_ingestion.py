@@ -0,0 +1,257 @@
+"""
+Testes do pipeline de ingestão em estágios do RAG v2.
+
+Vector store, graph store e embeddings são simulados; não exigem
+Postgres, Neo4j ou Redis.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("chromadb")
+pytest.importorskip("numpy")
+
+from src.rag.v2.config import IngestionConfig, RAGConfig  # noqa: E402
+from src.rag.v2.ingestion import (  # noqa: E402
+    _DONE,
+    DocumentStatus,
+    IngestionPipeline,
+    TenantThrottle,
+)
+
+POISON = "VENENO"
+
+
+class _Embedding:
+    def __init__(self):
+        self.embedding = [0.0] * 4
+
+
+class _FakeEmbeddings:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    async def embed_texts(self, texts):
+        self.calls.append(len(texts))
+        if self.fail and any(POISON in t for t in texts):
+            raise RuntimeError("falha no embedding")
+        return [_Embedding() for _ in texts]
+
+    async def close(self):
+        pass
+
+
+class _FakeVectorStore:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.next_id = 1
+        self.chunks = []
+
+    async def add_documents_batch(self, docs):
+        if self.fail and any(POISON in d.content for d in docs):
+            raise RuntimeError("falha na escrita")
+        ids = list(range(self.next_id, self.next_id + len(docs)))
+        self.next_id += len(docs)
+        return ids
+
+    async def add_document(self, doc):
+        return (await self.add_documents_batch([doc]))[0]
+
+    async def add_chunks_batch(self, chunks):
+        self.chunks.extend(chunks)
+        return list(range(len(chunks)))
+
+    async def close(self):
+        pass
+
+
+class _FakeGraphStore:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.documents = []
+
+    async def add_documents_batch(self, docs):
+        if self.fail and any(POISON in d.title for d in docs):
+            raise RuntimeError("falha no grafo")
+        self.documents.extend(docs)
+
+    async def add_document(self, doc):
+        await self.add_documents_batch([doc])
+
+    async def close(self):
+        pass
+
+
+def _pipeline(**ingestion):
+    ingestion.setdefault("chunk_processes", 0)
+    ingestion.setdefault("batch_linger_ms", 5)
+    config = RAGConfig(ingestion=IngestionConfig(**ingestion))
+    pipeline = IngestionPipeline(config)
+    pipeline._embedding_service = _FakeEmbeddings()
+    pipeline._vector_store = _FakeVectorStore()
+    pipeline._graph_store = _FakeGraphStore()
+    return pipeline
+
+
+def _documents(n, poison=None):
+    return [
+        {
+            "title": f"Doc {i}" + (f" {POISON}" if i == poison else ""),
+            "content": f"Documento {i} de Prefeitura Municipal, contato doc{i}@orgao.gov.br. "
+                       + (POISON if i == poison else "")
+                       + " Texto do edital. " * 30,
+        }
+        for i in range(n)
+    ]
+
+
+def _inflight(pipeline, tenant):
+    return pipeline._throttle._inflight[tenant]._value
+
+
+class TestTenantThrottle:
+    """Testes dos limites por tenant."""
+
+    def test_inflight_limit_blocks_until_release(self):
+        throttle = TenantThrottle(IngestionConfig(tenant_max_inflight=2))
+
+        async def run():
+            await throttle.acquire(1)
+            await throttle.acquire(1)
+            third = asyncio.create_task(throttle.acquire(1))
+            await asyncio.sleep(0.01)
+            blocked = not third.done()
+            # Outro tenant não é afetado
+            await asyncio.wait_for(throttle.acquire(2), 0.1)
+            throttle.release(1)
+            await asyncio.wait_for(third, 0.1)
+            return blocked
+
+        assert asyncio.run(run())
+
+    def test_rate_limit_with_override(self):
+        config = IngestionConfig(
+            tenant_docs_per_second=50.0,
+            tenant_burst=1,
+            tenant_rate_overrides={2: 10_000.0},
+        )
+        throttle = TenantThrottle(config)
+
+        async def timed(tenant, n):
+            start = time.perf_counter()
+            for _ in range(n):
+                await throttle.acquire(tenant)
+                throttle.release(tenant)
+            return time.perf_counter() - start
+
+        # 6 documentos a 50/s com burst de 1: ao menos 5 intervalos de 20ms
+        assert asyncio.run(timed(1, 6)) >= 0.09
+        assert asyncio.run(timed(2, 6)) < 0.05
+
+
+class TestNextBatch:
+    """Testes da montagem de lotes entre estágios."""
+
+    def test_linger_returns_partial_batch(self):
+        pipeline = _pipeline(batch_linger_ms=20)
+
+        async def run():
+            inbox = asyncio.Queue()
+            for i in range(3):
+                inbox.put_nowait(i)
+            start = time.perf_counter()
+            batch, done = await pipeline._next_batch(inbox, limit=10)
+            return batch, done, time.perf_counter() - start
+
+        batch, done, elapsed = asyncio.run(run())
+        assert batch == [0, 1, 2]
+        assert not done
+        assert 0.015 <= elapsed < 0.5
+
+    def test_sentinel_ends_batch(self):
+        pipeline = _pipeline()
+
+        async def run():
+            inbox = asyncio.Queue()
+            for item in (0, 1, _DONE, 2):
+                inbox.put_nowait(item)
+            first = await pipeline._next_batch(inbox, limit=10)
+            inbox.put_nowait(_DONE)
+            second = await pipeline._next_batch(inbox, limit=10)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == ([0, 1], True)
+        assert second == ([2], True)
+
+    def test_weight_limits_batch(self):
+        pipeline = _pipeline()
+
+        async def run():
+            inbox = asyncio.Queue()
+            for size in (3, 3, 3):
+                inbox.put_nowait(size)
+            return await pipeline._next_batch(inbox, limit=5, weight=lambda n: n)
+
+        assert asyncio.run(run()) == ([3, 3], False)
+
+
+class TestIngestBatch:
+    """Testes do ingest_batch em estágios."""
+
+    def test_results_in_order_with_cross_document_batches(self):
+        pipeline = _pipeline(embed_batch_size=64)
+        documents = _documents(20)
+        documents[5]["content"] = ""
+
+        results = asyncio.run(pipeline.ingest_batch(documents, project_id=1))
+
+        assert [r.status for r in results] == [
+            DocumentStatus.FAILED if i == 5 else DocumentStatus.COMPLETED for i in range(20)
+        ]
+        assert len({r.document_id for r in results if r.document_id}) == 19
+        assert len(pipeline._embedding_service.calls) < 19
+        assert len(pipeline._graph_store.documents) == 19
+        assert pipeline.get_metrics()["stages"]["embedding"]["documents"] == 19
+        assert _inflight(pipeline, 1) == pipeline.config.ingestion.tenant_max_inflight
+
+    @pytest.mark.parametrize("stage", ["embedding", "indexing", "graph_indexing"])
+    def test_stage_error_fails_only_its_batch(self, stage):
+        pipeline = _pipeline(embed_batch_size=1, write_batch_size=1, tenant_max_inflight=4)
+        if stage == "embedding":
+            pipeline._embedding_service = _FakeEmbeddings(fail=True)
+        elif stage == "indexing":
+            pipeline._vector_store = _FakeVectorStore(fail=True)
+        elif stage == "graph_indexing":
+            pipeline._graph_store = _FakeGraphStore(fail=True)
+
+        results = asyncio.run(pipeline.ingest_batch(_documents(12, poison=7), project_id=1))
+
+        failed = [i for i, r in enumerate(results) if r.status == DocumentStatus.FAILED]
+        assert failed == [7]
+        assert "falha" in results[7].error
+        assert pipeline.stage_metrics[stage].errors == 1
+        # Todas as vagas do tenant foram devolvidas
+        assert _inflight(pipeline, 1) == 4
+
+    def test_ingest_document_respects_tenant_limit(self):
+        pipeline = _pipeline(tenant_max_inflight=1)
+
+        async def run():
+            await pipeline._throttle.acquire(1)
+            task = asyncio.create_task(
+                pipeline.ingest_document("Doc", "Texto do edital. " * 30, project_id=1)
+            )
+            await asyncio.sleep(0.05)
+            blocked = not task.done()
+            pipeline._throttle.release(1)
+            result = await asyncio.wait_for(task, 1)
+            return blocked, result
+
+        blocked, result = asyncio.run(run())
+        assert blocked
+        assert result.status == DocumentStatus.COMPLETED
+        assert _inflight(pipeline, 1) == 1
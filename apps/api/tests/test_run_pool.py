@@ -0,0 +1,82 @@
+"""
+Testes do pool de execução bloqueante das rotas do AgentOS.
+
+Cobre limites por chave, fila, timeout e o mapeamento para HTTP.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+class TestBlockingRunPool:
+    """Testes para BlockingRunPool e offload."""
+
+    def test_per_key_limit_and_stats(self):
+        from src.os.execution import BlockingRunPool
+
+        pool = BlockingRunPool(max_workers=8, per_key_limit=2)
+        lock = threading.Lock()
+        current = {"agent:a": 0}
+        peak = {"agent:a": 0}
+
+        def work():
+            with lock:
+                current["agent:a"] += 1
+                peak["agent:a"] = max(peak["agent:a"], current["agent:a"])
+            time.sleep(0.05)
+            with lock:
+                current["agent:a"] -= 1
+            return "ok"
+
+        async def run():
+            return await asyncio.gather(*(pool.run("agent:a", work) for _ in range(6)))
+
+        assert asyncio.run(run()) == ["ok"] * 6
+        assert peak["agent:a"] == 2
+
+        stats = pool.stats()["per_key"]["agent:a"]
+        assert stats["completed"] == 6
+        assert stats["running"] == 0 and stats["queued"] == 0
+        pool.shutdown()
+
+    def test_queue_limit_and_timeout_map_to_http(self):
+        from fastapi import HTTPException
+        from src.os.execution import BlockingRunPool, offload
+
+        pool = BlockingRunPool(max_workers=2, per_key_limit=1, max_queue=2)
+        release = threading.Event()
+
+        async def run():
+            first = asyncio.ensure_future(offload("agent:slow", release.wait, pool=pool))
+            second = asyncio.ensure_future(offload("agent:slow", release.wait, pool=pool))
+            await asyncio.sleep(0.05)
+
+            # 1 executando + 1 aguardando o slot da chave: a fila (2) ainda aceita
+            assert pool.stats()["running"] == 1
+            assert pool.stats()["queued"] == 1
+
+            third = asyncio.ensure_future(offload("agent:slow", release.wait, pool=pool, timeout=0.1))
+            with pytest.raises(HTTPException) as timeout:
+                await third
+            assert timeout.value.status_code == 504
+
+            fourth = asyncio.ensure_future(offload("agent:slow", release.wait, pool=pool))
+            await asyncio.sleep(0.05)
+            assert pool.stats()["queued"] == 2
+            with pytest.raises(HTTPException) as saturated:
+                await offload("agent:other", release.wait, pool=pool)
+            assert saturated.value.status_code == 503
+
+            release.set()
+            await asyncio.gather(first, second, fourth)
+
+        asyncio.run(run())
+
+        stats = pool.stats()
+        assert stats["rejected"] == 1
+        assert stats["per_key"]["agent:slow"]["timeouts"] == 1
+        assert stats["queued"] == 0
+        pool.shutdown()
@@ -0,0 +1,182 @@
+"""
+Testes do módulo de agendamento.
+
+Cobre o motor cron compartilhado e o loop do Scheduler baseado em heap.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _brute_force_next(schedule, after: datetime) -> datetime:
+    dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while not schedule.matches(dt):
+        dt += timedelta(minutes=1)
+    return dt
+
+
+class TestCronSchedule:
+    """Testes para o CronSchedule compilado."""
+
+    @pytest.mark.parametrize("expression", [
+        "*/15 * * * *",
+        "0 9 * * 1-5",
+        "30 8-18/2 * * *",
+        "0 0 1,15 * *",
+        "0 12 * jan,jul mon",
+        "5 4 13 * 5",
+        "@weekly",
+    ])
+    def test_next_after_matches_brute_force(self, expression):
+        from src.scheduler.cron import CronSchedule
+
+        schedule = CronSchedule.parse(expression)
+        after = datetime(2024, 12, 30, 23, 59, 30)
+        for _ in range(20):
+            expected = _brute_force_next(schedule, after)
+            assert schedule.next_after(after) == expected
+            after = expected
+
+    def test_standard_weekday_and_day_semantics(self):
+        from src.scheduler.cron import CronSchedule
+
+        # 0 e 7 são domingo; 1-5 são dias úteis
+        assert CronSchedule.parse("0 0 * * 0").next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5)
+        assert CronSchedule.parse("0 0 * * 7").next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5)
+        assert CronSchedule.parse("0 9 * * 1-5").next_after(datetime(2025, 1, 3, 10)) == datetime(2025, 1, 6, 9)
+
+        # Dia do mês OU dia da semana quando ambos são restritos
+        schedule = CronSchedule.parse("0 0 13 * 5")
+        assert schedule.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 3)
+        assert schedule.next_after(datetime(2025, 1, 11)) == datetime(2025, 1, 13)
+
+    def test_invalid_and_impossible_expressions(self):
+        from src.scheduler.cron import CronSchedule
+
+        for expression in ["60 * * * *", "* * *", "*/0 * * * *", "5-1 * * * *", "x * * * *"]:
+            with pytest.raises(ValueError):
+                CronSchedule.parse(expression)
+
+        with pytest.raises(ValueError):
+            CronSchedule.parse("0 0 30 2 *").next_after(datetime(2025, 1, 1))
+
+        assert CronSchedule.parse("0 0 29 2 *").next_after(datetime(2025, 3, 1)) == datetime(2028, 2, 29)
+
+
+class TestScheduler:
+    """Testes para o loop e a persistência do Scheduler."""
+
+    def test_fires_due_task_without_polling(self, tmp_path):
+        from src.scheduler import Scheduler
+
+        calls = []
+
+        async def executor(agent_name, prompt):
+            calls.append((agent_name, prompt))
+            return "ok"
+
+        async def run():
+            scheduler = Scheduler(storage_path=str(tmp_path), agent_executor=executor, flush_interval=0.05)
+            task = scheduler.schedule("t", "agent", "prompt", "0 0 1 1 *")
+            await scheduler.start()
+
+            # Antecipar a execução: o loop deve acordar sozinho
+            task.next_run = datetime.now() + timedelta(seconds=0.2)
+            scheduler._push(task)
+            await asyncio.sleep(0.5)
+            await scheduler.stop()
+            return scheduler, task
+
+        scheduler, task = asyncio.run(run())
+
+        assert calls == [("agent", "prompt")]
+        assert task.run_count == 1
+        assert task.next_run > datetime.now() + timedelta(days=1)
+
+        assert len(scheduler.get_executions(task.id)) == 1
+
+        # Estado da execução vem do log runs.jsonl
+        assert (tmp_path / "runs.jsonl").exists()
+        reloaded = Scheduler(storage_path=str(tmp_path)).get_task(task.id)
+        assert reloaded.run_count == 1
+        assert reloaded.next_run == task.next_run
+
+    def test_paused_task_does_not_fire(self, tmp_path):
+        from src.scheduler import Scheduler
+
+        calls = []
+
+        async def executor(agent_name, prompt):
+            calls.append(agent_name)
+
+        async def run():
+            scheduler = Scheduler(storage_path=str(tmp_path), agent_executor=executor)
+            task = scheduler.schedule("t", "agent", "prompt", "* * * * *")
+            task.next_run = datetime.now() + timedelta(seconds=0.1)
+            scheduler._push(task)
+            scheduler.pause(task.id)
+            await scheduler.start()
+            await asyncio.sleep(0.3)
+            await scheduler.stop()
+
+        asyncio.run(run())
+        assert calls == []
+
+    def test_batch_persists_once(self, tmp_path, monkeypatch):
+        from src.scheduler import Scheduler
+
+        scheduler = Scheduler(storage_path=str(tmp_path))
+        writes = []
+        original = scheduler._write
+        monkeypatch.setattr(
+            scheduler, "_write",
+            lambda tasks, records, generation: (writes.append(len(tasks)), original(tasks, records, generation))
+        )
+
+        with scheduler.batch():
+            for i in range(50):
+                scheduler.schedule(f"t{i}", "agent", "prompt", "*/5 * * * *")
+
+        assert writes == [50]
+        assert len(Scheduler(storage_path=str(tmp_path)).list_tasks()) == 50
+
+    def test_run_log_is_compacted(self, tmp_path):
+        from src.scheduler import Scheduler
+
+        scheduler = Scheduler(storage_path=str(tmp_path))
+        task = scheduler.schedule("t", "agent", "prompt", "*/5 * * * *")
+
+        for _ in range(3):
+            asyncio.run(scheduler.run_now(task.id))
+        assert len((tmp_path / "runs.jsonl").read_text().splitlines()) == 3
+        saved = json.loads((tmp_path / "tasks.json").read_text())["tasks"]
+        assert saved[0]["run_count"] == 0
+
+        # Mudança estrutural grava snapshot e zera o log
+        scheduler.pause(task.id)
+        assert not (tmp_path / "runs.jsonl").exists()
+        saved = json.loads((tmp_path / "tasks.json").read_text())["tasks"]
+        assert saved[0]["run_count"] == 3
+
+    def test_stale_run_log_ignored_after_crash(self, tmp_path, monkeypatch):
+        from pathlib import Path
+
+        from src.scheduler import Scheduler, TaskStatus
+
+        scheduler = Scheduler(storage_path=str(tmp_path))
+        task = scheduler.schedule("t", "agent", "prompt", "*/5 * * * *")
+        for _ in range(2):
+            asyncio.run(scheduler.run_now(task.id))
+
+        # Queda entre a troca de tasks.json e a remoção do runs.jsonl
+        monkeypatch.setattr(Path, "unlink", lambda self, missing_ok=False: None)
+        scheduler.pause(task.id)
+        monkeypatch.undo()
+        assert (tmp_path / "runs.jsonl").exists()
+
+        reloaded = Scheduler(storage_path=str(tmp_path)).get_task(task.id)
+        assert reloaded.status == TaskStatus.PAUSED
+        assert reloaded.run_count == 2
@@ -244,6 +244,61 @@ class TestRulesEngine:
         
         assert rule is not None
         assert rule.id == "test_rule_factory"
+    
+    def test_rule_plan_cached_and_invalidated(self):
+        """Testa cache do plano compilado e invalidação."""
+        from rules.engine import RulesEngine
+        from rules.types import Rule, RuleCondition, RuleSet
+        
+        engine = RulesEngine(use_default_validators=False)
+        engine.add_rule(Rule(id="code", condition=RuleCondition.matches("content", r"```")))
+        engine.add_rule(Rule(id="slang", condition=RuleCondition.or_(
+            RuleCondition.matches("content", r"\blol\b"),
+            RuleCondition.matches("content", r"!!!+")
+        ), priority=10))
+        
+        plan = engine._get_plan()
+        assert engine._get_plan() is plan
+        assert list(plan.prefilters) == ["content"]
+        
+        result = engine.validate("lol ```x```")
+        assert [v.rule_id for v in result.violations] == ["slang", "code"]
+        assert engine.validate("texto limpo").passed
+        
+        engine.disable_rule("slang")
+        assert engine._get_plan() is not plan
+        assert [v.rule_id for v in engine.validate("lol ```x```").violations] == ["code"]
+        
+        # Alterações diretas no RuleSet também recompilam o plano
+        rule_set = RuleSet(id="rs")
+        engine.add_rule_set(rule_set)
+        rule_set.add_rule(Rule(id="long", condition=RuleCondition.from_dict(
+            {"field": "length", "operator": "greater_than", "value": 5}
+        )))
+        assert "long" in [v.rule_id for v in engine.validate("texto longo").violations]
+    
+    def test_validate_batch_with_processes(self):
+        """Testa validate_batch em pool de processos."""
+        from rules.engine import RulesEngine, create_default_rule_set
+        
+        engine = RulesEngine()
+        engine.add_rule_set(create_default_rule_set())
+        contents = [
+            "Resposta normal.",
+            "Contato: joao@example.com",
+            "omg!!! rm -rf /",
+            "Meu CPF é 123.456.789-00",
+        ] * 5
+        
+        try:
+            sequential = engine.validate_batch(contents)
+            parallel = engine.validate_batch(contents, use_processes=True, max_workers=2, chunk_size=3)
+        finally:
+            engine.shutdown_pool()
+        
+        assert [[v.rule_id for v in r.violations] for r in parallel] == \
+            [[v.rule_id for v in r.violations] for r in sequential]
+        assert engine.total_validations == 2 * len(contents)
 
 
 class TestRulesFeedback:
@@ -1110,6 +1165,111 @@ class TestSpanExporters:
         assert len(traces) == 2
 
 
+
+class TestTracerAsyncContext:
+    """Testes de propagação de contexto com contextvars."""
+    
+    def test_concurrent_tasks_keep_parent_links(self):
+        """Tasks asyncio paralelas não corrompem os parents umas das outras."""
+        from observability.tracing import Tracer
+        
+        tracer = Tracer()
+        
+        async def worker(i):
+            async with tracer.start_async_span(f"task_{i}") as task_span:
+                await asyncio.sleep(0.01)
+                with tracer.start_span("child") as child:
+                    await asyncio.sleep(0.01)
+                    assert child.context.parent_span_id == task_span.context.span_id
+                return task_span
+        
+        async def main():
+            with tracer.start_span("root") as root:
+                spans = await asyncio.gather(*[worker(i) for i in range(10)])
+            return root, spans
+        
+        root, spans = asyncio.run(main())
+        
+        assert all(s.context.parent_span_id == root.context.span_id for s in spans)
+        assert tracer.get_current_span() is None
+
+
+class TestSpanProcessors:
+    """Testes para processors, samplers e JsonlSpanExporter."""
+    
+    def test_batch_processor_exports_in_background(self, tmp_path):
+        """BatchSpanProcessor exporta lotes para o JSONL."""
+        from observability.tracing import Tracer, BatchSpanProcessor, JsonlSpanExporter
+        
+        path = tmp_path / "traces.jsonl"
+        processor = BatchSpanProcessor(JsonlSpanExporter(str(path)), schedule_delay_ms=10)
+        tracer = Tracer(processors=[processor])
+        
+        for i in range(50):
+            with tracer.start_span(f"op_{i}"):
+                pass
+        
+        tracer.force_flush()
+        tracer.shutdown()
+        
+        assert len(path.read_text().splitlines()) == 50
+        assert processor.exported_spans == 50
+    
+    def test_batch_processor_bounded_queue(self):
+        """Fila cheia descarta spans em vez de crescer."""
+        from observability.tracing import BatchSpanProcessor, InMemorySpanExporter, Span, SpanContext
+        
+        processor = BatchSpanProcessor(
+            InMemorySpanExporter(), max_queue_size=5, max_export_batch_size=100,
+            schedule_delay_ms=60000
+        )
+        
+        for i in range(10):
+            processor.on_end(Span(name="s", context=SpanContext(trace_id="t", span_id=str(i))))
+        
+        assert processor.dropped_spans == 5
+        processor.shutdown()
+    
+    def test_ratio_sampler_applies_to_whole_trace(self):
+        """Head sampling decide no span raiz e os filhos herdam."""
+        from observability.tracing import Tracer, TraceIdRatioSampler
+        
+        none = Tracer(sampler=TraceIdRatioSampler(0.0))
+        with none.start_span("root"):
+            with none.start_span("child") as child:
+                assert child.context.sampled is False
+        assert none.get_memory_exporter().get_spans() == []
+        
+        all_ = Tracer(sampler=TraceIdRatioSampler(1.0))
+        with all_.start_span("root"):
+            with all_.start_span("child"):
+                pass
+        assert len(all_.get_memory_exporter().get_spans()) == 2
+    
+    def test_tail_sampling_keeps_error_traces(self):
+        """Tail sampling mantém traces com erro e descarta os demais."""
+        from observability.tracing import (
+            Tracer, TailSamplingProcessor, SimpleSpanProcessor, InMemorySpanExporter
+        )
+        
+        exporter = InMemorySpanExporter()
+        tracer = Tracer(processors=[TailSamplingProcessor(
+            SimpleSpanProcessor(exporter), sample_ratio=0.0, latency_threshold_ms=None
+        )])
+        
+        with tracer.start_span("ok_root"):
+            with tracer.start_span("ok_child"):
+                pass
+        
+        try:
+            with tracer.start_span("err_root"):
+                with tracer.start_span("err_child"):
+                    raise ValueError("boom")
+        except ValueError:
+            pass
+        
+        assert sorted(s.name for s in exporter.get_spans()) == ["err_child", "err_root"]
+
 # ==================== MAIN ====================
 
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+"""
+Testes do sistema de webhooks.
+
+Cobre a fila persistente de entregas, retries agendados, circuit
+breaker por endpoint e entrega em lote.
+"""
+
+import asyncio
+import json
+
+import httpx
+
+
+class _Endpoint:
+    """Endpoint HTTP falso para httpx.MockTransport."""
+
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        await asyncio.sleep(0.01)
+        self.concurrent -= 1
+        status = self.statuses.pop(0) if self.statuses else 200
+        return httpx.Response(status, text="ok")
+
+
+def _manager(tmp_path, endpoint=None, **kwargs):
+    from src.events.webhooks import WebhookManager
+
+    transport = httpx.MockTransport(endpoint) if endpoint else None
+    return WebhookManager(storage_path=str(tmp_path), transport=transport, **kwargs)
+
+
+class TestWebhookDelivery:
+    """Testes para entrega via fila."""
+
+    def test_trigger_enqueues_and_returns_immediately(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        endpoint = _Endpoint()
+        manager = _manager(tmp_path, endpoint)
+        webhook = manager.register_webhook("http://hook.test/a", [EventType.AGENT_CREATED], secret="s3cr3t")
+
+        async def run():
+            deliveries = await manager.trigger(EventType.AGENT_CREATED, {"name": "bot"})
+            # Nada foi enviado ainda: trigger só enfileira
+            assert endpoint.requests == []
+            assert [d.status for d in deliveries] == ["pending"]
+            assert manager.get_stats()["queue"]["pending"] == 1
+
+            await manager.deliver_pending()
+            await manager.stop()
+            return deliveries
+
+        deliveries = asyncio.run(run())
+
+        request = endpoint.requests[0]
+        assert json.loads(request.content)["payload"] == {"name": "bot"}
+        assert request.headers["X-Webhook-Delivery"] == deliveries[0].id
+        assert request.headers["X-Webhook-Signature"].startswith("sha256=")
+        assert manager.get_stats()["queue"]["pending"] == 0
+        assert manager.get_deliveries(webhook.id)[0].success
+
+    def test_pending_deliveries_survive_restart(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        first = _manager(tmp_path)
+        first.register_webhook("http://hook.test/a", [EventType.USER_LOGIN])
+
+        async def emit():
+            await first.trigger(EventType.USER_LOGIN, {"user": "ana"})
+            # Simula queda do processo com a entrega em voo
+            first._queue.claim(limit=10)
+            first._task.cancel()
+
+        asyncio.run(emit())
+        first.close()
+
+        endpoint = _Endpoint()
+        second = _manager(tmp_path, endpoint)
+
+        async def resume():
+            await second.deliver_pending()
+            await second.stop()
+
+        asyncio.run(resume())
+
+        assert len(endpoint.requests) == 1
+        assert json.loads(endpoint.requests[0].content)["payload"] == {"user": "ana"}
+
+    def test_failed_delivery_is_rescheduled_then_dead_lettered(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        endpoint = _Endpoint(statuses=[500, 500])
+        manager = _manager(tmp_path, endpoint, retry_count=1)
+        webhook = manager.register_webhook("http://hook.test/a", [EventType.SYSTEM_ERROR])
+
+        async def run():
+            await manager.trigger(EventType.SYSTEM_ERROR, {})
+            await manager.deliver_pending()
+
+            # Retry agendado na fila, não em uma corrotina dormindo
+            assert manager.get_stats()["queue"]["pending"] == 1
+            assert manager.get_stats()["active_requests"] == 0
+            assert await manager.deliver_pending() == 0
+
+            manager._queue._conn.execute("UPDATE deliveries SET next_attempt_at = 0")
+            await manager.deliver_pending()
+            await manager.stop()
+
+        asyncio.run(run())
+
+        assert len(endpoint.requests) == 2
+        dead = manager.get_dead_letters()
+        assert len(dead) == 1 and dead[0].attempts == 2
+        assert webhook.failure_count == 1
+        assert manager.get_deliveries()[0].status == "failed"
+
+    def test_circuit_breaker_holds_deliveries_without_consuming_attempts(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        endpoint = _Endpoint(statuses=[503] * 2)
+        manager = _manager(tmp_path, endpoint, failure_threshold=2, recovery_timeout=60)
+        manager.register_webhook("http://hook.test/a", [EventType.HEALTH_CHECK], max_concurrency=1)
+
+        async def run():
+            for _ in range(5):
+                await manager.trigger(EventType.HEALTH_CHECK, {})
+            await manager.deliver_pending()
+            await manager.stop()
+
+        asyncio.run(run())
+
+        # Duas falhas abrem o circuito; o restante fica retido na fila
+        assert len(endpoint.requests) == 2
+        stats = manager.get_stats()
+        assert list(stats["endpoints"].values())[0]["circuit"] == "open"
+        assert stats["queue"]["pending"] == 5
+        attempts = [row[0] for row in manager._queue._conn.execute("SELECT attempts FROM deliveries")]
+        assert sorted(attempts) == [0, 0, 0, 1, 1]
+
+    def test_per_endpoint_concurrency_and_batching(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        limited = _Endpoint()
+        batched = _Endpoint()
+
+        async def route(request):
+            return await (batched if request.url.path == "/batch" else limited)(request)
+
+        manager = _manager(tmp_path, route, workers=8)
+        manager.register_webhook("http://hook.test/limited", [EventType.AGENT_EXECUTED], max_concurrency=2)
+        manager.register_webhook("http://hook.test/batch", [EventType.AGENT_EXECUTED], batch_size=10)
+
+        async def run():
+            results = await asyncio.wait_for(
+                asyncio.gather(*(
+                    manager.trigger(EventType.AGENT_EXECUTED, {"i": i}, wait=True) for i in range(20)
+                )),
+                timeout=10
+            )
+            await manager.stop()
+            return [d for group in results for d in group]
+
+        deliveries = asyncio.run(run())
+
+        assert all(d.success for d in deliveries)
+        assert len(limited.requests) == 20
+        assert limited.max_concurrent <= 2
+
+        assert len(batched.requests) < 20
+        events = [json.loads(r.content) for r in batched.requests]
+        assert all(isinstance(body, list) for body in events)
+        assert sorted(e["payload"]["i"] for body in events for e in body) == list(range(20))
+        assert max(len(body) for body in events) <= 10
+
+    def test_webhook_settings_persist(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        manager = _manager(tmp_path)
+        webhook = manager.register_webhook(
+            "http://hook.test/a", [EventType.AGENT_CREATED], max_concurrency=3, batch_size=25
+        )
+        manager.close()
+
+        reloaded = _manager(tmp_path).get_webhook(webhook.id)
+        assert reloaded.max_concurrency == 3
+        assert reloaded.batch_size == 25
+
+
+class TestDispatcherLifecycle:
+    """Testes de troca de event loop, handlers locais e emissão síncrona."""
+
+    def test_loop_change_keeps_other_in_flight_deliveries(self, tmp_path):
+        from src.events.queue import DeliveryQueue
+        from src.events.webhooks import EventType
+
+        endpoint = _Endpoint()
+        manager = _manager(tmp_path, endpoint)
+        manager.register_webhook("http://hook.test/a", [EventType.USER_LOGIN])
+
+        async def emit():
+            await manager.trigger(EventType.USER_LOGIN, {"user": "ana"})
+            await manager.stop()
+
+        asyncio.run(emit())
+
+        # Outro worker (mesmo banco) reserva a entrega
+        other = DeliveryQueue(str(tmp_path / "queue.db"))
+        assert len(other.claim(limit=10)) == 1
+
+        async def resume():
+            await manager.deliver_pending()
+            await manager.stop()
+
+        asyncio.run(resume())
+
+        assert endpoint.requests == []
+        assert manager.get_stats()["queue"]["in_flight"] == 1
+        other.close()
+
+    def test_local_handlers_are_awaited(self, tmp_path):
+        from src.events.webhooks import EventType
+
+        manager = _manager(tmp_path)
+        seen = []
+
+        @manager.on_event(EventType.AGENT_CREATED)
+        async def handler(event):
+            await asyncio.sleep(0.01)
+            seen.append(event["payload"]["name"])
+
+        async def run():
+            await manager.trigger(EventType.AGENT_CREATED, {"name": "bot"})
+            return list(seen)
+
+        assert asyncio.run(run()) == ["bot"]
+
+    def test_emit_event_sync_leaves_no_pending_dispatcher(self, tmp_path, monkeypatch):
+        from src.events import webhooks
+        from src.events.webhooks import EventType
+
+        endpoint = _Endpoint()
+        manager = _manager(tmp_path, endpoint)
+        manager.register_webhook("http://hook.test/a", [EventType.AGENT_CREATED])
+        monkeypatch.setattr(webhooks, "_webhook_manager", manager)
+
+        webhooks.emit_event_sync(EventType.AGENT_CREATED, {"name": "bot"})
+
+        assert len(endpoint.requests) == 1
+        assert manager._task is None
+        assert manager._loop.is_closed()
+
+    def test_saturated_endpoint_does_not_starve_others(self, tmp_path):
+        from src.events.queue import DeliveryQueue
+
+        queue = DeliveryQueue(str(tmp_path / "queue.db"))
+        queue.enqueue([(f"a{i}", "busy", "e", "{}") for i in range(100)], at=1)
+        queue.enqueue([(f"b{i}", "quiet", "e", "{}") for i in range(3)], at=2)
+
+        claimed = queue.claim(limit=10, capacity={"busy": 2}, default_capacity=1)
+
+        assert [d.webhook_id for d in claimed] == ["busy", "busy", "quiet"]
+        queue.close()
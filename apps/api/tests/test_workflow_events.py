@@ -0,0 +1,133 @@
+"""
+Testes do EventBus de workflows.
+
+Cobre o índice de padrões (trie + memoização) e a execução
+concorrente de handlers com limite e timeout.
+"""
+
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def bus():
+    from src.workflows.triggers.event import EventBus
+
+    EventBus._instance = None
+    yield EventBus()
+    EventBus._instance = None
+
+
+class TestPatternIndex:
+    """Testes para o índice de padrões."""
+
+    @pytest.mark.parametrize("pattern,event_type,expected", [
+        ("*", "user.created", True),
+        ("user.created", "user.created", True),
+        ("user.created", "user.updated", False),
+        ("user.*", "user.created", True),
+        ("user.*", "user.profile.updated", True),
+        ("user.*", "user", False),
+        ("user.*", "username.created", False),
+        ("*.failed", "workflow.failed", True),
+        ("*.failed", "step.completed", False),
+        ("wf.*.done", "wf.a.b.done", True),
+        ("user*", "username.created", True),
+    ])
+    def test_index_agrees_with_compiled_pattern(self, pattern, event_type, expected):
+        from src.workflows.triggers.event import PatternIndex, compile_pattern
+
+        index = PatternIndex()
+        index.add(pattern)
+        index.add("unrelated.event")
+
+        assert compile_pattern(pattern)(event_type) is expected
+        assert (pattern in index.match(event_type)) is expected
+
+    def test_match_is_memoized_and_invalidated(self):
+        from src.workflows.triggers.event import PatternIndex
+
+        index = PatternIndex()
+        index.add("user.*")
+        first = index.match("user.created")
+        assert index.match("user.created") is first
+
+        index.add("user.created")
+        assert set(index.match("user.created")) == {"user.*", "user.created"}
+
+        index.remove("user.*")
+        assert index.match("user.created") == ("user.created",)
+
+
+class TestEventBus:
+    """Testes para emissão de eventos."""
+
+    def test_handlers_run_concurrently(self, bus):
+        from src.workflows.triggers.event import WorkflowEvent
+
+        async def slow(event):
+            await asyncio.sleep(0.2)
+
+        for pattern in ["order.*", "order.paid", "*"]:
+            bus.subscribe(pattern, slow)
+
+        async def run():
+            start = asyncio.get_running_loop().time()
+            notified = await bus.emit(WorkflowEvent(event_type="order.paid"))
+            return notified, asyncio.get_running_loop().time() - start
+
+        notified, elapsed = asyncio.run(run())
+        assert notified == 3
+        assert elapsed < 0.5
+
+    def test_handler_timeout_and_errors_do_not_block_others(self, bus):
+        from src.workflows.triggers.event import WorkflowEvent
+
+        received = []
+
+        async def hangs(event):
+            await asyncio.sleep(10)
+
+        async def fails(event):
+            raise RuntimeError("boom")
+
+        async def ok(event):
+            received.append(event.event_type)
+
+        bus.handler_timeout = 0.1
+        for handler in (hangs, fails, ok):
+            bus.subscribe("job.done", handler)
+
+        notified = asyncio.run(bus.emit(WorkflowEvent(event_type="job.done")))
+        assert notified == 1
+        assert received == ["job.done"]
+
+    def test_nested_emit_does_not_deadlock(self, bus):
+        from src.workflows.triggers.event import WorkflowEvent
+
+        bus.max_concurrency = 1
+        received = []
+
+        async def outer(event):
+            await bus.emit(WorkflowEvent(event_type="inner"))
+
+        async def inner(event):
+            received.append(event.event_type)
+
+        bus.subscribe("outer", outer)
+        bus.subscribe("inner", inner)
+
+        asyncio.run(asyncio.wait_for(bus.emit(WorkflowEvent(event_type="outer")), timeout=2))
+        assert received == ["inner"]
+
+    def test_history_is_bounded(self, bus):
+        from src.workflows.triggers.event import WorkflowEvent
+
+        async def run():
+            for i in range(bus._max_history + 10):
+                await bus.emit(WorkflowEvent(event_type=f"tick.{i % 2}"))
+
+        asyncio.run(run())
+        assert len(bus._history) == bus._max_history
+        assert len(bus.get_history("tick.1", limit=10_000)) == bus._max_history // 2
@@ -0,0 +1,97 @@
+"""
+Testes do WorkflowRegistry com persistência incremental.
+"""
+
+import json
+
+
+def _definition(workflow_id, tags=None, name=None):
+    from src.workflows.core.registry import WorkflowDefinition, WorkflowStep
+
+    return WorkflowDefinition(
+        id=workflow_id,
+        name=name or workflow_id,
+        steps=[WorkflowStep(id="a", type="action", name="A")],
+        tags=tags or [],
+    )
+
+
+class TestWorkflowRegistryStorage:
+    """Testes para o store SQLite do registry."""
+
+    def test_changes_survive_restart(self, tmp_path):
+        from src.workflows.core.registry import WorkflowRegistry
+
+        path = str(tmp_path / "registry.db")
+        registry = WorkflowRegistry(path)
+        registry.register(_definition("etl", tags=["data"]))
+        registry.register(_definition("etl", tags=["data"], name="ETL v2"))
+        registry.register(_definition("report", tags=["bi"]))
+        registry.register(_definition("temp"))
+        registry.disable("report")
+        registry.delete("temp")
+
+        reloaded = WorkflowRegistry(path)
+        assert reloaded.get("etl").name == "ETL v2"
+        assert reloaded.get_versions("etl") == ["1.0.1", "1.0.0"]
+        assert reloaded.get_version("etl", "1.0.0").name == "etl"
+        assert reloaded.get("report").enabled is False
+        assert reloaded.get("temp") is None
+
+    def test_definitions_are_loaded_lazily(self, tmp_path):
+        from src.workflows.core.registry import WorkflowRegistry
+
+        path = str(tmp_path / "registry.db")
+        registry = WorkflowRegistry(path)
+        for i in range(20):
+            registry.register(_definition(f"wf-{i}", tags=["even" if i % 2 == 0 else "odd"]))
+        registry.disable("wf-0")
+
+        reloaded = WorkflowRegistry(path)
+        assert reloaded._workflows == {}
+
+        listed = reloaded.list(tags=["even"])
+        assert sorted(w.id for w in listed) == sorted(f"wf-{i}" for i in range(2, 20, 2))
+        assert set(reloaded._workflows) == {w.id for w in listed}
+
+        assert len(reloaded.list(enabled_only=False)) == 20
+
+    def test_legacy_json_file_is_imported(self, tmp_path):
+        from src.workflows.core.registry import WorkflowRegistry
+
+        legacy = tmp_path / "workflows.json"
+        legacy.write_text(json.dumps({
+            "workflows": [_definition("old", tags=["legacy"]).to_dict()],
+            "updated_at": "2024-01-01T00:00:00",
+        }))
+
+        registry = WorkflowRegistry(str(legacy))
+        assert [w.id for w in registry.list(tags=["legacy"])] == ["old"]
+        assert (tmp_path / "workflows.db").exists()
+
+        # Depois da importação, o banco é a fonte de verdade
+        registry.delete("old")
+        assert WorkflowRegistry(str(legacy)).get("old") is None
+
+    def test_failed_legacy_import_is_retried(self, tmp_path):
+        from src.workflows.core.registry import WorkflowRegistry
+
+        legacy = tmp_path / "workflows.json"
+        legacy.write_text('{"workflows": [')
+
+        assert WorkflowRegistry(str(legacy)).list(enabled_only=False) == []
+        assert (tmp_path / "workflows.db").exists()
+
+        legacy.write_text(json.dumps({"workflows": [_definition("old").to_dict()]}))
+        assert WorkflowRegistry(str(legacy)).get("old") is not None
+
+    def test_in_memory_registry(self):
+        from src.workflows.core.registry import WorkflowRegistry
+
+        registry = WorkflowRegistry()
+        registry.register(_definition("a", tags=["x"]))
+        registry.register(_definition("b", tags=["y"]))
+        registry.disable("b")
+
+        assert [w.id for w in registry.list()] == ["a"]
+        assert [w.id for w in registry.list(enabled_only=False, tags=["y"])] == ["b"]
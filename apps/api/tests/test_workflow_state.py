@@ -0,0 +1,174 @@
+"""
+Testes do StateManager de workflows.
+
+Cobre checkpoints incrementais (delta), snapshots periódicos e recovery
+por replay.
+"""
+
+import json
+
+import pytest
+
+
+def _run_steps(manager, state, steps, start=0):
+    for i in range(start, start + steps):
+        manager.checkpoint(state)
+        step_id = f"step{i}"
+        state.mark_step_started(step_id)
+        state.mark_step_completed(step_id, {"result": f"saida {i}"})
+        state.set_variable(step_id, {"result": f"saida {i}"})
+
+
+class TestDeltaCheckpoints:
+    """Testes para checkpoints incrementais."""
+
+    def test_deltas_only_carry_changes(self):
+        from src.workflows.core.state import StateManager
+
+        manager = StateManager(full_snapshot_every=5)
+        state = manager.create_state("exec", "wf", initial_variables={"grande": "x" * 100_000})
+        _run_steps(manager, state, 3)
+        cp = manager.checkpoint(state)
+
+        kinds = [c.kind for c in manager._checkpoints["exec"]]
+        assert kinds == ["full", "delta", "delta", "delta"]
+
+        delta = json.loads(cp.payload)
+        assert set(delta["variables"]) == {"step2"}
+        assert set(delta["step_states"]) == {"step2"}
+        assert len(cp.payload) < 1_000
+
+    def test_recover_replays_deltas(self):
+        from src.workflows.core.state import StateManager, StepStatus
+
+        manager = StateManager(full_snapshot_every=4)
+        state = manager.create_state("exec", "wf", initial_variables={"a": 1, "b": 2})
+        _run_steps(manager, state, 6)
+        state.variables.pop("a")
+        state.set_variable("b", 3)
+        manager.checkpoint(state)
+
+        recovered = manager.recover("exec")
+
+        assert recovered is not state
+        assert recovered.to_dict() == state.to_dict()
+        assert recovered.step_states["step5"].status == StepStatus.COMPLETED
+        assert "a" not in recovered.variables
+
+    def test_corrupted_delta_stops_replay(self):
+        from src.workflows.core.state import StateManager
+
+        manager = StateManager(full_snapshot_every=10)
+        state = manager.create_state("exec", "wf")
+        _run_steps(manager, state, 4)
+
+        manager._checkpoints["exec"][2].payload = "{}"
+        recovered = manager.recover("exec")
+
+        # Snapshot + primeiro delta válidos; o resto é descartado
+        assert set(recovered.variables) == {"step0"}
+        assert manager.get_latest_checkpoint("exec").checkpoint_id == "cp_exec_1"
+
+    def test_retention_starts_at_full_snapshot(self):
+        from src.workflows.core.state import StateManager
+
+        manager = StateManager(full_snapshot_every=3, max_checkpoints=4)
+        state = manager.create_state("exec", "wf")
+        _run_steps(manager, state, 20)
+
+        checkpoints = manager._checkpoints["exec"]
+        assert checkpoints[0].is_full
+        assert len(checkpoints) <= 6
+
+        recovered = manager.recover("exec")
+        assert set(recovered.variables) == {f"step{i}" for i in range(19)}
+
+    def test_new_state_object_forces_full_snapshot(self):
+        from src.workflows.core.state import StateManager
+
+        manager = StateManager()
+        state = manager.create_state("exec", "wf")
+        _run_steps(manager, state, 2)
+
+        recovered = manager.recover("exec")
+        recovered.set_variable("depois", True)
+        cp = manager.checkpoint(recovered)
+
+        assert cp.is_full
+        assert manager.recover("exec").variables["depois"] is True
+
+    def test_checkpoint_serialization_roundtrip(self):
+        from src.workflows.core.state import Checkpoint, StateManager
+
+        manager = StateManager()
+        state = manager.create_state("exec", "wf", initial_variables={"k": "v"})
+        full = manager.checkpoint(state)
+        state.set_variable("k", "w")
+        delta = manager.checkpoint(state)
+
+        for cp in (full, delta):
+            restored = Checkpoint.from_dict(cp.to_dict())
+            assert restored.kind == cp.kind
+            assert restored.validate()
+
+
+class _MemoryPersistence:
+    """Persistência em memória: checkpoints serializados, como num banco."""
+
+    def __init__(self):
+        self.rows = []
+
+    def save_state(self, state):
+        pass
+
+    def save_checkpoint(self, checkpoint):
+        self.rows.append(json.dumps(checkpoint.to_dict()))
+
+    def get_checkpoints(self, execution_id):
+        from src.workflows.core.state import Checkpoint
+
+        checkpoints = [Checkpoint.from_dict(json.loads(row)) for row in self.rows]
+        return [cp for cp in checkpoints if cp.execution_id == execution_id]
+
+    def get_latest_checkpoint(self, execution_id):
+        checkpoints = self.get_checkpoints(execution_id)
+        return checkpoints[-1] if checkpoints else None
+
+
+class TestPersistedRecovery:
+    """Recovery a partir da persistência (novo StateManager, após restart)."""
+
+    def test_recover_after_delta_checkpoint(self):
+        from src.workflows.core.state import StateManager
+
+        persistence = _MemoryPersistence()
+        manager = StateManager(persistence=persistence)
+        state = manager.create_state("exec", "wf", initial_variables={"a": 1})
+        manager.checkpoint(state)
+        state.set_variable("b", 2)
+        assert manager.checkpoint(state).kind == "delta"
+
+        recovered = StateManager(persistence=persistence).recover("exec")
+
+        assert recovered.variables == {"a": 1, "b": 2}
+
+    def test_delta_is_not_restored_alone(self):
+        from src.workflows.core.state import StateManager
+
+        class LatestOnly:
+            def __init__(self):
+                self.inner = _MemoryPersistence()
+                self.save_state = self.inner.save_state
+                self.save_checkpoint = self.inner.save_checkpoint
+                self.get_latest_checkpoint = self.inner.get_latest_checkpoint
+
+        persistence = LatestOnly()
+        manager = StateManager(persistence=persistence)
+        state = manager.create_state("exec", "wf")
+        manager.checkpoint(state)
+        state.set_variable("b", 2)
+        delta = manager.checkpoint(state)
+
+        with pytest.raises(ValueError):
+            delta.restore()
+        assert StateManager(persistence=persistence).recover("exec") is None